@@ -0,0 +1,52 @@
+"""
+Cassidy workflow callback endpoint
+
+In callback mode (CASSIDY_CALLBACK_MODE) Cassidy posts each workflow's result
+here instead of returning it on the triggering request. The URL carries the
+request_id the pipeline is waiting on and an HMAC token, so no API key is
+needed.
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.cassidy.callbacks import CALLBACK_PATH, get_cassidy_callback_registry
+from app.core.config import settings
+from app.models.errors import ErrorResponse
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}{CALLBACK_PATH}", tags=["Cassidy Callbacks"])
+
+
+@router.post("/{request_id}", status_code=202, summary="Receive Cassidy Workflow Result")
+async def receive_cassidy_callback(request_id: str, request: Request, token: str = Query(...)):
+    """Resume the pipeline waiting on request_id with the posted workflow result"""
+    registry = get_cassidy_callback_registry()
+    if not registry.verify(request_id, token):
+        error_response = ErrorResponse(
+            error_code="INVALID_CALLBACK_TOKEN",
+            message="Callback token does not match the request",
+            details={"request_id": request_id}
+        )
+        raise HTTPException(status_code=403, detail=error_response.model_dump())
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        error_response = ErrorResponse(
+            error_code="INVALID_CALLBACK_PAYLOAD",
+            message="Callback body must be the workflow result as a JSON object",
+            details={"request_id": request_id}
+        )
+        raise HTTPException(status_code=400, detail=error_response.model_dump())
+
+    outcome = await registry.deliver(request_id, payload)
+    if outcome is None:
+        error_response = ErrorResponse(
+            error_code="CALLBACK_REQUEST_NOT_FOUND",
+            message="No pipeline is waiting for this request; it may have timed out",
+            details={"request_id": request_id, "timeout_seconds": registry.timeout_seconds}
+        )
+        raise HTTPException(status_code=404, detail=error_response.model_dump())
+
+    return {"request_id": request_id, "status": outcome}
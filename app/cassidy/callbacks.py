@@ -0,0 +1,386 @@
+"""
+Callback mode for Cassidy workflows
+
+With ?results=true a workflow call holds its HTTP connection open until the
+workflow finishes (up to CASSIDY_TIMEOUT), which caps how many ingestions a
+worker can have in flight. In callback mode (CASSIDY_CALLBACK_MODE) the client
+triggers the workflow without results=true, passing a request_id and a signed
+callback_url, and the waiting pipeline is parked on a future in the
+CassidyCallbackRegistry. When Cassidy posts the workflow result to
+/api/v1/cassidy/callbacks/{request_id}, the registry resolves the future and
+the pipeline resumes where it left off.
+
+The callback can land on any API worker. Without a shared store
+(CASSIDY_CALLBACK_BACKEND=memory) only the worker that triggered the workflow
+can accept it. With sqlite or postgres, a worker that isn't waiting for the
+request stores the result, and the waiting worker's sweeper picks it up.
+
+The sweeper also fails requests whose callback hasn't arrived within
+CASSIDY_CALLBACK_TIMEOUT_SECONDS with CassidyTimeoutError.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from .exceptions import CassidyTimeoutError
+
+
+CALLBACK_PATH = "/cassidy/callbacks"
+
+
+def trigger_url(workflow_url: str) -> str:
+    """Workflow URL without results=true, so Cassidy acknowledges the trigger instead of waiting"""
+    parts = urlsplit(workflow_url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != "results"]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class CallbackResultBackend(ABC):
+    """Results of callbacks that arrived at a worker that isn't waiting for them"""
+
+    @abstractmethod
+    async def put(self, request_id: str, payload: Dict[str, Any]) -> None:
+        """Store a workflow result for the worker waiting on request_id"""
+
+    @abstractmethod
+    async def take_many(self, request_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Remove and return the stored results for any of request_ids"""
+
+    @abstractmethod
+    async def purge(self, older_than_seconds: float) -> None:
+        """Drop results nobody collected (their waiter timed out or went away)"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class SQLiteCallbackResultBackend(CallbackResultBackend):
+    """Results in a SQLite file shared by the workers on one host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cassidy_callback_results ("
+            " request_id TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " received_at REAL NOT NULL)"
+        )
+
+    def _put(self, request_id: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cassidy_callback_results (request_id, payload, received_at) VALUES (?, ?, ?)",
+                (request_id, json.dumps(payload), time.time())
+            )
+
+    def _take_many(self, request_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        placeholders = ",".join("?" for _ in request_ids)
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    f"SELECT request_id, payload FROM cassidy_callback_results WHERE request_id IN ({placeholders})",
+                    tuple(request_ids)
+                ).fetchall()
+                connection.execute(
+                    f"DELETE FROM cassidy_callback_results WHERE request_id IN ({placeholders})", tuple(request_ids)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return {request_id: json.loads(payload) for request_id, payload in rows}
+
+    def _purge(self, older_than_seconds: float) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM cassidy_callback_results WHERE received_at < ?", (time.time() - older_than_seconds,)
+            )
+
+    async def put(self, request_id: str, payload: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._put, request_id, payload)
+
+    async def take_many(self, request_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        if not request_ids:
+            return {}
+        return await asyncio.to_thread(self._take_many, request_ids)
+
+    async def purge(self, older_than_seconds: float) -> None:
+        await asyncio.to_thread(self._purge, older_than_seconds)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class PostgresCallbackResultBackend(CallbackResultBackend):
+    """Results in the cassidy_callback_results table, shared by every worker"""
+
+    def __init__(self, supabase_client=None):
+        if supabase_client is None:
+            from app.database.supabase_client import SupabaseClient
+            supabase_client = SupabaseClient()
+        self.supabase_client = supabase_client
+
+    async def put(self, request_id: str, payload: Dict[str, Any]) -> None:
+        await self.supabase_client._ensure_client()
+        await self.supabase_client.client.table("cassidy_callback_results").upsert({
+            "request_id": request_id,
+            "payload": payload
+        }).execute()
+
+    async def take_many(self, request_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        if not request_ids:
+            return {}
+        await self.supabase_client._ensure_client()
+        # DELETE ... RETURNING: a result is handed to exactly one taker
+        result = await self.supabase_client.client.table("cassidy_callback_results").delete().in_(
+            "request_id", list(request_ids)
+        ).execute()
+        return {row["request_id"]: row["payload"] for row in result.data or []}
+
+    async def purge(self, older_than_seconds: float) -> None:
+        await self.supabase_client._ensure_client()
+        cutoff = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - older_than_seconds))
+        await self.supabase_client.client.table("cassidy_callback_results").delete().lt("received_at", cutoff).execute()
+
+
+class _PendingWorkflow:
+    """A triggered workflow waiting for its callback"""
+
+    __slots__ = ("workflow_type", "future", "registered_at", "deadline")
+
+    def __init__(self, workflow_type: str, future: asyncio.Future, timeout_seconds: float):
+        self.workflow_type = workflow_type
+        self.future = future
+        self.registered_at = time.monotonic()
+        self.deadline = self.registered_at + timeout_seconds
+
+
+class CassidyCallbackRegistry(LoggerMixin):
+    """Parks pipelines on triggered Cassidy workflows and resumes them from callbacks"""
+
+    def __init__(
+        self,
+        backend: Optional[CallbackResultBackend] = None,
+        timeout_seconds: Optional[float] = None,
+        sweep_seconds: Optional[float] = None,
+        base_url: Optional[str] = None,
+        secret: Optional[str] = None
+    ):
+        """
+        Args:
+            backend: Shared store for callbacks that reach another worker (None: this worker only)
+            timeout_seconds: How long a triggered workflow may take to call back
+            sweep_seconds: Interval between sweeps for timed-out requests and shared results
+            base_url: Public base URL of this API, which Cassidy posts callbacks to
+            secret: Key for signing callback URLs (defaults to the API key)
+        """
+        self.backend = backend
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else settings.CASSIDY_CALLBACK_TIMEOUT_SECONDS
+        self.sweep_seconds = sweep_seconds if sweep_seconds is not None else settings.CASSIDY_CALLBACK_SWEEP_SECONDS
+        self.base_url = (base_url or settings.CASSIDY_CALLBACK_BASE_URL or "").rstrip("/")
+        self._secret = (secret or settings.CASSIDY_CALLBACK_SECRET or settings.API_KEY).encode()
+        self._pending: Dict[str, _PendingWorkflow] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._last_purge = time.monotonic()
+        self.counters = {"triggered": 0, "resumed": 0, "stored": 0, "timed_out": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def register(self, workflow_type: str) -> str:
+        """
+        Start waiting for a workflow's callback
+
+        Returns:
+            request_id to send with the trigger and to pass to wait()
+        """
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = _PendingWorkflow(workflow_type, future, self.timeout_seconds)
+        self.counters["triggered"] += 1
+        self._ensure_sweeper()
+        return request_id
+
+    def callback_url(self, request_id: str) -> str:
+        """Signed URL Cassidy posts the workflow result to"""
+        return f"{self.base_url}{settings.API_V1_STR}{CALLBACK_PATH}/{request_id}?token={self.sign(request_id)}"
+
+    def sign(self, request_id: str) -> str:
+        return hmac.new(self._secret, request_id.encode(), hashlib.sha256).hexdigest()
+
+    def verify(self, request_id: str, token: str) -> bool:
+        return hmac.compare_digest(self.sign(request_id), token)
+
+    async def wait(self, request_id: str) -> Dict[str, Any]:
+        """
+        Wait for the workflow result posted to request_id's callback
+
+        Raises:
+            CassidyTimeoutError: If no callback arrived within timeout_seconds
+        """
+        pending = self._pending[request_id]
+        try:
+            return await pending.future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def discard(self, request_id: str) -> None:
+        """Stop waiting for a request whose trigger failed"""
+        pending = self._pending.pop(request_id, None)
+        if pending is not None and not pending.future.done():
+            pending.future.cancel()
+
+    async def deliver(self, request_id: str, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Hand a callback's workflow result to the pipeline waiting for it
+
+        Returns:
+            "resumed" if a pipeline in this worker was waiting for it, "stored" if
+            it was kept for another worker, None if nobody can be waiting for it
+        """
+        if self._resolve(request_id, payload):
+            return "resumed"
+        if self.backend is None:
+            return None
+        await self.backend.put(request_id, payload)
+        self.counters["stored"] += 1
+        return "stored"
+
+    async def sweep(self) -> None:
+        """Collect results stored by other workers, then time out overdue requests"""
+        if self.backend is not None:
+            waiting = [request_id for request_id, pending in self._pending.items() if not pending.future.done()]
+            try:
+                for request_id, payload in (await self.backend.take_many(waiting)).items():
+                    self._resolve(request_id, payload)
+                if time.monotonic() - self._last_purge >= self.timeout_seconds:
+                    self._last_purge = time.monotonic()
+                    await self.backend.purge(self.timeout_seconds * 2)
+            except Exception as e:
+                self.logger.warning("Cassidy callback store unavailable", error=str(e))
+
+        now = time.monotonic()
+        for request_id, pending in list(self._pending.items()):
+            if pending.deadline <= now and not pending.future.done():
+                self.counters["timed_out"] += 1
+                self.logger.warning(
+                    "Cassidy callback timed out",
+                    request_id=request_id,
+                    workflow_type=pending.workflow_type,
+                    timeout_seconds=self.timeout_seconds
+                )
+                pending.future.set_exception(CassidyTimeoutError(
+                    f"No Cassidy callback for {pending.workflow_type} workflow within {self.timeout_seconds:.0f} seconds",
+                    details={"request_id": request_id, "timeout_seconds": self.timeout_seconds}
+                ))
+
+    def stats(self) -> Dict[str, Any]:
+        """Pending requests and counters for health reporting"""
+        now = time.monotonic()
+        oldest = min((pending.registered_at for pending in self._pending.values()), default=None)
+        return {
+            "pending": len(self._pending),
+            "oldest_pending_seconds": round(now - oldest, 1) if oldest is not None else None,
+            "timeout_seconds": self.timeout_seconds,
+            "shared_store": self.backend is not None,
+            **self.counters
+        }
+
+    async def close(self) -> None:
+        """Stop the sweeper, cancel waiting pipelines and close the store"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        for request_id in list(self._pending):
+            self.discard(request_id)
+        if self.backend is not None:
+            await self.backend.close()
+
+    def _resolve(self, request_id: str, payload: Dict[str, Any]) -> bool:
+        pending = self._pending.get(request_id)
+        if pending is None or pending.future.done():
+            return False
+        pending.future.set_result(payload)
+        self.counters["resumed"] += 1
+        self.logger.info(
+            "Cassidy callback received",
+            request_id=request_id,
+            workflow_type=pending.workflow_type,
+            waited_seconds=round(time.monotonic() - pending.registered_at, 1)
+        )
+        return True
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_while_pending(), name="cassidy-callback-sweeper")
+
+    async def _sweep_while_pending(self) -> None:
+        # Exits once nothing is pending; the next register() starts it again
+        while self._pending:
+            await asyncio.sleep(self.sweep_seconds)
+            await self.sweep()
+
+
+def build_callback_result_backend(kind: Optional[str] = None, supabase_client=None) -> Optional[CallbackResultBackend]:
+    """Create the store named by settings.CASSIDY_CALLBACK_BACKEND (None for memory)"""
+    kind = (kind or settings.CASSIDY_CALLBACK_BACKEND).lower()
+    if kind == "memory":
+        return None
+    if kind == "sqlite":
+        return SQLiteCallbackResultBackend(settings.CASSIDY_CALLBACK_SQLITE_PATH)
+    if kind == "postgres":
+        return PostgresCallbackResultBackend(supabase_client)
+    raise ValueError(f"Unknown CASSIDY_CALLBACK_BACKEND: {kind}")
+
+
+def check_callback_settings() -> None:
+    """
+    Refuse callback mode with the memory backend when the API runs more than one worker
+
+    Cassidy may post a callback to any worker, and with nothing shared the
+    worker that triggered the workflow would never see it.
+    """
+    if (settings.CASSIDY_CALLBACK_MODE and settings.CASSIDY_CALLBACK_BACKEND.lower() == "memory"
+            and settings.WEB_CONCURRENCY > 1):
+        raise ValueError(
+            f"CASSIDY_CALLBACK_MODE with CASSIDY_CALLBACK_BACKEND=memory needs a single worker "
+            f"(WEB_CONCURRENCY={settings.WEB_CONCURRENCY}); use the sqlite or postgres backend"
+        )
+
+
+_callback_registry: Optional[CassidyCallbackRegistry] = None
+
+
+def get_cassidy_callback_registry() -> CassidyCallbackRegistry:
+    """Get the process-wide callback registry, creating it on first use"""
+    global _callback_registry
+    if _callback_registry is None:
+        _callback_registry = CassidyCallbackRegistry(build_callback_result_backend())
+    return _callback_registry
+
+
+async def close_cassidy_callback_registry() -> None:
+    """Close the process-wide callback registry (a later call to get creates a new one)"""
+    global _callback_registry
+    registry, _callback_registry = _callback_registry, None
+    if registry is not None:
+        await registry.close()
@@ -7,6 +7,8 @@ and company data scraping with robust error handling and retry logic.
 
 import asyncio
 import json
+import weakref
+from contextlib import AsyncExitStack
 from typing import Dict, Any, Optional, Union
 from datetime import datetime, timedelta, timezone
 import httpx
@@ -20,6 +22,9 @@ from tenacity import (
 
 from app.core.config import settings
 from app.core.logging import LoggerMixin
+from app.core.metrics import CASSIDY_RETRIES, RATE_LIMIT_HITS
+from app.core.upstream import get_upstream_controller
+from .callbacks import CassidyCallbackRegistry, get_cassidy_callback_registry, trigger_url
 from .exceptions import (
     CassidyAPIError,
     CassidyTimeoutError,
@@ -36,14 +41,42 @@ from .models import (
 )
 
 
+def _count_retry(retry_state) -> None:
+    """Tenacity before_sleep hook: count each retried Cassidy workflow attempt"""
+    workflow_type = retry_state.kwargs.get("workflow_type", "unknown")
+    CASSIDY_RETRIES.inc(workflow=workflow_type)
+
+
+def _h2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
 class CassidyClient(LoggerMixin):
     """
     HTTP client for Cassidy AI workflows
     
     Provides methods to interact with Cassidy webhook endpoints for 
-    LinkedIn profile and company data extraction.
+    LinkedIn profile and company data extraction. All instances share one
+    long-lived httpx connection pool per event loop so keep-alive connections
+    and TLS sessions are reused across profiles and companies.
     """
     
+    # Shared connection pools keyed by event loop: loop -> (exit stack, client)
+    _http_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+    
+    # Process-wide connection pool counters
+    _pool_counters: Dict[str, int] = {
+        "requests": 0,
+        "connections_opened": 0,
+        "tls_handshakes": 0,
+        "pools_opened": 0,
+    }
+    
     def __init__(self):
         self.profile_workflow_url = settings.CASSIDY_PROFILE_WORKFLOW_URL
         self.company_workflow_url = settings.CASSIDY_COMPANY_WORKFLOW_URL
@@ -51,6 +84,19 @@ class CassidyClient(LoggerMixin):
         self.max_retries = settings.CASSIDY_MAX_RETRIES
         self.backoff_factor = settings.CASSIDY_BACKOFF_FACTOR
         
+        # Process-wide adaptive concurrency limit and circuit breaker for Cassidy
+        self.upstream = get_upstream_controller(
+            "cassidy", failure_exceptions=(httpx.TimeoutException, httpx.TransportError)
+        )
+        
+        # Callback mode: workflows report results to /api/v1/cassidy/callbacks instead of the open request
+        self.callbacks: Optional[CassidyCallbackRegistry] = None
+        if settings.CASSIDY_CALLBACK_MODE:
+            if settings.CASSIDY_CALLBACK_BASE_URL:
+                self.callbacks = get_cassidy_callback_registry()
+            else:
+                self.logger.warning("CASSIDY_CALLBACK_MODE is set without CASSIDY_CALLBACK_BASE_URL; waiting for results inline")
+        
         # HTTP client configuration
         self.client_config = {
             "timeout": httpx.Timeout(
@@ -60,10 +106,11 @@ class CassidyClient(LoggerMixin):
                 pool=30.0
             ),
             "limits": httpx.Limits(
-                max_keepalive_connections=10,
-                max_connections=20,
+                max_keepalive_connections=settings.CASSIDY_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=settings.CASSIDY_MAX_CONNECTIONS,
                 keepalive_expiry=30.0
             ),
+            "http2": settings.CASSIDY_HTTP2 and _h2_available(),
             "headers": {
                 "Content-Type": "application/json",
                 "Accept": "application/json",
@@ -71,6 +118,92 @@ class CassidyClient(LoggerMixin):
             }
         }
     
+    async def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client for the running event loop, opening it on first use
+        
+        Returns:
+            Long-lived httpx.AsyncClient bound to the current event loop
+        """
+        loop = asyncio.get_running_loop()
+        pool = CassidyClient._http_pools.get(loop)
+        if pool is not None:
+            return pool[1]
+        
+        stack = AsyncExitStack()
+        http_client = await stack.enter_async_context(httpx.AsyncClient(**self.client_config))
+        
+        # Another task may have opened a pool while we were awaiting
+        existing = CassidyClient._http_pools.get(loop)
+        if existing is not None:
+            await stack.aclose()
+            return existing[1]
+        
+        CassidyClient._http_pools[loop] = (stack, http_client)
+        CassidyClient._pool_counters["pools_opened"] += 1
+        self.logger.info(
+            "Opened shared Cassidy connection pool",
+            http2=self.client_config["http2"],
+            max_connections=settings.CASSIDY_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CASSIDY_MAX_KEEPALIVE_CONNECTIONS
+        )
+        return http_client
+    
+    @classmethod
+    async def open_pool(cls) -> None:
+        """Open the shared connection pool for the running event loop (called at startup)"""
+        await cls()._get_http_client()
+    
+    @classmethod
+    async def close_pool(cls) -> None:
+        """Close the shared connection pool for the running event loop (called at shutdown)"""
+        pool = cls._http_pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool[0].aclose()
+            cls().logger.info("Closed shared Cassidy connection pool")
+    
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Any]:
+        """
+        Get connection pool statistics for the shared Cassidy HTTP clients
+        
+        Returns:
+            Dict with pool limits, current connection counts and lifetime counters
+        """
+        open_connections = 0
+        active_connections = 0
+        http2_connections = 0
+        for _, http_client in list(cls._http_pools.values()):
+            connection_pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+            for connection in getattr(connection_pool, "connections", None) or []:
+                try:
+                    open_connections += 1
+                    if not connection.is_idle():
+                        active_connections += 1
+                    if "HTTP/2" in repr(connection):
+                        http2_connections += 1
+                except Exception:
+                    continue
+        
+        return {
+            "max_connections": settings.CASSIDY_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.CASSIDY_MAX_KEEPALIVE_CONNECTIONS,
+            "http2_enabled": settings.CASSIDY_HTTP2 and _h2_available(),
+            "open_pools": len(cls._http_pools),
+            "open_connections": open_connections,
+            "active_connections": active_connections,
+            "idle_connections": open_connections - active_connections,
+            "http2_connections": http2_connections,
+            **cls._pool_counters,
+        }
+    
+    async def _trace_connection_event(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook used to count new connections and TLS handshakes"""
+        if event_name == "connection.connect_tcp.complete":
+            CassidyClient._pool_counters["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            CassidyClient._pool_counters["tls_handshakes"] += 1
+    
     async def fetch_profile(self, linkedin_url: str) -> LinkedInProfile:
         """
         Fetch LinkedIn profile data using Cassidy workflow
@@ -93,7 +226,7 @@ class CassidyClient(LoggerMixin):
             }
             
             # Execute workflow with retry logic
-            response_data = await self._execute_workflow_with_retry(
+            response_data = await self._run_workflow(
                 url=self.profile_workflow_url,
                 payload=payload,
                 workflow_type="profile"
@@ -146,7 +279,7 @@ class CassidyClient(LoggerMixin):
             }
             
             # Execute workflow with retry logic
-            response_data = await self._execute_workflow_with_retry(
+            response_data = await self._run_workflow(
                 url=self.company_workflow_url,
                 payload=payload,
                 workflow_type="company"
@@ -177,6 +310,65 @@ class CassidyClient(LoggerMixin):
             )
             raise
     
+    async def _run_workflow(self, url: str, payload: Dict[str, Any], workflow_type: str) -> Dict[str, Any]:
+        """
+        Run a Cassidy workflow and return its results
+        
+        Inline mode waits on the ?results=true response. Callback mode triggers
+        the workflow with a request_id and signed callback_url, releases the
+        connection, and waits for Cassidy to post the results back.
+        
+        Args:
+            url: Cassidy workflow webhook URL
+            payload: Request payload
+            workflow_type: Type of workflow (profile/company) for logging
+            
+        Returns:
+            Dict containing workflow response data
+        """
+        if self.callbacks is None:
+            return await self._execute_workflow_with_retry(url=url, payload=payload, workflow_type=workflow_type)
+        
+        request_id = await self._trigger_workflow(url=url, payload=payload, workflow_type=workflow_type)
+        
+        self.logger.info(f"Waiting for {workflow_type} workflow callback", request_id=request_id)
+        return await self.callbacks.wait(request_id)
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=2, min=4, max=60),
+        # Only failures before Cassidy accepted the POST; a timeout may already have started the workflow
+        retry=retry_if_exception_type((CassidyConnectionError, CassidyRateLimitError)),
+        before_sleep=_count_retry,
+    )
+    async def _trigger_workflow(self, url: str, payload: Dict[str, Any], workflow_type: str) -> str:
+        """
+        Trigger a callback-mode workflow and return the request_id it reports back under
+        
+        Each attempt registers a new request_id and discards it on failure, so a
+        late callback from an attempt that did reach Cassidy is rejected rather
+        than resolving the retry.
+        
+        Args:
+            url: Cassidy workflow webhook URL
+            payload: Request payload
+            workflow_type: Type of workflow (profile/company) for logging
+            
+        Returns:
+            request_id to wait on
+        """
+        request_id = self.callbacks.register(workflow_type)
+        try:
+            await self._execute_workflow(
+                url=trigger_url(url),
+                payload={**payload, "request_id": request_id, "callback_url": self.callbacks.callback_url(request_id)},
+                workflow_type=workflow_type
+            )
+        except BaseException:
+            self.callbacks.discard(request_id)
+            raise
+        return request_id
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=2, min=4, max=60),
@@ -187,15 +379,29 @@ class CassidyClient(LoggerMixin):
             httpx.ConnectError,
         )),
         # Note: before_sleep logging removed due to initialization order
+        before_sleep=_count_retry,
     )
     async def _execute_workflow_with_retry(
         self, 
         url: str, 
         payload: Dict[str, Any], 
         workflow_type: str
+    ) -> Dict[str, Any]:
+        """Execute Cassidy workflow with retry logic (see _execute_workflow)"""
+        return await self._execute_workflow(url=url, payload=payload, workflow_type=workflow_type)
+    
+    async def _execute_workflow(
+        self, 
+        url: str, 
+        payload: Dict[str, Any], 
+        workflow_type: str
     ) -> Dict[str, Any]:
         """
-        Execute Cassidy workflow with retry logic
+        Execute one Cassidy workflow request
+        
+        The request holds a slot from the Cassidy upstream controller, so an
+        open circuit fails the call with UpstreamUnavailableError (not retried)
+        instead of waiting out another timeout.
         
         Args:
             url: Cassidy workflow webhook URL
@@ -211,66 +417,71 @@ class CassidyClient(LoggerMixin):
         start_time = datetime.now(timezone.utc)
         
         try:
-            async with httpx.AsyncClient(**self.client_config) as client:
-                self.logger.debug(
-                    f"Executing {workflow_type} workflow",
-                    url=url,
-                    payload=payload
-                )
-                
+            client = await self._get_http_client()
+            self.logger.debug(
+                f"Executing {workflow_type} workflow",
+                url=url,
+                payload=payload
+            )
+            
+            async with self.upstream.request() as call:
+                CassidyClient._pool_counters["requests"] += 1
                 response = await client.post(
                     url=url,
-                    json=payload
+                    json=payload,
+                    extensions={"trace": self._trace_connection_event}
                 )
-                
-                # Handle HTTP errors
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After", "60")
-                    raise CassidyRateLimitError(
-                        f"Rate limit exceeded. Retry after {retry_after} seconds",
-                        status_code=response.status_code,
-                        details={"retry_after": retry_after}
-                    )
-                
-                if response.status_code >= 400:
-                    error_details = {}
-                    try:
-                        error_details = response.json()
-                    except json.JSONDecodeError:
-                        pass
-                    
-                    raise CassidyAPIError(
-                        f"Cassidy API error: HTTP {response.status_code}",
-                        status_code=response.status_code,
-                        details=error_details
-                    )
-                
-                # Parse response JSON
+                call.record(response.status_code, response.headers)
+            
+            # Handle HTTP errors
+            if response.status_code == 429:
+                RATE_LIMIT_HITS.inc(upstream="cassidy")
+                retry_after = response.headers.get("Retry-After", "60")
+                raise CassidyRateLimitError(
+                    f"Rate limit exceeded. Retry after {retry_after} seconds",
+                    status_code=response.status_code,
+                    details={"retry_after": retry_after}
+                )
+            
+            if response.status_code >= 400:
+                error_details = {}
                 try:
-                    response_data = response.json()
-                except json.JSONDecodeError as e:
-                    raise CassidyValidationError(
-                        f"Invalid JSON response from Cassidy API: {str(e)}",
-                        details={"raw_response": response.text[:1000]}
-                    )
+                    error_details = response.json()
+                except json.JSONDecodeError:
+                    pass
                 
-                execution_time = (datetime.now(timezone.utc) - start_time).total_seconds()
-                
-                # DEBUG: Log the actual response structure to understand format
-                self.logger.info(
-                    f"DEBUG: Cassidy {workflow_type} response structure",
-                    response_keys=list(response_data.keys()),
-                    response_sample=str(response_data)[:500]
+                raise CassidyAPIError(
+                    f"Cassidy API error: HTTP {response.status_code}",
+                    status_code=response.status_code,
+                    details=error_details
                 )
-                
-                self.logger.debug(
-                    f"Workflow {workflow_type} completed",
-                    execution_time_seconds=execution_time,
-                    status_code=response.status_code
+            
+            # Parse response JSON
+            try:
+                response_data = response.json()
+            except json.JSONDecodeError as e:
+                raise CassidyValidationError(
+                    f"Invalid JSON response from Cassidy API: {str(e)}",
+                    details={"raw_response": response.text[:1000]}
                 )
-                
-                return response_data
-                
+            
+            execution_time = (datetime.now(timezone.utc) - start_time).total_seconds()
+            
+            # DEBUG: Log the actual response structure to understand format
+            self.logger.info(
+                f"DEBUG: Cassidy {workflow_type} response structure",
+                response_keys=list(response_data.keys()),
+                response_sample=str(response_data)[:500]
+            )
+            
+            self.logger.debug(
+                f"Workflow {workflow_type} completed",
+                execution_time_seconds=execution_time,
+                status_code=response.status_code
+            )
+            
+            return response_data
+            
         except httpx.TimeoutException as e:
             raise CassidyTimeoutError(
                 f"Cassidy workflow timeout after {self.timeout} seconds",
@@ -508,13 +719,13 @@ class CassidyClient(LoggerMixin):
             Dict with health check results
         """
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.head("https://app.cassidyai.com")
-                return {
-                    "status": "healthy" if response.status_code < 400 else "unhealthy",
-                    "status_code": response.status_code,
-                    "response_time_ms": response.elapsed.total_seconds() * 1000
-                }
+            client = await self._get_http_client()
+            response = await client.head("https://app.cassidyai.com", timeout=5.0)
+            return {
+                "status": "healthy" if response.status_code < 400 else "unhealthy",
+                "status_code": response.status_code,
+                "response_time_ms": response.elapsed.total_seconds() * 1000
+            }
         except Exception as e:
             return {
                 "status": "unhealthy",
@@ -0,0 +1,193 @@
+"""
+Cross-request cache for Cassidy company fetches
+
+Company workflows are slow and the same employers show up again and again when
+ingesting executives from the same firm. This cache keeps recently fetched
+CompanyProfile objects in memory with a TTL and an LRU size bound, and
+coalesces concurrent requests for the same company into one upstream call.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from app.cassidy.models import CompanyProfile
+
+
+# Cache lookup outcomes reported to callers
+CACHE_HIT = "hit"
+CACHE_COALESCED = "coalesced"
+CACHE_MISS = "miss"
+
+
+class CompanyFetchCache(LoggerMixin):
+    """In-memory TTL + LRU cache of company profiles with single-flight fetching"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Initialize company fetch cache
+
+        Args:
+            ttl_seconds: Seconds a fetched company stays valid (0 disables caching)
+            max_entries: Maximum number of companies kept before evicting the least recently used
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, CompanyProfile]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @staticmethod
+    def cache_key(company_url: str) -> str:
+        """
+        Build the cache key for a company URL
+
+        Uses the same company ID extraction as CompanyService so that URL
+        variants (protocol, www, trailing slash, query string) share an entry.
+
+        Args:
+            company_url: LinkedIn company URL
+
+        Returns:
+            Normalized company ID, or the stripped URL if no ID can be extracted
+        """
+        # Import here to avoid circular imports (app.services imports the pipeline)
+        from app.services.company_service import CompanyService
+
+        company_id = CompanyService._extract_company_id_from_url(company_url)
+        return (company_id or company_url.strip()).lower()
+
+    def get(self, company_url: str) -> Optional[CompanyProfile]:
+        """
+        Get a cached company if present and not expired
+
+        Args:
+            company_url: LinkedIn company URL
+
+        Returns:
+            Cached CompanyProfile or None
+        """
+        key = self.cache_key(company_url)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, company = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return company
+
+    def put(self, company_url: str, company: CompanyProfile) -> None:
+        """Store a fetched company, evicting the least recently used entries if full"""
+        if not self.enabled:
+            return
+
+        key = self.cache_key(company_url)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, company)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get_or_fetch(
+        self,
+        company_url: str,
+        fetcher: Callable[[str], Awaitable[CompanyProfile]]
+    ) -> Tuple[CompanyProfile, str]:
+        """
+        Return a cached company or fetch it, coalescing concurrent fetches
+
+        Args:
+            company_url: LinkedIn company URL
+            fetcher: Coroutine function performing the upstream fetch
+
+        Returns:
+            Tuple of (company, outcome) where outcome is "hit", "coalesced" or "miss"
+
+        Raises:
+            Exception: Whatever the upstream fetch raised (failures are not cached)
+        """
+        if not self.enabled:
+            return await fetcher(company_url), CACHE_MISS
+
+        cached = self.get(company_url)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached, CACHE_HIT
+
+        key = self.cache_key(company_url)
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            self._stats["coalesced"] += 1
+            self.logger.debug("Coalescing company fetch with in-flight request", company_key=key)
+            return await asyncio.shield(inflight), CACHE_COALESCED
+
+        self._stats["misses"] += 1
+        # The fetch runs in a task the cache owns: a caller that is cancelled stops
+        # waiting without cancelling the fetch the other callers are waiting on
+        task = loop.create_task(self._fetch(key, company_url, fetcher), name=f"company-fetch-{key}")
+        # Mark exceptions as retrieved so a failure with no waiters is not reported as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return await asyncio.shield(task), CACHE_MISS
+
+    async def _fetch(
+        self,
+        key: str,
+        company_url: str,
+        fetcher: Callable[[str], Awaitable[CompanyProfile]]
+    ) -> CompanyProfile:
+        try:
+            company = await fetcher(company_url)
+            self.put(company_url, company)
+            return company
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def invalidate(self, company_url: str) -> None:
+        """Drop a company from the cache"""
+        self._entries.pop(self.cache_key(company_url), None)
+
+    def clear(self) -> None:
+        """Drop all cached companies and reset statistics"""
+        self._entries.clear()
+        self._inflight.clear()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._inflight),
+            "hit_rate": round((self._stats["hits"] + self._stats["coalesced"]) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_company_fetch_cache: Optional[CompanyFetchCache] = None
+
+
+def get_company_fetch_cache() -> CompanyFetchCache:
+    """Get the process-wide company fetch cache, creating it on first use"""
+    global _company_fetch_cache
+    if _company_fetch_cache is None:
+        _company_fetch_cache = CompanyFetchCache(
+            ttl_seconds=settings.COMPANY_CACHE_TTL_SECONDS,
+            max_entries=settings.COMPANY_CACHE_MAX_ENTRIES
+        )
+    return _company_fetch_cache
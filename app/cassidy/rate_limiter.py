@@ -0,0 +1,95 @@
+"""
+Process-wide rate limiting for Cassidy workflow calls
+
+Provides a token bucket driven by settings.CASSIDY_RATE_LIMIT so that every
+concurrent ingestion in the process shares the same Cassidy call budget.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+
+
+class TokenBucket(LoggerMixin):
+    """
+    Asynchronous token bucket rate limiter
+
+    Tokens are reserved synchronously before any await, so callers are served
+    in arrival order. Reservations take a short threading lock (never held
+    across an await), so the bucket can also be shared by event loops running
+    in other threads.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate_per_minute: Number of tokens refilled per minute
+            capacity: Maximum burst size (defaults to rate_per_minute)
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate_per_minute))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last refill, up to capacity (caller holds the lock)"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+
+    def reserve(self) -> float:
+        """
+        Reserve one token without waiting
+
+        Returns:
+            Seconds the caller must wait before the reserved token is usable
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1.0
+            tokens = self._tokens
+        if tokens >= 0:
+            return 0.0
+        return -tokens / self.rate_per_second
+
+    async def acquire(self) -> float:
+        """
+        Wait until a token is available
+
+        Returns:
+            Seconds spent waiting for the token
+        """
+        wait_seconds = self.reserve()
+        if wait_seconds > 0:
+            self.logger.debug("Waiting for Cassidy rate limit token", wait_seconds=round(wait_seconds, 3))
+            await asyncio.sleep(wait_seconds)
+        return wait_seconds
+
+    @property
+    def available_tokens(self) -> float:
+        """Current number of tokens in the bucket (may be negative when oversubscribed)"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+_cassidy_rate_limiter: Optional[TokenBucket] = None
+
+
+def get_cassidy_rate_limiter() -> TokenBucket:
+    """Get the process-wide Cassidy token bucket, creating it on first use"""
+    global _cassidy_rate_limiter
+    if _cassidy_rate_limiter is None:
+        _cassidy_rate_limiter = TokenBucket(settings.CASSIDY_RATE_LIMIT)
+    return _cassidy_rate_limiter
@@ -16,6 +16,7 @@ from app.core.config import settings
 from app.database.supabase_client import SupabaseClient
 from app.services.scoring_job_service import ScoringJobService
 from app.services.llm_scoring_service import LLMScoringService
+from app.services.scoring_worker import notify_scoring_workers
 from app.models.scoring import (
     ScoringRequest, ScoringResponse, JobRetryRequest,
     JobStatus, ScoringResultData, ScoringErrorData
@@ -23,51 +24,28 @@ from app.models.scoring import (
 from app.models.template_models import EnhancedScoringRequest
 from app.services.template_service import TemplateService
 from app.models.errors import ErrorResponse
+from app.exceptions import InvalidCursorError
 
 
 class ProfileScoringController(LoggerMixin):
-    """Controller for profile scoring request endpoints"""
+    """
+    Controller for profile scoring request endpoints
     
-    def __init__(self):
-        self.db_client = SupabaseClient()
-        self.job_service = ScoringJobService()
-        self.llm_service = LLMScoringService()
-        self.template_service = TemplateService(supabase_client=self.db_client)
-        self._rate_limits = {}  # Simple in-memory rate limiting
+    Per-profile scoring limits are enforced before routing by the rate limit
+    middleware (app.core.rate_limit).
+    """
     
-    def _check_rate_limit(self, profile_id: str) -> bool:
-        """
-        Check if profile has exceeded rate limits
-        
-        Returns:
-            bool: True if within limits, False if exceeded
-        """
-        now = datetime.now(timezone.utc)
-        hour_ago = now - timedelta(hours=1)
-        
-        # Clean old entries
-        self._rate_limits = {
-            pid: requests for pid, requests in self._rate_limits.items()
-            if any(req_time > hour_ago for req_time in requests)
-        }
-        
-        # Check current profile
-        if profile_id not in self._rate_limits:
-            self._rate_limits[profile_id] = []
-        
-        # Filter to last hour
-        self._rate_limits[profile_id] = [
-            req_time for req_time in self._rate_limits[profile_id]
-            if req_time > hour_ago
-        ]
-        
-        # Check limit (10 per hour per profile)
-        if len(self._rate_limits[profile_id]) >= 10:
-            return False
-        
-        # Record this request
-        self._rate_limits[profile_id].append(now)
-        return True
+    def __init__(
+        self,
+        db_client: Optional[SupabaseClient] = None,
+        job_service: Optional[ScoringJobService] = None,
+        llm_service: Optional[LLMScoringService] = None,
+        template_service: Optional[TemplateService] = None
+    ):
+        self.db_client = db_client or SupabaseClient()
+        self.job_service = job_service or ScoringJobService(supabase_client=self.db_client)
+        self.llm_service = llm_service or LLMScoringService(job_service=self.job_service)
+        self.template_service = template_service or TemplateService(supabase_client=self.db_client)
     
     async def create_scoring_job(
         self, 
@@ -94,22 +72,6 @@ class ProfileScoringController(LoggerMixin):
             prompt_length=len(request.prompt)
         )
         
-        # Check rate limits
-        if not self._check_rate_limit(profile_id):
-            error_response = ErrorResponse(
-                error_code="RATE_LIMIT_EXCEEDED",
-                message="Rate limit exceeded for profile scoring",
-                details={
-                    "profile_id": profile_id,
-                    "limit": "10 requests per hour per profile"
-                }
-            )
-            raise HTTPException(
-                status_code=429,
-                detail=error_response.model_dump(),
-                headers={"Retry-After": "3600"}
-            )
-        
         # Verify profile exists
         try:
             profile = await self.db_client.get_profile_by_id(profile_id)
@@ -150,11 +112,13 @@ class ProfileScoringController(LoggerMixin):
             job_id = await self.job_service.create_job(
                 profile_id=profile_id,
                 prompt=request.prompt,
-                model_name=request.model
+                model_name=request.model,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
             )
             
-            # Start background processing (don't await)
-            asyncio.create_task(self._process_scoring_job(job_id, request))
+            # Hand the job to the worker pool (don't await)
+            self._dispatch_job(job_id, request)
             
             # Return immediate response
             estimated_completion = datetime.now(timezone.utc) + timedelta(minutes=2)
@@ -194,6 +158,20 @@ class ProfileScoringController(LoggerMixin):
                 detail=error_response.model_dump()
             )
     
+    def _dispatch_job(self, job_id: str, request: ScoringRequest):
+        """
+        Wake the scoring worker pool for a newly queued job
+        
+        Falls back to in-process background processing when no worker pool is
+        running (SCORING_WORKER_ENABLED is off or the app lifespan did not run).
+        
+        Args:
+            job_id: Job identifier
+            request: Original scoring request
+        """
+        if not notify_scoring_workers():
+            asyncio.create_task(self._process_scoring_job(job_id, request))
+    
     async def _process_scoring_job(self, job_id: str, request: ScoringRequest):
         """
         Background task to process scoring job with LLM
@@ -374,22 +352,6 @@ class ProfileScoringController(LoggerMixin):
                 prompt_length=len(prompt)
             )
         
-        # Check rate limits
-        if not self._check_rate_limit(profile_id):
-            error_response = ErrorResponse(
-                error_code="RATE_LIMIT_EXCEEDED",
-                message="Rate limit exceeded for profile scoring",
-                details={
-                    "profile_id": profile_id,
-                    "limit": "10 requests per hour per profile"
-                }
-            )
-            raise HTTPException(
-                status_code=429,
-                detail=error_response.model_dump(),
-                headers={"Retry-After": "3600"}
-            )
-        
         # Verify profile exists
         try:
             profile = await self.db_client.get_profile_by_id(profile_id)
@@ -431,7 +393,9 @@ class ProfileScoringController(LoggerMixin):
                 profile_id=profile_id,
                 prompt=prompt,
                 model_name=getattr(request, 'model', 'gpt-3.5-turbo'),
-                template_id=template_id
+                template_id=template_id,
+                max_tokens=getattr(request, 'max_tokens', 2000),
+                temperature=getattr(request, 'temperature', 0.1)
             )
             
             # Convert enhanced request to legacy format for background processing
@@ -442,8 +406,8 @@ class ProfileScoringController(LoggerMixin):
                 temperature=getattr(request, 'temperature', 0.1)
             )
             
-            # Start background processing (don't await)
-            asyncio.create_task(self._process_scoring_job(job_id, legacy_request))
+            # Hand the job to the worker pool (don't await)
+            self._dispatch_job(job_id, legacy_request)
             
             # Return immediate response
             response = ScoringResponse(
@@ -489,9 +453,13 @@ class ProfileScoringController(LoggerMixin):
 class ScoringJobController(LoggerMixin):
     """Controller for scoring job status and retry endpoints"""
     
-    def __init__(self):
-        self.job_service = ScoringJobService()
-        self.llm_service = LLMScoringService()
+    def __init__(
+        self,
+        job_service: Optional[ScoringJobService] = None,
+        llm_service: Optional[LLMScoringService] = None
+    ):
+        self.job_service = job_service or ScoringJobService()
+        self.llm_service = llm_service or LLMScoringService(job_service=self.job_service)
     
     async def get_job_status(self, job_id: str) -> ScoringResponse:
         """
@@ -641,8 +609,9 @@ class ScoringJobController(LoggerMixin):
                     detail=error_response.model_dump()
                 )
             
-            # Reset job to pending and increment retry count
-            await self.job_service.retry_job(job_id)
+            # Update model if specified in retry (before the job becomes claimable again)
+            if retry_request and retry_request.model:
+                await self.job_service.update_job_model(job_id, retry_request.model)
             
             # Start background processing with new parameters if provided
             request_params = {
@@ -650,11 +619,15 @@ class ScoringJobController(LoggerMixin):
                 "temperature": 0.1
             }
             
-            # Update model if specified in retry
-            if retry_request and retry_request.model:
-                await self.job_service.update_job_model(job_id, retry_request.model)
+            # Reset job to pending and increment retry count
+            await self.job_service.retry_job(
+                job_id,
+                max_tokens=request_params["max_tokens"],
+                temperature=request_params["temperature"]
+            )
             
-            asyncio.create_task(self._process_retry_job(job_id, request_params))
+            if not notify_scoring_workers():
+                asyncio.create_task(self._process_retry_job(job_id, request_params))
             
             return ScoringResponse(
                 job_id=job_id,
@@ -696,14 +669,7 @@ class ScoringJobController(LoggerMixin):
         try:
             self.logger.info("Starting retry job processing", job_id=job_id)
             
-            # Update status to processing
-            await self.job_service.update_job_status(
-                job_id=job_id,
-                status=JobStatus.PROCESSING,
-                started_at=datetime.now(timezone.utc)
-            )
-            
-            # Process with LLM service
+            # Process with LLM service (it moves the PENDING job to PROCESSING)
             await self.llm_service.process_scoring_job(
                 job_id=job_id,
                 max_tokens=request_params["max_tokens"],
@@ -724,7 +690,8 @@ class ScoringJobController(LoggerMixin):
         self,
         limit: int = 50,
         offset: int = 0,
-        status_filter: Optional[str] = None
+        status_filter: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         List scoring jobs with pagination and stats for dashboard
@@ -733,6 +700,7 @@ class ScoringJobController(LoggerMixin):
             limit: Maximum number of jobs to return
             offset: Number of jobs to skip
             status_filter: Optional status to filter by
+            cursor: next_cursor of the previous page (keyset pagination)
             
         Returns:
             Dict with jobs, stats, and pagination info
@@ -745,10 +713,11 @@ class ScoringJobController(LoggerMixin):
         )
         
         try:
-            jobs, stats = await self.job_service.list_jobs(
+            jobs, stats, next_cursor = await self.job_service.list_jobs(
                 limit=limit,
                 offset=offset,
-                status_filter=status_filter
+                status_filter=status_filter,
+                cursor=cursor
             )
             
             # Convert jobs to simple dict format for JSON response
@@ -786,10 +755,13 @@ class ScoringJobController(LoggerMixin):
                     "limit": limit,
                     "offset": offset,
                     "total": stats["total_jobs"],
-                    "has_more": len(jobs_data) >= limit
+                    "has_more": next_cursor is not None,
+                    "next_cursor": next_cursor
                 }
             }
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             self.logger.error(
                 "Failed to list jobs",
@@ -810,3 +782,50 @@ class ScoringJobController(LoggerMixin):
                 }
             )
             raise HTTPException(status_code=500, detail=error_response.model_dump())
+    
+    async def get_job_stats(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        group_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Scoring job counts per status, optionally per template or model
+        
+        Args:
+            since: Only count jobs created at or after this time
+            until: Only count jobs created before this time
+            group_by: Optional breakdown: 'template' or 'model'
+            
+        Returns:
+            Dict with stats and the window they cover
+        """
+        try:
+            stats = await self.job_service.get_job_stats(since=since, until=until, group_by=group_by)
+            
+            return {
+                "stats": stats,
+                "window": {
+                    "since": since.isoformat() if since else None,
+                    "until": until.isoformat() if until else None
+                },
+                "group_by": group_by
+            }
+            
+        except Exception as e:
+            self.logger.error(
+                "Failed to get job stats",
+                group_by=group_by,
+                error=str(e),
+                error_type=type(e).__name__
+            )
+            
+            error_response = ErrorResponse(
+                error_code="JOB_STATS_ERROR",
+                message="Failed to retrieve scoring job stats",
+                details={
+                    "operation": "get_job_stats",
+                    "error": str(e)
+                }
+            )
+            raise HTTPException(status_code=500, detail=error_response.model_dump())
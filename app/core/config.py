@@ -30,6 +30,7 @@ class Settings(BaseSettings):
         description="Allowed CORS origins"
     )
     API_V1_STR: str = "/api/v1"
+    WEB_CONCURRENCY: int = Field(default=1, description="Worker processes serving the API (the variable uvicorn and gunicorn read for their worker count)")
     
     # Cassidy AI Configuration
     CASSIDY_PROFILE_WORKFLOW_URL: str = Field(
@@ -43,22 +44,68 @@ class Settings(BaseSettings):
     CASSIDY_TIMEOUT: int = Field(default=300, description="Cassidy API timeout in seconds")
     CASSIDY_MAX_RETRIES: int = Field(default=3, description="Maximum retry attempts for Cassidy API")
     CASSIDY_BACKOFF_FACTOR: float = Field(default=2.0, description="Exponential backoff factor")
+    CASSIDY_MAX_CONNECTIONS: int = Field(default=20, description="Maximum connections in the shared Cassidy HTTP pool")
+    CASSIDY_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=10, description="Maximum idle keep-alive connections in the Cassidy HTTP pool")
+    COMPANY_CACHE_TTL_SECONDS: int = Field(default=21600, description="How long fetched company profiles are reused across requests (0 disables the cache)")
+    COMPANY_CACHE_MAX_ENTRIES: int = Field(default=1000, description="Maximum number of company profiles kept in the fetch cache")
+    CASSIDY_HTTP2: bool = Field(default=True, description="Use HTTP/2 for Cassidy requests when the h2 package is installed")
+    CASSIDY_CALLBACK_MODE: bool = Field(default=False, description="Trigger Cassidy workflows without ?results=true and resume pipelines when Cassidy posts results to the callback endpoint")
+    CASSIDY_CALLBACK_BASE_URL: Optional[str] = Field(default=None, description="Public base URL of this API that Cassidy posts workflow callbacks to (required for callback mode)")
+    CASSIDY_CALLBACK_SECRET: Optional[str] = Field(default=None, description="Key for signing callback URLs (defaults to API_KEY)")
+    CASSIDY_CALLBACK_TIMEOUT_SECONDS: int = Field(default=900, description="Seconds a triggered workflow may take to call back before its pipeline fails with a timeout")
+    CASSIDY_CALLBACK_SWEEP_SECONDS: float = Field(default=5.0, description="Interval between sweeps for timed-out callbacks and results stored by other workers")
+    CASSIDY_CALLBACK_BACKEND: str = Field(default="memory", description="Where callbacks that reach a worker not waiting for them are kept: memory (not kept; one worker), sqlite (workers on one host) or postgres (all workers)")
+    CASSIDY_CALLBACK_SQLITE_PATH: str = Field(default="/tmp/linkedin_cassidy_callbacks.sqlite3", description="SQLite file shared by workers when CASSIDY_CALLBACK_BACKEND=sqlite")
+    
+    # Profile Freshness
+    PROFILE_FRESHNESS_SECONDS: int = Field(default=21600, description="Stored profiles fetched more recently than this are returned without a Cassidy fetch unless force_refresh is set (0 disables)")
+    
+    # Profile Ingestion Locks
+    PROFILE_LOCK_BACKEND: str = Field(default="memory", description="Per-URL ingestion lease store: memory (one worker), sqlite (workers on one host) or postgres (all workers)")
+    PROFILE_LOCK_SQLITE_PATH: str = Field(default="/tmp/linkedin_ingestion_locks.sqlite3", description="SQLite file shared by workers when PROFILE_LOCK_BACKEND=sqlite")
+    PROFILE_LOCK_TTL_SECONDS: int = Field(default=60, description="Seconds an ingestion lease lasts without renewal; the holder renews it every third of this while ingesting, so it bounds how long a dead worker blocks the URL")
+    PROFILE_LOCK_WAIT_SECONDS: int = Field(default=600, description="Seconds a request waits for another ingestion of the same URL before failing with 409")
+    PROFILE_LOCK_POLL_SECONDS: float = Field(default=0.25, description="First interval between attempts to take a held ingestion lease")
+    PROFILE_LOCK_MAX_POLL_SECONDS: float = Field(default=5.0, description="Cap for the lease poll interval, which doubles after each attempt")
+    
+    # Company Enrichment
+    COMPANY_ENRICHMENT_MAX_CONCURRENT: int = Field(default=2, description="Maximum deferred company enrichments run at once per process")
     
     # Database Configuration
     SUPABASE_URL: Optional[str] = Field(default=None, description="Supabase project URL")
     SUPABASE_ANON_KEY: Optional[str] = Field(default=None, description="Supabase anonymous key")
     SUPABASE_SERVICE_KEY: Optional[str] = Field(default=None, description="Supabase service role key")
+    SUPABASE_MAX_CONNECTIONS: int = Field(default=20, description="Maximum connections in the shared Supabase/PostgREST HTTP pool")
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=10, description="Maximum idle keep-alive connections in the Supabase HTTP pool")
+    SUPABASE_POOL_TIMEOUT: float = Field(default=30.0, description="Seconds a request waits for a free Supabase connection before failing")
     DATABASE_URL: Optional[str] = Field(default=None, description="Direct database connection URL")
     
     # Vector Configuration
     VECTOR_DIMENSION: int = Field(default=1536, description="Vector embedding dimension")
     SIMILARITY_THRESHOLD: float = Field(default=0.8, description="Vector similarity threshold")
+    EMBEDDING_BATCH_MAX_ITEMS: int = Field(default=100, description="Maximum texts per embeddings request (also the batch ingestion window in profiles)")
+    EMBEDDING_BATCH_MAX_TOKENS: int = Field(default=100000, description="Maximum total tokens per embeddings request")
+    EMBEDDING_CACHE_BACKEND: str = Field(default="supabase", description="Persistent embedding cache tier: supabase, sqlite, memory or disabled")
+    EMBEDDING_CACHE_SQLITE_PATH: str = Field(default="embedding_cache.db", description="SQLite file for the sqlite embedding cache tier")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=10000, description="Maximum embeddings kept in the in-process cache tier")
     
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = Field(default=None, description="OpenAI API key for LLM scoring")
     OPENAI_DEFAULT_MODEL: str = Field(default="gpt-3.5-turbo", description="Default OpenAI model for scoring")
     OPENAI_MAX_TOKENS: int = Field(default=2000, description="Maximum tokens for OpenAI responses")
     OPENAI_TEMPERATURE: float = Field(default=0.1, description="Temperature for OpenAI requests")
+
+    # Scoring Worker Pool Configuration
+    SCORING_WORKER_ENABLED: bool = Field(default=True, description="Process scoring jobs with the durable worker pool")
+    SCORING_WORKER_COUNT: int = Field(default=4, description="Number of scoring workers per process")
+    SCORING_WORKER_PER_MODEL_LIMIT: int = Field(default=2, description="Maximum scoring jobs processed concurrently per model")
+    SCORING_WORKER_POLL_INTERVAL: float = Field(default=2.0, description="Seconds idle workers wait before polling for jobs")
+    SCORING_WORKER_HEARTBEAT_INTERVAL: float = Field(default=15.0, description="Seconds between heartbeats for jobs being processed")
+    SCORING_WORKER_STALE_AFTER: int = Field(default=120, description="Heartbeat age in seconds after which a processing job is reclaimed")
+    SCORING_WORKER_MAX_RETRIES: int = Field(default=3, description="Stale reclaims allowed before a job is marked failed")
+    
+    # Batch Ingestion
+    BATCH_EVENTS_KEEPALIVE_SECONDS: float = Field(default=15.0, description="Seconds between keep-alives (and progress re-reads) on idle batch event streams")
     
     # Stage-Based Model Configuration
     STAGE_2_MODEL: str = Field(default="gpt-3.5-turbo", description="Model for Stage 2 screening (cost-effective)")
@@ -77,13 +124,30 @@ class Settings(BaseSettings):
     )
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="Enforce API rate limits in middleware")
+    RATE_LIMIT_BACKEND: str = Field(default="memory", description="Rate limit counter store: memory (one worker), sqlite (workers on one host) or postgres (all workers)")
+    RATE_LIMIT_SQLITE_PATH: str = Field(default="/tmp/linkedin_ingestion_rate_limits.sqlite3", description="SQLite file shared by workers when RATE_LIMIT_BACKEND=sqlite")
+    RATE_LIMIT_PURGE_INTERVAL_SECONDS: float = Field(default=300.0, description="Seconds between purges of expired counters from the sqlite/postgres rate limit store")
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, description="API rate limit per minute")
+    RATE_LIMIT_PROFILE_SCORING_PER_HOUR: int = Field(default=10, description="Scoring requests per profile per hour")
+    RATE_LIMIT_OPENAI_PER_MINUTE: int = Field(default=60, description="Requests per minute admitted to endpoints that call OpenAI")
     CASSIDY_RATE_LIMIT: int = Field(default=10, description="Cassidy API calls per minute")
+    CASSIDY_MAX_CONCURRENT_FETCHES: int = Field(default=5, description="Maximum concurrent Cassidy company fetches per profile")
+    CASSIDY_MAX_CONCURRENCY: int = Field(default=10, description="Upper bound of the adaptive limit on Cassidy calls in flight per process")
+    CASSIDY_LATENCY_TARGET_SECONDS: float = Field(default=120.0, description="Cassidy calls slower than this shrink the adaptive concurrency limit")
+    OPENAI_MAX_CONCURRENCY: int = Field(default=10, description="Upper bound of the adaptive limit on OpenAI calls in flight per process")
+    OPENAI_LATENCY_TARGET_SECONDS: float = Field(default=30.0, description="OpenAI calls slower than this shrink the adaptive concurrency limit")
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, description="Consecutive timeouts/5xx from an upstream that open its circuit breaker")
+    UPSTREAM_CIRCUIT_OPEN_SECONDS: float = Field(default=60.0, description="Seconds an open circuit fails calls fast before letting a probe through")
+    UPSTREAM_MAX_THROTTLE_WAIT_SECONDS: float = Field(default=30.0, description="Longest Retry-After/rate-limit reset a call waits out; longer ones fail with 503")
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
     LOG_FORMAT: str = Field(default="json", description="Log format: json or plain")
     
+    # Metrics
+    METRICS_ENABLED: bool = Field(default=True, description="Record request/pipeline metrics and serve them at /metrics")
+    
     # Security
     API_KEY: str = Field(default="li_HieZz-IjBp0uE7d-rZkRE0qyy12r5_ZJS_FR4jMvv0I", description="API key for authentication")
     
@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) pagination
+
+A cursor is an opaque, URL-safe token holding the sort key and direction of
+the request plus the sort value and id of the last row on the page. The next
+page starts strictly after that row, so reading page 100 costs the same as
+reading page 1 and rows inserted meanwhile don't shift later pages. The id is
+the tie-breaker, which makes the ordering total even when sort values repeat.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.exceptions import InvalidCursorError
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: str) -> str:
+    """
+    Build the cursor that continues after a row
+
+    Args:
+        sort_by: Sort key of the request
+        sort_order: 'asc' or 'desc'
+        value: Sort value of the last row (None for a NULL sort value)
+        row_id: id of the last row
+
+    Returns:
+        Opaque cursor string
+    """
+    payload = {"k": sort_by, "o": sort_order.lower(), "v": value, "id": str(row_id)}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Optional[str], str]:
+    """
+    Read a cursor issued for the same sort
+
+    Args:
+        cursor: Cursor returned as next_cursor by a previous page
+        sort_by: Sort key of the current request
+        sort_order: Sort order of the current request
+
+    Returns:
+        Tuple of (sort value of the last row, id of the last row)
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for a different sort
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        key, order, value, row_id = payload["k"], payload["o"], payload["v"], payload["id"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursorError(cursor)
+
+    if not isinstance(row_id, str) or not (value is None or isinstance(value, str)):
+        raise InvalidCursorError(cursor)
+    if key != sort_by or order != sort_order.lower():
+        raise InvalidCursorError(
+            cursor,
+            message=f"Cursor was issued for sort_by={key}, sort_order={order}",
+            details={"cursor_sort_by": key, "cursor_sort_order": order}
+        )
+    return value, row_id
+
+
+def apply_keyset(query, cursor: Optional[str], column: str = "created_at", sort_order: str = "desc"):
+    """
+    Order a PostgREST query by (column, id) and continue after a cursor
+
+    The sort column must be NOT NULL in practice (e.g. created_at DEFAULT NOW()).
+
+    Args:
+        query: Supabase select query
+        cursor: Cursor from a previous page, or None for the first page
+        column: Sort column
+        sort_order: 'asc' or 'desc'
+
+    Returns:
+        Query with ordering and the keyset filter applied
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for a different sort
+    """
+    desc = sort_order.lower() == "desc"
+    if cursor:
+        value, row_id = decode_cursor(cursor, column, sort_order)
+        if value is None:
+            raise InvalidCursorError(cursor)
+        op = "lt" if desc else "gt"
+        query = query.or_(
+            f'{column}.{op}."{value}",and({column}.eq."{value}",id.{op}."{row_id}")'
+        )
+    return query.order(column, desc=desc).order("id", desc=desc)
+
+
+def page_after(
+    rows: Sequence[Dict[str, Any]],
+    limit: int,
+    column: str = "created_at",
+    sort_order: str = "desc"
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trim a limit + 1 row fetch to one page and build its next cursor
+
+    Args:
+        rows: Rows fetched with one extra row to detect a following page
+        limit: Page size
+        column: Sort column
+        sort_order: 'asc' or 'desc'
+
+    Returns:
+        Tuple of (page rows, next cursor or None on the last page)
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(column, sort_order, last.get(column), last["id"])
@@ -0,0 +1,520 @@
+"""
+Sliding-window rate limiting for API endpoints
+
+Each limit is a sliding-window counter: the count of the current fixed window
+plus the previous window's count weighted by how much of it still overlaps the
+sliding window. A key's state is three integers, so every check is O(1)
+regardless of traffic. Counters are keyed by API key, by profile (scoring) and
+by upstream (OpenAI) and live in a pluggable backend:
+
+- memory: per-process dictionary, for a single worker
+- sqlite: a file shared by the workers on one host
+- postgres: the rate_limit_hit_many database function, shared by every worker
+
+The HTTP middleware applies the limits before routing and answers 429 with a
+Retry-After header. All the limits of a request are checked together and only
+counted if every one of them allows it, so a request rejected by one limit
+does not use up the others. Keys come from callers (API keys, client IPs,
+profile ids), so the limiter purges expired counters from the shared stores
+every RATE_LIMIT_PURGE_INTERVAL_SECONDS.
+
+Cassidy is not limited here: one request may ingest one profile or hundreds.
+Its load is bounded where the workflows are run, by the shared token bucket
+(CASSIDY_RATE_LIMIT) and the adaptive upstream controller.
+"""
+
+import asyncio
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.routing import compile_path
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from app.models.errors import ErrorResponse
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of counting one request against a limit"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+class _WindowState(NamedTuple):
+    window_index: int
+    current: int
+    previous: int
+
+
+def sliding_window_hit(
+    state: Optional[_WindowState],
+    now: float,
+    limit: int,
+    window_seconds: float
+) -> Tuple[_WindowState, RateLimitResult]:
+    """
+    Count one request against a sliding-window counter
+
+    Rejected requests are not counted, so clients retrying after Retry-After
+    are not locked out for longer.
+
+    Args:
+        state: Counter state of the key (None if unseen)
+        now: Current time in seconds
+        limit: Requests allowed per window
+        window_seconds: Window length in seconds
+
+    Returns:
+        Tuple of (new counter state, result)
+    """
+    window_index = int(now // window_seconds)
+    elapsed = now - window_index * window_seconds
+    if state is None or state.window_index < window_index - 1:
+        current, previous = 0, 0
+    elif state.window_index == window_index - 1:
+        current, previous = 0, state.current
+    else:
+        current, previous = state.current, state.previous
+
+    estimated = previous * (1 - elapsed / window_seconds) + current
+    if estimated + 1 <= limit:
+        current += 1
+        remaining = max(0, math.floor(limit - estimated - 1))
+        return _WindowState(window_index, current, previous), RateLimitResult(True, limit, remaining, 0.0)
+
+    if current + 1 > limit:
+        # Blocked for the rest of this window, then until this window's count decays enough
+        retry_after = window_seconds - elapsed
+        if current > 0:
+            retry_after += max(0.0, window_seconds * (1 - (limit - 1) / current))
+    else:
+        # Wait until the previous window's weight has decayed enough
+        retry_after = window_seconds * (1 - (limit - 1 - current) / previous) - elapsed
+    return _WindowState(window_index, current, previous), RateLimitResult(False, limit, 0, max(retry_after, 0.0))
+
+
+# One counter to hit: (key, limit, window seconds)
+CounterHit = Tuple[str, int, float]
+
+
+def sliding_window_hit_many(
+    states: Sequence[Optional[_WindowState]],
+    now: float,
+    hits: Sequence[CounterHit]
+) -> Tuple[List[_WindowState], List[RateLimitResult], bool]:
+    """
+    Check several counters at once; see sliding_window_hit
+
+    Returns:
+        Tuple of (new counter states, results, whether every counter allowed the
+        request). The new states are only to be stored if all of them did.
+    """
+    new_states, results = [], []
+    for state, (_, limit, window_seconds) in zip(states, hits):
+        new_state, result = sliding_window_hit(state, now, limit, window_seconds)
+        new_states.append(new_state)
+        results.append(result)
+    return new_states, results, all(result.allowed for result in results)
+
+
+class RateLimitBackend(ABC):
+    """Storage for sliding-window counters"""
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """Count one request for key and report whether it is within limit"""
+        return (await self.hit_many([(key, limit, window_seconds)]))[0]
+
+    @abstractmethod
+    async def hit_many(self, hits: Sequence[CounterHit]) -> List[RateLimitResult]:
+        """
+        Check one request against several counters atomically
+
+        The request is counted on every counter if all of them allow it and on
+        none of them otherwise.
+        """
+
+    async def purge_expired(self) -> int:
+        """Delete counters whose windows have passed; returns the number removed"""
+        return 0
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process counters for a single worker
+
+    Keys are kept in least-recently-hit order; each hit evicts a few keys from
+    the old end whose state has expired, so memory stays bounded without a
+    sweep over every key.
+    """
+
+    def __init__(self):
+        self._counters: "OrderedDict[str, Tuple[_WindowState, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit_many(self, hits: Sequence[CounterHit]) -> List[RateLimitResult]:
+        now = time.time()
+        with self._lock:
+            entries = [self._counters.get(key) for key, _, _ in hits]
+            states, results, allowed = sliding_window_hit_many(
+                [entry[0] if entry else None for entry in entries], now, hits
+            )
+            if allowed:
+                for (key, _, window_seconds), state in zip(hits, states):
+                    self._counters.pop(key, None)
+                    self._counters[key] = (state, now, window_seconds)
+            self._evict_expired(now)
+        return results
+
+    def _evict_expired(self, now: float, max_evictions: int = 2) -> None:
+        for _ in range(max_evictions):
+            oldest_key = next(iter(self._counters), None)
+            if oldest_key is None:
+                return
+            _, last_hit, window_seconds = self._counters[oldest_key]
+            if last_hit + 2 * window_seconds > now:
+                return
+            del self._counters[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Counters in a SQLite file shared by the workers on one host
+
+    Each hit is a read-modify-write inside BEGIN IMMEDIATE, which serializes
+    workers on the database lock. Calls run in a thread to keep the event
+    loop free.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            " key TEXT PRIMARY KEY,"
+            " window_index INTEGER NOT NULL,"
+            " current_count INTEGER NOT NULL,"
+            " previous_count INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires_at ON rate_limit_counters(expires_at)"
+        )
+
+    def _hit_many(self, hits: Sequence[CounterHit]) -> List[RateLimitResult]:
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = [
+                    connection.execute(
+                        "SELECT window_index, current_count, previous_count FROM rate_limit_counters WHERE key = ?",
+                        (key,)
+                    ).fetchone()
+                    for key, _, _ in hits
+                ]
+                states, results, allowed = sliding_window_hit_many(
+                    [_WindowState(*row) if row else None for row in rows], now, hits
+                )
+                if allowed:
+                    connection.executemany(
+                        "INSERT INTO rate_limit_counters (key, window_index, current_count, previous_count, expires_at)"
+                        " VALUES (?, ?, ?, ?, ?)"
+                        " ON CONFLICT(key) DO UPDATE SET window_index = excluded.window_index,"
+                        " current_count = excluded.current_count, previous_count = excluded.previous_count,"
+                        " expires_at = excluded.expires_at",
+                        [
+                            (key, state.window_index, state.current, state.previous, now + 2 * window_seconds)
+                            for (key, _, window_seconds), state in zip(hits, states)
+                        ]
+                    )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return results
+
+    async def hit_many(self, hits: Sequence[CounterHit]) -> List[RateLimitResult]:
+        return await asyncio.to_thread(self._hit_many, hits)
+
+    def _purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM rate_limit_counters WHERE expires_at < ?", (time.time(),))
+            return cursor.rowcount
+
+    async def purge_expired(self) -> int:
+        return await asyncio.to_thread(self._purge_expired)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """Counters in the rate_limit_counters table, shared by every worker"""
+
+    def __init__(self, supabase_client=None):
+        if supabase_client is None:
+            from app.database.supabase_client import SupabaseClient
+            supabase_client = SupabaseClient()
+        self.supabase_client = supabase_client
+
+    async def hit_many(self, hits: Sequence[CounterHit]) -> List[RateLimitResult]:
+        await self.supabase_client._ensure_client()
+        result = await self.supabase_client.client.rpc("rate_limit_hit_many", {
+            "p_keys": [key for key, _, _ in hits],
+            "p_limits": [limit for _, limit, _ in hits],
+            "p_window_seconds": [window_seconds for _, _, window_seconds in hits]
+        }).execute()
+        data = result.data or [{} for _ in hits]
+        return [self._result(item, limit) for item, (_, limit, _) in zip(data, hits)]
+
+    async def purge_expired(self) -> int:
+        await self.supabase_client._ensure_client()
+        result = await self.supabase_client.client.rpc("purge_rate_limit_counters", {}).execute()
+        return int(result.data or 0)
+
+    @staticmethod
+    def _result(data: Dict, limit: int) -> RateLimitResult:
+        return RateLimitResult(
+            allowed=bool(data.get("allowed", True)),
+            limit=limit,
+            remaining=int(data.get("remaining", 0)),
+            retry_after=float(data.get("retry_after", 0.0))
+        )
+
+
+class RateLimiter(LoggerMixin):
+    """Checks requests against named limits stored in a backend"""
+
+    def __init__(self, backend: RateLimitBackend, purge_interval_seconds: Optional[float] = None):
+        self.backend = backend
+        self.purge_interval_seconds = (
+            settings.RATE_LIMIT_PURGE_INTERVAL_SECONDS if purge_interval_seconds is None else purge_interval_seconds
+        )
+        self._last_purge = time.monotonic()
+
+    async def check(self, scope: str, identity: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """
+        Count one request for identity under scope
+
+        Backend errors fail open: an unreachable counter store must not take
+        the API down with it.
+
+        Args:
+            scope: Limit name, e.g. 'api_key', 'profile_scoring', 'upstream'
+            identity: Who is limited within the scope
+            limit: Requests allowed per window (0 or less disables the limit)
+            window_seconds: Window length in seconds
+
+        Returns:
+            RateLimitResult for the request
+        """
+        return (await self.check_many([(scope, identity, limit, window_seconds)]))[0]
+
+    async def check_many(self, limits: Sequence[Tuple[str, str, int, float]]) -> List[RateLimitResult]:
+        """
+        Count one request under several limits, all or nothing
+
+        Backend errors fail open, as in check. Every purge_interval_seconds the
+        check also purges expired counters from the backend.
+
+        Args:
+            limits: (scope, identity, limit, window seconds) per limit
+
+        Returns:
+            RateLimitResult per limit, in order; the request was counted only if
+            every result is allowed
+        """
+        results = [RateLimitResult(True, limit, 0, 0.0) for _, _, limit, _ in limits]
+        enabled = [index for index, (_, _, limit, _) in enumerate(limits) if limit > 0]
+        if not enabled:
+            return results
+        hits = [(f"{limits[i][0]}:{limits[i][1]}", limits[i][2], limits[i][3]) for i in enabled]
+        try:
+            counted = await self.backend.hit_many(hits)
+        except Exception as e:
+            self.logger.warning("Rate limit backend unavailable, allowing request", scopes=[limits[i][0] for i in enabled], error=str(e))
+            counted = [RateLimitResult(True, limit, limit, 0.0) for _, limit, _ in hits]
+        for index, result in zip(enabled, counted):
+            results[index] = result
+        await self._purge_if_due()
+        return results
+
+    async def _purge_if_due(self) -> None:
+        if time.monotonic() - self._last_purge < self.purge_interval_seconds:
+            return
+        self._last_purge = time.monotonic()
+        try:
+            purged = await self.backend.purge_expired()
+        except Exception as e:
+            self.logger.warning("Failed to purge expired rate limit counters", error=str(e))
+            return
+        if purged:
+            self.logger.debug("Purged expired rate limit counters", purged=purged)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def build_rate_limit_backend(kind: Optional[str] = None) -> RateLimitBackend:
+    """Create the counter backend named by settings.RATE_LIMIT_BACKEND"""
+    kind = (kind or settings.RATE_LIMIT_BACKEND).lower()
+    if kind == "memory":
+        return InMemoryRateLimitBackend()
+    if kind == "sqlite":
+        return SQLiteRateLimitBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    if kind == "postgres":
+        return PostgresRateLimitBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {kind}")
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter, creating it on first use"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(build_rate_limit_backend())
+    return _rate_limiter
+
+
+async def close_rate_limiter() -> None:
+    """Close the process-wide rate limiter; the next request creates a new one"""
+    global _rate_limiter
+    limiter, _rate_limiter = _rate_limiter, None
+    if limiter is not None:
+        await limiter.close()
+
+
+class RouteRateLimit:
+    """Extra limits for one endpoint, beyond the per-API-key limit"""
+
+    def __init__(self, method: str, path: str, profile_param: Optional[str] = None, upstream: Optional[str] = None):
+        self.method = method
+        self.path = path
+        self.path_regex, _, _ = compile_path(path)
+        self.profile_param = profile_param
+        self.upstream = upstream
+
+    def match(self, method: str, path: str) -> Optional[Dict[str, str]]:
+        if method != self.method:
+            return None
+        matched = self.path_regex.match(path)
+        return matched.groupdict() if matched else None
+
+
+# Endpoints that score a profile (per-profile and OpenAI limits)
+ROUTE_RATE_LIMITS: Tuple[RouteRateLimit, ...] = (
+    RouteRateLimit("POST", "/api/v1/profiles/{profile_id}/score", profile_param="profile_id", upstream="openai"),
+    RouteRateLimit("POST", "/api/v1/profiles/{profile_id}/score-template", profile_param="profile_id", upstream="openai"),
+    RouteRateLimit("POST", "/api/v1/profiles/{profile_id}/role-compatibility", upstream="openai"),
+)
+
+# Probes and scrapes are never limited
+RATE_LIMIT_EXEMPT_PATHS = frozenset({"/", "/ready", "/live", "/metrics", "/api/v1/health", "/api/v1/health/detailed", "/api/version"})
+
+# Cassidy workflow callbacks are authenticated by their signed URL, not an API key
+RATE_LIMIT_EXEMPT_PREFIXES = ("/api/v1/cassidy/callbacks/",)
+
+
+def _api_key_identity(request) -> str:
+    """Hash of the API key (never stored in clear), or the client address without one"""
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def request_limits(method: str, path: str, api_key_identity: str) -> List[Tuple[str, str, int, float]]:
+    """
+    Limits that apply to a request, as (scope, identity, limit, window seconds)
+
+    Args:
+        method: HTTP method
+        path: Request path
+        api_key_identity: Identity of the caller for the per-API-key limit
+
+    Returns:
+        Limits to check together
+    """
+    if path in RATE_LIMIT_EXEMPT_PATHS or path.startswith(RATE_LIMIT_EXEMPT_PREFIXES):
+        return []
+    limits = [("api_key", api_key_identity, settings.RATE_LIMIT_PER_MINUTE, 60.0)]
+    for route in ROUTE_RATE_LIMITS:
+        params = route.match(method, path)
+        if params is None:
+            continue
+        if route.profile_param:
+            limits.append(("profile_scoring", params[route.profile_param], settings.RATE_LIMIT_PROFILE_SCORING_PER_HOUR, 3600.0))
+        if route.upstream == "openai":
+            limits.append(("upstream", "openai", settings.RATE_LIMIT_OPENAI_PER_MINUTE, 60.0))
+        break
+    return limits
+
+
+def rate_limit_exceeded_response(scope: str, identity: str, result: RateLimitResult, window_seconds: float) -> JSONResponse:
+    """429 response in the HTTPException error format, with Retry-After"""
+    retry_after = max(1, math.ceil(result.retry_after))
+    error_response = ErrorResponse(
+        error_code="RATE_LIMIT_EXCEEDED",
+        message=f"Rate limit exceeded ({scope})",
+        details={
+            "scope": scope,
+            "identity": identity if scope != "api_key" else None,
+            "limit": result.limit,
+            "window_seconds": window_seconds,
+            "retry_after": retry_after
+        }
+    )
+    return JSONResponse(
+        status_code=429,
+        content={"detail": error_response.model_dump()},
+        headers={
+            "Retry-After": str(retry_after),
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": "0"
+        }
+    )
+
+
+async def enforce_rate_limits(request, call_next):
+    """
+    HTTP middleware enforcing the per-API-key, per-profile and per-upstream limits
+
+    Successful responses carry X-RateLimit-Limit/Remaining for the API key limit.
+    """
+    limiter = get_rate_limiter()
+    limits = request_limits(request.method, request.url.path, _api_key_identity(request))
+    results = await limiter.check_many(limits)
+    api_key_result = None
+    for (scope, identity, _, window_seconds), result in zip(limits, results):
+        if not result.allowed:
+            limiter.logger.info("Rate limit exceeded", scope=scope, path=request.url.path, retry_after=round(result.retry_after, 1))
+            return rate_limit_exceeded_response(scope, identity, result, window_seconds)
+        if scope == "api_key":
+            api_key_result = result
+
+    response = await call_next(request)
+    if api_key_result is not None:
+        response.headers["X-RateLimit-Limit"] = str(api_key_result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(api_key_result.remaining)
+    return response
@@ -0,0 +1,412 @@
+"""
+Adaptive concurrency and circuit breaking for upstream APIs
+
+Every call to Cassidy or OpenAI goes through the process-wide
+UpstreamController for that upstream. The controller:
+
+- caps calls in flight with an AIMD limit: each fast success raises the limit
+  by 1/limit (about +1 per limit's worth of calls), a success slower than the
+  latency target shrinks it by 10%, and a 429, 5xx, timeout or connection
+  error halves it
+- honors Retry-After and OpenAI's x-ratelimit-* headers by holding new calls
+  back until the upstream said it will accept them again
+- trips a circuit breaker after consecutive failures: while open, calls fail
+  immediately with UpstreamUnavailableError instead of queueing behind
+  multi-minute timeouts; after UPSTREAM_CIRCUIT_OPEN_SECONDS one probe call is
+  let through and its outcome closes or re-opens the circuit
+
+State is per process and exposed through upstream_health() for
+/api/v1/health/detailed.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Optional, Tuple, Type
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from app.exceptions import UpstreamUnavailableError
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Multiplicative decrease factors
+FAILURE_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.9
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset duration into seconds
+
+    Accepts plain seconds ("30", "1.5") and OpenAI's Go-style durations
+    ("20ms", "6m0s", "1h2m3.5s"). Returns None for anything else.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_SECONDS[unit] for number, unit in parts)
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    How long the upstream asked us to wait, from its response headers
+
+    Looks at Retry-After (seconds or HTTP date), OpenAI's retry-after-ms and,
+    when a request or token budget is exhausted, the matching
+    x-ratelimit-reset-* header. Returns None when the headers ask for no wait.
+    """
+    if not headers:
+        return None
+    lowered = {str(name).lower(): str(value) for name, value in headers.items()}
+    waits = []
+
+    if "retry-after-ms" in lowered:
+        milliseconds = parse_duration(lowered["retry-after-ms"])
+        if milliseconds is not None:
+            waits.append(milliseconds / 1000.0)
+    if "retry-after" in lowered:
+        seconds = parse_duration(lowered["retry-after"])
+        if seconds is None:
+            try:
+                seconds = max(0.0, parsedate_to_datetime(lowered["retry-after"]).timestamp() - time.time())
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            waits.append(seconds)
+
+    for budget in ("requests", "tokens"):
+        if lowered.get(f"x-ratelimit-remaining-{budget}", "").strip() == "0":
+            reset = parse_duration(lowered.get(f"x-ratelimit-reset-{budget}"))
+            if reset is not None:
+                waits.append(reset)
+
+    return max(waits) if waits else None
+
+
+class UpstreamCall:
+    """Handle yielded by UpstreamController.request() for recording the response"""
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+        self.headers: Optional[Mapping[str, str]] = None
+
+    def record(self, status_code: int, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Record the HTTP response; it decides the outcome even if the caller then raises"""
+        self.status_code = status_code
+        self.headers = headers
+
+
+class UpstreamController(LoggerMixin):
+    """AIMD concurrency limit, rate-limit backoff and circuit breaker for one upstream"""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        latency_target_seconds: float,
+        min_concurrency: int = 1,
+        failure_threshold: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        max_throttle_wait_seconds: Optional[float] = None,
+        failure_exceptions: Tuple[Type[BaseException], ...] = ()
+    ):
+        """
+        Args:
+            name: Upstream name used in logs, errors and health output
+            max_concurrency: Upper bound (and starting value) of the concurrency limit
+            latency_target_seconds: Successes slower than this shrink the limit
+            min_concurrency: Lower bound of the concurrency limit
+            failure_threshold: Consecutive failures that open the circuit
+            open_seconds: How long the circuit stays open before a probe
+            max_throttle_wait_seconds: Longest Retry-After a call waits out; longer ones fail fast
+            failure_exceptions: Exception types without a status code that count as
+                upstream failures (timeouts, connection errors)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = max(1, min(min_concurrency, max_concurrency))
+        self.latency_target_seconds = latency_target_seconds
+        self.failure_threshold = failure_threshold or settings.UPSTREAM_CIRCUIT_FAILURE_THRESHOLD
+        self.open_seconds = open_seconds if open_seconds is not None else settings.UPSTREAM_CIRCUIT_OPEN_SECONDS
+        self.max_throttle_wait_seconds = (
+            max_throttle_wait_seconds if max_throttle_wait_seconds is not None
+            else settings.UPSTREAM_MAX_THROTTLE_WAIT_SECONDS
+        )
+        self.failure_exceptions = failure_exceptions
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._throttled_until = 0.0
+
+        self.circuit = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.latency_ewma: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.counters = {"successes": 0, "slow": 0, "throttled": 0, "failures": 0, "rejected": 0}
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[UpstreamCall]:
+        """
+        Hold a slot for one upstream call
+
+        Raises:
+            UpstreamUnavailableError: If the circuit is open or the upstream asked
+                for a longer pause than max_throttle_wait_seconds
+        """
+        probe = await self._acquire()
+        call = UpstreamCall()
+        started = time.monotonic()
+        outcome = None
+        try:
+            yield call
+        except BaseException as e:
+            outcome = self._classify_exception(e, call)
+            raise
+        finally:
+            if call.status_code is not None:
+                outcome = self._classify_status(call.status_code)
+                if outcome == "failure":
+                    self.last_error = f"HTTP {call.status_code}"
+            self._release(probe, outcome or "success", time.monotonic() - started, call.headers)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state for health reporting"""
+        now = time.monotonic()
+        snapshot = {
+            "circuit": self.circuit,
+            "concurrency_limit": self.concurrency_limit,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "consecutive_failures": self.consecutive_failures,
+            "throttled_for_seconds": round(max(0.0, self._throttled_until - now), 1),
+            "latency_ewma_seconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "latency_target_seconds": self.latency_target_seconds,
+            "last_error": self.last_error,
+            **self.counters
+        }
+        if self.circuit == CIRCUIT_OPEN:
+            snapshot["retry_in_seconds"] = round(max(0.0, self._opened_at + self.open_seconds - now), 1)
+        return snapshot
+
+    async def _acquire(self) -> bool:
+        """Wait for a slot; returns whether this call is the half-open probe"""
+        probe = self._check_circuit()
+
+        throttle = self._throttled_until - time.monotonic()
+        if throttle > 0:
+            if throttle > self.max_throttle_wait_seconds:
+                self._reject(probe, "rate limited by upstream", throttle)
+            self.logger.info("Waiting for upstream rate limit", upstream=self.name, wait_seconds=round(throttle, 2))
+            try:
+                await asyncio.sleep(throttle)
+            except asyncio.CancelledError:
+                if probe:
+                    self._probe_in_flight = False
+                raise
+
+        if self.in_flight < self.concurrency_limit and not self._waiters:
+            self.in_flight += 1
+            return probe
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # _wake() reserves the slot before resolving the future
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+            if probe:
+                self._probe_in_flight = False
+            raise
+
+        if self.circuit == CIRCUIT_OPEN:
+            # Opened while this call was queued
+            self._release_slot()
+            self._reject(probe, "circuit open", self._open_remaining())
+        return probe
+
+    def _check_circuit(self) -> bool:
+        """Fail fast while the circuit is open; returns whether the caller is the probe"""
+        if self.circuit == CIRCUIT_OPEN:
+            remaining = self._open_remaining()
+            if remaining > 0:
+                self._reject(False, "circuit open", remaining)
+            self.circuit = CIRCUIT_HALF_OPEN
+            self.logger.info("Upstream circuit half-open, sending probe", upstream=self.name)
+
+        if self.circuit == CIRCUIT_HALF_OPEN:
+            if self._probe_in_flight:
+                self._reject(False, "circuit half-open, probe in flight", self.open_seconds)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _reject(self, probe: bool, reason: str, retry_after: float) -> None:
+        if probe:
+            self._probe_in_flight = False
+        self.counters["rejected"] += 1
+        raise UpstreamUnavailableError(self.name, reason, retry_after=retry_after, last_error=self.last_error)
+
+    def _open_remaining(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def _classify_status(self, status_code: int) -> str:
+        if status_code == 429:
+            return "throttled"
+        if status_code >= 500:
+            return "failure"
+        # Other 4xx are the caller's fault and say nothing about upstream health
+        return "success" if status_code < 400 else "neutral"
+
+    def _classify_exception(self, error: BaseException, call: UpstreamCall) -> str:
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            return "neutral"
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int):
+            headers = getattr(getattr(error, "response", None), "headers", None)
+            call.record(status_code, headers if isinstance(headers, Mapping) else None)
+            return self._classify_status(status_code)
+        if self.failure_exceptions and isinstance(error, self.failure_exceptions):
+            self.last_error = f"{type(error).__name__}: {error}"
+            return "failure"
+        return "neutral"
+
+    def _release(self, probe: bool, outcome: str, latency: float, headers: Optional[Mapping[str, str]]) -> None:
+        self._release_slot()
+        if probe:
+            self._probe_in_flight = False
+
+        wait = retry_after_seconds(headers)
+        if wait:
+            self._throttled_until = max(self._throttled_until, time.monotonic() + wait)
+
+        if outcome == "success":
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma
+            )
+            if latency > self.latency_target_seconds:
+                self.counters["slow"] += 1
+                self._set_limit(self.limit * LATENCY_BACKOFF)
+            else:
+                self.counters["successes"] += 1
+                self._set_limit(self.limit + 1.0 / self.limit)
+            self._close_circuit(probe)
+        elif outcome == "throttled":
+            # The upstream answered, so it is up; it wants less from us
+            self.counters["throttled"] += 1
+            self._set_limit(self.limit * FAILURE_BACKOFF)
+            self._close_circuit(probe)
+        elif outcome == "failure":
+            self.counters["failures"] += 1
+            self._set_limit(self.limit * FAILURE_BACKOFF)
+            self.consecutive_failures += 1
+            if probe or self.consecutive_failures >= self.failure_threshold:
+                self._open_circuit()
+        # A neutral probe (cancelled, or a 4xx) leaves the circuit half-open for the next call to probe
+
+        self._wake()
+
+    def _set_limit(self, limit: float) -> None:
+        self.limit = min(float(self.max_concurrency), max(float(self.min_concurrency), limit))
+
+    def _open_circuit(self) -> None:
+        if self.circuit != CIRCUIT_OPEN:
+            self.logger.warning(
+                "Upstream circuit opened",
+                upstream=self.name,
+                consecutive_failures=self.consecutive_failures,
+                open_seconds=self.open_seconds,
+                last_error=self.last_error
+            )
+        self.circuit = CIRCUIT_OPEN
+        self._opened_at = time.monotonic()
+        # Calls queued behind the outage fail fast instead of waiting for a slot
+        self._wake(drain=True)
+
+    def _close_circuit(self, probe: bool) -> None:
+        self.consecutive_failures = 0
+        if self.circuit != CIRCUIT_CLOSED and probe:
+            self.logger.info("Upstream circuit closed", upstream=self.name)
+            self.circuit = CIRCUIT_CLOSED
+            self.last_error = None
+
+    def _release_slot(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def _wake(self, drain: bool = False) -> None:
+        """Hand free slots to queued calls in arrival order"""
+        while self._waiters and (drain or self.in_flight < self.concurrency_limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            try:
+                waiter.set_result(None)
+            except RuntimeError:
+                # The waiter's event loop is gone
+                self._release_slot()
+
+
+_controllers: Dict[str, UpstreamController] = {}
+
+
+def get_upstream_controller(name: str, **kwargs: Any) -> UpstreamController:
+    """
+    Get the process-wide controller for an upstream, creating it on first use
+
+    Limits come from settings.<NAME>_MAX_CONCURRENCY and
+    settings.<NAME>_LATENCY_TARGET_SECONDS; kwargs (e.g. failure_exceptions)
+    only apply when the controller is created.
+    """
+    controller = _controllers.get(name)
+    if controller is None:
+        prefix = name.upper()
+        kwargs.setdefault("max_concurrency", getattr(settings, f"{prefix}_MAX_CONCURRENCY"))
+        kwargs.setdefault("latency_target_seconds", getattr(settings, f"{prefix}_LATENCY_TARGET_SECONDS"))
+        controller = _controllers[name] = UpstreamController(name, **kwargs)
+    return controller
+
+
+def upstream_health() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every upstream controller created in this process"""
+    return {name: controller.snapshot() for name, controller in sorted(_controllers.items())}
+
+
+def reset_upstream_controllers() -> None:
+    """Forget every controller so the next call starts closed at full concurrency"""
+    _controllers.clear()
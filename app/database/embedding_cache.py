@@ -0,0 +1,289 @@
+"""
+Content-hash embedding cache
+
+Embeddings are keyed by a SHA-256 of the embedding model name plus the
+whitespace-normalized input text, so re-ingesting a profile whose text has
+not changed reuses the stored vector instead of paying for a new one. Lookups
+go through an in-process LRU tier first and then a persistent tier (a
+Supabase table or a local SQLite file).
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+
+
+# Cached entry: (embedding vector, token count of the embedded text)
+CachedEmbedding = Tuple[List[float], int]
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """
+    Build the cache key for a model and input text
+
+    Args:
+        model: Embedding model name
+        text: Input text (whitespace is normalized before hashing)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class SQLiteEmbeddingStore:
+    """Persistent embedding cache tier on a local SQLite file"""
+
+    def __init__(self, database_path: str):
+        """
+        Initialize SQLite embedding store
+
+        Args:
+            database_path: Path of the SQLite database file
+        """
+        self.database_path = database_path
+        connection = self._connect()
+        try:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    embedding TEXT NOT NULL,
+                    token_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.database_path, timeout=30.0)
+
+    def _get_many_sync(self, keys: List[str]) -> Dict[str, CachedEmbedding]:
+        connection = self._connect()
+        try:
+            placeholders = ",".join("?" for _ in keys)
+            rows = connection.execute(
+                f"SELECT cache_key, embedding, token_count FROM embedding_cache WHERE cache_key IN ({placeholders})",
+                keys
+            ).fetchall()
+            return {key: (json.loads(embedding), token_count) for key, embedding, token_count in rows}
+        finally:
+            connection.close()
+
+    def _put_many_sync(self, model: str, entries: Dict[str, CachedEmbedding]) -> None:
+        created_at = datetime.now(timezone.utc).isoformat()
+        connection = self._connect()
+        try:
+            connection.executemany(
+                """
+                INSERT OR REPLACE INTO embedding_cache (cache_key, model, embedding, token_count, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (key, model, json.dumps(vector), token_count, created_at)
+                    for key, (vector, token_count) in entries.items()
+                ]
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, CachedEmbedding]:
+        """Get stored embeddings for the given keys"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many_sync, keys)
+
+    async def put_many(self, model: str, entries: Dict[str, CachedEmbedding]) -> None:
+        """Store embeddings by key"""
+        if entries:
+            await asyncio.to_thread(self._put_many_sync, model, entries)
+
+
+class SupabaseEmbeddingStore:
+    """Persistent embedding cache tier on the Supabase embedding_cache table"""
+
+    table_name = "embedding_cache"
+
+    def __init__(self, supabase_client=None):
+        """
+        Initialize Supabase embedding store
+
+        Args:
+            supabase_client: SupabaseClient instance (created on first use if omitted)
+        """
+        self.supabase_client = supabase_client
+
+    async def _table(self):
+        if self.supabase_client is None:
+            # Import here to avoid requiring Supabase configuration at import time
+            from app.database.supabase_client import SupabaseClient
+            self.supabase_client = SupabaseClient()
+        await self.supabase_client._ensure_client()
+        return self.supabase_client.client.table(self.table_name)
+
+    @staticmethod
+    def _parse_vector(value: Any) -> List[float]:
+        # pgvector columns come back from PostgREST as "[0.1,0.2,...]" strings
+        return json.loads(value) if isinstance(value, str) else list(value)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, CachedEmbedding]:
+        """Get stored embeddings for the given keys"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        table = await self._table()
+        result = await table.select("cache_key, embedding, token_count").in_("cache_key", keys).execute()
+        return {
+            row["cache_key"]: (self._parse_vector(row["embedding"]), row.get("token_count") or 0)
+            for row in (result.data or [])
+        }
+
+    async def put_many(self, model: str, entries: Dict[str, CachedEmbedding]) -> None:
+        """Store embeddings by key"""
+        if not entries:
+            return
+        table = await self._table()
+        await table.upsert(
+            [
+                {"cache_key": key, "model": model, "embedding": vector, "token_count": token_count}
+                for key, (vector, token_count) in entries.items()
+            ],
+            on_conflict="cache_key"
+        ).execute()
+
+
+class EmbeddingCache(LoggerMixin):
+    """Two-tier embedding cache: in-process LRU in front of an optional persistent store"""
+
+    def __init__(self, max_entries: int = 10000, store=None):
+        """
+        Initialize embedding cache
+
+        Args:
+            max_entries: Maximum embeddings kept in the in-process LRU tier
+            store: Persistent tier (SQLiteEmbeddingStore / SupabaseEmbeddingStore) or None
+        """
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[str, CachedEmbedding]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "store_errors": 0}
+
+    def _remember(self, key: str, entry: CachedEmbedding) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, CachedEmbedding]:
+        """
+        Look up embeddings, memory tier first
+
+        Args:
+            keys: Cache keys from embedding_cache_key
+
+        Returns:
+            Mapping of found keys to (vector, token count)
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, CachedEmbedding] = {}
+        missing: List[str] = []
+        for key in unique_keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                found[key] = entry
+            else:
+                missing.append(key)
+        self._stats["memory_hits"] += len(found)
+
+        if missing and self.store is not None:
+            try:
+                stored = await self.store.get_many(missing)
+            except Exception as e:
+                # The cache only saves money; a failing store must not fail embedding
+                self._stats["store_errors"] += 1
+                self.logger.warning("Embedding cache lookup failed", error=str(e), keys=len(missing))
+                stored = {}
+            for key, entry in stored.items():
+                self._remember(key, entry)
+                found[key] = entry
+            self._stats["store_hits"] += len(stored)
+
+        self._stats["misses"] += len(unique_keys) - len(found)
+        return found
+
+    async def put_many(self, model: str, entries: Dict[str, CachedEmbedding]) -> None:
+        """
+        Store new embeddings in both tiers
+
+        Args:
+            model: Embedding model name
+            entries: Mapping of cache key to (vector, token count)
+        """
+        for key, entry in entries.items():
+            self._remember(key, entry)
+
+        if entries and self.store is not None:
+            try:
+                await self.store.put_many(model, entries)
+            except Exception as e:
+                self._stats["store_errors"] += 1
+                self.logger.warning("Embedding cache write failed", error=str(e), keys=len(entries))
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the persistent tier is left intact)"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self._stats["memory_hits"] + self._stats["store_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["store_hits"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent_tier": type(self.store).__name__ if self.store is not None else None,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def _create_store():
+    backend = settings.EMBEDDING_CACHE_BACKEND.lower()
+    if backend == "sqlite":
+        return SQLiteEmbeddingStore(settings.EMBEDDING_CACHE_SQLITE_PATH)
+    if backend == "supabase" and settings.SUPABASE_URL and settings.SUPABASE_ANON_KEY:
+        return SupabaseEmbeddingStore()
+    return None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the process-wide embedding cache
+
+    Returns:
+        EmbeddingCache, or None when EMBEDDING_CACHE_BACKEND is "disabled"
+    """
+    global _embedding_cache
+    if settings.EMBEDDING_CACHE_BACKEND.lower() == "disabled":
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            store=_create_store()
+        )
+    return _embedding_cache
@@ -4,25 +4,29 @@ Embedding generation service using OpenAI's embedding API
 Handles text-to-vector conversion for LinkedIn profiles and companies
 """
 
+import openai
 from openai import AsyncOpenAI
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import tiktoken
 from functools import lru_cache
 
 from app.core.config import settings
 from app.core.logging import LoggerMixin
+from app.core.metrics import RATE_LIMIT_HITS, record_openai_usage
 from app.cassidy.models import LinkedInProfile, CompanyProfile
+from app.database.embedding_cache import EmbeddingCache, embedding_cache_key, get_embedding_cache
 
 
 class EmbeddingService(LoggerMixin):
     """Service for generating vector embeddings from text data"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[EmbeddingCache] = None):
         """
         Initialize embedding service
         
         Args:
             api_key: OpenAI API key (falls back to environment if not provided)
+            cache: Embedding cache (defaults to the process-wide cache)
         """
         # Use provided API key or fall back to settings
         if api_key is None:
@@ -35,6 +39,7 @@ class EmbeddingService(LoggerMixin):
         self.model = "text-embedding-ada-002"  # OpenAI's current embedding model
         self.max_tokens = 8192  # Model token limit
         self.encoding = tiktoken.get_encoding("cl100k_base")  # GPT-4 encoding
+        self.cache = cache if cache is not None else get_embedding_cache()
     
     @lru_cache(maxsize=128)
     def _count_tokens(self, text: str) -> int:
@@ -87,6 +92,12 @@ class EmbeddingService(LoggerMixin):
             # Return zero vector for empty text
             return [0.0] * settings.VECTOR_DIMENSION
         
+        cache_key = embedding_cache_key(self.model, text)
+        if self.cache is not None:
+            cached = (await self.cache.get_many([cache_key])).get(cache_key)
+            if cached is not None:
+                return cached[0]
+        
         # Truncate if necessary
         processed_text = self._truncate_text(text.strip())
         token_count = self._count_tokens(processed_text)
@@ -104,6 +115,7 @@ class EmbeddingService(LoggerMixin):
             )
             
             embedding = response.data[0].embedding
+            record_openai_usage(self.model, response.usage, kinds=("total",))
             
             self.logger.debug(
                 "Embedding generated successfully",
@@ -111,9 +123,14 @@ class EmbeddingService(LoggerMixin):
                 tokens_used=response.usage.total_tokens if response.usage else token_count
             )
             
+            if self.cache is not None:
+                await self.cache.put_many(self.model, {cache_key: (embedding, token_count)})
+            
             return embedding
             
         except Exception as e:
+            if isinstance(e, openai.RateLimitError):
+                RATE_LIMIT_HITS.inc(upstream="openai")
             self.logger.error(
                 "Failed to generate embedding",
                 error=str(e),
@@ -163,6 +180,7 @@ class EmbeddingService(LoggerMixin):
             )
             
             embeddings = [item.embedding for item in response.data]
+            record_openai_usage(self.model, response.usage, kinds=("total",))
             
             # Reconstruct full embedding list with zero vectors for empty texts
             result = []
@@ -184,6 +202,8 @@ class EmbeddingService(LoggerMixin):
             return result
             
         except Exception as e:
+            if isinstance(e, openai.RateLimitError):
+                RATE_LIMIT_HITS.inc(upstream="openai")
             self.logger.error(
                 "Failed to generate batch embeddings",
                 error=str(e),
@@ -192,6 +212,143 @@ class EmbeddingService(LoggerMixin):
             )
             raise
     
+    def _embedding_token_count(self, text: str) -> int:
+        """Tokens a text costs to embed (texts are truncated to the model limit before sending)"""
+        return min(self._count_tokens(text.strip()), self.max_tokens - 100) if text else 0
+    
+    def plan_micro_batches(
+        self,
+        texts: List[str],
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None
+    ) -> List[List[int]]:
+        """
+        Group texts into micro-batches bounded by total tokens and item count
+        
+        Args:
+            texts: Texts to embed
+            max_batch_tokens: Token budget per embeddings request
+            max_batch_items: Maximum inputs per embeddings request
+            
+        Returns:
+            List of micro-batches, each a list of indices into texts
+        """
+        max_batch_tokens = max_batch_tokens or settings.EMBEDDING_BATCH_MAX_TOKENS
+        max_batch_items = max_batch_items or settings.EMBEDDING_BATCH_MAX_ITEMS
+        
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = self._embedding_token_count(text)
+            if current and (len(current) >= max_batch_items or current_tokens + tokens > max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def generate_micro_batched_embeddings(
+        self,
+        texts: List[str],
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for any number of texts with one request per micro-batch
+        
+        Args:
+            texts: Texts to embed
+            max_batch_tokens: Token budget per embeddings request
+            max_batch_items: Maximum inputs per embeddings request
+            
+        Returns:
+            Vector embeddings in the same order as texts
+        """
+        embeddings, _ = await self.generate_cached_embeddings(texts, max_batch_tokens, max_batch_items)
+        return embeddings
+    
+    async def generate_cached_embeddings(
+        self,
+        texts: List[str],
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None
+    ) -> Tuple[List[List[float]], List[Optional[int]]]:
+        """
+        Generate embeddings, reusing cached vectors for previously embedded texts
+        
+        Texts missing from the cache are embedded in micro-batched requests
+        (identical texts only once) and written back to the cache. If a
+        micro-batch fails, the others are still embedded and cached before the
+        first error is raised.
+        
+        Args:
+            texts: Texts to embed
+            max_batch_tokens: Token budget per embeddings request
+            max_batch_items: Maximum inputs per embeddings request
+            
+        Returns:
+            Tuple of (vector embeddings in the same order as texts, tokens saved per
+            text: the cached token count for cache hits and None for texts that were
+            embedded or empty)
+        """
+        embeddings: List[List[float]] = [[0.0] * settings.VECTOR_DIMENSION for _ in texts]
+        saved_tokens: List[Optional[int]] = [None] * len(texts)
+        
+        keys: Dict[int, str] = {
+            index: embedding_cache_key(self.model, text)
+            for index, text in enumerate(texts)
+            if text and text.strip()
+        }
+        
+        cached = await self.cache.get_many(list(keys.values())) if self.cache is not None and keys else {}
+        
+        # One request slot per distinct uncached text
+        pending: Dict[str, List[int]] = {}
+        for index, key in keys.items():
+            if key in cached:
+                embeddings[index], saved_tokens[index] = cached[key]
+            else:
+                pending.setdefault(key, []).append(index)
+        
+        pending_keys = list(pending)
+        pending_texts = [texts[pending[key][0]] for key in pending_keys]
+        batches = self.plan_micro_batches(pending_texts, max_batch_tokens, max_batch_items)
+        
+        self.logger.info(
+            "Generating micro-batched embeddings",
+            total_texts=len(texts),
+            cache_hits=sum(1 for saved in saved_tokens if saved is not None),
+            texts_to_embed=len(pending_texts),
+            requests=len(batches)
+        )
+        
+        new_entries: Dict[str, Tuple[List[float], int]] = {}
+        batch_error: Optional[Exception] = None
+        for batch in batches:
+            try:
+                vectors = await self.generate_batch_embeddings([pending_texts[i] for i in batch])
+            except Exception as e:
+                # Embed the remaining micro-batches anyway, so a retry of the
+                # failed texts finds everything else in the cache
+                batch_error = batch_error or e
+                continue
+            for position, vector in zip(batch, vectors):
+                key = pending_keys[position]
+                for index in pending[key]:
+                    embeddings[index] = vector
+                new_entries[key] = (vector, self._embedding_token_count(pending_texts[position]))
+        
+        if self.cache is not None and new_entries:
+            await self.cache.put_many(self.model, new_entries)
+        
+        if batch_error is not None:
+            raise batch_error
+        
+        return embeddings, saved_tokens
+    
     def profile_to_text(self, profile: LinkedInProfile) -> str:
         """
         Convert LinkedIn profile to searchable text
@@ -306,10 +463,13 @@ class EmbeddingService(LoggerMixin):
             text_parts.append(f"Founded: {company.year_founded}")
         
         # Funding
-        if company.funding_info:
-            funding_text = f"Funding: {company.funding_info.get('total_funding', 'Unknown')}"
-            if company.funding_info.get('latest_round'):
-                funding_text += f" (Latest: {company.funding_info['latest_round']})"
+        funding = company.funding_info
+        if funding and funding.last_funding_round_type:
+            funding_text = f"Funding: {funding.last_funding_round_type}"
+            if funding.last_funding_round_amount:
+                funding_text += f" of {funding.last_funding_round_amount} {funding.last_funding_round_currency or ''}".rstrip()
+            if funding.last_funding_round_year:
+                funding_text += f" ({funding.last_funding_round_year})"
             text_parts.append(funding_text)
         
         return " | ".join(text_parts)
@@ -4,22 +4,85 @@ Supabase client for LinkedIn profile and company data storage
 Handles vector storage, retrieval, and similarity search using pgvector
 """
 
+import asyncio
 import json
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+import weakref
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime, timezone
 from supabase import acreate_client, AsyncClient, AsyncClientOptions
 import httpx
 
 from app.core.config import settings
 from app.core.logging import LoggerMixin
+from app.core.pagination import decode_cursor, encode_cursor
 from app.cassidy.models import LinkedInProfile, CompanyProfile
 from app.models.canonical.profile import CanonicalProfile
 from pydantic import HttpUrl
 
 
+# linkedin_profiles columns read for API responses; the embedding vector is never among them
+PROFILE_RESPONSE_COLUMNS: Tuple[str, ...] = (
+    "id", "linkedin_id", "name", "url", "position", "about", "city", "country_code",
+    "followers", "connections", "profile_image_url", "current_company", "experience",
+    "education", "certifications", "suggested_role", "created_at", "timestamp",
+)
+
+# Columns read for a stored profile before re-ingesting it: enough to serve it while fresh
+# or diff it against a new fetch (the embedding itself is not needed)
+PROFILE_DIFF_COLUMNS: Tuple[str, ...] = PROFILE_RESPONSE_COLUMNS + ("embedding_text_hash", "last_fetched_at")
+
+
+def _connection_pool_usage(connection_pool) -> Tuple[int, int, int]:
+    """
+    Inspect an httpcore connection pool
+    
+    Returns:
+        Tuple of (open connections, connections in use, requests queued for a connection)
+    """
+    open_connections = 0
+    in_use = 0
+    for connection in getattr(connection_pool, "connections", None) or []:
+        try:
+            open_connections += 1
+            if not connection.is_idle():
+                in_use += 1
+        except Exception:
+            continue
+    queued = sum(1 for request in getattr(connection_pool, "_requests", None) or [] if request.is_queued())
+    return open_connections, in_use, queued
+
+
+class _PoolStatsTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that counts requests and the ones that had to wait for a free connection"""
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        counters = SupabaseClient._pool_counters
+        counters["requests"] += 1
+        _, in_use, queued = _connection_pool_usage(self._pool)
+        if queued or in_use >= settings.SUPABASE_MAX_CONNECTIONS:
+            counters["waits"] += 1
+        return await super().handle_async_request(request)
+
+
 class SupabaseClient(LoggerMixin):
-    """Client for interacting with Supabase database and vector storage"""
+    """
+    Client for interacting with Supabase database and vector storage
+    
+    All instances share one Supabase client and pooled httpx transport per
+    event loop, sized by SUPABASE_MAX_CONNECTIONS, so repositories and
+    services never open connection pools of their own.
+    """
+    
+    # Shared clients keyed by event loop: loop -> (httpx client, supabase client)
+    _pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+    
+    # Process-wide connection pool counters
+    _pool_counters: Dict[str, int] = {
+        "requests": 0,
+        "waits": 0,
+        "pools_opened": 0,
+    }
     
     def __init__(self):
         if not settings.SUPABASE_URL or not settings.SUPABASE_ANON_KEY:
@@ -27,29 +90,108 @@ class SupabaseClient(LoggerMixin):
         
         # Create async client (lazily initialized)
         self.client: AsyncClient = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
         self._client_initialized = False
         self.vector_dimension = settings.VECTOR_DIMENSION
     
     async def _ensure_client(self):
-        """Ensure the async client is initialized"""
-        if not self._client_initialized:
-            # Create httpx client with proper configuration to avoid deprecation warnings
-            http_client = httpx.AsyncClient(
-                timeout=30.0,
-                verify=True
-            )
-            
-            # Create options with proper httpx client
-            options = AsyncClientOptions(
-                httpx_client=http_client
+        """Ensure the async client is initialized, attaching to the shared pool for the running loop"""
+        loop = asyncio.get_running_loop()
+        if not self._client_initialized or (self._client_loop is not None and self._client_loop is not loop):
+            self.client = await SupabaseClient._get_shared_client()
+            self._client_loop = loop
+            self._client_initialized = True
+    
+    @classmethod
+    async def _get_shared_client(cls) -> AsyncClient:
+        """
+        Get the shared Supabase client for the running event loop, opening it on first use
+        
+        Returns:
+            Supabase AsyncClient backed by the shared httpx connection pool
+        """
+        loop = asyncio.get_running_loop()
+        pool = cls._pools.get(loop)
+        if pool is not None:
+            return pool[1]
+        
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, pool=settings.SUPABASE_POOL_TIMEOUT),
+            transport=_PoolStatsTransport(
+                verify=True,
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=30.0
+                )
             )
-            
-            self.client = await acreate_client(
+        )
+        try:
+            client = await acreate_client(
                 settings.SUPABASE_URL,
                 settings.SUPABASE_ANON_KEY,
-                options=options
+                options=AsyncClientOptions(httpx_client=http_client)
             )
-            self._client_initialized = True
+        except Exception:
+            await http_client.aclose()
+            raise
+        
+        # Another task may have opened a pool while we were awaiting
+        existing = cls._pools.get(loop)
+        if existing is not None:
+            await http_client.aclose()
+            return existing[1]
+        
+        cls._pools[loop] = (http_client, client)
+        cls._pool_counters["pools_opened"] += 1
+        cls().logger.info(
+            "Opened shared Supabase connection pool",
+            max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS
+        )
+        return client
+    
+    @classmethod
+    async def open_pool(cls) -> None:
+        """Open the shared connection pool for the running event loop (called at startup)"""
+        await cls._get_shared_client()
+    
+    @classmethod
+    async def close_pool(cls) -> None:
+        """Close the shared connection pool for the running event loop (called at shutdown)"""
+        pool = cls._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool[0].aclose()
+            cls().logger.info("Closed shared Supabase connection pool")
+    
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Any]:
+        """
+        Get connection pool statistics for the shared Supabase HTTP clients
+        
+        Returns:
+            Dict with pool limits, in-use/idle connections, queued requests and lifetime counters
+        """
+        open_connections = 0
+        in_use_connections = 0
+        queued_requests = 0
+        for http_client, _ in list(cls._pools.values()):
+            connection_pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+            opened, in_use, queued = _connection_pool_usage(connection_pool)
+            open_connections += opened
+            in_use_connections += in_use
+            queued_requests += queued
+        
+        return {
+            "max_connections": settings.SUPABASE_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            "open_pools": len(cls._pools),
+            "open_connections": open_connections,
+            "in_use_connections": in_use_connections,
+            "idle_connections": open_connections - in_use_connections,
+            "queued_requests": queued_requests,
+            **cls._pool_counters,
+        }
     
     def _serialize_model(self, model) -> Dict[str, Any]:
         """Serialize a Pydantic model, converting HttpUrl objects to strings"""
@@ -120,10 +262,42 @@ class SupabaseClient(LoggerMixin):
             # Standard field sorting
             return query.order(sort_by, desc=desc)
     
+    def profile_to_columns(self, profile: CanonicalProfile) -> Dict[str, Any]:
+        """
+        Column values stored for a fetched profile
+        
+        Excludes the record id, created_at, suggested_role and the embedding,
+        which are not part of the fetched profile.
+        
+        Args:
+            profile: CanonicalProfile (or Cassidy LinkedInProfile) instance
+            
+        Returns:
+            Dict of linkedin_profiles column values
+        """
+        return {
+            "linkedin_id": profile.profile_id,
+            "name": profile.full_name,
+            "url": str(profile.linkedin_url) if profile.linkedin_url else None,
+            "position": profile.job_title,
+            "about": profile.about,
+            "city": profile.city,
+            "country_code": profile.country,  # Using country instead of country_code
+            "followers": profile.follower_count,
+            "connections": profile.connection_count,
+            "profile_image_url": str(profile.profile_image_url) if profile.profile_image_url else None,
+            "experience": [self._serialize_model(exp) for exp in profile.experiences],
+            "education": [self._serialize_model(edu) for edu in profile.educations],
+            "certifications": [],  # CanonicalProfile doesn't have certifications field
+            "current_company": {"name": profile.company} if profile.company else None,
+            "timestamp": profile.timestamp.isoformat() if profile.timestamp else datetime.now(timezone.utc).isoformat(),
+        }
+    
     async def store_profile(
         self, 
         profile: CanonicalProfile, 
-        embedding: Optional[List[float]] = None
+        embedding: Optional[List[float]] = None,
+        embedding_text_hash: Optional[str] = None
     ) -> str:
         """
         Store LinkedIn profile in Supabase with optional vector embedding
@@ -131,6 +305,7 @@ class SupabaseClient(LoggerMixin):
         Args:
             profile: CanonicalProfile instance to store
             embedding: Optional vector embedding for similarity search
+            embedding_text_hash: Content hash of the text the embedding was generated from
             
         Returns:
             str: Unique record ID
@@ -155,24 +330,12 @@ class SupabaseClient(LoggerMixin):
         # Prepare profile data for storage
         profile_data = {
             "id": record_id,
-            "linkedin_id": profile.profile_id,
-            "name": profile.full_name,
-            "url": str(profile.linkedin_url) if profile.linkedin_url else None,
-            "position": profile.job_title,
-            "about": profile.about,
-            "city": profile.city,
-            "country_code": profile.country,  # Using country instead of country_code
-            "followers": profile.follower_count,
-            "connections": profile.connection_count,
-            "profile_image_url": str(profile.profile_image_url) if profile.profile_image_url else None,
+            **self.profile_to_columns(profile),
             "suggested_role": None,  # Will be set separately via update_profile_suggested_role
-            "experience": [self._serialize_model(exp) for exp in profile.experiences],
-            "education": [self._serialize_model(edu) for edu in profile.educations],
-            "certifications": [],  # CanonicalProfile doesn't have certifications field
-            "current_company": {"name": profile.company} if profile.company else None,
-            "timestamp": profile.timestamp.isoformat() if profile.timestamp else datetime.now(timezone.utc).isoformat(),
             "created_at": datetime.now(timezone.utc).isoformat(),
-            "embedding": embedding
+            "last_fetched_at": datetime.now(timezone.utc).isoformat(),
+            "embedding": embedding,
+            "embedding_text_hash": embedding_text_hash
         }
         
         try:
@@ -224,6 +387,9 @@ class SupabaseClient(LoggerMixin):
                     relationships_deleted=relationships_deleted
                 )
             
+            # Deferred company enrichment status has no foreign key to the profile
+            await self.client.table("profile_enrichments").delete().eq("profile_id", profile_id).execute()
+            
             # Then delete the profile itself
             table = self.client.table("linkedin_profiles")
             result = await table.delete().eq("id", profile_id).execute()
@@ -249,6 +415,34 @@ class SupabaseClient(LoggerMixin):
             )
             raise
     
+    async def update_profile(self, profile_id: str, changes: Dict[str, Any]) -> bool:
+        """
+        Patch the given columns of a stored profile
+        
+        Args:
+            profile_id: Profile record ID
+            changes: Column values to write; other columns are left untouched
+            
+        Returns:
+            bool: True if the profile was updated, False if it was not found
+        """
+        await self._ensure_client()
+        self.logger.info("Updating profile columns", profile_id=profile_id, columns=sorted(changes))
+        
+        try:
+            table = self.client.table("linkedin_profiles")
+            result = await table.update(changes).eq("id", profile_id).execute()
+            return bool(result.data)
+            
+        except Exception as e:
+            self.logger.error(
+                "Failed to update profile",
+                profile_id=profile_id,
+                error=str(e),
+                error_type=type(e).__name__
+            )
+            raise
+    
     async def update_profile_suggested_role(self, profile_id: str, suggested_role: str) -> bool:
         """
         Update the suggested_role field for a profile
@@ -519,12 +713,17 @@ class SupabaseClient(LoggerMixin):
             )
             raise
     
-    async def list_recent_profiles(self, limit: int = 50) -> List[Dict[str, Any]]:
+    async def list_recent_profiles(
+        self,
+        limit: int = 50,
+        columns: Sequence[str] = PROFILE_RESPONSE_COLUMNS
+    ) -> List[Dict[str, Any]]:
         """
         Get recently stored profiles
         
         Args:
             limit: Maximum number of profiles to return
+            columns: Columns to select (defaults to the response columns, without the embedding)
             
         Returns:
             List of recent profiles
@@ -534,7 +733,7 @@ class SupabaseClient(LoggerMixin):
         
         try:
             table = self.client.table("linkedin_profiles")
-            result = await table.order("created_at", desc=True).limit(limit).execute()
+            result = await table.select(",".join(columns)).order("created_at", desc=True).limit(limit).execute()
             
             profiles = result.data or []
             self.logger.info("Recent profiles retrieved", count=len(profiles))
@@ -545,12 +744,17 @@ class SupabaseClient(LoggerMixin):
             self.logger.error("Failed to fetch recent profiles", error=str(e))
             raise
     
-    async def get_profile_by_url(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
+    async def get_profile_by_url(
+        self,
+        linkedin_url: str,
+        columns: Optional[Sequence[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Retrieve profile by LinkedIn URL
         
         Args:
             linkedin_url: LinkedIn profile URL
+            columns: Columns to select (all columns if omitted)
             
         Returns:
             Profile data or None if not found
@@ -560,7 +764,7 @@ class SupabaseClient(LoggerMixin):
         
         try:
             table = self.client.table("linkedin_profiles")
-            result = await table.select("*").eq("url", linkedin_url).execute()
+            result = await table.select(",".join(columns) if columns else "*").eq("url", linkedin_url).execute()
             
             if result.data:
                 self.logger.info("Profile found by URL", linkedin_url=linkedin_url)
@@ -609,7 +813,44 @@ class SupabaseClient(LoggerMixin):
             )
             raise
     
-    async def search_profiles(
+    def _parse_score_range(self, score_range: Optional[str]) -> Dict[str, Any]:
+        """Translate a score_range filter into search_profiles RPC parameters
+        
+        Args:
+            score_range: 'unscored', 'high' (8-10), 'medium' (5-7), 'low' (1-4) or a custom 'min-max'
+            
+        Returns:
+            Dict of p_unscored / p_score_min / p_score_max / p_score_max_inclusive parameters
+        """
+        params = {
+            "p_unscored": False,
+            "p_score_min": None,
+            "p_score_max": None,
+            "p_score_max_inclusive": True
+        }
+        if not score_range:
+            return params
+        
+        score_range = score_range.lower()
+        if score_range == "unscored":
+            params["p_unscored"] = True
+        elif score_range == "high":
+            params.update(p_score_min=8.0, p_score_max=10.0)
+        elif score_range == "medium":
+            params.update(p_score_min=5.0, p_score_max=8.0, p_score_max_inclusive=False)
+        elif score_range == "low":
+            params.update(p_score_min=1.0, p_score_max=5.0, p_score_max_inclusive=False)
+        elif "-" in score_range:
+            # Handle custom ranges like "7-10"
+            try:
+                min_score, max_score = score_range.split("-")
+                params.update(p_score_min=float(min_score.strip()), p_score_max=float(max_score.strip()))
+            except (ValueError, IndexError):
+                # Fall back to no score filtering
+                self.logger.warning(f"Invalid score_range format: {score_range}")
+        return params
+    
+    async def search_profiles_page(
         self,
         name: Optional[str] = None,
         company: Optional[str] = None,
@@ -618,179 +859,139 @@ class SupabaseClient(LoggerMixin):
         sort_by: Optional[str] = None,
         sort_order: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> List[Dict[str, Any]]:
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Sequence[str] = PROFILE_RESPONSE_COLUMNS
+    ) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
         """
-        Search profiles with optional filters and sorting
+        Search profiles with optional filters and sorting, returning the exact match count
+        and a keyset cursor for the next page
+        
+        All filtering (company junction join, score range join, unscored anti-join),
+        sorting and pagination run in the search_profiles database function, so this
+        is a single round-trip.
         
         Args:
             name: Partial name search (case-insensitive)
-            company: Partial company name search (case-insensitive) - searches both junction table relationships and text fields
+            company: Partial company name search (case-insensitive) over linked companies
             location: Partial location search (case-insensitive, searches city field)
             score_range: Score range filter: 'unscored', 'high' (8-10), 'medium' (5-7), 'low' (1-4)
             sort_by: Sort field: 'name', 'created_at', 'city', 'position', default: 'created_at'
             sort_order: Sort order: 'asc' or 'desc', default: 'desc'
             limit: Maximum number of profiles to return
-            offset: Number of profiles to skip
+            offset: Number of profiles to skip (after the cursor row, if a cursor is given)
+            cursor: next_cursor of the previous page, issued for the same sort
+            columns: linkedin_profiles columns to return (the embedding is never returned)
             
         Returns:
-            List of matching profiles
+            Tuple of (page of matching profiles, total number of matching profiles,
+            cursor for the next page or None on the last page)
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed or was issued for a different sort
         """
+        sort_by = sort_by or "created_at"
+        sort_order = (sort_order or "desc").lower()
+        after_value, after_id = decode_cursor(cursor, sort_by, sort_order) if cursor else (None, None)
+        
         await self._ensure_client()
-        self.logger.info("Searching profiles", name=name, company=company, location=location, score_range=score_range, limit=limit, offset=offset)
+        self.logger.info("Searching profiles", name=name, company=company, location=location, score_range=score_range, limit=limit, offset=offset, cursor=bool(cursor))
+        
+        params = {
+            "p_name": name or None,
+            "p_company": company or None,
+            "p_location": location or None,
+            "p_sort_by": sort_by,
+            "p_sort_order": sort_order,
+            "p_limit": limit,
+            "p_offset": offset,
+            "p_columns": list(columns),
+            "p_after_value": after_value,
+            "p_after_id": after_id,
+            **self._parse_score_range(score_range)
+        }
         
         try:
-            # First, handle company filtering if provided - use junction table relationships
-            company_filtered_profile_ids = None
-            if company:
-                # Get profile IDs that are linked to companies matching the search term
-                companies_table = self.client.table("companies")
-                companies_result = await companies_table.select("id").ilike("company_name", f"%{company}%").execute()
-                company_ids = [row["id"] for row in companies_result.data or []]
-                
-                if company_ids:
-                    # Get profile IDs linked to these companies via junction table
-                    junction_table = self.client.table("profile_companies")
-                    junction_result = await junction_table.select("profile_id").in_("company_id", company_ids).execute()
-                    company_filtered_profile_ids = [row["profile_id"] for row in junction_result.data or []]
-                else:
-                    company_filtered_profile_ids = []  # No companies match the search term
-            
-            # For score filtering, we need to handle it differently since we need to join with profile_scores
-            if score_range:
-                # First, get profile IDs that match the score criteria
-                scored_profile_ids = set()
-                
-                if score_range.lower() == "unscored":
-                    # Get all profile linkedin_ids from profile_scores
-                    scores_table = self.client.table("profile_scores")
-                    scores_result = await scores_table.select("profile_id").execute()
-                    scored_linkedin_ids = {row["profile_id"] for row in scores_result.data or []}
-                    
-                    # Get all profiles and filter out the scored ones
-                    profiles_table = self.client.table("linkedin_profiles")
-                    query = profiles_table.select("*")
-                    
-                    # Add other filters
-                    if name:
-                        query = query.ilike("name", f"%{name}%")
-                    if company and company_filtered_profile_ids is not None:
-                        if company_filtered_profile_ids:  # Only filter if we found matching profiles
-                            query = query.in_("id", company_filtered_profile_ids)
-                        else:  # No profiles match company filter, return empty result
-                            return []
-                    if location:
-                        query = query.ilike("city", f"%{location}%")
-                    
-                    query = self._apply_sorting(query, sort_by, sort_order).range(offset, offset + limit - 1)
-                    result = await query.execute()
-                    
-                    # Filter out profiles that have scores
-                    profiles = [p for p in (result.data or []) if p.get("linkedin_id") not in scored_linkedin_ids]
-                    
-                else:
-                    # Get profiles with scores in the specified range
-                    scores_table = self.client.table("profile_scores")
-                    scores_query = scores_table.select("profile_id")
-                    
-                    if score_range.lower() == "high":
-                        scores_query = scores_query.gte("overall_score", 8.0).lte("overall_score", 10.0)
-                    elif score_range.lower() == "medium":
-                        scores_query = scores_query.gte("overall_score", 5.0).lt("overall_score", 8.0)
-                    elif score_range.lower() == "low":
-                        scores_query = scores_query.gte("overall_score", 1.0).lt("overall_score", 5.0)
-                    else:
-                        # Handle custom ranges like "7-10"
-                        if "-" in score_range:
-                            try:
-                                min_score, max_score = score_range.split("-")
-                                min_score = float(min_score.strip())
-                                max_score = float(max_score.strip())
-                                scores_query = scores_query.gte("overall_score", min_score).lte("overall_score", max_score)
-                            except (ValueError, IndexError):
-                                self.logger.warning(f"Invalid score_range format: {score_range}")
-                                # Fall back to no score filtering
-                                scores_query = None
-                        else:
-                            scores_query = None
-                    
-                    if scores_query:
-                        scores_result = await scores_query.execute()
-                        target_linkedin_ids = [row["profile_id"] for row in scores_result.data or []]
-                        
-                        if target_linkedin_ids:
-                            # Get profiles matching these linkedin_ids
-                            profiles_table = self.client.table("linkedin_profiles")
-                            query = profiles_table.select("*").in_("linkedin_id", target_linkedin_ids)
-                            
-                            # Add other filters
-                            if name:
-                                query = query.ilike("name", f"%{name}%")
-                            if company and company_filtered_profile_ids is not None:
-                                if company_filtered_profile_ids:  # Only filter if we found matching profiles
-                                    query = query.in_("id", company_filtered_profile_ids)
-                                else:  # No profiles match company filter, return empty result
-                                    return []
-                            if location:
-                                query = query.ilike("city", f"%{location}%")
-                            
-                            query = self._apply_sorting(query, sort_by, sort_order).range(offset, offset + limit - 1)
-                            result = await query.execute()
-                            profiles = result.data or []
-                        else:
-                            profiles = []  # No profiles match the score criteria
-                    else:
-                        # Fall back to regular search without score filtering
-                        profiles_table = self.client.table("linkedin_profiles")
-                        query = profiles_table.select("*")
-                        
-                        if name:
-                            query = query.ilike("name", f"%{name}%")
-                        if company and company_filtered_profile_ids is not None:
-                            if company_filtered_profile_ids:  # Only filter if we found matching profiles
-                                query = query.in_("id", company_filtered_profile_ids)
-                            else:  # No profiles match company filter, return empty result
-                                return []
-                        if location:
-                            query = query.ilike("city", f"%{location}%")
-                        
-                        query = self._apply_sorting(query, sort_by, sort_order).range(offset, offset + limit - 1)
-                        result = await query.execute()
-                        profiles = result.data or []
-                
-            else:
-                # Regular query without score filtering
-                table = self.client.table("linkedin_profiles")
-                query = table.select("*")
-                
-                # Add name filter if provided (case-insensitive)
-                if name:
-                    query = query.ilike("name", f"%{name}%")
-                
-                # Add company filter if provided (use junction table relationships)
-                if company and company_filtered_profile_ids is not None:
-                    if company_filtered_profile_ids:  # Only filter if we found matching profiles
-                        query = query.in_("id", company_filtered_profile_ids)
-                    else:  # No profiles match company filter, return empty result
-                        return []
-                
-                # Add location filter if provided (search in city field)
-                if location:
-                    query = query.ilike("city", f"%{location}%")
-                
-                # Add ordering, limit, and offset
-                query = self._apply_sorting(query, sort_by, sort_order).range(offset, offset + limit - 1)
-                
-                result = await query.execute()
-                profiles = result.data or []
+            result = await self.client.rpc("search_profiles", params).execute()
+            data = result.data or {}
+            profiles = data.get("profiles") or []
+            total = data.get("total") or 0
+            last = data.get("next")
+            next_cursor = encode_cursor(sort_by, sort_order, last["value"], last["id"]) if last else None
             
-            self.logger.info("Profile search completed", count=len(profiles))
-            return profiles
+            self.logger.info("Profile search completed", count=len(profiles), total=total)
+            return profiles, total, next_cursor
             
         except Exception as e:
             self.logger.error("Failed to search profiles", error=str(e))
             raise
     
+    async def search_profiles_with_total(
+        self,
+        name: Optional[str] = None,
+        company: Optional[str] = None,
+        location: Optional[str] = None,
+        score_range: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        columns: Sequence[str] = PROFILE_RESPONSE_COLUMNS
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Search profiles with optional filters and sorting, returning the exact match count
+        
+        See search_profiles_page for argument details.
+        
+        Returns:
+            Tuple of (page of matching profiles, total number of matching profiles)
+        """
+        profiles, total, _ = await self.search_profiles_page(
+            name=name,
+            company=company,
+            location=location,
+            score_range=score_range,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            offset=offset,
+            columns=columns
+        )
+        return profiles, total
+    
+    async def search_profiles(
+        self,
+        name: Optional[str] = None,
+        company: Optional[str] = None,
+        location: Optional[str] = None,
+        score_range: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        columns: Sequence[str] = PROFILE_RESPONSE_COLUMNS
+    ) -> List[Dict[str, Any]]:
+        """
+        Search profiles with optional filters and sorting
+        
+        See search_profiles_page for argument details.
+        
+        Returns:
+            List of matching profiles
+        """
+        profiles, _ = await self.search_profiles_with_total(
+            name=name,
+            company=company,
+            location=location,
+            score_range=score_range,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            offset=offset,
+            columns=columns
+        )
+        return profiles
+    
     async def link_profile_to_company(
         self,
         profile_id: str,
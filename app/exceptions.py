@@ -81,3 +81,60 @@ class ProfileAlreadyExistsError(LinkedInIngestionError):
         
         super().__init__(message, status_code=409, details=combined_details)
         self.error_code = "PROFILE_ALREADY_EXISTS"
+
+
+class InvalidCursorError(LinkedInIngestionError):
+    """Raised when a pagination cursor is malformed or was issued for a different sort"""
+    
+    def __init__(
+        self, 
+        cursor: str, 
+        message: Optional[str] = None, 
+        details: Optional[Dict[str, Any]] = None
+    ):
+        self.cursor = cursor
+        
+        if message is None:
+            message = "Invalid pagination cursor"
+        
+        combined_details = details or {}
+        combined_details["suggestions"] = [
+            "Pass pagination.next_cursor from the previous page unchanged",
+            "Keep sort_by and sort_order the same as the request that returned the cursor",
+            "Omit cursor to start again from the first page"
+        ]
+        
+        super().__init__(message, status_code=400, details=combined_details)
+        self.error_code = "INVALID_CURSOR"
+
+
+class UpstreamUnavailableError(LinkedInIngestionError):
+    """Raised without calling an upstream API whose circuit is open or that asked us to back off"""
+    
+    def __init__(
+        self, 
+        upstream: str, 
+        reason: str, 
+        retry_after: float = 0.0, 
+        last_error: Optional[str] = None
+    ):
+        self.upstream = upstream
+        self.reason = reason
+        self.retry_after = retry_after
+        
+        message = f"{upstream} is temporarily unavailable ({reason}); retry in {retry_after:.0f}s"
+        
+        details = {
+            "upstream": upstream,
+            "reason": reason,
+            "retry_after_seconds": round(retry_after, 1),
+            "suggestions": [
+                f"Retry after {max(1, round(retry_after))} seconds",
+                "Check /api/v1/health/detailed for the upstream's circuit state"
+            ]
+        }
+        if last_error:
+            details["last_error"] = last_error
+        
+        super().__init__(message, status_code=503, details=details)
+        self.error_code = "UPSTREAM_UNAVAILABLE"
@@ -57,6 +57,24 @@ class ScoringJob(BaseModel):
         default=None,
         description="ID of prompt template used for scoring (optional)"
     )
+    max_tokens: Optional[int] = Field(
+        default=None,
+        description="Maximum response tokens requested for this job"
+    )
+    temperature: Optional[float] = Field(
+        default=None,
+        description="Sampling temperature requested for this job"
+    )
+    
+    # Worker Ownership
+    worker_id: Optional[str] = Field(
+        default=None,
+        description="ID of the worker that claimed the job"
+    )
+    heartbeat_at: Optional[datetime] = Field(
+        default=None,
+        description="Last heartbeat from the worker processing the job"
+    )
     
     # LLM Response Data
     llm_response: Optional[Dict[str, Any]] = Field(
@@ -9,7 +9,8 @@ Handles all database CRUD operations for companies including:
 - Domain and location-based queries
 """
 
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
+import asyncio
 import uuid
 from datetime import datetime, timezone
 import json
@@ -18,11 +19,22 @@ import logging
 from supabase import Client as SupabaseClient
 from pydantic import ValidationError
 
+from app.core.pagination import apply_keyset, page_after
+from app.exceptions import InvalidCursorError
 from app.models.canonical.company import CanonicalCompany, CanonicalFundingInfo, CanonicalCompanyLocation, CanonicalAffiliatedCompany
 
 
 logger = logging.getLogger(__name__)
 
+# companies columns read for API responses; the embedding vector and raw Cassidy payload are never among them
+COMPANY_RESPONSE_COLUMNS: Tuple[str, ...] = (
+    "id", "linkedin_company_id", "company_name", "linkedin_url", "tagline", "description",
+    "website", "domain", "logo_url", "year_founded", "industries", "specialties",
+    "employee_count", "employee_range", "follower_count", "hq_city", "hq_region",
+    "hq_country", "hq_full_address", "funding_info", "locations", "affiliated_companies",
+    "created_at", "updated_at", "timestamp",
+)
+
 
 class CompanyRepository:
     """Repository class for company database operations."""
@@ -35,9 +47,18 @@ class CompanyRepository:
             supabase_client: SupabaseClient instance for database operations
         """
         self.supabase_client = supabase_client
-        self.client = supabase_client.client  # For sync operations
         self.table_name = "companies"
     
+    @property
+    def client(self):
+        """Async Supabase client of the wrapped SupabaseClient"""
+        return self.supabase_client.client
+    
+    @staticmethod
+    def _select_list(columns: Optional[Sequence[str]]) -> str:
+        """PostgREST select list for the given columns ("*" when omitted)"""
+        return ",".join(columns) if columns else "*"
+    
     async def create(self, company: CanonicalCompany) -> Dict[str, Any]:
         """
         Insert a new company record into the database.
@@ -105,7 +126,82 @@ class CompanyRepository:
             logger.error(f"Failed to update company {company_id}: {str(e)}")
             raise
     
-    def upsert_by_linkedin_id(self, company: CanonicalCompany) -> Dict[str, Any]:
+    async def update_embeddings(self, embeddings: Dict[str, List[float]]) -> int:
+        """
+        Store vector embeddings for existing company records.
+        
+        Args:
+            embeddings: Mapping of company UUID to embedding vector
+            
+        Returns:
+            Number of company records updated
+        """
+        if not embeddings:
+            return 0
+        
+        await self.supabase_client._ensure_client()
+        table = self.supabase_client.client.table(self.table_name)
+        updated_at = datetime.now(timezone.utc).isoformat()
+        
+        async def update_one(company_id: str, embedding: List[float]) -> bool:
+            try:
+                result = await table.update({"embedding": embedding, "updated_at": updated_at}).eq("id", company_id).execute()
+                return bool(result.data)
+            except Exception as e:
+                logger.warning(f"Failed to store embedding for company {company_id}: {str(e)}")
+                return False
+        
+        # Each row has a different vector, so these are individual updates sent concurrently
+        results = await asyncio.gather(*(update_one(cid, vec) for cid, vec in embeddings.items()))
+        return sum(results)
+    
+    async def bulk_upsert(self, companies: List[Tuple[Optional[str], CanonicalCompany]]) -> List[Dict[str, Any]]:
+        """
+        Create and update many company records in one upsert request.
+        
+        Args:
+            companies: (database ID, company) pairs; a None ID creates a new record
+            
+        Returns:
+            List of company records in the same order as the input
+            
+        Raises:
+            Exception: If database operation fails
+        """
+        if not companies:
+            return []
+        
+        rows = []
+        for company_id, company in companies:
+            db_data = self._model_to_db_format(company, is_update=company_id is not None)
+            # IDs for new records are assigned here so the whole batch can conflict on "id"
+            db_data["id"] = str(company_id) if company_id else str(uuid.uuid4())
+            rows.append(db_data)
+        
+        try:
+            await self.supabase_client._ensure_client()
+            
+            # Rows carry different column sets; missing columns fall back to column defaults
+            # (created_at/updated_at on new records) instead of NULL
+            result = await self.supabase_client.client.table(self.table_name).upsert(
+                rows,
+                on_conflict="id",
+                default_to_null=False
+            ).execute()
+            
+            records_by_id = {record["id"]: record for record in (result.data or [])}
+            missing = [row["id"] for row in rows if row["id"] not in records_by_id]
+            if missing:
+                raise Exception(f"Bulk upsert did not return {len(missing)} of {len(rows)} company records")
+            
+            logger.info(f"Bulk upserted {len(rows)} company records")
+            return [records_by_id[row["id"]] for row in rows]
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk upsert {len(rows)} companies: {str(e)}")
+            raise
+    
+    async def upsert_by_linkedin_id(self, company: CanonicalCompany) -> Dict[str, Any]:
         """
         Insert or update a company based on LinkedIn company ID.
         
@@ -116,11 +212,14 @@ class CompanyRepository:
             Dict containing the upserted company record
         """
         try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
             # Convert to database format
             db_data = self._model_to_db_format(company)
             
             # Upsert based on linkedin_company_id
-            result = self.client.table(self.table_name).upsert(
+            result = await self.supabase_client.client.table(self.table_name).upsert(
                 db_data,
                 on_conflict="linkedin_company_id"
             ).execute()
@@ -184,39 +283,100 @@ class CompanyRepository:
             logger.error(f"Failed to get company by LinkedIn ID {linkedin_company_id}: {str(e)}")
             return None
     
-    async def get_all(self, limit: int = 50, offset: int = 0) -> List[CanonicalCompany]:
+    async def get_by_linkedin_ids(self, linkedin_company_ids: List[str]) -> Dict[str, CanonicalCompany]:
+        """
+        Get companies for many LinkedIn company IDs in one query.
+        
+        Args:
+            linkedin_company_ids: LinkedIn company IDs
+            
+        Returns:
+            Mapping of LinkedIn company ID to CanonicalCompany for the IDs that exist
+            
+        Raises:
+            Exception: If database operation fails
+        """
+        linkedin_company_ids = list(dict.fromkeys(cid for cid in linkedin_company_ids if cid))
+        if not linkedin_company_ids:
+            return {}
+        
+        try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.table(self.table_name).select("*").in_(
+                "linkedin_company_id", linkedin_company_ids
+            ).execute()
+            
+            return {row["linkedin_company_id"]: self._db_to_model_format(row) for row in (result.data or [])}
+            
+        except Exception as e:
+            logger.error(f"Failed to get companies by {len(linkedin_company_ids)} LinkedIn IDs: {str(e)}")
+            raise
+    
+    async def get_all(self, limit: int = 50, offset: int = 0, columns: Optional[Sequence[str]] = None) -> List[CanonicalCompany]:
         """
         Get all companies with pagination.
         
         Args:
             limit: Maximum number of results to return
             offset: Number of records to skip
+            columns: Columns to select (all columns if omitted)
             
         Returns:
             List of CanonicalCompany instances
         """
+        companies, _ = await self.get_page(limit=limit, offset=offset, columns=columns)
+        return companies
+    
+    async def get_page(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[CanonicalCompany], Optional[str]]:
+        """
+        Get one page of companies, newest first, with a keyset cursor for the next page.
+        
+        Args:
+            limit: Maximum number of results to return
+            offset: Number of records to skip (after the cursor row, if a cursor is given)
+            cursor: next_cursor of the previous page
+            columns: Columns to select (all columns if omitted)
+            
+        Returns:
+            Tuple of (CanonicalCompany instances, cursor for the next page or None on the last page)
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
         try:
             # Ensure async client is available
             await self.supabase_client._ensure_client()
             
-            result = await self.supabase_client.client.table(self.table_name).select("*").order(
-                "created_at", desc=True
-            ).range(offset, offset + limit - 1).execute()
+            query = self.supabase_client.client.table(self.table_name).select(self._select_list(columns))
+            # One extra row tells whether another page follows
+            result = await apply_keyset(query, cursor).range(offset, offset + limit).execute()
+            rows, next_cursor = page_after(result.data or [], limit)
             
-            logger.info(f"Retrieved {len(result.data)} companies (limit: {limit}, offset: {offset})")
-            return [self._db_to_model_format(row) for row in result.data]
+            logger.info(f"Retrieved {len(rows)} companies (limit: {limit}, offset: {offset}, cursor: {bool(cursor)})")
+            return [self._db_to_model_format(row) for row in rows], next_cursor
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get all companies: {str(e)}")
-            return []
+            return [], None
     
-    async def search_by_name(self, name_query: str, limit: int = 20) -> List[CanonicalCompany]:
+    async def search_by_name(self, name_query: str, limit: int = 20, columns: Optional[Sequence[str]] = None) -> List[CanonicalCompany]:
         """
         Search companies by name.
         
         Args:
             name_query: Company name search query
             limit: Maximum number of results to return
+            columns: Columns to select (all columns if omitted)
             
         Returns:
             List of CanonicalCompany instances
@@ -225,7 +385,7 @@ class CompanyRepository:
             # Ensure async client is available
             await self.supabase_client._ensure_client()
             
-            result = await self.supabase_client.client.table(self.table_name).select("*").ilike(
+            result = await self.supabase_client.client.table(self.table_name).select(self._select_list(columns)).ilike(
                 "company_name", f"%{name_query}%"
             ).limit(limit).execute()
             
@@ -235,33 +395,37 @@ class CompanyRepository:
             logger.error(f"Failed to search companies by name '{name_query}': {str(e)}")
             return []
     
-    def search_by_domain(self, domain: str, exact_match: bool = False) -> List[CanonicalCompany]:
+    async def search_by_domain(self, domain: str, exact_match: bool = False, columns: Optional[Sequence[str]] = None) -> List[CanonicalCompany]:
         """
         Search companies by domain.
         
         Args:
             domain: Domain to search for
             exact_match: Whether to match exactly or use partial matching
+            columns: Columns to select (all columns if omitted)
             
         Returns:
             List of CanonicalCompany instances
         """
         try:
-            query = self.client.table(self.table_name).select("*")
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            query = self.supabase_client.client.table(self.table_name).select(self._select_list(columns))
             
             if exact_match:
                 query = query.eq("domain", domain.lower())
             else:
                 query = query.ilike("domain", f"%{domain.lower()}%")
             
-            result = query.limit(50).execute()
+            result = await query.limit(50).execute()
             return [self._db_to_model_format(row) for row in result.data]
             
         except Exception as e:
             logger.error(f"Failed to search companies by domain '{domain}': {str(e)}")
             return []
     
-    def get_companies_by_size_category(self, category: str = "all", limit: int = 50) -> List[Dict[str, Any]]:
+    async def get_companies_by_size_category(self, category: str = "all", limit: int = 50) -> List[Dict[str, Any]]:
         """
         Get companies filtered by size category.
         
@@ -273,8 +437,11 @@ class CompanyRepository:
             List of company records with size information
         """
         try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
             # Use the database function if available, otherwise implement logic here
-            result = self.client.rpc("get_companies_by_size_category", {
+            result = await self.supabase_client.client.rpc("get_companies_by_size_category", {
                 "category": category,
                 "limit_count": limit
             }).execute()
@@ -284,9 +451,9 @@ class CompanyRepository:
         except Exception as e:
             # Fallback to manual filtering if function doesn't exist
             logger.warning(f"Database function not available, using fallback: {str(e)}")
-            return self._get_companies_by_size_fallback(category, limit)
+            return await self._get_companies_by_size_fallback(category, limit)
     
-    def get_startup_companies(self, limit: int = 25) -> List[Dict[str, Any]]:
+    async def get_startup_companies(self, limit: int = 25) -> List[Dict[str, Any]]:
         """
         Get companies that match startup criteria.
         
@@ -297,7 +464,10 @@ class CompanyRepository:
             List of startup company records
         """
         try:
-            result = self.client.rpc("get_startup_companies", {
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.rpc("get_startup_companies", {
                 "limit_count": limit
             }).execute()
             
@@ -306,9 +476,9 @@ class CompanyRepository:
         except Exception as e:
             # Fallback implementation
             logger.warning(f"Database function not available, using fallback: {str(e)}")
-            return self._get_startup_companies_fallback(limit)
+            return await self._get_startup_companies_fallback(limit)
     
-    def vector_similarity_search(self, query_embedding: List[float], threshold: float = 0.2, limit: int = 10) -> List[Dict[str, Any]]:
+    async def vector_similarity_search(self, query_embedding: List[float], threshold: float = 0.2, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Perform vector similarity search for companies.
         
@@ -321,7 +491,10 @@ class CompanyRepository:
             List of similar companies with similarity scores
         """
         try:
-            result = self.client.rpc("match_companies", {
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.rpc("match_companies", {
                 "query_embedding": query_embedding,
                 "match_threshold": threshold,
                 "match_count": limit
@@ -333,7 +506,7 @@ class CompanyRepository:
             logger.error(f"Failed to perform vector similarity search: {str(e)}")
             return []
     
-    def get_companies_by_location(self, city: Optional[str] = None, country: Optional[str] = None, limit: int = 50) -> List[CanonicalCompany]:
+    async def get_companies_by_location(self, city: Optional[str] = None, country: Optional[str] = None, limit: int = 50, columns: Optional[Sequence[str]] = None) -> List[CanonicalCompany]:
         """
         Get companies by location (city and/or country).
         
@@ -341,39 +514,47 @@ class CompanyRepository:
             city: City name to filter by
             country: Country name to filter by
             limit: Maximum number of results
+            columns: Columns to select (all columns if omitted)
             
         Returns:
             List of CanonicalCompany instances
         """
         try:
-            query = self.client.table(self.table_name).select("*")
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            query = self.supabase_client.client.table(self.table_name).select(self._select_list(columns))
             
             if city:
                 query = query.ilike("hq_city", f"%{city}%")
             if country:
                 query = query.ilike("hq_country", f"%{country}%")
             
-            result = query.limit(limit).execute()
+            result = await query.limit(limit).execute()
             return [self._db_to_model_format(row) for row in result.data]
             
         except Exception as e:
             logger.error(f"Failed to get companies by location (city: {city}, country: {country}): {str(e)}")
             return []
     
-    def get_companies_by_industry(self, industry: str, limit: int = 50) -> List[CanonicalCompany]:
+    async def get_companies_by_industry(self, industry: str, limit: int = 50, columns: Optional[Sequence[str]] = None) -> List[CanonicalCompany]:
         """
         Get companies by industry.
         
         Args:
             industry: Industry name to filter by
             limit: Maximum number of results
+            columns: Columns to select (all columns if omitted)
             
         Returns:
             List of CanonicalCompany instances
         """
         try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
             # PostgreSQL array contains query
-            result = self.client.table(self.table_name).select("*").contains(
+            result = await self.supabase_client.client.table(self.table_name).select(self._select_list(columns)).contains(
                 "industries", [industry]
             ).limit(limit).execute()
             
@@ -383,7 +564,7 @@ class CompanyRepository:
             logger.error(f"Failed to get companies by industry '{industry}': {str(e)}")
             return []
     
-    def delete(self, company_id: Union[str, uuid.UUID]) -> bool:
+    async def delete(self, company_id: Union[str, uuid.UUID]) -> bool:
         """
         Delete a company record.
         
@@ -394,7 +575,10 @@ class CompanyRepository:
             True if deleted successfully, False otherwise
         """
         try:
-            result = self.client.table(self.table_name).delete().eq("id", str(company_id)).execute()
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.table(self.table_name).delete().eq("id", str(company_id)).execute()
             
             if result.data:
                 logger.info(f"Deleted company record: {company_id}")
@@ -516,10 +700,13 @@ class CompanyRepository:
             logger.debug(f"Problematic data: {model_data}")
             raise
     
-    def _get_companies_by_size_fallback(self, category: str, limit: int) -> List[Dict[str, Any]]:
+    async def _get_companies_by_size_fallback(self, category: str, limit: int) -> List[Dict[str, Any]]:
         """Fallback implementation for size category filtering."""
         try:
-            query = self.client.table(self.table_name).select("id, company_name, employee_count")
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            query = self.supabase_client.client.table(self.table_name).select("id, company_name, employee_count")
             
             # Apply size filters
             if category == "startup":
@@ -535,7 +722,7 @@ class CompanyRepository:
             elif category == "unknown":
                 query = query.is_("employee_count", "null")
             
-            result = query.limit(limit).execute()
+            result = await query.limit(limit).execute()
             
             # Add size_category to results
             for row in result.data:
@@ -559,13 +746,16 @@ class CompanyRepository:
             logger.error(f"Fallback size category query failed: {str(e)}")
             return []
     
-    def _get_startup_companies_fallback(self, limit: int) -> List[Dict[str, Any]]:
+    async def _get_startup_companies_fallback(self, limit: int) -> List[Dict[str, Any]]:
         """Fallback implementation for startup filtering."""
         try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
             current_year = datetime.now().year
             
             # Get companies with startup characteristics
-            result = self.client.table(self.table_name).select(
+            result = await self.supabase_client.client.table(self.table_name).select(
                 "id, company_name, employee_count, year_founded, funding_info, domain"
             ).or_(
                 f"employee_count.lt.200,and(employee_count.lt.50,year_founded.gt.{current_year - 7})"
@@ -623,19 +813,8 @@ class CompanyRepository:
         """
         try:
             # Create the relationship record
-            relationship_data = {
-                "profile_id": profile_id,
-                "company_id": company_id,
-                "job_title": work_experience.get("position_title"),
-                "start_date": work_experience.get("start_date"),
-                "end_date": work_experience.get("end_date"),
-                "is_current_role": work_experience.get("is_current", False),
-                "description": work_experience.get("description"),
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Remove None values
-            relationship_data = {k: v for k, v in relationship_data.items() if v is not None}
+            relationship_data = self._relationship_to_db_format(profile_id, company_id, work_experience)
+            relationship_data["created_at"] = datetime.now(timezone.utc).isoformat()
             
             # Ensure async client is available
             await self.supabase_client._ensure_client()
@@ -653,7 +832,77 @@ class CompanyRepository:
             logger.error(f"Failed to link profile {profile_id} to company {company_id}: {str(e)}")
             raise
     
-    def unlink_from_profile(self, profile_id: str, company_id: str) -> bool:
+    async def link_many_to_profile(self, profile_id: str, links: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Link a profile to many companies in one upsert request.
+        
+        Existing links for the same (profile_id, company_id) are updated in place,
+        so re-ingesting a profile refreshes its work experience instead of failing.
+        
+        Args:
+            profile_id: UUID of the profile
+            links: (company UUID, work experience dict) pairs
+            
+        Returns:
+            List of relationship records
+            
+        Raises:
+            Exception: If database operation fails
+        """
+        # One row per company; the first experience listed for a company wins
+        rows_by_company: Dict[str, Dict[str, Any]] = {}
+        for company_id, work_experience in links:
+            if company_id not in rows_by_company:
+                rows_by_company[company_id] = self._relationship_to_db_format(profile_id, company_id, work_experience)
+        
+        if not rows_by_company:
+            return []
+        
+        try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            # Missing columns use their defaults (created_at) rather than NULL
+            result = await self.supabase_client.client.table("profile_companies").upsert(
+                list(rows_by_company.values()),
+                on_conflict="profile_id,company_id",
+                default_to_null=False
+            ).execute()
+            
+            logger.info(f"Linked profile {profile_id} to {len(rows_by_company)} companies")
+            return result.data or []
+            
+        except Exception as e:
+            logger.error(f"Failed to link profile {profile_id} to {len(rows_by_company)} companies: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _relationship_to_db_format(profile_id: str, company_id: str, work_experience: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert work experience details to a profile_companies row.
+        
+        Args:
+            profile_id: UUID of the profile
+            company_id: UUID of the company
+            work_experience: Dict containing work experience details
+            
+        Returns:
+            Dictionary formatted for the profile_companies table
+        """
+        relationship_data = {
+            "profile_id": profile_id,
+            "company_id": company_id,
+            "job_title": work_experience.get("position_title"),
+            "start_date": work_experience.get("start_date"),
+            "end_date": work_experience.get("end_date"),
+            "is_current_role": work_experience.get("is_current", False),
+            "description": work_experience.get("description")
+        }
+        
+        # Remove None values
+        return {k: v for k, v in relationship_data.items() if v is not None}
+    
+    async def unlink_from_profile(self, profile_id: str, company_id: str) -> bool:
         """
         Unlink a profile from a company.
         
@@ -665,7 +914,10 @@ class CompanyRepository:
             True if unlinking was successful, False otherwise
         """
         try:
-            result = self.client.table("profile_companies").delete().eq(
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.table("profile_companies").delete().eq(
                 "profile_id", profile_id
             ).eq(
                 "company_id", company_id
@@ -682,7 +934,66 @@ class CompanyRepository:
             logger.error(f"Failed to unlink profile {profile_id} from company {company_id}: {str(e)}")
             return False
     
-    def get_companies_for_profile(self, profile_id: str) -> List[CanonicalCompany]:
+    async def unlink_many_from_profile(self, profile_id: str, company_ids: List[str]) -> int:
+        """
+        Unlink a profile from many companies in one request.
+        
+        Args:
+            profile_id: UUID of the profile
+            company_ids: UUIDs of the companies
+            
+        Returns:
+            Number of relationships removed
+            
+        Raises:
+            Exception: If database operation fails
+        """
+        if not company_ids:
+            return 0
+        
+        try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.table("profile_companies").delete().eq(
+                "profile_id", profile_id
+            ).in_(
+                "company_id", list(company_ids)
+            ).execute()
+            
+            removed = len(result.data or [])
+            logger.info(f"Unlinked profile {profile_id} from {removed} companies")
+            return removed
+            
+        except Exception as e:
+            logger.error(f"Failed to unlink profile {profile_id} from {len(company_ids)} companies: {str(e)}")
+            raise
+    
+    async def get_profile_links(self, profile_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a profile's profile_companies rows.
+        
+        Args:
+            profile_id: UUID of the profile
+            
+        Returns:
+            Relationship rows (company_id and work experience columns)
+            
+        Raises:
+            Exception: If database operation fails
+        """
+        # Ensure async client is available
+        await self.supabase_client._ensure_client()
+        
+        result = await self.supabase_client.client.table("profile_companies").select(
+            "company_id,job_title,start_date,end_date,is_current_role,description"
+        ).eq(
+            "profile_id", profile_id
+        ).execute()
+        
+        return result.data or []
+    
+    async def get_companies_for_profile(self, profile_id: str) -> List[CanonicalCompany]:
         """
         Get all companies associated with a profile.
         
@@ -693,8 +1004,11 @@ class CompanyRepository:
             List of CanonicalCompany instances
         """
         try:
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
             # Join profile_companies and companies tables
-            result = self.client.table("profile_companies").select(
+            result = await self.supabase_client.client.table("profile_companies").select(
                 "companies(*)"
             ).eq(
                 "profile_id", profile_id
@@ -739,7 +1053,7 @@ class CompanyRepository:
             logger.error(f"Failed to get profiles for company {company_id}: {str(e)}")
             return []
     
-    def get_profile_count_for_company(self, company_id: str) -> int:
+    async def get_profile_count_for_company(self, company_id: str) -> int:
         """
         Get the count of profiles associated with a company.
         
@@ -750,7 +1064,10 @@ class CompanyRepository:
             Number of profiles linked to the company
         """
         try:
-            result = self.client.table("profile_companies").select(
+            # Ensure async client is available
+            await self.supabase_client._ensure_client()
+            
+            result = await self.supabase_client.client.table("profile_companies").select(
                 "id", count="exact"
             ).eq(
                 "company_id", company_id
@@ -0,0 +1,375 @@
+"""
+Asynchronous batch ingestion
+
+A batch is recorded in ingestion_batches with one ingestion_batch_items row per
+requested profile and processed in the background by BatchIngestionRunner.
+Each item's outcome is written as soon as it finishes and published to
+in-process subscribers, which back the batch's Server-Sent Events stream.
+Clients poll the stored batch, so progress survives the request that
+submitted it and is visible from every worker.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from app.database.supabase_client import SupabaseClient
+
+
+# Batch statuses after which no further progress is made
+TERMINAL_BATCH_STATUSES = ("completed", "failed")
+
+ITEM_COLUMNS = "id,position,linkedin_url,status,profile_id,result,error_message,started_at,completed_at"
+
+# Ingests one item's stored request and returns (profile id, result summary)
+IngestProfile = Callable[[Dict[str, Any]], Awaitable[Tuple[str, Dict[str, Any]]]]
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class BatchIngestionService(LoggerMixin):
+    """Persistence for ingestion batches and their items"""
+
+    def __init__(self, supabase_client: Optional[SupabaseClient] = None):
+        """
+        Initialize batch ingestion service
+
+        Args:
+            supabase_client: Shared SupabaseClient (a new one is created if omitted)
+        """
+        self.supabase_client = supabase_client or SupabaseClient()
+        # For testing purposes, allow client override
+        self.client = None
+        self._client_initialized = False
+
+    async def _ensure_client(self):
+        """Ensure Supabase client is initialized"""
+        if not self._client_initialized:
+            if self.client is None:  # Use real client if not overridden for testing
+                await self.supabase_client._ensure_client()
+                self.client = self.supabase_client.client
+            self._client_initialized = True
+
+    async def create_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrent: int
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Record a queued batch and one pending item per profile request
+
+        Args:
+            requests: JSON-serializable profile create requests, in submission order
+            max_concurrent: Maximum profiles processed at once
+
+        Returns:
+            Tuple of (batch row, item rows)
+        """
+        await self._ensure_client()
+
+        batch_id = str(uuid.uuid4())
+        batch_data = {
+            "id": batch_id,
+            "status": "queued",
+            "total_requested": len(requests),
+            "max_concurrent": max_concurrent,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        items_data = [
+            {
+                "id": str(uuid.uuid4()),
+                "batch_id": batch_id,
+                "position": position,
+                "linkedin_url": str(request["linkedin_url"]),
+                "request": request,
+                "status": "pending",
+            }
+            for position, request in enumerate(requests)
+        ]
+
+        batch_result = await self.client.table("ingestion_batches").insert(batch_data).execute()
+        if not batch_result.data:
+            raise Exception("Failed to create ingestion batch - no data returned")
+        items_result = await self.client.table("ingestion_batch_items").insert(items_data).execute()
+
+        self.logger.info("Ingestion batch created", batch_id=batch_id, total_requested=len(requests))
+        return batch_result.data[0], items_result.data or items_data
+
+    async def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a batch by ID
+
+        Returns:
+            Batch row or None if not found
+        """
+        await self._ensure_client()
+        result = await self.client.table("ingestion_batches").select("*").eq("id", batch_id).execute()
+        return result.data[0] if result.data else None
+
+    async def get_items(self, batch_id: str, finished_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Retrieve a batch's items in submission order
+
+        Args:
+            batch_id: Batch identifier
+            finished_only: Only items that completed or failed
+
+        Returns:
+            Item rows without their stored requests
+        """
+        await self._ensure_client()
+        query = self.client.table("ingestion_batch_items").select(ITEM_COLUMNS).eq("batch_id", batch_id)
+        if finished_only:
+            query = query.in_("status", ["completed", "failed"])
+        result = await query.order("position").execute()
+        return result.data or []
+
+    async def mark_batch_running(self, batch_id: str) -> None:
+        """Move a queued batch to running"""
+        await self._ensure_client()
+        now = datetime.now(timezone.utc).isoformat()
+        await self.client.table("ingestion_batches").update(
+            {"status": "running", "started_at": now, "updated_at": now}
+        ).eq("id", batch_id).eq("status", "queued").execute()
+
+    async def mark_batch_failed(self, batch_id: str, error_message: str) -> Optional[Dict[str, Any]]:
+        """
+        Fail a batch that stopped before all of its items finished
+
+        Returns:
+            Updated batch row, or None if the batch had already finished
+        """
+        await self._ensure_client()
+        now = datetime.now(timezone.utc).isoformat()
+        result = await self.client.table("ingestion_batches").update(
+            {"status": "failed", "error_message": error_message, "completed_at": now, "updated_at": now}
+        ).eq("id", batch_id).in_("status", ["queued", "running"]).execute()
+        return result.data[0] if result.data else None
+
+    async def mark_item_processing(self, item_id: str) -> None:
+        """Record that an item's ingestion has started"""
+        await self._ensure_client()
+        await self.client.table("ingestion_batch_items").update(
+            {"status": "processing", "started_at": datetime.now(timezone.utc).isoformat()}
+        ).eq("id", item_id).execute()
+
+    async def record_item_result(
+        self,
+        item_id: str,
+        profile_id: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error_message: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Persist one item's outcome and update the batch counters atomically
+
+        An error_message marks the item failed, otherwise it completed.
+
+        Returns:
+            Updated batch row
+        """
+        await self._ensure_client()
+        response = await self.client.rpc("complete_ingestion_batch_item", {
+            "p_item_id": item_id,
+            "p_status": "failed" if error_message is not None else "completed",
+            "p_profile_id": profile_id,
+            "p_result": result,
+            "p_error_message": error_message,
+        }).execute()
+        data = response.data
+        if isinstance(data, list):
+            return data[0] if data else None
+        return data
+
+
+class BatchProgressBroker:
+    """Fans batch progress events out to the in-process event streams"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, batch_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(batch_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, batch_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(batch_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[batch_id]
+
+    def publish(self, batch_id: str, event: str, data: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(batch_id, ()):
+            queue.put_nowait((event, data))
+
+
+class BatchIngestionRunner(LoggerMixin):
+    """Processes submitted batches in background tasks and streams their progress"""
+
+    def __init__(self, batch_service: BatchIngestionService, broker: Optional[BatchProgressBroker] = None):
+        self.batch_service = batch_service
+        self.broker = broker or BatchProgressBroker()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def running_batches(self) -> int:
+        return len(self._tasks)
+
+    def start(self, batch: Dict[str, Any], items: List[Dict[str, Any]], ingest: IngestProfile) -> asyncio.Task:
+        """
+        Start processing a created batch in the background
+
+        Args:
+            batch: Batch row from BatchIngestionService.create_batch
+            items: Its item rows, including the stored requests
+            ingest: Coroutine function that ingests one stored request
+        """
+        batch_id = batch["id"]
+        task = asyncio.create_task(self._run(batch, items, ingest), name=f"ingestion-batch-{batch_id}")
+        self._tasks[batch_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(batch_id, None))
+        return task
+
+    async def close(self) -> None:
+        """Cancel unfinished batches; they are marked failed"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, batch: Dict[str, Any], items: List[Dict[str, Any]], ingest: IngestProfile) -> None:
+        batch_id = batch["id"]
+        semaphore = asyncio.Semaphore(batch.get("max_concurrent") or 1)
+        self.logger.info("Ingestion batch started", batch_id=batch_id, total_requested=len(items))
+        try:
+            await self.batch_service.mark_batch_running(batch_id)
+            recorded = await asyncio.gather(
+                *(self._process_item(batch_id, item, ingest, semaphore) for item in items)
+            )
+        except asyncio.CancelledError:
+            await self._fail_batch(batch_id, "Batch processing was interrupted by a service shutdown")
+            raise
+        except Exception as e:
+            self.logger.error("Ingestion batch failed", batch_id=batch_id, error=str(e))
+            await self._fail_batch(batch_id, f"Batch processing failed: {str(e)}")
+            return
+
+        unrecorded = recorded.count(False)
+        if unrecorded:
+            # The counters can't reach the total, so the batch would never complete
+            await self._fail_batch(batch_id, f"Failed to record the results of {unrecorded} profiles")
+        self.logger.info("Ingestion batch finished", batch_id=batch_id, unrecorded=unrecorded)
+
+    async def _process_item(
+        self,
+        batch_id: str,
+        item: Dict[str, Any],
+        ingest: IngestProfile,
+        semaphore: asyncio.Semaphore
+    ) -> bool:
+        """Ingest one item and persist its outcome; returns whether the outcome was recorded"""
+        async with semaphore:
+            try:
+                await self.batch_service.mark_item_processing(item["id"])
+            except Exception as e:
+                # Only the in-progress status is lost; the result is still recorded below
+                self.logger.warning("Failed to mark batch item processing", batch_id=batch_id, item_id=item["id"], error=str(e))
+            profile_id, result, error_message = None, None, None
+            try:
+                profile_id, result = await ingest(item["request"])
+            except Exception as e:
+                error_message = str(e) or type(e).__name__
+
+            try:
+                updated_batch = await self.batch_service.record_item_result(
+                    item["id"], profile_id=profile_id, result=result, error_message=error_message
+                )
+            except Exception as e:
+                self.logger.error("Failed to record batch item result", batch_id=batch_id, item_id=item["id"], error=str(e))
+                return False
+
+        self.broker.publish(batch_id, "item", {
+            "id": item["id"],
+            "position": item["position"],
+            "linkedin_url": item["linkedin_url"],
+            "status": "failed" if error_message is not None else "completed",
+            "profile_id": profile_id,
+            "result": result,
+            "error_message": error_message,
+        })
+        if updated_batch:
+            self.broker.publish(batch_id, "progress", updated_batch)
+        return True
+
+    async def _fail_batch(self, batch_id: str, error_message: str) -> None:
+        try:
+            failed_batch = await self.batch_service.mark_batch_failed(batch_id, error_message)
+        except Exception as e:
+            self.logger.error("Failed to mark ingestion batch failed", batch_id=batch_id, error=str(e))
+            return
+        if failed_batch:
+            self.broker.publish(batch_id, "progress", failed_batch)
+
+    async def events(self, batch: Dict[str, Any], keepalive_seconds: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Server-Sent Events for a batch, from its current state until it finishes
+
+        Emits an 'item' event per finished profile (already finished ones first),
+        'progress' events with the batch counters and a final 'complete' event.
+        Batches processed by another worker publish nothing here, so idle
+        streams re-read the stored progress at every keep-alive.
+
+        Args:
+            batch: Batch row the stream starts from
+            keepalive_seconds: Idle interval between keep-alives
+        """
+        batch_id = batch["id"]
+        keepalive_seconds = keepalive_seconds or settings.BATCH_EVENTS_KEEPALIVE_SECONDS
+        sent_items: Set[str] = set()
+        # Subscribe before the snapshot so nothing finishing in between is lost
+        queue = self.broker.subscribe(batch_id)
+        try:
+            async def unsent_items():
+                for item in await self.batch_service.get_items(batch_id, finished_only=True):
+                    if item["id"] not in sent_items:
+                        sent_items.add(item["id"])
+                        yield format_sse("item", item)
+
+            async for message in unsent_items():
+                yield message
+            yield format_sse("progress", batch)
+
+            while batch["status"] not in TERMINAL_BATCH_STATUSES:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    batch = await self.batch_service.get_batch(batch_id) or batch
+                    async for message in unsent_items():
+                        yield message
+                    continue
+
+                if event == "item":
+                    if data["id"] in sent_items:
+                        continue
+                    sent_items.add(data["id"])
+                else:
+                    batch = data
+                yield format_sse(event, data)
+
+            # A batch that finished elsewhere may still have unsent items
+            async for message in unsent_items():
+                yield message
+            yield format_sse("complete", batch)
+        finally:
+            self.broker.unsubscribe(batch_id, queue)
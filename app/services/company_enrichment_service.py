@@ -0,0 +1,221 @@
+"""
+Deferred company enrichment
+
+With defer_companies a profile is stored and returned right after its own
+Cassidy fetch. Fetching, upserting, embedding and linking its companies is
+then queued on CompanyEnrichmentQueue and runs in the background. Progress is
+recorded in profile_enrichments (one row per profile), so clients can poll
+for completion from any worker.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from app.database.supabase_client import SupabaseClient
+
+
+# Enrichment statuses after which no further progress is made
+TERMINAL_ENRICHMENT_STATUSES = ("completed", "failed")
+
+# Runs one profile's company enrichment and returns its summary
+# ({"companies": [...], "companies_linked": int, "errors": [...]})
+EnrichCompanies = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class CompanyEnrichmentService(LoggerMixin):
+    """Persistence for deferred company enrichment status"""
+
+    def __init__(self, supabase_client: Optional[SupabaseClient] = None):
+        """
+        Initialize company enrichment service
+
+        Args:
+            supabase_client: Shared SupabaseClient (a new one is created if omitted)
+        """
+        self.supabase_client = supabase_client or SupabaseClient()
+        # For testing purposes, allow client override
+        self.client = None
+        self._client_initialized = False
+
+    async def _ensure_client(self):
+        """Ensure Supabase client is initialized"""
+        if not self._client_initialized:
+            if self.client is None:  # Use real client if not overridden for testing
+                await self.supabase_client._ensure_client()
+                self.client = self.supabase_client.client
+            self._client_initialized = True
+
+    async def create_enrichment(self, profile_id: str, pipeline_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record a pending enrichment for a stored profile, replacing any earlier one
+
+        Returns:
+            Enrichment row
+        """
+        await self._ensure_client()
+        now = datetime.now(timezone.utc).isoformat()
+        enrichment_data = {
+            "profile_id": profile_id,
+            "pipeline_id": pipeline_id,
+            "status": "pending",
+            "companies": [],
+            "companies_linked": 0,
+            "error_message": None,
+            "created_at": now,
+            "started_at": None,
+            "completed_at": None,
+            "updated_at": now,
+        }
+        result = await self.client.table("profile_enrichments").upsert(
+            enrichment_data, on_conflict="profile_id"
+        ).execute()
+        return result.data[0] if result.data else enrichment_data
+
+    async def get_enrichment(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a profile's enrichment status
+
+        Returns:
+            Enrichment row or None if the profile's companies were never deferred
+        """
+        await self._ensure_client()
+        result = await self.client.table("profile_enrichments").select("*").eq("profile_id", profile_id).execute()
+        return result.data[0] if result.data else None
+
+    async def mark_processing(self, profile_id: str) -> None:
+        """Record that a profile's enrichment has started"""
+        await self._ensure_client()
+        now = datetime.now(timezone.utc).isoformat()
+        await self.client.table("profile_enrichments").update(
+            {"status": "processing", "started_at": now, "updated_at": now}
+        ).eq("profile_id", profile_id).execute()
+
+    async def record_result(
+        self,
+        profile_id: str,
+        summary: Optional[Dict[str, Any]] = None,
+        error_message: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Persist an enrichment's outcome
+
+        An error_message marks the enrichment failed, otherwise it completed.
+        Companies processed before a failure are still recorded.
+
+        Returns:
+            Updated enrichment row
+        """
+        await self._ensure_client()
+        summary = summary or {}
+        now = datetime.now(timezone.utc).isoformat()
+        result = await self.client.table("profile_enrichments").update({
+            "status": "failed" if error_message is not None else "completed",
+            "companies": summary.get("companies", []),
+            "companies_linked": summary.get("companies_linked", 0),
+            "error_message": error_message,
+            "completed_at": now,
+            "updated_at": now,
+        }).eq("profile_id", profile_id).in_("status", ["pending", "processing"]).execute()
+        return result.data[0] if result.data else None
+
+
+class CompanyEnrichmentQueue(LoggerMixin):
+    """Runs deferred company enrichments in background tasks, a bounded number at a time"""
+
+    def __init__(self, enrichment_service: CompanyEnrichmentService, max_concurrent: Optional[int] = None):
+        self.enrichment_service = enrichment_service
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent or settings.COMPANY_ENRICHMENT_MAX_CONCURRENT))
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_reasons: Dict[str, str] = {}
+
+    @property
+    def pending_enrichments(self) -> int:
+        return len(self._tasks)
+
+    async def submit(self, profile_id: str, enrich: EnrichCompanies, pipeline_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record a pending enrichment and queue it
+
+        Args:
+            profile_id: Stored profile whose companies are enriched
+            enrich: Coroutine function that runs the enrichment
+            pipeline_id: Pipeline run that stored the profile
+
+        Returns:
+            The pending enrichment row
+        """
+        try:
+            enrichment = await self.enrichment_service.create_enrichment(profile_id, pipeline_id)
+        except Exception as e:
+            # The companies are still enriched; only the status can't be polled
+            self.logger.error("Failed to record company enrichment", profile_id=profile_id, error=str(e))
+            enrichment = {"profile_id": profile_id, "pipeline_id": pipeline_id, "status": "pending"}
+
+        task = asyncio.create_task(self._run(profile_id, enrich), name=f"company-enrichment-{profile_id}")
+        self._tasks[profile_id] = task
+        task.add_done_callback(lambda finished: self._forget(profile_id, finished))
+        return enrichment
+
+    async def wait(self, profile_id: str, timeout: float) -> None:
+        """Wait up to timeout seconds for an enrichment running in this process to finish"""
+        task = self._tasks.get(profile_id)
+        if task is None or timeout <= 0:
+            return
+        await asyncio.wait({task}, timeout=timeout)
+
+    async def cancel(self, profile_id: str) -> None:
+        """Cancel a profile's enrichment running in this process and wait for it to stop"""
+        task = self._tasks.get(profile_id)
+        if task is None:
+            return
+        self._cancel_reasons[profile_id] = "Company enrichment was cancelled because the profile was deleted"
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # Not consumed if the enrichment was still waiting for a slot
+        self._cancel_reasons.pop(profile_id, None)
+
+    async def close(self) -> None:
+        """Cancel unfinished enrichments; they are marked failed"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, profile_id: str, finished: asyncio.Task) -> None:
+        # A later submit for the same profile may already have replaced this task
+        if self._tasks.get(profile_id) is finished:
+            del self._tasks[profile_id]
+
+    async def _run(self, profile_id: str, enrich: EnrichCompanies) -> None:
+        async with self._semaphore:
+            summary, error_message = None, None
+            try:
+                await self.enrichment_service.mark_processing(profile_id)
+                summary = await enrich()
+                if summary.get("errors"):
+                    error_message = "; ".join(error["error"] for error in summary["errors"])
+            except asyncio.CancelledError:
+                reason = self._cancel_reasons.pop(profile_id, "Company enrichment was interrupted by a service shutdown")
+                await self._record(profile_id, summary, reason)
+                raise
+            except Exception as e:
+                self.logger.error("Company enrichment failed", profile_id=profile_id, error=str(e))
+                error_message = f"Company enrichment failed: {str(e) or type(e).__name__}"
+
+            await self._record(profile_id, summary, error_message)
+
+        self.logger.info(
+            "Company enrichment finished",
+            profile_id=profile_id,
+            companies=len((summary or {}).get("companies", [])),
+            failed=error_message is not None
+        )
+
+    async def _record(self, profile_id: str, summary: Optional[Dict[str, Any]], error_message: Optional[str]) -> None:
+        try:
+            await self.enrichment_service.record_result(profile_id, summary=summary, error_message=error_message)
+        except Exception as e:
+            self.logger.error("Failed to record company enrichment result", profile_id=profile_id, error=str(e))
@@ -10,14 +10,16 @@ Handles business logic for company operations including:
 """
 
 import re
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
 from urllib.parse import urlparse, parse_qs
 from difflib import SequenceMatcher
 import uuid
 
 from app.models.canonical.company import CanonicalCompany
 from app.repositories.company_repository import CompanyRepository
+from app.services.profile_diff import diff_profile_links
 
 
 logger = logging.getLogger(__name__)
@@ -159,6 +161,163 @@ class CompanyService:
         """
         Process multiple companies efficiently with error resilience.
         
+        Resolves every LinkedIn ID in one query, runs name similarity matching
+        only for the companies left over, and writes all creates and updates in
+        one upsert. If the bulk path fails the companies are processed one at a
+        time so a single bad record cannot fail the whole batch.
+        
+        Args:
+            companies: List of CanonicalCompany instances to process
+            
+        Returns:
+            List of results with success status and data/error information
+        """
+        if not companies:
+            return []
+        
+        try:
+            results = await self._bulk_process_companies(companies)
+        except Exception as e:
+            logger.warning(f"Bulk company processing failed, processing {len(companies)} companies individually: {str(e)}")
+            return await self._process_companies_individually(companies)
+        
+        successful = len([r for r in results if r["success"]])
+        logger.info(f"Batch processing complete: {successful}/{len(companies)} successful")
+        
+        return results
+
+    async def _bulk_process_companies(self, companies: List[CanonicalCompany]) -> List[Dict[str, Any]]:
+        """
+        Deduplicate and write a batch of companies with one lookup and one upsert.
+        
+        Args:
+            companies: List of CanonicalCompany instances to process
+            
+        Returns:
+            List of results in input order
+            
+        Raises:
+            Exception: If the LinkedIn ID lookup or the upsert fails
+        """
+        existing_by_linkedin_id = await self.company_repo.get_by_linkedin_ids(
+            [company.company_id for company in companies if company.company_id]
+        )
+        
+        # Name similarity searches only for companies the LinkedIn ID lookup did not resolve
+        leftover_names = list(dict.fromkeys(
+            company.company_name for company in companies
+            if company.company_id not in existing_by_linkedin_id
+        ))
+        candidates = await asyncio.gather(*(self.company_repo.search_by_name(name) for name in leftover_names))
+        name_matches = {
+            name: self._find_best_name_match(name, found)
+            for name, found in zip(leftover_names, candidates)
+        }
+        
+        # Plan one write per database record; duplicates within the batch merge into it
+        planned: Dict[str, Dict[str, Any]] = {}
+        targets: List[str] = []
+        actions: List[str] = []
+        for company in companies:
+            existing = existing_by_linkedin_id.get(company.company_id) if company.company_id else None
+            if existing is None:
+                existing = name_matches.get(company.company_name)
+            
+            if existing is not None:
+                key = str(existing.id)
+                if key not in planned:
+                    planned[key] = {"id": key, "company": existing}
+                action = "updated"
+            else:
+                key = self._find_planned_create(company, planned)
+                if key is None:
+                    key = f"new:{len(planned)}"
+                    planned[key] = {"id": None, "company": company}
+                    action = "created"
+                else:
+                    action = "updated"
+            
+            if planned[key]["company"] is not company:
+                planned[key]["company"] = self._merge_company_data(planned[key]["company"], company)
+            targets.append(key)
+            actions.append(action)
+        
+        plan = list(planned.values())
+        records = await self.company_repo.bulk_upsert([(entry["id"], entry["company"]) for entry in plan])
+        records_by_key = dict(zip(planned.keys(), records))
+        
+        results = []
+        for company, key, action in zip(companies, targets, actions):
+            record = records_by_key[key]
+            results.append({
+                "success": True,
+                "action": action,
+                "company_id": record["id"],
+                "company_name": company.company_name,
+                "data": record
+            })
+        
+        logger.info(f"Bulk processed {len(companies)} companies as {len(plan)} records "
+                   f"({len(existing_by_linkedin_id)} matched by LinkedIn ID, "
+                   f"{sum(1 for match in name_matches.values() if match)} by name)")
+        return results
+
+    def _find_planned_create(self, company: CanonicalCompany, planned: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        """
+        Find a new company earlier in the same batch that this company duplicates.
+        
+        Args:
+            company: Company to check
+            planned: Planned writes keyed by database ID or placeholder
+            
+        Returns:
+            Key of the matching planned create, or None
+        """
+        best_key = None
+        best_similarity = 0.0
+        for key, entry in planned.items():
+            if entry["id"] is not None:
+                continue
+            other = entry["company"]
+            if company.company_id and other.company_id:
+                if company.company_id == other.company_id:
+                    return key
+                continue
+            similarity = self._calculate_name_similarity(company.company_name, other.company_name)
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_key = key
+        return best_key if best_similarity >= self.similarity_threshold else None
+
+    def _find_best_name_match(self, company_name: str, candidates: List[CanonicalCompany]) -> Optional[CanonicalCompany]:
+        """
+        Pick the most similar existing company above the similarity threshold.
+        
+        Args:
+            company_name: Name of the incoming company
+            candidates: Existing companies returned by a name search
+            
+        Returns:
+            Best matching CanonicalCompany or None
+        """
+        best_match = None
+        best_similarity = 0.0
+        for candidate in candidates or []:
+            similarity = self._calculate_name_similarity(company_name, candidate.company_name)
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_match = candidate
+        
+        if best_match and best_similarity >= self.similarity_threshold:
+            logger.info(f"Found similar company: {best_match.company_name} "
+                       f"(similarity: {best_similarity:.2f})")
+            return best_match
+        return None
+
+    async def _process_companies_individually(self, companies: List[CanonicalCompany]) -> List[Dict[str, Any]]:
+        """
+        Process companies one at a time, isolating failures per company.
+        
         Args:
             companies: List of CanonicalCompany instances to process
             
@@ -254,7 +413,34 @@ class CompanyService:
             logger.error(f"Failed to link profile {profile_id} to company {company_id}: {str(e)}")
             raise
 
-    def unlink_profile_from_company(self, profile_id: str, company_id: str) -> None:
+    async def link_profile_to_companies(self, profile_id: str, links: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Link a profile to many companies in one request.
+        
+        Args:
+            profile_id: UUID of the profile
+            links: (company UUID, work experience dict) pairs
+            
+        Returns:
+            List of relationship records
+        """
+        try:
+            # Validate work experience data
+            for company_id, work_experience in links:
+                if "position_title" not in work_experience:
+                    raise ValueError(f"Missing required field: position_title (company {company_id})")
+            
+            results = await self.company_repo.link_many_to_profile(profile_id, links)
+            
+            logger.info(f"Linked profile {profile_id} to {len(results)} companies")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Failed to link profile {profile_id} to {len(links)} companies: {str(e)}")
+            raise
+
+    async def unlink_profile_from_company(self, profile_id: str, company_id: str) -> None:
         """
         Unlink a profile from a company.
         
@@ -263,14 +449,85 @@ class CompanyService:
             company_id: UUID of the company
         """
         try:
-            self.company_repo.unlink_from_profile(profile_id, company_id)
+            await self.company_repo.unlink_from_profile(profile_id, company_id)
             logger.info(f"Unlinked profile {profile_id} from company {company_id}")
             
         except Exception as e:
             logger.error(f"Failed to unlink profile {profile_id} from company {company_id}: {str(e)}")
             raise
 
-    def get_companies_for_profile(self, profile_id: str) -> List[CanonicalCompany]:
+    async def unlink_profile_from_companies(self, profile_id: str, company_ids: List[str]) -> int:
+        """
+        Unlink a profile from many companies in one request.
+        
+        Args:
+            profile_id: UUID of the profile
+            company_ids: UUIDs of the companies
+            
+        Returns:
+            Number of relationships removed
+        """
+        try:
+            return await self.company_repo.unlink_many_from_profile(profile_id, company_ids)
+            
+        except Exception as e:
+            logger.error(f"Failed to unlink profile {profile_id} from {len(company_ids)} companies: {str(e)}")
+            raise
+
+    async def sync_profile_links(
+        self,
+        profile_id: str,
+        links: List[Tuple[str, Dict[str, Any]]],
+        remove_stale: bool = True
+    ) -> Dict[str, List[str]]:
+        """
+        Make a profile's company links match the given links, writing only the differences.
+        
+        Args:
+            profile_id: UUID of the profile
+            links: (company UUID, work experience dict) pairs; the first experience per company wins
+            remove_stale: Whether to remove links to companies that are not in links
+            
+        Returns:
+            Company UUIDs of the links "added", "updated" and "removed"
+        """
+        desired: Dict[str, Dict[str, Any]] = {}
+        for company_id, work_experience in links:
+            if company_id not in desired:
+                desired[company_id] = CompanyRepository._relationship_to_db_format(profile_id, company_id, work_experience)
+        
+        stored_links = await self.company_repo.get_profile_links(profile_id)
+        added, updated, removed = diff_profile_links(stored_links, desired)
+        if not remove_stale:
+            removed = []
+        
+        changed = added + updated
+        if changed:
+            await self.company_repo.link_many_to_profile(
+                profile_id, [(company_id, work_experience) for company_id, work_experience in links if company_id in changed]
+            )
+        if removed:
+            await self.company_repo.unlink_many_from_profile(profile_id, removed)
+        
+        logger.info(
+            f"Synced profile {profile_id} company links: "
+            f"{len(added)} added, {len(updated)} updated, {len(removed)} removed"
+        )
+        return {"added": added, "updated": updated, "removed": removed}
+
+    async def get_profile_links(self, profile_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a profile's company links with their work experience details.
+        
+        Args:
+            profile_id: UUID of the profile
+            
+        Returns:
+            profile_companies rows
+        """
+        return await self.company_repo.get_profile_links(profile_id)
+
+    async def get_companies_for_profile(self, profile_id: str) -> List[CanonicalCompany]:
         """
         Get all companies associated with a profile.
         
@@ -281,7 +538,7 @@ class CompanyService:
             List of CanonicalCompany instances
         """
         try:
-            companies = self.company_repo.get_companies_for_profile(profile_id)
+            companies = await self.company_repo.get_companies_for_profile(profile_id)
             logger.debug(f"Found {len(companies)} companies for profile {profile_id}")
             return companies
             
@@ -291,7 +548,8 @@ class CompanyService:
 
     # Private helper methods
 
-    def _extract_company_id_from_url(self, linkedin_url: str) -> Optional[str]:
+    @staticmethod
+    def _extract_company_id_from_url(linkedin_url: str) -> Optional[str]:
         """
         Extract company ID from LinkedIn URL.
         
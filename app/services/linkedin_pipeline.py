@@ -6,15 +6,22 @@ Orchestrates the entire flow from Cassidy API to database storage with vector em
 
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
+import time
 import uuid
 
 from app.core.logging import LoggerMixin
 from app.core.config import settings
+from app.core.metrics import PIPELINE_STAGE_SECONDS
 from app.cassidy.client import CassidyClient
+from app.cassidy.rate_limiter import get_cassidy_rate_limiter
+from app.cassidy.company_cache import get_company_fetch_cache
 from app.cassidy.models import LinkedInProfile, CompanyProfile
 from app.database import SupabaseClient, EmbeddingService
+from app.database.embedding_cache import embedding_cache_key
 from app.services.company_service import CompanyService
+from app.services.company_enrichment_service import CompanyEnrichmentQueue, CompanyEnrichmentService
+from app.services.profile_diff import diff_profile_columns
 from app.repositories.company_repository import CompanyRepository
 from app.models.canonical.company import CanonicalCompany
 
@@ -22,13 +29,38 @@ from app.models.canonical.company import CanonicalCompany
 class LinkedInDataPipeline(LoggerMixin):
     """Complete pipeline for LinkedIn data ingestion and storage"""
     
-    def __init__(self):
-        self.cassidy_client = CassidyClient()
-        self.db_client = SupabaseClient() if self._has_db_config() else None
-        self.embedding_service = EmbeddingService() if self._has_openai_config() else None
+    def __init__(
+        self,
+        cassidy_client: Optional[CassidyClient] = None,
+        db_client: Optional[SupabaseClient] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        company_service: Optional[CompanyService] = None,
+        enrichment_queue: Optional[CompanyEnrichmentQueue] = None
+    ):
+        """
+        Initialize pipeline, building any client that is not passed in
+        
+        Args:
+            cassidy_client: Shared CassidyClient
+            db_client: Shared SupabaseClient
+            embedding_service: Shared EmbeddingService
+            company_service: Shared CompanyService
+            enrichment_queue: Shared CompanyEnrichmentQueue for deferred company enrichment
+        """
+        self.cassidy_client = cassidy_client or CassidyClient()
+        self.rate_limiter = get_cassidy_rate_limiter()
+        self.company_cache = get_company_fetch_cache()
+        if db_client is None and self._has_db_config():
+            db_client = SupabaseClient()
+        self.db_client = db_client
+        if embedding_service is None and self._has_openai_config():
+            embedding_service = EmbeddingService()
+        self.embedding_service = embedding_service
         
         # Initialize company service for profile ingestion with company processing
-        if self.db_client:
+        if company_service is not None:
+            self.company_service = company_service
+        elif self.db_client:
             # Initialize company service immediately
             try:
                 company_repo = CompanyRepository(self.db_client)
@@ -39,6 +71,10 @@ class LinkedInDataPipeline(LoggerMixin):
         else:
             self.company_service = None
         
+        if enrichment_queue is None and self.db_client:
+            enrichment_queue = CompanyEnrichmentQueue(CompanyEnrichmentService(supabase_client=self.db_client))
+        self.enrichment_queue = enrichment_queue
+        
         self.logger.info(
             "LinkedIn pipeline initialized",
             has_database=self.db_client is not None,
@@ -74,7 +110,8 @@ class LinkedInDataPipeline(LoggerMixin):
         linkedin_url: str,
         store_in_db: bool = True,
         generate_embeddings: bool = True,
-        suggested_role: Optional[str] = None
+        suggested_role: Optional[str] = None,
+        defer_companies: bool = False
     ) -> Dict[str, Any]:
         """
         Complete unified profile ingestion pipeline with company processing
@@ -83,10 +120,209 @@ class LinkedInDataPipeline(LoggerMixin):
             linkedin_url: LinkedIn profile URL
             store_in_db: Whether to store in database
             generate_embeddings: Whether to generate vector embeddings
+            suggested_role: Optional suggested role to set on the stored profile
+            defer_companies: Store the profile first and enrich its companies in the
+                background (only when storing); result["enrichment"] holds the pending status
             
         Returns:
             Pipeline result with profile data and processed company information
         """
+        defer_companies = (
+            defer_companies and store_in_db and self.db_client is not None and self.enrichment_queue is not None
+        )
+        staged = await self._stage_profile(
+            linkedin_url, store_in_db, generate_embeddings, process_companies=not defer_companies
+        )
+        result = staged["result"]
+        
+        try:
+            # Step 3: Generate embeddings if enabled
+            if generate_embeddings and self.embedding_service:
+                self.logger.info("Generating embeddings", pipeline_id=result["pipeline_id"])
+                
+                # Profile and company texts go out in a single embeddings request
+                await self._embed_staged_profiles([staged])
+            
+            # Step 4: Store profile in database if enabled
+            if store_in_db and self.db_client:
+                await self._store_staged_profile(staged, suggested_role)
+                await self._store_company_embeddings([staged])
+            
+            self._complete_staged_profile(staged, store_in_db, generate_embeddings)
+            
+        except Exception as e:
+            self._fail_pipeline_result(result, e)
+            raise
+        
+        if defer_companies:
+            profile_id = result["storage_ids"]["profile"]
+            result["enrichment"] = await self.enrichment_queue.submit(
+                profile_id,
+                lambda: self._enrich_staged_profile(staged, profile_id, generate_embeddings),
+                pipeline_id=result["pipeline_id"]
+            )
+        
+        return result
+    
+    async def update_profile(
+        self,
+        linkedin_url: str,
+        stored_profile: Dict[str, Any],
+        generate_embeddings: bool = True,
+        suggested_role: Optional[str] = None,
+        defer_companies: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Re-ingest a stored profile, writing only what changed since it was stored
+        
+        The fresh fetch is diffed against the stored row: only changed columns are
+        patched, only changed company links are added, updated or removed, and the
+        profile is only re-embedded when its embedding text changed.
+        
+        Args:
+            linkedin_url: LinkedIn profile URL
+            stored_profile: Stored linkedin_profiles row (PROFILE_DIFF_COLUMNS)
+            generate_embeddings: Whether to generate vector embeddings
+            suggested_role: Optional suggested role to set on the stored profile
+            defer_companies: Patch the profile first and sync its companies in the background
+            
+        Returns:
+            Pipeline result; result["changes"] summarizes the field, embedding and link changes
+        """
+        profile_id = stored_profile["id"]
+        defer_companies = defer_companies and self.enrichment_queue is not None
+        staged = await self._stage_profile(
+            linkedin_url, True, generate_embeddings, process_companies=not defer_companies
+        )
+        result = staged["result"]
+        profile = staged["profile"]
+        
+        try:
+            columns = self.db_client.profile_to_columns(profile)
+            field_changes = diff_profile_columns(stored_profile, columns)
+            if suggested_role and suggested_role != stored_profile.get("suggested_role"):
+                field_changes["suggested_role"] = {"old": stored_profile.get("suggested_role"), "new": suggested_role}
+            
+            # The stored embedding is reused unless the text it was generated from changed
+            reembed = False
+            if generate_embeddings and self.embedding_service:
+                text_hash = embedding_cache_key(self.embedding_service.model, self.embedding_service.profile_to_text(profile))
+                reembed = text_hash != stored_profile.get("embedding_text_hash")
+                if reembed or staged["company_profiles"]:
+                    await self._embed_staged_profiles([staged], include_profiles=reembed)
+            
+            patch = {column: columns[column] for column in field_changes if column in columns}
+            if "suggested_role" in field_changes:
+                patch["suggested_role"] = suggested_role
+            if reembed:
+                patch["embedding"] = staged["profile_embedding"]
+                patch["embedding_text_hash"] = staged["profile_embedding_hash"]
+            
+            self.logger.info(
+                "Applying incremental profile update",
+                pipeline_id=result["pipeline_id"],
+                profile_id=profile_id,
+                changed_fields=sorted(field_changes),
+                reembedded=reembed
+            )
+            if patch:
+                patch["timestamp"] = columns["timestamp"]
+            # Written even when nothing changed, so the profile counts as fresh again
+            patch["last_fetched_at"] = datetime.now(timezone.utc).isoformat()
+            with PIPELINE_STAGE_SECONDS.time(stage="profile_store"):
+                await self.db_client.update_profile(profile_id, patch)
+            result["storage_ids"]["profile"] = profile_id
+            
+            link_changes = {"added": [], "updated": [], "removed": []}
+            if not defer_companies:
+                link_changes = await self._sync_staged_profile_links(staged, profile_id)
+            await self._store_company_embeddings([staged])
+            
+            result["changes"] = {
+                "mode": "incremental",
+                "fields": field_changes,
+                "reembedded": reembed,
+                "links": link_changes
+            }
+            self._complete_staged_profile(staged, True, generate_embeddings)
+            
+        except Exception as e:
+            self._fail_pipeline_result(result, e)
+            raise
+        
+        if defer_companies:
+            result["enrichment"] = await self.enrichment_queue.submit(
+                profile_id,
+                lambda: self._enrich_staged_profile(staged, profile_id, generate_embeddings, sync_links=True),
+                pipeline_id=result["pipeline_id"]
+            )
+        
+        return result
+    
+    async def _enrich_staged_profile(
+        self,
+        staged: Dict[str, Any],
+        profile_id: str,
+        generate_embeddings: bool = True,
+        sync_links: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Process, embed and link the companies of a profile stored without them
+        
+        Args:
+            staged: Staged profile stored with process_companies=False
+            profile_id: Stored profile record ID
+            generate_embeddings: Whether to generate company embeddings
+            sync_links: Diff against the profile's existing links (incremental re-ingestion)
+            
+        Returns:
+            Enrichment summary: processed companies, links written and errors
+        """
+        result = staged["result"]
+        errors_before = len(result["errors"])
+        
+        await self._stage_companies(staged)
+        
+        if generate_embeddings and self.embedding_service and staged["company_profiles"]:
+            try:
+                await self._embed_staged_profiles([staged], include_profiles=False)
+                await self._store_company_embeddings([staged])
+            except Exception as e:
+                # Company embeddings are an enrichment; the companies are still linked
+                self.logger.warning("Failed to embed deferred companies", pipeline_id=result["pipeline_id"], error=str(e))
+        
+        if sync_links:
+            link_changes = await self._sync_staged_profile_links(staged, profile_id)
+            linked = len(link_changes["added"]) + len(link_changes["updated"])
+        else:
+            linked = await self._link_staged_profile(staged, profile_id)
+        
+        return {
+            "companies": staged["companies_processed"],
+            "companies_linked": linked,
+            "errors": result["errors"][errors_before:]
+        }
+    
+    async def _stage_profile(
+        self,
+        linkedin_url: str,
+        store_in_db: bool,
+        generate_embeddings: bool,
+        process_companies: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Fetch a profile and process its companies (pipeline steps 1 and 2)
+        
+        Args:
+            linkedin_url: LinkedIn profile URL
+            store_in_db: Whether the profile will be stored (for logging)
+            generate_embeddings: Whether embeddings will be generated (for logging)
+            process_companies: Whether to run step 2 now (False defers it to _stage_companies)
+            
+        Returns:
+            Staged profile: the pipeline result plus the fetched profile and company
+            profiles awaiting embedding and storage
+        """
         pipeline_id = str(uuid.uuid4())
         start_time = datetime.utcnow()
         
@@ -108,230 +344,430 @@ class LinkedInDataPipeline(LoggerMixin):
             "companies": [],
             "embeddings": {},
             "storage_ids": {},
+            "company_fetch_timings": [],
             "errors": []
         }
         
         try:
             # Step 1: Fetch profile from Cassidy API
             self.logger.info("Fetching profile from Cassidy", pipeline_id=pipeline_id)
-            profile = await self.cassidy_client.fetch_profile(linkedin_url)
+            with PIPELINE_STAGE_SECONDS.time(stage="profile_fetch"):
+                profile = await self.cassidy_client.fetch_profile(linkedin_url)
             result["profile"] = profile.dict()
-            
-            # Step 2: Process company data using CompanyService
-            companies_processed = []
-            try:
-                if self.db_client and settings.ENABLE_COMPANY_INGESTION:
-                    # Ensure company service is initialized
-                    await self._ensure_company_service()
+        except Exception as e:
+            self._fail_pipeline_result(result, e)
+            raise
+        
+        staged = {
+            "result": result,
+            "profile": profile,
+            "companies_processed": [],
+            "company_profiles": {},
+            # Set by _stage_companies when every company URL was fetched and processed
+            "companies_complete": False,
+            "profile_embedding": None,
+            "profile_embedding_hash": None,
+            "company_embeddings": {}
+        }
+        
+        # Step 2: Process company data using CompanyService
+        if process_companies:
+            await self._stage_companies(staged)
+        
+        return staged
+    
+    async def _stage_companies(self, staged: Dict[str, Any]):
+        """
+        Fetch, upsert and collect a staged profile's companies (pipeline step 2)
+        
+        Failures are recorded in the pipeline result's errors; the profile is
+        still stored without them.
+        
+        Args:
+            staged: Staged profile from _stage_profile
+        """
+        result = staged["result"]
+        pipeline_id = result["pipeline_id"]
+        profile = staged["profile"]
+        fetch_timings = result["company_fetch_timings"]
+        companies_processed = staged["companies_processed"]
+        company_profiles: Dict[str, CompanyProfile] = staged["company_profiles"]
+        
+        try:
+            if self.db_client and settings.ENABLE_COMPANY_INGESTION:
+                # Ensure company service is initialized
+                await self._ensure_company_service()
+                
+                if self.company_service:
+                    self.logger.info(
+                        "🏢 COMPANY_START: Initiating company data processing", 
+                        pipeline_id=pipeline_id,
+                        process_type="COMPANY_PROCESSING"
+                    )
                     
-                    if self.company_service:
+                    # Extract company URLs from profile experience
+                    company_urls = self._extract_company_urls(profile)
+                    
+                    if company_urls:
                         self.logger.info(
-                            "🏢 COMPANY_START: Initiating company data processing", 
+                            "Found company URLs to fetch",
                             pipeline_id=pipeline_id,
-                            process_type="COMPANY_PROCESSING"
+                            company_count=len(company_urls),
+                            company_urls=company_urls[:3]  # Log first 3 for debugging
                         )
                         
-                        # Extract company URLs from profile experience
-                        company_urls = self._extract_company_urls(profile)
+                        # Fetch detailed company data from Cassidy API
+                        with PIPELINE_STAGE_SECONDS.time(stage="company_fetch"):
+                            cassidy_companies = await self._fetch_companies(company_urls, fetch_timings)
                         
-                        if company_urls:
+                        if cassidy_companies:
                             self.logger.info(
-                                "Found company URLs to fetch",
+                                "Successfully fetched companies from Cassidy API",
                                 pipeline_id=pipeline_id,
-                                company_count=len(company_urls),
-                                company_urls=company_urls[:3]  # Log first 3 for debugging
+                                companies_fetched=len(cassidy_companies)
                             )
                             
-                            # Fetch detailed company data from Cassidy API
-                            cassidy_companies = await self._fetch_companies(company_urls)
+                            # Convert Cassidy CompanyProfile objects to CanonicalCompany for database storage
+                            canonical_companies = []
+                            for cassidy_company in cassidy_companies:
+                                try:
+                                    # Convert CompanyProfile to CanonicalCompany format
+                                    canonical_data = {
+                                        "company_name": cassidy_company.company_name,
+                                        "company_id": cassidy_company.company_id,
+                                        "linkedin_url": cassidy_company.linkedin_url,
+                                        "description": cassidy_company.description,
+                                        "website": cassidy_company.website,
+                                        "domain": cassidy_company.domain,
+                                        "employee_count": cassidy_company.employee_count,
+                                        "employee_range": cassidy_company.employee_range,
+                                        "year_founded": cassidy_company.year_founded,
+                                        "industries": cassidy_company.industries or [],
+                                        "hq_city": cassidy_company.hq_city,
+                                        "hq_region": cassidy_company.hq_region,
+                                        "hq_country": cassidy_company.hq_country,
+                                        "logo_url": cassidy_company.logo_url,
+                                    }
+                                    
+                                    # Filter out None values and create CanonicalCompany
+                                    filtered_data = {k: v for k, v in canonical_data.items() if v is not None}
+                                    canonical_company = CanonicalCompany(**filtered_data)
+                                    canonical_companies.append(canonical_company)
+                                except Exception as e:
+                                    self.logger.warning(
+                                        "Failed to convert Cassidy company to canonical format",
+                                        pipeline_id=pipeline_id,
+                                        company_name=getattr(cassidy_company, 'company_name', 'Unknown'),
+                                        error=str(e)
+                                    )
+                                    continue
                             
-                            if cassidy_companies:
+                            # Use CompanyService to process companies (create/update with deduplication)
+                            if canonical_companies:
+                                with PIPELINE_STAGE_SECONDS.time(stage="company_upsert"):
+                                    processing_results = await self.company_service.batch_process_companies(canonical_companies)
+                                
+                                # Convert results for response
+                                cassidy_by_name = {c.company_name: c for c in cassidy_companies}
+                                for process_result in processing_results:
+                                    if process_result["success"]:
+                                        companies_processed.append({
+                                            "company_id": process_result["company_id"],
+                                            "company_name": process_result["company_name"],
+                                            "action": process_result["action"]  # created/updated
+                                        })
+                                        company_profile = cassidy_by_name.get(process_result["company_name"])
+                                        if company_profile is not None:
+                                            company_profiles[process_result["company_id"]] = company_profile
+                                
+                                # Every company in the profile is accounted for, so links
+                                # to companies outside this set are stale
+                                staged["companies_complete"] = len(companies_processed) == len(company_urls)
+                                
                                 self.logger.info(
-                                    "Successfully fetched companies from Cassidy API",
+                                    "🏁 COMPANY_COMPLETE: Company data processing finished successfully",
                                     pipeline_id=pipeline_id,
-                                    companies_fetched=len(cassidy_companies)
+                                    companies_processed=len(companies_processed),
+                                    process_type="COMPANY_PROCESSING",
+                                    status="SUCCESS"
                                 )
-                                
-                                # Convert Cassidy CompanyProfile objects to CanonicalCompany for database storage
-                                canonical_companies = []
-                                for cassidy_company in cassidy_companies:
-                                    try:
-                                        # Convert CompanyProfile to CanonicalCompany format
-                                        canonical_data = {
-                                            "company_name": cassidy_company.company_name,
-                                            "company_id": cassidy_company.company_id,
-                                            "linkedin_url": cassidy_company.linkedin_url,
-                                            "description": cassidy_company.description,
-                                            "website": cassidy_company.website,
-                                            "domain": cassidy_company.domain,
-                                            "employee_count": cassidy_company.employee_count,
-                                            "employee_range": cassidy_company.employee_range,
-                                            "year_founded": cassidy_company.year_founded,
-                                            "industries": cassidy_company.industries or [],
-                                            "hq_city": cassidy_company.hq_city,
-                                            "hq_region": cassidy_company.hq_region,
-                                            "hq_country": cassidy_company.hq_country,
-                                            "logo_url": cassidy_company.logo_url,
-                                        }
-                                        
-                                        # Filter out None values and create CanonicalCompany
-                                        filtered_data = {k: v for k, v in canonical_data.items() if v is not None}
-                                        canonical_company = CanonicalCompany(**filtered_data)
-                                        canonical_companies.append(canonical_company)
-                                    except Exception as e:
-                                        self.logger.warning(
-                                            "Failed to convert Cassidy company to canonical format",
-                                            pipeline_id=pipeline_id,
-                                            company_name=getattr(cassidy_company, 'company_name', 'Unknown'),
-                                            error=str(e)
-                                        )
-                                        continue
-                                
-                                # Use CompanyService to process companies (create/update with deduplication)
-                                if canonical_companies:
-                                    processing_results = await self.company_service.batch_process_companies(canonical_companies)
-                                    
-                                    # Convert results for response
-                                    for process_result in processing_results:
-                                        if process_result["success"]:
-                                            companies_processed.append({
-                                                "company_id": process_result["company_id"],
-                                                "company_name": process_result["company_name"],
-                                                "action": process_result["action"]  # created/updated
-                                            })
-                                    
-                                    self.logger.info(
-                                        "🏁 COMPANY_COMPLETE: Company data processing finished successfully",
-                                        pipeline_id=pipeline_id,
-                                        companies_processed=len(companies_processed),
-                                        process_type="COMPANY_PROCESSING",
-                                        status="SUCCESS"
-                                    )
-                            else:
-                                self.logger.warning("No companies fetched from Cassidy API", pipeline_id=pipeline_id)
                         else:
-                            self.logger.info("No company URLs found in profile", pipeline_id=pipeline_id)
-                            
-            except Exception as e:
-                error_msg = f"Company processing failed: {str(e)}"
-                self.logger.warning(error_msg, pipeline_id=pipeline_id)
-                result["errors"].append({
-                    "error": error_msg,
-                    "error_type": type(e).__name__,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                # Continue with profile processing even if company processing fails
+                            self.logger.warning("No companies fetched from Cassidy API", pipeline_id=pipeline_id)
+                    else:
+                        self.logger.info("No company URLs found in profile", pipeline_id=pipeline_id)
+                        staged["companies_complete"] = True
+                        
+        except Exception as e:
+            error_msg = f"Company processing failed: {str(e)}"
+            self.logger.warning(error_msg, pipeline_id=pipeline_id)
+            result["errors"].append({
+                "error": error_msg,
+                "error_type": type(e).__name__,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+            # Continue with profile processing even if company processing fails
+        
+        result["companies"] = companies_processed
+    
+    async def _embed_staged_profiles(self, staged_profiles: List[Dict[str, Any]], include_profiles: bool = True) -> int:
+        """
+        Embed profile and company texts for staged profiles in micro-batched requests
+        
+        Companies shared by several profiles are embedded once, and texts already
+        in the embedding cache are not sent to OpenAI at all. Each result gets an
+        "embedding_cache" summary (hits, misses, hit rate, tokens saved).
+        
+        Args:
+            staged_profiles: Staged profiles from _stage_profile
+            include_profiles: Embed the profile texts too (False for deferred company enrichment)
             
-            result["companies"] = companies_processed
+        Returns:
+            Number of texts embedded
+        """
+        # Profile texts first, so profile i's vector is vectors[i]
+        texts = [
+            self.embedding_service.profile_to_text(staged["profile"]) for staged in staged_profiles
+        ] if include_profiles else []
+        company_slots: Dict[str, int] = {}
+        
+        for staged in staged_profiles:
+            for company_id, company_profile in staged["company_profiles"].items():
+                if company_id in company_slots:
+                    continue
+                try:
+                    company_text = self.embedding_service.company_to_text(company_profile)
+                except Exception as e:
+                    self.logger.warning("Failed to build company embedding text", company_id=company_id, error=str(e))
+                    continue
+                company_slots[company_id] = len(texts)
+                texts.append(company_text)
+        
+        with PIPELINE_STAGE_SECONDS.time(stage="embedding"):
+            vectors, saved_tokens = await self.embedding_service.generate_cached_embeddings(texts)
+        
+        for index, staged in enumerate(staged_profiles):
+            text_indices = []
+            if include_profiles:
+                staged["profile_embedding"] = vectors[index]
+                staged["profile_embedding_hash"] = embedding_cache_key(self.embedding_service.model, texts[index])
+                staged["result"]["embeddings"]["profile"] = len(vectors[index])  # Store dimension, not actual values
+                text_indices.append(index)
             
-            # Step 3: Generate embeddings if enabled
-            if generate_embeddings and self.embedding_service:
-                self.logger.info("Generating embeddings", pipeline_id=pipeline_id)
-                
-                # Profile embedding
-                profile_embedding = await self.embedding_service.embed_profile(profile)
-                result["embeddings"]["profile"] = len(profile_embedding)  # Store dimension, not actual values
-            else:
-                profile_embedding = None
+            for company_id in staged["company_profiles"]:
+                if company_id in company_slots:
+                    staged["company_embeddings"][company_id] = vectors[company_slots[company_id]]
+                    text_indices.append(company_slots[company_id])
+            if staged["company_embeddings"]:
+                staged["result"]["embeddings"]["companies"] = len(staged["company_embeddings"])
             
-            # Step 4: Store profile in database if enabled
-            if store_in_db and self.db_client:
-                self.logger.info("Storing data in database", pipeline_id=pipeline_id)
-                
-                # Store profile
-                profile_id = await self.db_client.store_profile(profile, profile_embedding)
-                result["storage_ids"]["profile"] = profile_id
-                
-                # Set suggested role if provided
-                if suggested_role:
-                    self.logger.info("Updating profile suggested role", pipeline_id=pipeline_id, suggested_role=suggested_role)
-                    await self.db_client.update_profile_suggested_role(profile_id, suggested_role)
-                
-                # Link profile to companies in profile_companies junction table
-                if companies_processed and self.company_service:
-                    self.logger.info("Linking profile to companies", pipeline_id=pipeline_id, companies_count=len(companies_processed))
-                    
-                    # Extract work experience from profile to map to companies
-                    company_experiences = self._extract_company_experiences(profile)
-                    
-                    for company_data in companies_processed:
-                        company_id = company_data["company_id"]
-                        company_name = company_data["company_name"]
-                        
-                        # Find matching experience for this company
-                        experience = self._find_experience_for_company(company_experiences, company_name)
-                        
-                        if experience:
-                            try:
-                                await self.company_service.link_profile_to_company(profile_id, company_id, experience)
-                                self.logger.debug("Linked profile to company", 
-                                                pipeline_id=pipeline_id, 
-                                                company_name=company_name, 
-                                                position=experience.get("position_title", "Unknown"))
-                            except Exception as e:
-                                self.logger.warning("Failed to link profile to company", 
-                                                  pipeline_id=pipeline_id, 
-                                                  company_name=company_name, 
-                                                  error=str(e))
-                        else:
-                            # Create minimal link if no specific experience found
-                            minimal_experience = {"position_title": "Employee", "is_current": False}
-                            try:
-                                await self.company_service.link_profile_to_company(profile_id, company_id, minimal_experience)
-                                self.logger.debug("Created minimal profile-company link", 
-                                                pipeline_id=pipeline_id, 
-                                                company_name=company_name)
-                            except Exception as e:
-                                self.logger.warning("Failed to create minimal profile-company link", 
-                                                  pipeline_id=pipeline_id, 
-                                                  company_name=company_name, 
-                                                  error=str(e))
+            hits = [saved_tokens[i] for i in text_indices if saved_tokens[i] is not None]
+            lookups = sum(1 for i in text_indices if texts[i].strip())
+            staged["result"]["embedding_cache"] = {
+                "hits": len(hits),
+                "misses": lookups - len(hits),
+                "hit_rate": round(len(hits) / lookups, 4) if lookups else 0.0,
+                "saved_tokens": sum(hits)
+            }
+        
+        return len(texts)
+    
+    async def _store_staged_profile(self, staged: Dict[str, Any], suggested_role: Optional[str] = None):
+        """
+        Store a staged profile and link it to its companies (pipeline step 4)
+        
+        Args:
+            staged: Staged profile from _stage_profile
+            suggested_role: Optional suggested role to set on the stored profile
+        """
+        result = staged["result"]
+        pipeline_id = result["pipeline_id"]
+        profile = staged["profile"]
+        profile_embedding = staged["profile_embedding"]
+        
+        self.logger.info("Storing data in database", pipeline_id=pipeline_id)
+        
+        # Store profile
+        with PIPELINE_STAGE_SECONDS.time(stage="profile_store"):
+            profile_id = await self.db_client.store_profile(
+                profile, profile_embedding, embedding_text_hash=staged["profile_embedding_hash"]
+            )
+            result["storage_ids"]["profile"] = profile_id
             
-            # Pipeline completed successfully
-            result["status"] = "completed"
-            result["completed_at"] = datetime.utcnow().isoformat()
+            # Set suggested role if provided
+            if suggested_role:
+                self.logger.info("Updating profile suggested role", pipeline_id=pipeline_id, suggested_role=suggested_role)
+                await self.db_client.update_profile_suggested_role(profile_id, suggested_role)
+        
+        await self._link_staged_profile(staged, profile_id)
+    
+    async def _link_staged_profile(self, staged: Dict[str, Any], profile_id: str) -> int:
+        """
+        Link a stored profile to its processed companies in the profile_companies junction table
+        
+        Args:
+            staged: Staged profile whose companies have been processed
+            profile_id: Stored profile record ID
             
-            self.logger.info(
-                "🏁 PIPELINE_COMPLETE: Profile ingestion finished successfully",
-                pipeline_id=pipeline_id,
-                profile_name=getattr(profile, 'full_name', getattr(profile, 'name', 'Unknown')),
-                companies_count=len(companies_processed),
-                has_embeddings=generate_embeddings and self.embedding_service is not None,
-                stored_in_db=store_in_db and self.db_client is not None,
-                process_type="PROFILE_INGESTION",
-                status="SUCCESS"
-            )
+        Returns:
+            Number of links written (failures are recorded in the result's errors)
+        """
+        pipeline_id = staged["result"]["pipeline_id"]
+        companies_processed = staged["companies_processed"]
+        
+        if companies_processed and self.company_service:
+            self.logger.info("Linking profile to companies", pipeline_id=pipeline_id, companies_count=len(companies_processed))
+            links = self._staged_profile_links(staged)
             
+            # All profile_companies rows go out in one request
+            try:
+                with PIPELINE_STAGE_SECONDS.time(stage="company_link"):
+                    linked = await self.company_service.link_profile_to_companies(profile_id, links)
+                self.logger.debug("Linked profile to companies", 
+                                pipeline_id=pipeline_id, 
+                                links_count=len(linked))
+                return len(linked)
+            except Exception as e:
+                self.logger.warning("Failed to link profile to companies", 
+                                  pipeline_id=pipeline_id, 
+                                  companies_count=len(links), 
+                                  error=str(e))
+                staged["result"]["errors"].append({
+                    "error": f"Company linking failed: {str(e)}",
+                    "error_type": type(e).__name__,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+        return 0
+    
+    def _staged_profile_links(self, staged: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """(company id, work experience) pairs linking a staged profile to its processed companies"""
+        # Extract work experience from profile to map to companies
+        company_experiences = self._extract_company_experiences(staged["profile"])
+        
+        links = []
+        for company_data in staged["companies_processed"]:
+            # Find matching experience for this company, or create a minimal link
+            experience = self._find_experience_for_company(company_experiences, company_data["company_name"])
+            links.append((company_data["company_id"], experience or {"position_title": "Employee", "is_current": False}))
+        return links
+    
+    async def _sync_staged_profile_links(self, staged: Dict[str, Any], profile_id: str) -> Dict[str, List[str]]:
+        """
+        Bring a stored profile's company links in line with a fresh fetch, writing only the differences
+        
+        Links are only removed when every company of the fresh fetch was
+        processed; otherwise a company that failed to fetch would lose its link.
+        
+        Args:
+            staged: Staged profile whose companies have been processed
+            profile_id: Stored profile record ID
+            
+        Returns:
+            Company ids of the links "added", "updated" and "removed"
+        """
+        if not self.company_service:
+            return {"added": [], "updated": [], "removed": []}
+        
+        try:
+            with PIPELINE_STAGE_SECONDS.time(stage="company_link"):
+                return await self.company_service.sync_profile_links(
+                    profile_id,
+                    self._staged_profile_links(staged),
+                    remove_stale=staged["companies_complete"]
+                )
         except Exception as e:
-            result["status"] = "failed"
-            result["completed_at"] = datetime.utcnow().isoformat()
-            result["errors"].append({
-                "error": str(e),
+            self.logger.warning("Failed to sync profile company links", 
+                              pipeline_id=staged["result"]["pipeline_id"], 
+                              error=str(e))
+            staged["result"]["errors"].append({
+                "error": f"Company linking failed: {str(e)}",
                 "error_type": type(e).__name__,
                 "timestamp": datetime.utcnow().isoformat()
             })
+            return {"added": [], "updated": [], "removed": []}
+    
+    async def _store_company_embeddings(self, staged_profiles: List[Dict[str, Any]]) -> int:
+        """
+        Write company embeddings generated for staged profiles to the companies table
+        
+        Args:
+            staged_profiles: Staged profiles that have been embedded
             
-            self.logger.error(
-                "Profile ingestion failed",
-                pipeline_id=pipeline_id,
-                error=str(e),
-                error_type=type(e).__name__
-            )
-            raise
+        Returns:
+            Number of company records updated
+        """
+        embeddings: Dict[str, List[float]] = {}
+        for staged in staged_profiles:
+            embeddings.update(staged["company_embeddings"])
         
-        return result
+        if not embeddings or not self.company_service:
+            return 0
+        
+        try:
+            return await self.company_service.company_repo.update_embeddings(embeddings)
+        except Exception as e:
+            # Company embeddings are an enrichment; the profiles are already stored
+            self.logger.warning("Failed to store company embeddings", companies=len(embeddings), error=str(e))
+            return 0
+    
+    def _complete_staged_profile(self, staged: Dict[str, Any], store_in_db: bool, generate_embeddings: bool):
+        """Mark a staged profile's pipeline result as completed"""
+        result = staged["result"]
+        profile = staged["profile"]
+        
+        # Pipeline completed successfully
+        result["status"] = "completed"
+        result["completed_at"] = datetime.utcnow().isoformat()
+        
+        self.logger.info(
+            "🏁 PIPELINE_COMPLETE: Profile ingestion finished successfully",
+            pipeline_id=result["pipeline_id"],
+            profile_name=getattr(profile, 'full_name', getattr(profile, 'name', 'Unknown')),
+            companies_count=len(staged["companies_processed"]),
+            has_embeddings=generate_embeddings and self.embedding_service is not None,
+            stored_in_db=store_in_db and self.db_client is not None,
+            process_type="PROFILE_INGESTION",
+            status="SUCCESS"
+        )
+    
+    def _fail_pipeline_result(self, result: Dict[str, Any], error: Exception):
+        """Mark a pipeline result as failed"""
+        result["status"] = "failed"
+        result["completed_at"] = datetime.utcnow().isoformat()
+        result["errors"].append({
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+        self.logger.error(
+            "Profile ingestion failed",
+            pipeline_id=result["pipeline_id"],
+            error=str(error),
+            error_type=type(error).__name__
+        )
     
     async def batch_ingest_profiles(
         self, 
         linkedin_urls: List[str],
-        max_concurrent: int = 3
+        max_concurrent: int = 3,
+        store_in_db: bool = True,
+        generate_embeddings: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Batch process multiple LinkedIn profiles
         
+        Profiles are processed in windows of EMBEDDING_BATCH_MAX_ITEMS: each
+        window is fetched concurrently, its profile and company texts are
+        embedded in micro-batched requests bounded by EMBEDDING_BATCH_MAX_TOKENS
+        and EMBEDDING_BATCH_MAX_ITEMS, and the profiles are then stored. If an
+        embeddings request fails, the window's profiles are embedded one by one
+        so only the profiles whose texts cannot be embedded fail.
+        
         Args:
             linkedin_urls: List of LinkedIn profile URLs
             max_concurrent: Maximum concurrent processing
+            store_in_db: Whether to store in database
+            generate_embeddings: Whether to generate vector embeddings
             
         Returns:
             List of pipeline results
@@ -344,38 +780,88 @@ class LinkedInDataPipeline(LoggerMixin):
         
         # Create semaphore to limit concurrency
         semaphore = asyncio.Semaphore(max_concurrent)
+        embed = generate_embeddings and self.embedding_service is not None
+        window_size = max(1, settings.EMBEDDING_BATCH_MAX_ITEMS)
+        
+        def failed_result(url: str, error: BaseException) -> Dict[str, Any]:
+            return {
+                "linkedin_url": url,
+                "status": "failed",
+                "errors": [{"error": str(error), "error_type": type(error).__name__}]
+            }
         
-        async def process_single_profile(url: str) -> Dict[str, Any]:
+        async def stage_single_profile(url: str):
             async with semaphore:
                 try:
-                    return await self.ingest_profile(url)
+                    return await self._stage_profile(url, store_in_db, generate_embeddings)
                 except Exception as e:
                     self.logger.error(
                         "Batch profile processing failed",
                         linkedin_url=url,
                         error=str(e)
                     )
-                    return {
-                        "linkedin_url": url,
-                        "status": "failed",
-                        "errors": [{"error": str(e), "error_type": type(e).__name__}]
-                    }
+                    return failed_result(url, e)
         
-        # Process all profiles concurrently with limit
-        tasks = [process_single_profile(url) for url in linkedin_urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def embed_single_profile(staged: Dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    await self._embed_staged_profiles([staged])
+                    return True
+                except Exception as e:
+                    self._fail_pipeline_result(staged["result"], e)
+                    return False
         
-        # Convert exceptions to error results
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    "linkedin_url": linkedin_urls[i],
-                    "status": "failed",
-                    "errors": [{"error": str(result), "error_type": type(result).__name__}]
-                })
+        async def store_single_profile(staged: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    await self._store_staged_profile(staged)
+                    self._complete_staged_profile(staged, store_in_db, generate_embeddings)
+                except Exception as e:
+                    self._fail_pipeline_result(staged["result"], e)
+        
+        processed_results: List[Dict[str, Any]] = []
+        for window_start in range(0, len(linkedin_urls), window_size):
+            window_urls = linkedin_urls[window_start:window_start + window_size]
+            
+            # Steps 1-2: fetch profiles and process companies concurrently with limit
+            staged_or_failed = await asyncio.gather(
+                *(stage_single_profile(url) for url in window_urls), return_exceptions=True
+            )
+            window_results: List[Dict[str, Any]] = []
+            staged_profiles: List[Dict[str, Any]] = []
+            for url, outcome in zip(window_urls, staged_or_failed):
+                if isinstance(outcome, BaseException):
+                    window_results.append(failed_result(url, outcome))
+                elif "result" in outcome:
+                    staged_profiles.append(outcome)
+                    window_results.append(outcome["result"])
+                else:
+                    window_results.append(outcome)
+            
+            # Step 3: embed the whole window in as few requests as possible
+            if embed and staged_profiles:
+                try:
+                    await self._embed_staged_profiles(staged_profiles)
+                except Exception as e:
+                    # Retry profile by profile so a failing micro-batch only fails its own
+                    # profiles; texts from the micro-batches that succeeded are cache hits
+                    self.logger.warning(
+                        "Batch embedding failed, retrying profiles individually",
+                        profiles=len(staged_profiles),
+                        error=str(e)
+                    )
+                    embedded = await asyncio.gather(*(embed_single_profile(staged) for staged in staged_profiles))
+                    staged_profiles = [staged for staged, ok in zip(staged_profiles, embedded) if ok]
+            
+            # Step 4: store profiles concurrently with limit
+            if store_in_db and self.db_client:
+                await asyncio.gather(*(store_single_profile(staged) for staged in staged_profiles))
+                await self._store_company_embeddings(staged_profiles)
             else:
-                processed_results.append(result)
+                for staged in staged_profiles:
+                    self._complete_staged_profile(staged, store_in_db, generate_embeddings)
+            
+            processed_results.extend(window_results)
         
         successful = sum(1 for r in processed_results if r.get("status") == "completed")
         failed = len(processed_results) - successful
@@ -538,23 +1024,58 @@ class LinkedInDataPipeline(LoggerMixin):
             
         return unique_urls
     
-    async def _fetch_companies(self, company_urls: List[str]) -> List[CompanyProfile]:
-        """Fetch company profiles from URLs"""
+    async def _fetch_companies(
+        self,
+        company_urls: List[str],
+        fetch_timings: Optional[List[Dict[str, Any]]] = None
+    ) -> List[CompanyProfile]:
+        """
+        Fetch company profiles concurrently under the shared Cassidy rate limit
+        
+        Companies already in the process-wide company cache are returned without
+        calling Cassidy, and concurrent requests for the same company share one fetch.
+        
+        Args:
+            company_urls: Company LinkedIn URLs to fetch
+            fetch_timings: Optional list that receives one timing entry per URL
+            
+        Returns:
+            Successfully fetched companies, in the same order as company_urls
+        """
         self.logger.info(f"DEBUG: Starting company fetch for {len(company_urls)} URLs")
-        companies = []
+        if not company_urls:
+            return []
         
-        for i, url in enumerate(company_urls):
+        semaphore = asyncio.Semaphore(max(1, settings.CASSIDY_MAX_CONCURRENT_FETCHES))
+        
+        async def fetch_upstream(url: str, timing: Dict[str, Any]) -> CompanyProfile:
+            async with semaphore:
+                timing["token_wait_seconds"] = round(await self.rate_limiter.acquire(), 3)
+                request_start = time.monotonic()
+                try:
+                    return await self.cassidy_client.fetch_company(url)
+                finally:
+                    timing["in_flight_seconds"] = round(time.monotonic() - request_start, 3)
+        
+        async def fetch_single_company(i: int, url: str) -> Tuple[Optional[CompanyProfile], Dict[str, Any]]:
+            timing = {
+                "company_url": url,
+                "cache": None,
+                "token_wait_seconds": 0.0,
+                "in_flight_seconds": 0.0,
+                "success": False
+            }
             self.logger.info(f"DEBUG: Fetching company {i+1}/{len(company_urls)}: {url}")
             try:
-                self.logger.info(f"DEBUG: Calling Cassidy API for company: {url}")
-                company = await self.cassidy_client.fetch_company(url)
-                self.logger.info(f"DEBUG: Successfully fetched company: {getattr(company, 'company_name', 'Unknown')} from {url}")
-                companies.append(company)
-                
-                # Small delay to respect rate limits
-                self.logger.info(f"DEBUG: Adding 1 second delay before next company fetch")
-                await asyncio.sleep(1)
-                
+                company, timing["cache"] = await self.company_cache.get_or_fetch(
+                    url, lambda company_url: fetch_upstream(company_url, timing)
+                )
+                timing["success"] = True
+                self.logger.info(
+                    f"DEBUG: Successfully fetched company: {getattr(company, 'company_name', 'Unknown')} from {url}",
+                    cache=timing["cache"]
+                )
+                return company, timing
             except Exception as e:
                 self.logger.error(
                     f"DEBUG: Failed to fetch company {i+1}/{len(company_urls)}",
@@ -562,9 +1083,23 @@ class LinkedInDataPipeline(LoggerMixin):
                     error=str(e),
                     error_type=type(e).__name__
                 )
-                continue
+                return None, timing
         
-        self.logger.info(f"DEBUG: Company fetch completed - successfully fetched {len(companies)} out of {len(company_urls)} companies")
+        results = await asyncio.gather(
+            *(fetch_single_company(i, url) for i, url in enumerate(company_urls))
+        )
+        
+        companies = [company for company, _ in results if company is not None]
+        timings = [timing for _, timing in results]
+        if fetch_timings is not None:
+            fetch_timings.extend(timings)
+        
+        self.logger.info(
+            f"DEBUG: Company fetch completed - successfully fetched {len(companies)} out of {len(company_urls)} companies",
+            total_token_wait_seconds=round(sum(t["token_wait_seconds"] for t in timings), 3),
+            total_in_flight_seconds=round(sum(t["in_flight_seconds"] for t in timings), 3),
+            cache_hits=sum(1 for t in timings if t["cache"] in ("hit", "coalesced"))
+        )
         return companies
     
     def convert_cassidy_to_canonical(self, cassidy_companies: List[CompanyProfile]) -> List[CanonicalCompany]:
@@ -661,8 +1196,10 @@ class LinkedInDataPipeline(LoggerMixin):
             "companies": [],
             "embeddings": {},
             "storage_ids": {},
+            "company_fetch_timings": [],
             "errors": []
         }
+        fetch_timings = result["company_fetch_timings"]
         
         try:
             # Step 1: Fetch profile from Cassidy API
@@ -692,7 +1229,7 @@ class LinkedInDataPipeline(LoggerMixin):
                             )
                             
                             # Fetch detailed company data from Cassidy API
-                            cassidy_companies = await self._fetch_companies(company_urls)
+                            cassidy_companies = await self._fetch_companies(company_urls, fetch_timings)
                             
                             if cassidy_companies:
                                 self.logger.info(
@@ -10,7 +10,6 @@ import uuid
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timezone
 import asyncio
-from asyncio import Semaphore
 
 import openai
 from openai import AsyncOpenAI
@@ -19,6 +18,8 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 
 from app.core.logging import LoggerMixin
 from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_HITS, record_openai_usage
+from app.core.upstream import get_upstream_controller
 from app.models.canonical.profile import CanonicalProfile
 from app.services.scoring_job_service import ScoringJobService
 from app.models.scoring import JobStatus
@@ -32,12 +33,13 @@ class LLMScoringService(LoggerMixin):
     response parsing, and async job management.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, job_service: Optional[ScoringJobService] = None):
         """
         Initialize LLM scoring service
         
         Args:
             api_key: OpenAI API key (falls back to environment if not provided)
+            job_service: Shared ScoringJobService (a new one is created if omitted)
         """
         self.api_key = api_key or settings.OPENAI_API_KEY
         if not self.api_key:
@@ -51,12 +53,12 @@ class LLMScoringService(LoggerMixin):
         if self.api_key:
             try:
                 # Try different initialization approaches for compatibility
-                self.client = AsyncOpenAI(api_key=self.api_key)
+                # Retries go through tenacity and the upstream controller, which see every 429
+                self.client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
             except TypeError as e:
                 self.logger.warning(f"OpenAI client initialization error (v1): {e}")
                 try:
                     # Try with minimal params
-                    import openai
                     self.client = AsyncOpenAI(
                         api_key=self.api_key,
                         timeout=30.0
@@ -66,7 +68,7 @@ class LLMScoringService(LoggerMixin):
                     self.client = None
         
         # Service dependencies
-        self.job_service = ScoringJobService()
+        self.job_service = job_service or ScoringJobService()
         
         # Configuration from settings
         self.default_model = settings.OPENAI_DEFAULT_MODEL
@@ -74,8 +76,8 @@ class LLMScoringService(LoggerMixin):
         self.temperature = settings.OPENAI_TEMPERATURE
         self.max_input_tokens = 16000  # Conservative limit for input
         
-        # Rate limiting
-        self._rate_limiter = Semaphore(10)  # Max concurrent requests
+        # Process-wide adaptive concurrency limit and circuit breaker for OpenAI
+        self.upstream = get_upstream_controller("openai", failure_exceptions=(openai.APIConnectionError,))
         
         # Token counting
         self.encoding = tiktoken.get_encoding("cl100k_base")  # GPT-4 compatible
@@ -276,6 +278,7 @@ Please provide your evaluation in JSON format:"""
             
         Raises:
             openai.OpenAIError: For API errors that can't be retried
+            UpstreamUnavailableError: If the OpenAI circuit is open (not retried)
         """
         if not self.client:
             raise ValueError("OpenAI client not initialized - missing API key")
@@ -284,7 +287,7 @@ Please provide your evaluation in JSON format:"""
         max_tokens = max_tokens or self.max_tokens
         temperature = temperature if temperature is not None else self.temperature
         
-        async with self._rate_limiter:
+        async with self.upstream.request():
             self.logger.info(
                 "Making OpenAI API call",
                 model=model,
@@ -307,6 +310,7 @@ Please provide your evaluation in JSON format:"""
                 # Extract response data
                 message = response.choices[0].message
                 usage = response.usage
+                record_openai_usage(response.model, usage)
                 
                 result = {
                     "content": message.content,
@@ -331,6 +335,7 @@ Please provide your evaluation in JSON format:"""
                 return result
                 
             except openai.RateLimitError as e:
+                RATE_LIMIT_HITS.inc(upstream="openai")
                 self.logger.warning(
                     "OpenAI rate limit exceeded - will retry",
                     error=str(e),
@@ -456,9 +461,7 @@ Please provide your evaluation in JSON format:"""
             # Fetch template and use its prompt and preferred model
             try:
                 from app.services.template_service import TemplateService
-                from app.database.supabase_client import SupabaseClient
-                db_client = SupabaseClient()
-                template_service = TemplateService(supabase_client=db_client)
+                template_service = TemplateService(supabase_client=self.job_service.supabase_client)
                 template_used = await template_service.get_template_by_id(template_id)
                 
                 if not template_used:
@@ -604,13 +607,17 @@ Please provide your evaluation in JSON format:"""
         self, 
         job_id: str, 
         max_tokens: Optional[int] = None, 
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        claimed: bool = False
     ) -> bool:
         """
         Process an async scoring job
         
         Args:
             job_id: Scoring job ID to process
+            max_tokens: Maximum response tokens (defaults to the job's stored value)
+            temperature: Model temperature (defaults to the job's stored value)
+            claimed: Job was already moved to PROCESSING by a worker's atomic claim
             
         Returns:
             bool: True if successful, False otherwise
@@ -622,14 +629,21 @@ Please provide your evaluation in JSON format:"""
             self.logger.error("STEP 1 FAILED: Scoring job not found", job_id=job_id)
             return False
         
-        if job.status != JobStatus.PENDING:
+        expected_status = JobStatus.PROCESSING if claimed else JobStatus.PENDING
+        if job.status != expected_status:
             self.logger.warning(
-                "STEP 1 FAILED: Job not in pending status", 
+                "STEP 1 FAILED: Job not in expected status", 
                 job_id=job_id, 
-                current_status=job.status
+                current_status=job.status,
+                expected_status=expected_status
             )
             return False
         
+        if max_tokens is None:
+            max_tokens = job.max_tokens
+        if temperature is None:
+            temperature = job.temperature
+        
         self.logger.info(
             "STEP 2: Job validation passed, starting processing",
             job_id=job_id,
@@ -639,15 +653,16 @@ Please provide your evaluation in JSON format:"""
         )
         
         try:
-            # Update job status to processing
-            self.logger.info("STEP 3: Updating job status to PROCESSING", job_id=job_id)
-            started_at = datetime.now(timezone.utc)
-            await self.job_service.update_job_status(
-                job_id, 
-                JobStatus.PROCESSING, 
-                started_at=started_at
-            )
-            self.logger.info("STEP 3 SUCCESS: Job status updated to PROCESSING", job_id=job_id)
+            # Update job status to processing (a worker claim already did this)
+            if not claimed:
+                self.logger.info("STEP 3: Updating job status to PROCESSING", job_id=job_id)
+                started_at = datetime.now(timezone.utc)
+                await self.job_service.update_job_status(
+                    job_id, 
+                    JobStatus.PROCESSING, 
+                    started_at=started_at
+                )
+                self.logger.info("STEP 3 SUCCESS: Job status updated to PROCESSING", job_id=job_id)
             
             # Get profile data
             self.logger.info("STEP 4: Retrieving profile data", job_id=job_id, profile_id=job.profile_id)
@@ -760,7 +775,6 @@ Please provide your evaluation in JSON format:"""
         """
         try:
             # Import here to avoid circular imports
-            from app.database.supabase_client import SupabaseClient
             from app.models.canonical.profile import (
                 CanonicalProfile, CanonicalExperienceEntry, CanonicalEducationEntry
             )
@@ -768,8 +782,7 @@ Please provide your evaluation in JSON format:"""
             from datetime import datetime, timezone
             
             # Get profile data from database
-            db_client = SupabaseClient()
-            profile_data = await db_client.get_profile_by_id(profile_id)
+            profile_data = await self.job_service.supabase_client.get_profile_by_id(profile_id)
             
             if not profile_data:
                 self.logger.info("Profile not found in database", profile_id=profile_id)
@@ -0,0 +1,98 @@
+"""
+Field- and link-level diffs between a stored profile and a fresh fetch
+
+Incremental re-ingestion patches only the linkedin_profiles columns whose
+values changed and adds, updates or removes only the profile_companies rows
+that differ, instead of deleting the profile and storing it again.
+"""
+
+import json
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns diffed for incremental re-ingestion. timestamp is the fetch time,
+# which differs on every fetch, so it is written with changes but never
+# reported as one.
+DIFFED_PROFILE_COLUMNS: Tuple[str, ...] = (
+    "linkedin_id", "name", "url", "position", "about", "city", "country_code",
+    "followers", "connections", "profile_image_url", "current_company",
+    "experience", "education", "certifications",
+)
+
+# profile_companies columns that describe a link (besides its two ids)
+LINK_COLUMNS: Tuple[str, ...] = ("job_title", "start_date", "end_date", "is_current_role", "description")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _canonical(value: Any) -> str:
+    """Order-independent JSON form of a column value, as it round-trips through the database"""
+    return json.dumps(value, sort_keys=True, default=_json_default)
+
+
+def diff_profile_columns(stored: Dict[str, Any], fresh: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare a stored profile row with the columns of a fresh fetch
+
+    Args:
+        stored: Stored linkedin_profiles row
+        fresh: Column values for the fresh fetch (SupabaseClient.profile_to_columns)
+
+    Returns:
+        Changed columns. Scalar and object columns map to {"old", "new"}; list
+        columns (experience, education, certifications) map to the number of
+        entries {"added", "removed"}.
+    """
+    changes: Dict[str, Dict[str, Any]] = {}
+    for column in DIFFED_PROFILE_COLUMNS:
+        old, new = stored.get(column), fresh.get(column)
+        if _canonical(old) == _canonical(new):
+            continue
+        if isinstance(old, list) or isinstance(new, list):
+            old_entries = Counter(_canonical(entry) for entry in old or [])
+            new_entries = Counter(_canonical(entry) for entry in new or [])
+            changes[column] = {
+                "added": sum((new_entries - old_entries).values()),
+                "removed": sum((old_entries - new_entries).values()),
+            }
+        else:
+            changes[column] = {"old": old, "new": new}
+    return changes
+
+
+def diff_profile_links(
+    stored_links: List[Dict[str, Any]],
+    desired_links: Dict[str, Dict[str, Any]]
+) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Compare a profile's stored company links with the links of a fresh fetch
+
+    Args:
+        stored_links: Stored profile_companies rows
+        desired_links: profile_companies rows for the fresh fetch, by company id
+
+    Returns:
+        Tuple of (added, updated, removed) company ids
+    """
+    stored_by_company: Dict[str, Dict[str, Any]] = {str(link["company_id"]): link for link in stored_links}
+
+    added = [company_id for company_id in desired_links if company_id not in stored_by_company]
+    removed = [company_id for company_id in stored_by_company if company_id not in desired_links]
+    updated = [
+        company_id for company_id, row in desired_links.items()
+        if company_id in stored_by_company
+        and any(_link_value(row, column) != _link_value(stored_by_company[company_id], column) for column in LINK_COLUMNS)
+    ]
+    return added, updated, removed
+
+
+def _link_value(link: Dict[str, Any], column: str) -> Optional[Any]:
+    value = link.get(column)
+    if column == "is_current_role":
+        return bool(value)
+    return value
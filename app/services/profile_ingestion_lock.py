@@ -0,0 +1,317 @@
+"""
+Per-URL serialization of profile ingestion
+
+Two concurrent POST /api/v1/profiles for the same URL would each look the
+profile up, each delete it, each run the Cassidy workflow and race to insert,
+doubling the Cassidy cost and leaving duplicates or orphaned profile_companies
+rows. ProfileIngestionLock prevents that on two levels:
+
+- single-flight: identical requests for a normalized URL in one worker share
+  one ingestion; followers await the leader's result
+- a lease per normalized URL serializes the remaining ingestions across
+  workers. The next holder finds the profile just stored, so the freshness
+  policy usually serves it without another Cassidy fetch.
+
+Leases live in a pluggable backend, like the rate limit counters:
+
+- memory: per-process, for a single worker
+- sqlite: a file shared by the workers on one host
+- postgres: the profile_ingestion_locks table, shared by every worker
+
+A session-level Postgres advisory lock can't be held across PostgREST
+requests (each runs on whichever pooled connection is free), so the postgres
+backend takes a transaction-level advisory lock only to decide who gets the
+lease; the lease itself is a row with an expiry, which also frees the URL if
+a worker dies mid-ingestion. The holder renews the expiry while its ingestion
+runs, so the ttl only bounds how long a dead worker blocks the URL.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+
+T = TypeVar("T")
+
+
+class ProfileIngestionInProgressError(Exception):
+    """Another ingestion of the same URL held the lease for longer than the wait allowed"""
+
+    def __init__(self, key: str, waited_seconds: float):
+        self.key = key
+        self.waited_seconds = waited_seconds
+        super().__init__(f"Profile {key} is already being ingested (waited {waited_seconds:.0f}s)")
+
+
+class IngestionLockBackend(ABC):
+    """Storage for per-URL ingestion leases"""
+
+    @abstractmethod
+    async def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Take the lease on key for owner unless someone else holds an unexpired one"""
+
+    @abstractmethod
+    async def release(self, key: str, owner: str) -> None:
+        """Give up owner's lease on key (no-op if it expired and was taken over)"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class InMemoryIngestionLockBackend(IngestionLockBackend):
+    """Per-process leases for a single worker"""
+
+    def __init__(self):
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[0] != owner and lease[1] > now:
+                return False
+            self._leases[key] = (owner, now + ttl_seconds)
+            return True
+
+    async def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[0] == owner:
+                del self._leases[key]
+
+    def __len__(self) -> int:
+        return len(self._leases)
+
+
+class SQLiteIngestionLockBackend(IngestionLockBackend):
+    """
+    Leases in a SQLite file shared by the workers on one host
+
+    The check-and-set runs inside BEGIN IMMEDIATE, which serializes workers on
+    the database lock. Calls run in a thread to keep the event loop free.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS profile_ingestion_locks ("
+            " key TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+
+    def _acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT owner, expires_at FROM profile_ingestion_locks WHERE key = ?", (key,)
+                ).fetchone()
+                acquired = row is None or row[0] == owner or row[1] <= now
+                if acquired:
+                    connection.execute(
+                        "INSERT INTO profile_ingestion_locks (key, owner, expires_at) VALUES (?, ?, ?)"
+                        " ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at",
+                        (key, owner, now + ttl_seconds)
+                    )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return acquired
+
+    def _release(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM profile_ingestion_locks WHERE key = ? AND owner = ?", (key, owner))
+
+    async def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        return await asyncio.to_thread(self._acquire, key, owner, ttl_seconds)
+
+    async def release(self, key: str, owner: str) -> None:
+        await asyncio.to_thread(self._release, key, owner)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class PostgresIngestionLockBackend(IngestionLockBackend):
+    """Leases in the profile_ingestion_locks table, shared by every worker"""
+
+    def __init__(self, supabase_client=None):
+        if supabase_client is None:
+            from app.database.supabase_client import SupabaseClient
+            supabase_client = SupabaseClient()
+        self.supabase_client = supabase_client
+
+    async def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        await self.supabase_client._ensure_client()
+        result = await self.supabase_client.client.rpc("profile_ingestion_lock_acquire", {
+            "p_key": key,
+            "p_owner": owner,
+            "p_ttl_seconds": ttl_seconds
+        }).execute()
+        return bool(result.data)
+
+    async def release(self, key: str, owner: str) -> None:
+        await self.supabase_client._ensure_client()
+        await self.supabase_client.client.rpc("profile_ingestion_lock_release", {
+            "p_key": key,
+            "p_owner": owner
+        }).execute()
+
+
+class ProfileIngestionLock(LoggerMixin):
+    """Coalesces identical ingestions of a URL in this worker and serializes the rest across workers"""
+
+    def __init__(
+        self,
+        backend: Optional[IngestionLockBackend] = None,
+        ttl_seconds: Optional[float] = None,
+        wait_seconds: Optional[float] = None,
+        poll_seconds: Optional[float] = None,
+        max_poll_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            backend: Lease store (per-process memory if omitted)
+            ttl_seconds: How long a lease lasts without renewal; the holder renews it
+                every ttl_seconds / 3 while the ingestion runs
+            wait_seconds: How long to wait for another holder's lease before giving up
+            poll_seconds: First interval between attempts to take a held lease
+            max_poll_seconds: Cap for the poll interval, which doubles after each attempt
+        """
+        self.backend = backend or InMemoryIngestionLockBackend()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PROFILE_LOCK_TTL_SECONDS
+        self.wait_seconds = wait_seconds if wait_seconds is not None else settings.PROFILE_LOCK_WAIT_SECONDS
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.PROFILE_LOCK_POLL_SECONDS
+        self.max_poll_seconds = max_poll_seconds if max_poll_seconds is not None else settings.PROFILE_LOCK_MAX_POLL_SECONDS
+        self._flights: Dict[str, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, flight_key: str, ingest: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run an ingestion of key, sharing it with identical concurrent requests
+
+        Args:
+            key: Normalized profile URL, leased for the duration of the ingestion
+            flight_key: Identifies identical requests; concurrent calls with the same
+                flight_key share one ingestion
+            ingest: Coroutine function that runs the ingestion
+
+        Returns:
+            Tuple of (ingestion result, whether this call shared another call's ingestion)
+
+        Raises:
+            ProfileIngestionInProgressError: If the lease stayed held for longer than wait_seconds
+        """
+        task = self._flights.get(flight_key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.create_task(self._run_leased(key, ingest), name=f"profile-ingestion-{key}")
+            self._flights[flight_key] = task
+            task.add_done_callback(lambda finished: self._forget(flight_key, finished))
+        else:
+            self.logger.info("Joining in-flight profile ingestion", key=key)
+
+        # A caller that goes away does not cancel the ingestion its followers await
+        return await asyncio.shield(task), shared
+
+    async def close(self) -> None:
+        """Cancel unfinished ingestions (their leases are released), then close the backend"""
+        tasks = list(self._flights.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.backend.close()
+
+    def _forget(self, flight_key: str, finished: asyncio.Task) -> None:
+        if self._flights.get(flight_key) is finished:
+            del self._flights[flight_key]
+        if not finished.cancelled():
+            # Retrieved here so an ingestion nobody awaits anymore doesn't log "exception never retrieved"
+            finished.exception()
+
+    async def _run_leased(self, key: str, ingest: Callable[[], Awaitable[T]]) -> T:
+        owner = str(uuid.uuid4())
+        leased = await self._acquire(key, owner)
+        heartbeat = asyncio.create_task(self._renew(key, owner), name=f"profile-lease-{key}") if leased else None
+        try:
+            return await ingest()
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            if leased:
+                try:
+                    await self.backend.release(key, owner)
+                except Exception as e:
+                    # The lease expires on its own after ttl_seconds
+                    self.logger.warning("Failed to release profile ingestion lease", key=key, error=str(e))
+
+    async def _renew(self, key: str, owner: str) -> None:
+        """Extend owner's lease on key every ttl_seconds / 3 so a slow ingestion keeps it"""
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            try:
+                renewed = await self.backend.acquire(key, owner, self.ttl_seconds)
+            except Exception as e:
+                # Retried on the next beat; the lease still has two thirds of its ttl left
+                self.logger.warning("Failed to renew profile ingestion lease", key=key, error=str(e))
+                continue
+            if not renewed:
+                self.logger.warning("Profile ingestion lease was taken over by another worker", key=key)
+                return
+
+    async def _acquire(self, key: str, owner: str) -> bool:
+        """
+        Wait for the lease on key
+
+        Backend errors fail open: an unreachable lease store must not stop
+        ingestion, it only loses the cross-worker guarantee.
+
+        Returns:
+            Whether the lease was taken (False when the backend is unavailable)
+        """
+        started = time.monotonic()
+        poll_seconds = self.poll_seconds
+        while True:
+            try:
+                if await self.backend.acquire(key, owner, self.ttl_seconds):
+                    return True
+            except Exception as e:
+                self.logger.warning("Profile ingestion lock backend unavailable, ingesting unlocked", key=key, error=str(e))
+                return False
+
+            waited = time.monotonic() - started
+            if waited >= self.wait_seconds:
+                raise ProfileIngestionInProgressError(key, waited)
+            await asyncio.sleep(min(poll_seconds, self.wait_seconds - waited))
+            poll_seconds = min(poll_seconds * 2, self.max_poll_seconds)
+
+
+def build_ingestion_lock_backend(kind: Optional[str] = None, supabase_client=None) -> IngestionLockBackend:
+    """Create the lease backend named by settings.PROFILE_LOCK_BACKEND"""
+    kind = (kind or settings.PROFILE_LOCK_BACKEND).lower()
+    if kind == "memory":
+        return InMemoryIngestionLockBackend()
+    if kind == "sqlite":
+        return SQLiteIngestionLockBackend(settings.PROFILE_LOCK_SQLITE_PATH)
+    if kind == "postgres":
+        return PostgresIngestionLockBackend(supabase_client)
+    raise ValueError(f"Unknown PROFILE_LOCK_BACKEND: {kind}")
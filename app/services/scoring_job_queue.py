@@ -0,0 +1,350 @@
+"""
+Scoring job queue backends
+
+Atomic claim / heartbeat / release / reclaim operations on the scoring_jobs
+table used by the scoring worker pool. SupabaseScoringJobQueue calls the RPC
+functions from the add_scoring_job_workers migration (FOR UPDATE SKIP LOCKED);
+SQLiteScoringJobQueue implements the same semantics on a local SQLite file so
+the worker pool can run without Postgres in tests and local development.
+"""
+
+import asyncio
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.logging import LoggerMixin
+from app.models.scoring import ScoringJob, JobStatus
+
+
+def _job_from_row(row: Dict[str, Any]) -> ScoringJob:
+    """Build a ScoringJob from a database row, dropping columns the model does not know"""
+    data = {key: value for key, value in row.items() if key in ScoringJob.model_fields and value is not None}
+    return ScoringJob(**data)
+
+
+class SupabaseScoringJobQueue(LoggerMixin):
+    """Scoring job queue backed by Supabase RPC functions"""
+
+    def __init__(self, supabase_client=None):
+        """
+        Initialize Supabase job queue
+
+        Args:
+            supabase_client: SupabaseClient instance (created on first use if omitted)
+        """
+        self.supabase_client = supabase_client
+
+    async def _client(self):
+        if self.supabase_client is None:
+            # Import here to avoid requiring Supabase configuration at import time
+            from app.database.supabase_client import SupabaseClient
+            self.supabase_client = SupabaseClient()
+        await self.supabase_client._ensure_client()
+        return self.supabase_client.client
+
+    async def claim(self, worker_id: str, exclude_models: Sequence[str] = ()) -> Optional[ScoringJob]:
+        """
+        Atomically claim the oldest pending job
+
+        Args:
+            worker_id: ID recorded as the job owner
+            exclude_models: Models the caller has no capacity for
+
+        Returns:
+            Claimed job (now PROCESSING) or None if nothing is pending
+        """
+        client = await self._client()
+        result = await client.rpc(
+            "claim_scoring_job",
+            {"p_worker_id": worker_id, "p_exclude_models": list(exclude_models)}
+        ).execute()
+        rows = result.data or []
+        return _job_from_row(rows[0]) if rows else None
+
+    async def heartbeat(self, worker_id: str, job_ids: Sequence[str]) -> int:
+        """Refresh heartbeat_at for jobs still owned by the worker"""
+        if not job_ids:
+            return 0
+        client = await self._client()
+        result = await client.rpc(
+            "heartbeat_scoring_jobs",
+            {"p_worker_id": worker_id, "p_job_ids": list(job_ids)}
+        ).execute()
+        return result.data or 0
+
+    async def release(self, worker_id: str, job_ids: Sequence[str]) -> int:
+        """Return unfinished jobs owned by the worker to PENDING"""
+        if not job_ids:
+            return 0
+        client = await self._client()
+        result = await client.rpc(
+            "release_scoring_jobs",
+            {"p_worker_id": worker_id, "p_job_ids": list(job_ids)}
+        ).execute()
+        return result.data or 0
+
+    async def reclaim_stale(self, stale_after_seconds: int, max_retries: int) -> int:
+        """
+        Requeue (or fail once out of retries) PROCESSING jobs with a stale heartbeat
+
+        Only jobs claimed by a worker pool are reclaimed: jobs processed in-process
+        by the fallback path have no worker_id and never heartbeat.
+        """
+        client = await self._client()
+        result = await client.rpc(
+            "reclaim_stale_scoring_jobs",
+            {"p_stale_seconds": int(stale_after_seconds), "p_max_retries": max_retries}
+        ).execute()
+        return result.data or 0
+
+    async def fail(self, job_id: str, error_message: str) -> None:
+        """Mark a claimed job as failed"""
+        client = await self._client()
+        await client.table("scoring_jobs").update({
+            "status": JobStatus.FAILED.value,
+            "error_message": error_message,
+            "worker_id": None,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }).eq("id", job_id).execute()
+
+
+class SQLiteScoringJobQueue(LoggerMixin):
+    """
+    Scoring job queue on a local SQLite database
+
+    Stands in for Postgres in tests and local development. SQLite has no
+    SKIP LOCKED, but every claim runs in a BEGIN IMMEDIATE transaction so
+    concurrent claimers (including other processes sharing the file) are
+    serialized and a job can never be claimed twice.
+    """
+
+    _TIMESTAMP_NOW = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+    def __init__(self, database_path: str):
+        """
+        Initialize SQLite job queue
+
+        Args:
+            database_path: Path of the SQLite database file
+        """
+        self.database_path = database_path
+        self._execute_sync(self._create_schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.database_path, timeout=30.0, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _execute_sync(self, operation, *args):
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+        finally:
+            connection.close()
+
+    async def _execute(self, operation, *args):
+        return await asyncio.to_thread(self._execute_sync, operation, *args)
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection) -> None:
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS scoring_jobs (
+                id TEXT PRIMARY KEY,
+                profile_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                prompt TEXT NOT NULL,
+                model_name TEXT NOT NULL DEFAULT 'gpt-3.5-turbo',
+                template_id TEXT,
+                max_tokens INTEGER,
+                temperature REAL,
+                error_message TEXT,
+                retry_count INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+                started_at TEXT,
+                completed_at TEXT,
+                heartbeat_at TEXT,
+                updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+            )
+        """)
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_scoring_jobs_status_created ON scoring_jobs(status, created_at)"
+        )
+
+    async def enqueue(
+        self,
+        profile_id: str,
+        prompt: str,
+        model_name: str = "gpt-3.5-turbo",
+        template_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """
+        Insert a PENDING job (the local equivalent of ScoringJobService.create_job)
+
+        Returns:
+            str: Created job ID
+        """
+        job_id = str(uuid.uuid4())
+
+        def insert(connection):
+            connection.execute(
+                """
+                INSERT INTO scoring_jobs (id, profile_id, status, prompt, model_name, template_id, max_tokens, temperature)
+                VALUES (?, ?, 'pending', ?, ?, ?, ?, ?)
+                """,
+                (job_id, profile_id, prompt, model_name, template_id, max_tokens, temperature)
+            )
+
+        await self._execute(insert)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job row as a dict"""
+        def select(connection):
+            row = connection.execute("SELECT * FROM scoring_jobs WHERE id = ?", (job_id,)).fetchone()
+            return dict(row) if row else None
+
+        return await self._execute(select)
+
+    async def claim(self, worker_id: str, exclude_models: Sequence[str] = ()) -> Optional[ScoringJob]:
+        """Atomically claim the oldest pending job (see SupabaseScoringJobQueue.claim)"""
+        exclude_models = list(exclude_models)
+
+        def claim_oldest(connection):
+            placeholders = ",".join("?" for _ in exclude_models)
+            model_filter = f"AND model_name NOT IN ({placeholders})" if exclude_models else ""
+            row = connection.execute(
+                f"""
+                SELECT id FROM scoring_jobs
+                WHERE status = 'pending' {model_filter}
+                ORDER BY created_at, rowid
+                LIMIT 1
+                """,
+                exclude_models
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                f"""
+                UPDATE scoring_jobs
+                SET status = 'processing', worker_id = ?, started_at = {self._TIMESTAMP_NOW},
+                    heartbeat_at = {self._TIMESTAMP_NOW}, updated_at = {self._TIMESTAMP_NOW}
+                WHERE id = ?
+                """,
+                (worker_id, row["id"])
+            )
+            claimed = connection.execute("SELECT * FROM scoring_jobs WHERE id = ?", (row["id"],)).fetchone()
+            return dict(claimed)
+
+        row = await self._execute(claim_oldest)
+        return _job_from_row(row) if row else None
+
+    async def heartbeat(self, worker_id: str, job_ids: Sequence[str]) -> int:
+        """Refresh heartbeat_at for jobs still owned by the worker"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+
+        def touch(connection):
+            placeholders = ",".join("?" for _ in job_ids)
+            cursor = connection.execute(
+                f"""
+                UPDATE scoring_jobs SET heartbeat_at = {self._TIMESTAMP_NOW}
+                WHERE id IN ({placeholders}) AND worker_id = ? AND status = 'processing'
+                """,
+                (*job_ids, worker_id)
+            )
+            return cursor.rowcount
+
+        return await self._execute(touch)
+
+    async def release(self, worker_id: str, job_ids: Sequence[str]) -> int:
+        """Return unfinished jobs owned by the worker to PENDING"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+
+        def release_jobs(connection):
+            placeholders = ",".join("?" for _ in job_ids)
+            cursor = connection.execute(
+                f"""
+                UPDATE scoring_jobs
+                SET status = 'pending', worker_id = NULL, heartbeat_at = NULL, started_at = NULL,
+                    updated_at = {self._TIMESTAMP_NOW}
+                WHERE id IN ({placeholders}) AND worker_id = ? AND status = 'processing'
+                """,
+                (*job_ids, worker_id)
+            )
+            return cursor.rowcount
+
+        return await self._execute(release_jobs)
+
+    async def reclaim_stale(self, stale_after_seconds: float, max_retries: int) -> int:
+        """Requeue (or fail once out of retries) PROCESSING jobs with a stale heartbeat"""
+        def reclaim(connection):
+            cursor = connection.execute(
+                f"""
+                UPDATE scoring_jobs
+                SET status = CASE WHEN retry_count < ? THEN 'pending' ELSE 'failed' END,
+                    error_message = CASE WHEN retry_count < ? THEN NULL
+                                         ELSE 'Worker stopped responding while processing job' END,
+                    retry_count = MIN(retry_count + 1, 10),
+                    worker_id = NULL,
+                    heartbeat_at = NULL,
+                    updated_at = {self._TIMESTAMP_NOW}
+                WHERE status = 'processing'
+                  AND worker_id IS NOT NULL
+                  AND julianday(COALESCE(heartbeat_at, started_at, updated_at)) < julianday('now') - ? / 86400.0
+                """,
+                (max_retries, max_retries, stale_after_seconds)
+            )
+            return cursor.rowcount
+
+        return await self._execute(reclaim)
+
+    async def complete(self, job_id: str) -> None:
+        """Mark a claimed job as completed"""
+        def complete_job(connection):
+            connection.execute(
+                f"""
+                UPDATE scoring_jobs
+                SET status = 'completed', worker_id = NULL, completed_at = {self._TIMESTAMP_NOW},
+                    updated_at = {self._TIMESTAMP_NOW}
+                WHERE id = ?
+                """,
+                (job_id,)
+            )
+
+        await self._execute(complete_job)
+
+    async def fail(self, job_id: str, error_message: str) -> None:
+        """Mark a claimed job as failed"""
+        def fail_job(connection):
+            connection.execute(
+                f"""
+                UPDATE scoring_jobs
+                SET status = 'failed', error_message = ?, worker_id = NULL, updated_at = {self._TIMESTAMP_NOW}
+                WHERE id = ?
+                """,
+                (error_message, job_id)
+            )
+
+        await self._execute(fail_job)
+
+    async def list_statuses(self) -> List[str]:
+        """Get the status of every job, oldest first"""
+        def select(connection):
+            return [row["status"] for row in connection.execute("SELECT status FROM scoring_jobs ORDER BY created_at, rowid")]
+
+        return await self._execute(select)
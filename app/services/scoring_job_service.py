@@ -5,16 +5,29 @@ Database service for managing scoring jobs with Supabase backend.
 Provides CRUD operations and job status management.
 """
 
+import asyncio
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone, timedelta
 
 from app.core.logging import LoggerMixin
 from app.core.config import settings
+from app.core.pagination import apply_keyset, page_after
 from app.database.supabase_client import SupabaseClient
 from app.models.scoring import ScoringJob, JobStatus
 
 
+# Breakdowns supported by the scoring_job_stats database function
+STATS_GROUP_BY = ("template", "model")
+
+
+def _empty_job_stats() -> Dict[str, int]:
+    return {
+        "total_jobs": 0,
+        **{f"{status.value}_jobs": 0 for status in JobStatus}
+    }
+
+
 class ScoringJobService(LoggerMixin):
     """
     Service for managing scoring jobs in the database
@@ -22,8 +35,14 @@ class ScoringJobService(LoggerMixin):
     Provides async CRUD operations for scoring jobs using Supabase client patterns.
     """
     
-    def __init__(self):
-        self.supabase_client = SupabaseClient()
+    def __init__(self, supabase_client: Optional[SupabaseClient] = None):
+        """
+        Initialize scoring job service
+        
+        Args:
+            supabase_client: Shared SupabaseClient (a new one is created if omitted)
+        """
+        self.supabase_client = supabase_client or SupabaseClient()
         # For testing purposes, allow client override
         self.client = None
         self._client_initialized = False
@@ -41,7 +60,9 @@ class ScoringJobService(LoggerMixin):
         profile_id: str,
         prompt: str,
         model_name: str = "gpt-3.5-turbo",
-        template_id: Optional[str] = None
+        template_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
     ) -> str:
         """
         Create a new scoring job
@@ -50,6 +71,9 @@ class ScoringJobService(LoggerMixin):
             profile_id: UUID of the profile to score
             prompt: LLM evaluation prompt
             model_name: OpenAI model to use
+            template_id: Optional template the prompt was built from
+            max_tokens: Maximum response tokens (persisted so any worker can process the job)
+            temperature: Model temperature (persisted so any worker can process the job)
             
         Returns:
             str: Created job ID
@@ -67,6 +91,8 @@ class ScoringJobService(LoggerMixin):
             "prompt": prompt.strip(),
             "model_name": model_name,
             "template_id": template_id,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
             "retry_count": 0,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
@@ -128,7 +154,7 @@ class ScoringJobService(LoggerMixin):
             job_data = result.data[0]
             
             # Convert timestamps from ISO strings back to datetime objects
-            for timestamp_field in ['created_at', 'updated_at', 'started_at', 'completed_at']:
+            for timestamp_field in ['created_at', 'updated_at', 'started_at', 'completed_at', 'heartbeat_at']:
                 if job_data.get(timestamp_field):
                     try:
                         job_data[timestamp_field] = datetime.fromisoformat(
@@ -324,12 +350,19 @@ class ScoringJobService(LoggerMixin):
             )
             raise
     
-    async def increment_retry_count(self, job_id: str) -> bool:
+    async def increment_retry_count(
+        self,
+        job_id: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> bool:
         """
         Increment retry count and reset job to pending status
         
         Args:
             job_id: Job identifier
+            max_tokens: Replacement max_tokens for the retry (kept if None)
+            temperature: Replacement temperature for the retry (kept if None)
             
         Returns:
             bool: True if update succeeded, False if job not found
@@ -341,8 +374,14 @@ class ScoringJobService(LoggerMixin):
             "retry_count": "retry_count + 1",  # This will be handled as raw SQL
             "status": JobStatus.PENDING.value,
             "error_message": None,  # Clear previous error
+            "worker_id": None,
+            "heartbeat_at": None,
             "updated_at": datetime.now(timezone.utc).isoformat()
         }
+        if max_tokens is not None:
+            update_data["max_tokens"] = max_tokens
+        if temperature is not None:
+            update_data["temperature"] = temperature
         
         try:
             table = self.client.table("scoring_jobs")
@@ -521,17 +560,24 @@ class ScoringJobService(LoggerMixin):
             )
             raise
     
-    async def retry_job(self, job_id: str) -> bool:
+    async def retry_job(
+        self,
+        job_id: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> bool:
         """
         Reset job to pending and increment retry count
         
         Args:
             job_id: Job identifier
+            max_tokens: Replacement max_tokens for the retry (kept if None)
+            temperature: Replacement temperature for the retry (kept if None)
             
         Returns:
             bool: True if update succeeded, False if job not found
         """
-        return await self.increment_retry_count(job_id)
+        return await self.increment_retry_count(job_id, max_tokens=max_tokens, temperature=temperature)
     
     async def update_job_model(self, job_id: str, model_name: str) -> bool:
         """
@@ -579,18 +625,23 @@ class ScoringJobService(LoggerMixin):
         self,
         limit: int = 50,
         offset: int = 0,
-        status_filter: Optional[str] = None
-    ) -> tuple[List[ScoringJob], Dict[str, int]]:
+        status_filter: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ScoringJob], Dict[str, int], Optional[str]]:
         """
         List scoring jobs with pagination and optional status filtering
         
         Args:
             limit: Maximum number of jobs to return
-            offset: Number of jobs to skip
+            offset: Number of jobs to skip (after the cursor row, if a cursor is given)
             status_filter: Optional status to filter by
+            cursor: next_cursor of the previous page
             
         Returns:
-            Tuple of (jobs_list, stats_dict)
+            Tuple of (jobs_list, stats_dict, cursor for the next page or None on the last page)
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
         """
         await self._ensure_client()
         
@@ -602,16 +653,18 @@ class ScoringJobService(LoggerMixin):
             if status_filter:
                 query = query.eq("status", status_filter)
             
-            # Get jobs with pagination
-            result = await query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
-            
-            # Get stats (total counts by status)
-            stats_result = await table.select("status").execute()
+            # Get jobs newest first, with one extra row to tell whether another page follows,
+            # alongside the per-status totals aggregated in the database
+            result, stats = await asyncio.gather(
+                apply_keyset(query, cursor).range(offset, offset + limit).execute(),
+                self.get_job_stats()
+            )
+            rows, next_cursor = page_after(result.data or [], limit)
             
             # Process jobs
             jobs = []
-            if result.data:
-                for job_data in result.data:
+            if rows:
+                for job_data in rows:
                     # Convert timestamps
                     for timestamp_field in ['created_at', 'updated_at', 'started_at', 'completed_at']:
                         if job_data.get(timestamp_field):
@@ -624,28 +677,6 @@ class ScoringJobService(LoggerMixin):
                     
                     jobs.append(ScoringJob(**job_data))
             
-            # Calculate stats
-            stats = {
-                "total_jobs": 0,
-                "pending_jobs": 0,
-                "processing_jobs": 0,
-                "completed_jobs": 0,
-                "failed_jobs": 0
-            }
-            
-            if stats_result.data:
-                stats["total_jobs"] = len(stats_result.data)
-                for job_data in stats_result.data:
-                    status = job_data.get("status", "pending")
-                    if status == "pending":
-                        stats["pending_jobs"] += 1
-                    elif status == "processing":
-                        stats["processing_jobs"] += 1
-                    elif status == "completed":
-                        stats["completed_jobs"] += 1
-                    elif status == "failed":
-                        stats["failed_jobs"] += 1
-            
             self.logger.debug(
                 "Listed scoring jobs",
                 job_count=len(jobs),
@@ -654,7 +685,7 @@ class ScoringJobService(LoggerMixin):
                 limit=limit
             )
             
-            return jobs, stats
+            return jobs, stats, next_cursor
             
         except Exception as e:
             self.logger.error(
@@ -663,3 +694,59 @@ class ScoringJobService(LoggerMixin):
                 error_type=type(e).__name__
             )
             raise
+    
+    async def get_job_stats(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        group_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Count scoring jobs per status in the database
+        
+        Args:
+            since: Only count jobs created at or after this time
+            until: Only count jobs created before this time
+            group_by: Optional breakdown: 'template' (template_id) or 'model' (model_name)
+            
+        Returns:
+            Dict with total_jobs and <status>_jobs counts, plus by_template or
+            by_model mapping each template id / model name to the same counts
+        """
+        if group_by not in (None, *STATS_GROUP_BY):
+            raise ValueError(f"group_by must be one of: {', '.join(STATS_GROUP_BY)}")
+        
+        await self._ensure_client()
+        
+        try:
+            result = await self.client.rpc("scoring_job_stats", {
+                "p_since": since.isoformat() if since else None,
+                "p_until": until.isoformat() if until else None,
+                "p_group_by": group_by
+            }).execute()
+            
+            stats = _empty_job_stats()
+            groups: Dict[str, Dict[str, int]] = {}
+            for row in result.data or []:
+                buckets = [stats]
+                if group_by:
+                    # Jobs without a template are grouped under "none"
+                    buckets.append(groups.setdefault(row.get("group_key") or "none", _empty_job_stats()))
+                count = row.get("job_count") or 0
+                status_key = f"{row.get('status')}_jobs"
+                for bucket in buckets:
+                    bucket["total_jobs"] += count
+                    if status_key in bucket:
+                        bucket[status_key] += count
+            
+            if group_by:
+                stats[f"by_{group_by}"] = groups
+            return stats
+            
+        except Exception as e:
+            self.logger.error(
+                "Failed to get scoring job stats",
+                error=str(e),
+                error_type=type(e).__name__
+            )
+            raise
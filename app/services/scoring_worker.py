@@ -0,0 +1,308 @@
+"""
+Scoring job worker pool
+
+Replaces fire-and-forget asyncio.create_task processing of scoring jobs with a
+bounded pool of workers that claim PENDING rows from scoring_jobs atomically,
+cap concurrent LLM calls per model, heartbeat the jobs they are processing and
+reclaim jobs whose worker died mid-flight. Because jobs are only ever taken
+from the table, a redeploy no longer drops queued or in-flight work. Jobs run
+by the in-process fallback (no pool running) have no worker_id and are never
+reclaimed, since nothing heartbeats them.
+"""
+
+import asyncio
+import socket
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+from app.models.scoring import ScoringJob
+
+
+JobProcessor = Callable[[ScoringJob], Awaitable[bool]]
+
+
+class ScoringWorkerPool(LoggerMixin):
+    """Pool of asyncio workers processing scoring jobs claimed from a job queue"""
+
+    def __init__(
+        self,
+        queue,
+        process_job: JobProcessor,
+        worker_count: Optional[int] = None,
+        per_model_limit: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        heartbeat_interval: Optional[float] = None,
+        stale_after_seconds: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize worker pool
+
+        Args:
+            queue: Job queue backend (SupabaseScoringJobQueue or SQLiteScoringJobQueue)
+            process_job: Coroutine function that processes one claimed job
+            worker_count: Number of concurrent workers
+            per_model_limit: Maximum jobs processed concurrently per model
+            poll_interval: Seconds to wait between claims when the queue is empty
+            heartbeat_interval: Seconds between heartbeats for in-flight jobs
+            stale_after_seconds: Heartbeat age after which a PROCESSING job is reclaimed
+            max_retries: Reclaims allowed before a job is marked failed
+            worker_id: Owner ID written to claimed rows (defaults to host + random suffix)
+        """
+        self.queue = queue
+        self.process_job = process_job
+        self.worker_count = worker_count or settings.SCORING_WORKER_COUNT
+        self.per_model_limit = per_model_limit or settings.SCORING_WORKER_PER_MODEL_LIMIT
+        self.poll_interval = poll_interval if poll_interval is not None else settings.SCORING_WORKER_POLL_INTERVAL
+        self.heartbeat_interval = heartbeat_interval or settings.SCORING_WORKER_HEARTBEAT_INTERVAL
+        self.stale_after_seconds = stale_after_seconds or settings.SCORING_WORKER_STALE_AFTER
+        self.max_retries = max_retries if max_retries is not None else settings.SCORING_WORKER_MAX_RETRIES
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._claim_lock: Optional[asyncio.Lock] = None
+        self._in_flight: Dict[str, ScoringJob] = {}
+        self._in_flight_by_model: Dict[str, int] = defaultdict(int)
+        self._stats = {"claimed": 0, "succeeded": 0, "failed": 0, "reclaimed": 0, "released": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._stopping
+
+    async def start(self) -> None:
+        """Start workers plus the heartbeat and stale-job reclaim loops"""
+        if self._tasks:
+            return
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+        for index in range(self.worker_count):
+            self._spawn(self._worker_loop(index), f"scoring-worker-{index}")
+        self._spawn(self._heartbeat_loop(), "scoring-heartbeat")
+        self._spawn(self._reclaim_loop(), "scoring-reclaim")
+
+        self.logger.info(
+            "Scoring worker pool started",
+            worker_id=self.worker_id,
+            worker_count=self.worker_count,
+            per_model_limit=self.per_model_limit
+        )
+
+    def _spawn(self, coroutine, name: str) -> None:
+        task = asyncio.create_task(coroutine, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def notify(self) -> None:
+        """Wake idle workers after a job has been queued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """
+        Stop claiming jobs, wait for in-flight jobs, then release whatever is unfinished
+
+        Args:
+            timeout: Seconds to wait for in-flight jobs before cancelling them
+        """
+        if not self._tasks:
+            return
+
+        self._stopping = True
+        self.notify()
+
+        deadline = asyncio.get_running_loop().time() + timeout
+        while self._in_flight and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+
+        unfinished = list(self._in_flight)
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if unfinished:
+            try:
+                released = await self.queue.release(self.worker_id, unfinished)
+                self._stats["released"] += released
+            except Exception as e:
+                # Released or not, the jobs are reclaimed once their heartbeat goes stale
+                self.logger.error("Failed to release unfinished scoring jobs", error=str(e), job_count=len(unfinished))
+
+        self._in_flight.clear()
+        self._in_flight_by_model.clear()
+        self.logger.info("Scoring worker pool stopped", worker_id=self.worker_id, released_jobs=len(unfinished))
+
+    def _saturated_models(self):
+        return [model for model, count in self._in_flight_by_model.items() if count >= self.per_model_limit]
+
+    async def _worker_loop(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                # Claims are serialized within the pool so the per-model counts are current
+                async with self._claim_lock:
+                    job = await self.queue.claim(self.worker_id, self._saturated_models())
+                    if job is not None:
+                        self._in_flight[job.id] = job
+                        self._in_flight_by_model[job.model_name] += 1
+                        self._stats["claimed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Failed to claim scoring job", worker=index, error=str(e))
+                job = None
+
+            if job is None:
+                await self._wait_for_work()
+                continue
+
+            try:
+                await self._run_job(job)
+            finally:
+                self._in_flight.pop(job.id, None)
+                self._in_flight_by_model[job.model_name] -= 1
+                if self._in_flight_by_model[job.model_name] <= 0:
+                    del self._in_flight_by_model[job.model_name]
+                # A model slot just freed up; let idle workers re-check the queue
+                self.notify()
+
+    async def _wait_for_work(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_job(self, job: ScoringJob) -> None:
+        self.logger.info("Processing claimed scoring job", job_id=job.id, model_name=job.model_name, worker_id=self.worker_id)
+        try:
+            succeeded = await self.process_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            succeeded = False
+            error_message = f"{type(e).__name__}: {str(e)}"
+            self.logger.error("Scoring job processor raised", job_id=job.id, error=error_message)
+            try:
+                await self.queue.fail(job.id, error_message)
+            except Exception as fail_error:
+                self.logger.error("Failed to mark scoring job as failed", job_id=job.id, error=str(fail_error))
+
+        self._stats["succeeded" if succeeded else "failed"] += 1
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self._in_flight:
+                continue
+            try:
+                await self.queue.heartbeat(self.worker_id, list(self._in_flight))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Scoring job heartbeat failed", error=str(e), job_count=len(self._in_flight))
+
+    async def _reclaim_loop(self) -> None:
+        while True:
+            try:
+                reclaimed = await self.queue.reclaim_stale(self.stale_after_seconds, self.max_retries)
+                if reclaimed:
+                    self._stats["reclaimed"] += reclaimed
+                    self.logger.warning("Reclaimed stale scoring jobs", reclaimed=reclaimed)
+                    self.notify()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Stale scoring job reclaim failed", error=str(e))
+            await asyncio.sleep(max(self.stale_after_seconds / 2, self.poll_interval))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get worker pool statistics"""
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "worker_count": self.worker_count,
+            "per_model_limit": self.per_model_limit,
+            "in_flight": len(self._in_flight),
+            "in_flight_by_model": dict(self._in_flight_by_model),
+            **self._stats,
+        }
+
+
+async def process_claimed_scoring_job(job: ScoringJob, llm_service=None) -> bool:
+    """
+    Default job processor: score the claimed job with LLMScoringService
+
+    Args:
+        job: Claimed scoring job
+        llm_service: Shared LLMScoringService (a new one is created if omitted)
+    """
+    if llm_service is None:
+        # Import here to avoid loading OpenAI/tiktoken until a job is processed
+        from app.services.llm_scoring_service import LLMScoringService
+        llm_service = LLMScoringService()
+
+    return await llm_service.process_scoring_job(
+        job_id=job.id,
+        max_tokens=job.max_tokens,
+        temperature=job.temperature,
+        claimed=True
+    )
+
+
+_scoring_worker_pool: Optional[ScoringWorkerPool] = None
+
+
+def get_scoring_worker_pool() -> Optional[ScoringWorkerPool]:
+    """Get the process-wide scoring worker pool if one has been started"""
+    return _scoring_worker_pool
+
+
+async def start_scoring_worker_pool(queue=None, process_job: Optional[JobProcessor] = None) -> ScoringWorkerPool:
+    """
+    Create and start the process-wide scoring worker pool
+
+    Args:
+        queue: Job queue backend (defaults to SupabaseScoringJobQueue)
+        process_job: Job processor (defaults to process_claimed_scoring_job)
+
+    Returns:
+        The running ScoringWorkerPool
+    """
+    global _scoring_worker_pool
+    if _scoring_worker_pool is None:
+        if queue is None:
+            from app.services.scoring_job_queue import SupabaseScoringJobQueue
+            queue = SupabaseScoringJobQueue()
+        _scoring_worker_pool = ScoringWorkerPool(queue, process_job or process_claimed_scoring_job)
+    await _scoring_worker_pool.start()
+    return _scoring_worker_pool
+
+
+async def stop_scoring_worker_pool() -> None:
+    """Stop the process-wide scoring worker pool if it is running"""
+    global _scoring_worker_pool
+    if _scoring_worker_pool is not None:
+        await _scoring_worker_pool.stop()
+        _scoring_worker_pool = None
+
+
+def notify_scoring_workers() -> bool:
+    """
+    Tell the worker pool a job was queued
+
+    Returns:
+        bool: True if a running pool will pick the job up, False if there is no pool
+    """
+    pool = get_scoring_worker_pool()
+    if pool is None or not pool.running:
+        return False
+    pool.notify()
+    return True
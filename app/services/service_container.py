@@ -0,0 +1,101 @@
+"""
+Process-lifetime service container
+
+Built once in the FastAPI lifespan and handed to routes through Depends, so a
+request reuses the same Supabase/Cassidy/OpenAI clients, LinkedIn pipeline and
+scoring services instead of constructing them (and reloading the tiktoken
+encoding) per request. Closed at shutdown.
+"""
+
+from typing import Any, Optional
+
+from app.core.logging import LoggerMixin
+from app.services.batch_ingestion_service import BatchIngestionRunner, BatchIngestionService
+from app.services.company_enrichment_service import CompanyEnrichmentQueue, CompanyEnrichmentService
+from app.services.company_service import CompanyService
+from app.services.linkedin_pipeline import LinkedInDataPipeline
+from app.services.profile_ingestion_lock import ProfileIngestionLock, build_ingestion_lock_backend
+from app.services.llm_scoring_service import LLMScoringService
+from app.services.scoring_job_service import ScoringJobService
+from app.services.scoring_worker import process_claimed_scoring_job
+from app.services.template_service import TemplateService
+from app.services.template_versioning_service import TemplateVersioningService
+from app.repositories.company_repository import CompanyRepository
+
+
+class ServiceContainer(LoggerMixin):
+    """Owns one instance of each client and service for the lifetime of the process"""
+
+    # Controllers defined in main.py are built from these services and attached
+    # by the application at startup
+    profile_controller: Optional[Any] = None
+    company_controller: Optional[Any] = None
+    profile_scoring_controller: Optional[Any] = None
+    scoring_job_controller: Optional[Any] = None
+
+    def __init__(self, db_client, cassidy_client, linkedin_workflow):
+        """
+        Build the shared services
+
+        Args:
+            db_client: SupabaseClient shared by every repository and service
+            cassidy_client: CassidyClient for profile and company fetches
+            linkedin_workflow: LinkedInWorkflow for the legacy ingestion endpoints
+        """
+        self.db_client = db_client
+        self.cassidy_client = cassidy_client
+        self.linkedin_workflow = linkedin_workflow
+
+        self.company_repository = CompanyRepository(db_client)
+        self.company_service = CompanyService(self.company_repository)
+        self.company_enrichment_queue = CompanyEnrichmentQueue(CompanyEnrichmentService(supabase_client=db_client))
+        self.linkedin_pipeline = LinkedInDataPipeline(
+            cassidy_client=cassidy_client,
+            db_client=db_client,
+            company_service=self.company_service,
+            enrichment_queue=self.company_enrichment_queue
+        )
+        self.profile_ingestion_lock = ProfileIngestionLock(build_ingestion_lock_backend(supabase_client=db_client))
+
+        self.job_service = ScoringJobService(supabase_client=db_client)
+        self.llm_service = LLMScoringService(job_service=self.job_service)
+        self.template_service = TemplateService(supabase_client=db_client)
+        self.template_versioning_service = TemplateVersioningService(supabase_client=db_client)
+        self.batch_ingestion_runner = BatchIngestionRunner(BatchIngestionService(supabase_client=db_client))
+
+        self.logger.info(
+            "Service container initialized",
+            has_embeddings=self.linkedin_pipeline.embedding_service is not None,
+            has_openai=self.llm_service.client is not None
+        )
+
+    async def process_scoring_job(self, job) -> bool:
+        """Scoring worker pool job processor using the shared LLMScoringService"""
+        return await process_claimed_scoring_job(job, llm_service=self.llm_service)
+
+    async def close(self) -> None:
+        """
+        Close the clients owned by the container; errors are logged, not raised
+
+        The Supabase and Cassidy connection pools are shared process-wide and
+        closed separately by the application lifespan.
+        """
+        # Unfinished ingestion batches and company enrichments are marked failed
+        # while the database is still reachable; batches first, as they queue enrichments
+        await self.batch_ingestion_runner.close()
+        await self.company_enrichment_queue.close()
+        await self.profile_ingestion_lock.close()
+
+        closers = [
+            ("openai_scoring", getattr(self.llm_service.client, "close", None)),
+            ("openai_embeddings", getattr(getattr(self.linkedin_pipeline.embedding_service, "client", None), "close", None)),
+        ]
+        for name, close in closers:
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as e:
+                self.logger.warning("Failed to close client", client=name, error=str(e))
+
+        self.logger.info("Service container closed")
@@ -0,0 +1,117 @@
+"""
+Local stand-in for the Cassidy workflow webhooks
+
+Serves POST /workflows/profile and POST /workflows/company and answers with
+the canned mock_responses/profile_response.json and company_response.json,
+wrapped in Cassidy's workflowRun envelope. With ?results=true it answers
+inline like Cassidy does; without it, it acknowledges the trigger and posts
+the result to the payload's callback_url, so callback mode can be exercised
+end to end without Cassidy.
+
+Run it next to the API:
+
+    python -m app.testing.cassidy_stand_in --port 8765
+
+and point the service at it:
+
+    CASSIDY_PROFILE_WORKFLOW_URL=http://localhost:8765/workflows/profile?results=true
+    CASSIDY_COMPANY_WORKFLOW_URL=http://localhost:8765/workflows/company?results=true
+    CASSIDY_CALLBACK_MODE=true
+    CASSIDY_CALLBACK_BASE_URL=http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+
+DEFAULT_RESPONSES_DIR = Path(__file__).resolve().parents[2] / "mock_responses"
+
+WORKFLOW_RESPONSE_FILES = {
+    "profile": "profile_response.json",
+    "company": "company_response.json",
+}
+
+
+def workflow_result(workflow_type: str, responses_dir: Path = DEFAULT_RESPONSES_DIR) -> Dict[str, Any]:
+    """Canned result of a workflow, in the envelope CassidyClient extracts data from"""
+    with open(responses_dir / WORKFLOW_RESPONSE_FILES[workflow_type]) as f:
+        data = json.load(f)[workflow_type]
+    return {
+        "workflowRun": {
+            "id": str(uuid.uuid4()),
+            "status": "SUCCESS",
+            "actionResults": [{"status": "SUCCESS", "output": {"value": data}}]
+        }
+    }
+
+
+def create_stand_in_app(
+    responses_dir: Path = DEFAULT_RESPONSES_DIR,
+    delay_seconds: float = 0.0,
+    callback_transport: Optional[httpx.AsyncBaseTransport] = None
+) -> FastAPI:
+    """
+    Build the stand-in application
+
+    Args:
+        responses_dir: Directory holding the canned workflow responses
+        delay_seconds: How long a workflow "runs" before its callback is posted
+        callback_transport: Transport for posting callbacks (e.g. an ASGITransport
+            to the API app in tests); real HTTP if omitted
+    """
+    app = FastAPI(title="Cassidy stand-in")
+    callback_tasks: Set[asyncio.Task] = set()
+    app.state.callback_tasks = callback_tasks
+    app.state.triggers = []
+
+    async def post_callback(callback_url: str, result: Dict[str, Any]) -> None:
+        await asyncio.sleep(delay_seconds)
+        async with httpx.AsyncClient(transport=callback_transport) as client:
+            await client.post(callback_url, json=result)
+
+    @app.post("/workflows/{workflow_type}")
+    async def run_workflow(workflow_type: str, request: Request, results: bool = False):
+        if workflow_type not in WORKFLOW_RESPONSE_FILES:
+            raise HTTPException(status_code=404, detail=f"Unknown workflow: {workflow_type}")
+        payload = await request.json()
+        app.state.triggers.append({"workflow_type": workflow_type, "results": results, "payload": payload})
+        result = workflow_result(workflow_type, responses_dir)
+        if results:
+            return result
+
+        callback_url = payload.get("callback_url")
+        if not callback_url:
+            raise HTTPException(status_code=400, detail="callback_url is required without ?results=true")
+        task = asyncio.create_task(post_callback(callback_url, result))
+        callback_tasks.add(task)
+        task.add_done_callback(callback_tasks.discard)
+        return JSONResponse(
+            status_code=202,
+            content={"workflowRun": {"id": result["workflowRun"]["id"], "status": "RUNNING"}}
+        )
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve canned Cassidy workflow responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds before a callback is posted")
+    parser.add_argument("--responses-dir", type=Path, default=DEFAULT_RESPONSES_DIR)
+    args = parser.parse_args()
+    uvicorn.run(create_stand_in_app(args.responses_dir, args.delay), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
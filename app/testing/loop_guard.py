@@ -0,0 +1,71 @@
+"""
+Event loop blocking guard for tests
+
+Runs the event loop in asyncio debug mode, where every callback or task step
+that holds the loop longer than ``slow_callback_duration`` is logged by the
+``asyncio`` logger. The guard collects those reports so a test can fail when
+code it exercises (e.g. a repository call doing synchronous I/O) blocks the
+loop for more than the threshold.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+
+# Default threshold in seconds; override with LOOP_BLOCKING_THRESHOLD_MS
+DEFAULT_BLOCKING_THRESHOLD = float(os.getenv("LOOP_BLOCKING_THRESHOLD_MS", "100")) / 1000
+
+
+class _SlowStepHandler(logging.Handler):
+    """Collects asyncio debug-mode "Executing <step> took N seconds" reports"""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.reports: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if isinstance(record.msg, str) and record.msg.startswith("Executing "):
+            self.reports.append(record.getMessage())
+
+
+@contextmanager
+def detect_loop_blocking(
+    threshold: float = DEFAULT_BLOCKING_THRESHOLD,
+    loop: Optional[asyncio.AbstractEventLoop] = None
+) -> Iterator[List[str]]:
+    """
+    Report event loop steps that block for longer than a threshold
+
+    Reports for a step are only emitted once the step finishes, so inspect the
+    yielded list after the awaited code has returned control to the loop (e.g.
+    in fixture teardown).
+
+    Args:
+        threshold: Maximum seconds a single loop step may run
+        loop: Event loop to watch (defaults to the running loop)
+
+    Yields:
+        List that collects one message per blocking step
+    """
+    loop = loop or asyncio.get_running_loop()
+    previous_debug = loop.get_debug()
+    previous_duration = loop.slow_callback_duration
+    asyncio_logger = logging.getLogger("asyncio")
+    previous_level = asyncio_logger.level
+    handler = _SlowStepHandler()
+
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold
+    asyncio_logger.addHandler(handler)
+    if asyncio_logger.getEffectiveLevel() > logging.WARNING:
+        asyncio_logger.setLevel(logging.WARNING)
+    try:
+        yield handler.reports
+    finally:
+        asyncio_logger.removeHandler(handler)
+        asyncio_logger.setLevel(previous_level)
+        loop.slow_callback_duration = previous_duration
+        loop.set_debug(previous_debug)
@@ -6,6 +6,7 @@ Configures test environment to use local Supabase instance
 import os
 import pytest
 from pydantic_settings import SettingsConfigDict
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 def pytest_configure(config):
@@ -39,3 +40,71 @@ def test_settings():
         _env_file=".env.test",
         _env_file_encoding="utf-8"
     )
+
+
+@pytest.fixture
+async def fail_on_loop_blocking():
+    """
+    Fail the test when any event loop step blocks longer than the guard threshold
+    
+    Runs the test's loop in asyncio debug mode (see app.testing.loop_guard);
+    set LOOP_BLOCKING_THRESHOLD_MS to tune the threshold.
+    """
+    from app.testing.loop_guard import detect_loop_blocking
+    
+    with detect_loop_blocking() as blocking_steps:
+        yield
+    if blocking_steps:
+        pytest.fail("Event loop blocked:\n" + "\n".join(blocking_steps))
+
+
+class WordEncoding:
+    """Whitespace tokenizer standing in for tiktoken (which downloads its encoding files)"""
+
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+@pytest.fixture
+def word_encoding():
+    """Patch tiktoken with WordEncoding in the modules that count tokens"""
+    with patch("app.database.embeddings.tiktoken.get_encoding", return_value=WordEncoding()), \
+         patch("app.services.llm_scoring_service.tiktoken.get_encoding", return_value=WordEncoding()):
+        yield
+
+
+COMPANY_URL = "https://www.linkedin.com/company/100"
+
+
+@pytest.fixture
+def make_pipeline():
+    """
+    Factory for a LinkedInDataPipeline with mocked clients
+    
+    Every profile works at company 100, which the mocked company service
+    stores as company-uuid; tests set up the rest (db_client is a MagicMock).
+    """
+    from app.cassidy.models import CompanyProfile
+    from app.services.linkedin_pipeline import LinkedInDataPipeline
+
+    def make(company_name="Acme", action="created", **kwargs):
+        with patch('app.services.linkedin_pipeline.CassidyClient'), \
+             patch('app.services.linkedin_pipeline.SupabaseClient'), \
+             patch('app.services.linkedin_pipeline.EmbeddingService'):
+            pipeline = LinkedInDataPipeline(**kwargs)
+
+        pipeline.db_client = MagicMock()
+        pipeline._extract_company_urls = MagicMock(return_value=[COMPANY_URL])
+        pipeline._fetch_companies = AsyncMock(return_value=[
+            CompanyProfile(company_name=company_name, company_id="100", linkedin_url=COMPANY_URL)
+        ])
+        pipeline.company_service = MagicMock()
+        pipeline.company_service.batch_process_companies = AsyncMock(return_value=[
+            {"success": True, "company_id": "company-uuid", "company_name": company_name, "action": action}
+        ])
+        return pipeline
+
+    return make
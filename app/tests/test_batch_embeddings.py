@@ -0,0 +1,189 @@
+"""
+Tests for micro-batched embedding generation in EmbeddingService and batch profile ingestion
+"""
+
+import pytest
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.cassidy.models import LinkedInProfile
+from app.database.embeddings import EmbeddingService
+
+
+def embeddings_response(inputs):
+    """Fake OpenAI embeddings response: one vector per input, tagged with the input's word count"""
+    response = MagicMock()
+    response.data = [MagicMock(embedding=[float(len(text.split())), 0.0]) for text in inputs]
+    response.usage = MagicMock(total_tokens=sum(len(text.split()) for text in inputs))
+    return response
+
+
+@pytest.fixture
+def embedding_service(word_encoding):
+    service = EmbeddingService(api_key="test-key")
+    service.client = MagicMock()
+    service.client.embeddings.create = AsyncMock(
+        side_effect=lambda model, input: embeddings_response(input)
+    )
+    return service
+
+
+class TestMicroBatching:
+    """Tests for EmbeddingService.plan_micro_batches / generate_micro_batched_embeddings"""
+
+    def test_batches_bounded_by_item_count(self, embedding_service):
+        texts = [f"text {i}" for i in range(7)]
+
+        batches = embedding_service.plan_micro_batches(texts, max_batch_tokens=1000, max_batch_items=3)
+
+        assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_batches_bounded_by_tokens(self, embedding_service):
+        texts = ["one two three", "four five", "six seven eight nine", "ten"]
+
+        batches = embedding_service.plan_micro_batches(texts, max_batch_tokens=5, max_batch_items=100)
+
+        assert batches == [[0, 1], [2, 3]]
+
+    def test_oversized_text_gets_its_own_batch(self, embedding_service):
+        texts = ["a", "b " * 50, "c"]
+
+        batches = embedding_service.plan_micro_batches(texts, max_batch_tokens=10, max_batch_items=100)
+
+        assert batches == [[0], [1], [2]]
+
+    async def test_vectors_returned_in_input_order(self, embedding_service):
+        texts = ["one", "one two", "", "one two three", "one two three four"]
+
+        vectors = await embedding_service.generate_micro_batched_embeddings(
+            texts, max_batch_tokens=1000, max_batch_items=2
+        )
+
+        assert [vector[0] for vector in vectors] == [1.0, 2.0, 0.0, 3.0, 4.0]
+        # The empty text gets a zero vector without taking a request slot
+        assert embedding_service.client.embeddings.create.await_count == 2
+
+
+class TestBatchIngestEmbeddings:
+    """Tests for batched embedding generation in LinkedInDataPipeline.batch_ingest_profiles"""
+
+    @pytest.fixture
+    def pipeline(self, make_pipeline, embedding_service):
+        pipeline = make_pipeline(company_name="Shared Corp", action="updated")
+        pipeline.embedding_service = embedding_service
+        pipeline.db_client.store_profile = AsyncMock(side_effect=lambda profile, embedding, **kwargs: f"stored-{profile.profile_id}")
+
+        def profile_for(url):
+            profile_id = url.rstrip("/").split("/")[-1]
+            return LinkedInProfile(full_name=f"Person {profile_id}", profile_id=profile_id, linkedin_url=url)
+
+        pipeline.cassidy_client.fetch_profile = AsyncMock(side_effect=profile_for)
+        pipeline.company_service.link_profile_to_companies = AsyncMock(return_value=[])
+        pipeline.company_service.company_repo.update_embeddings = AsyncMock(return_value=1)
+        return pipeline
+
+    async def test_window_embedded_in_one_request(self, pipeline, embedding_service):
+        urls = [f"https://www.linkedin.com/in/person-{i}" for i in range(25)]
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            mock_settings.EMBEDDING_BATCH_MAX_ITEMS = 100
+            results = await pipeline.batch_ingest_profiles(urls)
+
+        assert [r["status"] for r in results] == ["completed"] * 25
+        assert [r["linkedin_url"] for r in results] == urls
+
+        # 25 profile texts + the shared company text in one embeddings request
+        embedding_service.client.embeddings.create.assert_awaited_once()
+        assert len(embedding_service.client.embeddings.create.call_args.kwargs["input"]) == 26
+
+        stored = {call.args[0].profile_id: call.args[1] for call in pipeline.db_client.store_profile.call_args_list}
+        assert set(stored) == {f"person-{i}" for i in range(25)}
+        expected_vector = embedding_service.profile_to_text(pipeline.cassidy_client.fetch_profile.side_effect(urls[0]))
+        assert stored["person-0"][0] == float(len(expected_vector.split()))
+
+        # One bulk link request per stored profile
+        assert pipeline.company_service.link_profile_to_companies.await_count == 25
+        assert pipeline.company_service.link_profile_to_companies.call_args_list[0].args == (
+            "stored-person-0", [("company-uuid", {"position_title": "Employee", "is_current": False})]
+        )
+
+        pipeline.company_service.company_repo.update_embeddings.assert_awaited_once()
+        company_embeddings = pipeline.company_service.company_repo.update_embeddings.call_args.args[0]
+        assert list(company_embeddings) == ["company-uuid"]
+        assert results[0]["embeddings"] == {"profile": 2, "companies": 1}
+
+    async def test_windows_split_by_max_items(self, pipeline, embedding_service):
+        urls = [f"https://www.linkedin.com/in/person-{i}" for i in range(5)]
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            mock_settings.EMBEDDING_BATCH_MAX_ITEMS = 2
+            results = await pipeline.batch_ingest_profiles(urls)
+
+        assert [r["status"] for r in results] == ["completed"] * 5
+        assert pipeline.db_client.store_profile.await_count == 5
+        # One embeddings request per window of 2 + 2 + 1 profiles
+        assert embedding_service.client.embeddings.create.await_count == 3
+
+    async def test_failed_fetch_does_not_block_window(self, pipeline, embedding_service):
+        urls = ["https://www.linkedin.com/in/ok-1", "https://www.linkedin.com/in/broken", "https://www.linkedin.com/in/ok-2"]
+        fetch = pipeline.cassidy_client.fetch_profile.side_effect
+
+        async def fetch_or_fail(url):
+            if url.endswith("broken"):
+                raise RuntimeError("Cassidy unavailable")
+            return fetch(url)
+
+        pipeline.cassidy_client.fetch_profile = AsyncMock(side_effect=fetch_or_fail)
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            mock_settings.EMBEDDING_BATCH_MAX_ITEMS = 100
+            results = await pipeline.batch_ingest_profiles(urls)
+
+        assert [r["status"] for r in results] == ["completed", "failed", "completed"]
+        assert results[1]["errors"][0]["error"] == "Cassidy unavailable"
+        embedding_service.client.embeddings.create.assert_awaited_once()
+        assert pipeline.db_client.store_profile.await_count == 2
+
+    async def test_reingest_served_from_embedding_cache(self, pipeline, embedding_service):
+        urls = [f"https://www.linkedin.com/in/person-{i}" for i in range(3)]
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            mock_settings.EMBEDDING_BATCH_MAX_ITEMS = 100
+            first = await pipeline.batch_ingest_profiles(urls)
+            second = await pipeline.batch_ingest_profiles(urls)
+
+        embedding_service.client.embeddings.create.assert_awaited_once()
+        assert first[0]["embedding_cache"] == {"hits": 0, "misses": 2, "hit_rate": 0.0, "saved_tokens": 0}
+        assert second[0]["embedding_cache"]["hits"] == 2
+        assert second[0]["embedding_cache"]["hit_rate"] == 1.0
+        assert second[0]["embedding_cache"]["saved_tokens"] > 0
+        assert pipeline.db_client.store_profile.call_args_list[0].args[1] == pipeline.db_client.store_profile.call_args_list[3].args[1]
+
+    async def test_failed_micro_batch_only_fails_its_profiles(self, pipeline, embedding_service):
+        urls = [f"https://www.linkedin.com/in/person-{i}" for i in range(5)] + ["https://www.linkedin.com/in/poison"]
+
+        def respond(model, input):
+            if any("poison" in text for text in input):
+                raise RuntimeError("OpenAI rejected the input")
+            return embeddings_response(input)
+
+        embedding_service.client.embeddings.create = AsyncMock(side_effect=respond)
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings, \
+             patch('app.database.embeddings.settings.EMBEDDING_BATCH_MAX_ITEMS', 2):
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            mock_settings.EMBEDDING_BATCH_MAX_ITEMS = 100
+            results = await pipeline.batch_ingest_profiles(urls)
+
+        assert [r["status"] for r in results] == ["completed"] * 5 + ["failed"]
+        assert results[5]["errors"][-1]["error"] == "OpenAI rejected the input"
+        stored = [call.args[0].profile_id for call in pipeline.db_client.store_profile.call_args_list]
+        assert sorted(stored) == [f"person-{i}" for i in range(5)]
+        # Only person-4, which shared the failing micro-batch, is embedded again
+        embedded = Counter(text for call in embedding_service.client.embeddings.create.call_args_list
+                           for text in call.kwargs["input"] if "poison" not in text)
+        assert [text for text, count in embedded.items() if count > 1] == ["Name: Person person-4"]
@@ -0,0 +1,240 @@
+"""
+Tests for asynchronous batch ingestion: incremental persistence and progress events
+"""
+
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.batch_ingestion_service import BatchIngestionRunner, BatchIngestionService
+
+
+class InMemoryBatchService:
+    """BatchIngestionService over dicts, with the counter semantics of complete_ingestion_batch_item"""
+
+    def __init__(self):
+        self.batches = {}
+        self.items = {}
+        self.recorded = []
+
+    async def create_batch(self, requests, max_concurrent):
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {
+            "id": batch_id, "status": "queued", "total_requested": len(requests),
+            "successful": 0, "failed": 0, "max_concurrent": max_concurrent,
+        }
+        items = [
+            {"id": f"{batch_id}-item-{position}", "batch_id": batch_id, "position": position,
+             "linkedin_url": request["linkedin_url"], "request": request, "status": "pending"}
+            for position, request in enumerate(requests)
+        ]
+        for item in items:
+            self.items[item["id"]] = dict(item)
+        return dict(self.batches[batch_id]), items
+
+    async def get_batch(self, batch_id):
+        batch = self.batches.get(batch_id)
+        return dict(batch) if batch else None
+
+    async def get_items(self, batch_id, finished_only=False):
+        return [
+            {key: value for key, value in item.items() if key not in ("batch_id", "request")}
+            for item in sorted(self.items.values(), key=lambda item: item["position"])
+            if item["batch_id"] == batch_id and (not finished_only or item["status"] in ("completed", "failed"))
+        ]
+
+    async def mark_batch_running(self, batch_id):
+        self.batches[batch_id]["status"] = "running"
+
+    async def mark_batch_failed(self, batch_id, error_message):
+        batch = self.batches[batch_id]
+        if batch["status"] in ("completed", "failed"):
+            return None
+        batch.update(status="failed", error_message=error_message)
+        return dict(batch)
+
+    async def mark_item_processing(self, item_id):
+        self.items[item_id]["status"] = "processing"
+
+    async def record_item_result(self, item_id, profile_id=None, result=None, error_message=None):
+        item = self.items[item_id]
+        status = "failed" if error_message is not None else "completed"
+        item.update(status=status, profile_id=profile_id, result=result, error_message=error_message)
+        self.recorded.append(item_id)
+        batch = self.batches[item["batch_id"]]
+        batch["successful" if status == "completed" else "failed"] += 1
+        finished = batch["successful"] + batch["failed"] >= batch["total_requested"]
+        batch["status"] = "completed" if finished else "running"
+        return dict(batch)
+
+
+def requests_for(*names):
+    return [{"linkedin_url": f"https://www.linkedin.com/in/{name}/", "suggested_role": "CTO"} for name in names]
+
+
+def parse_events(messages):
+    events = []
+    for message in messages:
+        if message.startswith(":"):
+            continue
+        event_line, data_line = message.strip().split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def batch_service():
+    return InMemoryBatchService()
+
+
+@pytest.fixture
+def runner(batch_service):
+    return BatchIngestionRunner(batch_service)
+
+
+class TestBatchIngestionRunner:
+    async def test_each_result_persisted_when_it_finishes(self, runner, batch_service):
+        release_slow = asyncio.Event()
+
+        async def ingest(request):
+            if "slow" in request["linkedin_url"]:
+                await release_slow.wait()
+            return f"profile-for-{request['linkedin_url'][-5:-1]}", {"name": "Someone"}
+
+        batch, items = await batch_service.create_batch(requests_for("slow", "fast"), max_concurrent=2)
+        task = runner.start(batch, items, ingest)
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+        # The fast profile is stored while the slow one is still being ingested
+        assert batch_service.recorded == [items[1]["id"]]
+        assert batch_service.batches[batch["id"]]["status"] == "running"
+        assert runner.running_batches == 1
+
+        release_slow.set()
+        await task
+
+        assert batch_service.batches[batch["id"]]["status"] == "completed"
+        assert batch_service.items[items[0]["id"]]["profile_id"] == "profile-for-slow"
+        assert runner.running_batches == 0
+
+    async def test_failed_profiles_recorded_without_failing_batch(self, runner, batch_service):
+        async def ingest(request):
+            if "broken" in request["linkedin_url"]:
+                raise ValueError("Cassidy returned no profile")
+            return "profile-1", {}
+
+        batch, items = await batch_service.create_batch(requests_for("good", "broken"), max_concurrent=1)
+        await runner.start(batch, items, ingest)
+
+        stored = batch_service.batches[batch["id"]]
+        assert (stored["status"], stored["successful"], stored["failed"]) == ("completed", 1, 1)
+        assert batch_service.items[items[1]["id"]]["error_message"] == "Cassidy returned no profile"
+
+    async def test_status_update_error_does_not_fail_batch(self, runner, batch_service):
+        batch, items = await batch_service.create_batch(requests_for("good", "other"), max_concurrent=2)
+        batch_service.mark_item_processing = AsyncMock(side_effect=[ConnectionError("database unavailable"), None])
+
+        await runner.start(batch, items, AsyncMock(return_value=("profile-1", {})))
+
+        stored = batch_service.batches[batch["id"]]
+        assert (stored["status"], stored["successful"], stored["failed"]) == ("completed", 2, 0)
+
+    async def test_concurrency_limited_per_batch(self, runner, batch_service):
+        in_flight, peak = 0, 0
+
+        async def ingest(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return "profile", {}
+
+        batch, items = await batch_service.create_batch(requests_for(*[f"p{i}" for i in range(8)]), max_concurrent=3)
+        await runner.start(batch, items, ingest)
+
+        assert peak == 3
+
+    async def test_close_marks_unfinished_batches_failed(self, runner, batch_service):
+        async def ingest(request):
+            await asyncio.sleep(60)
+
+        batch, items = await batch_service.create_batch(requests_for("a"), max_concurrent=1)
+        runner.start(batch, items, ingest)
+        await asyncio.sleep(0)
+
+        await runner.close()
+
+        assert batch_service.batches[batch["id"]]["status"] == "failed"
+        assert runner.running_batches == 0
+
+
+class TestBatchEvents:
+    async def test_stream_replays_finished_items_then_follows_progress(self, runner, batch_service):
+        release = {name: asyncio.Event() for name in ("first", "second")}
+
+        async def ingest(request):
+            name = request["linkedin_url"].rstrip("/").rsplit("/", 1)[-1]
+            await release[name].wait()
+            return f"profile-{name}", {"name": name}
+
+        batch, items = await batch_service.create_batch(requests_for("first", "second"), max_concurrent=2)
+        task = runner.start(batch, items, ingest)
+        release["first"].set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        stream = runner.events(await batch_service.get_batch(batch["id"]), keepalive_seconds=5)
+        messages = [await stream.__anext__(), await stream.__anext__()]
+        release["second"].set()
+        messages += [message async for message in stream]
+        await task
+
+        events = parse_events(messages)
+        assert [event for event, _ in events] == ["item", "progress", "item", "progress", "complete"]
+        assert events[0][1]["profile_id"] == "profile-first"
+        assert events[1][1]["successful"] == 1
+        assert events[2][1]["result"] == {"name": "second"}
+        assert events[-1][1]["status"] == "completed"
+        assert runner.broker._subscribers == {}
+
+    async def test_stream_polls_batches_processed_elsewhere(self, runner, batch_service):
+        # Processed by another worker: nothing is published in this process
+        batch, items = await batch_service.create_batch(requests_for("a"), max_concurrent=1)
+
+        async def other_worker():
+            await asyncio.sleep(0.02)
+            await batch_service.record_item_result(items[0]["id"], profile_id="profile-a")
+
+        worker = asyncio.create_task(other_worker())
+        messages = [message async for message in runner.events(batch, keepalive_seconds=0.01)]
+        await worker
+
+        assert any(message.startswith(": keep-alive") for message in messages)
+        events = parse_events(messages)
+        assert [event for event, _ in events] == ["progress", "item", "complete"]
+        assert events[1][1]["profile_id"] == "profile-a"
+
+
+class TestBatchIngestionService:
+    async def test_item_result_recorded_through_rpc(self):
+        service = BatchIngestionService(supabase_client=MagicMock())
+        service.client = MagicMock()
+        service._client_initialized = True
+        service.client.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": "batch-1", "status": "running", "successful": 0, "failed": 1}])
+        )
+
+        batch = await service.record_item_result("item-1", error_message="timeout")
+
+        service.client.rpc.assert_called_once_with("complete_ingestion_batch_item", {
+            "p_item_id": "item-1",
+            "p_status": "failed",
+            "p_profile_id": None,
+            "p_result": None,
+            "p_error_message": "timeout",
+        })
+        assert batch["failed"] == 1
@@ -0,0 +1,209 @@
+"""
+Tests for Cassidy callback mode: trigger, park the pipeline, resume from the callback
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from tenacity import wait_none
+from unittest.mock import AsyncMock, patch
+
+import app.cassidy.callbacks as callbacks_module
+from app.api.routes.cassidy_callbacks import router as callbacks_router
+from app.cassidy.callbacks import CassidyCallbackRegistry, SQLiteCallbackResultBackend, trigger_url
+from app.cassidy.exceptions import CassidyConnectionError, CassidyTimeoutError
+from app.core.config import settings
+from app.testing.cassidy_stand_in import create_stand_in_app, workflow_result
+
+
+@pytest.fixture
+async def registry(monkeypatch):
+    registry = CassidyCallbackRegistry(timeout_seconds=5, sweep_seconds=0.01, base_url="http://api.test", secret="s3cret")
+    monkeypatch.setattr(callbacks_module, "_callback_registry", registry)
+    yield registry
+    await registry.close()
+
+
+@pytest.fixture
+def api_transport():
+    """The callback endpoint, without the rest of main.py"""
+    api = FastAPI()
+    api.include_router(callbacks_router)
+    return httpx.ASGITransport(app=api)
+
+
+def test_trigger_url_drops_results_param():
+    url = "https://app.cassidyai.com/api/webhook/workflows/abc?results=true&source=api"
+
+    assert trigger_url(url) == "https://app.cassidyai.com/api/webhook/workflows/abc?source=api"
+
+
+class TestCallbackRegistry:
+    async def test_callback_resumes_waiting_pipeline(self, registry):
+        request_id = registry.register("profile")
+        waiter = asyncio.create_task(registry.wait(request_id))
+
+        assert await registry.deliver(request_id, {"workflowRun": {"status": "SUCCESS"}}) == "resumed"
+        assert await waiter == {"workflowRun": {"status": "SUCCESS"}}
+        assert registry.pending == 0
+
+    async def test_unknown_request_without_shared_store(self, registry):
+        assert await registry.deliver("unknown", {}) is None
+
+    async def test_sweeper_times_out_missing_callback(self, registry):
+        registry.timeout_seconds = 0.02
+        request_id = registry.register("company")
+
+        with pytest.raises(CassidyTimeoutError):
+            await registry.wait(request_id)
+
+        assert registry.stats()["timed_out"] == 1
+        assert registry.pending == 0
+        # A late callback finds nobody waiting
+        assert await registry.deliver(request_id, {}) is None
+
+    def test_callback_url_is_signed(self, registry):
+        url = registry.callback_url("abc")
+
+        assert url.startswith("http://api.test/api/v1/cassidy/callbacks/abc?token=")
+        assert registry.verify("abc", url.split("token=")[1])
+        assert not registry.verify("other", url.split("token=")[1])
+
+    async def test_callback_on_another_worker_is_picked_up_from_shared_store(self, tmp_path):
+        path = str(tmp_path / "callbacks.sqlite3")
+        waiting_worker = CassidyCallbackRegistry(SQLiteCallbackResultBackend(path), timeout_seconds=5, sweep_seconds=0.01)
+        other_worker = CassidyCallbackRegistry(SQLiteCallbackResultBackend(path), timeout_seconds=5, sweep_seconds=0.01)
+        try:
+            request_id = waiting_worker.register("profile")
+
+            assert await other_worker.deliver(request_id, {"result": 1}) == "stored"
+            assert await asyncio.wait_for(waiting_worker.wait(request_id), 1) == {"result": 1}
+        finally:
+            await waiting_worker.close()
+            await other_worker.close()
+
+
+class TestCallbackEndpoint:
+    async def test_rejects_bad_token(self, registry, api_transport):
+        request_id = registry.register("profile")
+
+        async with httpx.AsyncClient(transport=api_transport, base_url="http://api.test") as client:
+            response = await client.post(f"/api/v1/cassidy/callbacks/{request_id}?token=forged", json={})
+
+        assert response.status_code == 403
+        assert response.json()["detail"]["error_code"] == "INVALID_CALLBACK_TOKEN"
+        registry.discard(request_id)
+
+    async def test_unknown_request_is_not_found(self, registry, api_transport):
+        async with httpx.AsyncClient(transport=api_transport) as client:
+            response = await client.post(registry.callback_url("expired"), json={})
+
+        assert response.status_code == 404
+
+
+class TestCallbackModeWithStandIn:
+    @pytest.fixture
+    def stand_in(self, api_transport):
+        return create_stand_in_app(callback_transport=api_transport)
+
+    @pytest.fixture
+    def client(self, registry, stand_in):
+        from app.cassidy.client import CassidyClient
+
+        with patch.object(settings, "CASSIDY_CALLBACK_MODE", True), \
+             patch.object(settings, "CASSIDY_CALLBACK_BASE_URL", "http://api.test"):
+            client = CassidyClient()
+        client.profile_workflow_url = "http://cassidy.test/workflows/profile?results=true"
+        client.company_workflow_url = "http://cassidy.test/workflows/company?results=true"
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stand_in))
+        client._get_http_client = AsyncMock(return_value=http_client)
+        return client
+
+    async def test_profile_fetch_resumes_from_callback(self, client, registry, stand_in):
+        assert client.callbacks is registry
+
+        profile = await client.fetch_profile("https://www.linkedin.com/in/johndoe")
+
+        assert profile.name == "John Doe"
+        trigger = stand_in.state.triggers[0]
+        assert trigger["results"] is False
+        assert trigger["payload"]["request_id"] in trigger["payload"]["callback_url"]
+        assert registry.stats()["resumed"] == 1
+        assert registry.pending == 0
+
+    async def test_concurrent_fetches_are_correlated_by_request_id(self, client, stand_in):
+        profile, company = await asyncio.gather(
+            client.fetch_profile("https://www.linkedin.com/in/johndoe"),
+            client.fetch_company("https://www.linkedin.com/company/techcorp")
+        )
+
+        assert profile.name == "John Doe"
+        assert company.company_name == "TechCorp"
+
+    async def test_failed_trigger_stops_waiting(self, client, registry):
+        client._execute_workflow = AsyncMock(side_effect=CassidyTimeoutError("no response"))
+
+        with pytest.raises(CassidyTimeoutError):
+            await client.fetch_profile("https://www.linkedin.com/in/johndoe")
+
+        # The POST may have started the workflow, so it is not sent again
+        client._execute_workflow.assert_awaited_once()
+        assert registry.pending == 0
+
+    async def test_retried_trigger_uses_new_request_id(self, client, registry):
+        from app.cassidy.client import CassidyClient
+
+        execute = client._execute_workflow
+
+        async def refuse_first(**kwargs):
+            if client._execute_workflow.await_count == 1:
+                raise CassidyConnectionError("refused")
+            return await execute(**kwargs)
+
+        client._execute_workflow = AsyncMock(side_effect=refuse_first)
+        with patch.object(CassidyClient._trigger_workflow.retry, "wait", wait_none()):
+            profile = await client.fetch_profile("https://www.linkedin.com/in/johndoe")
+
+        assert profile.name == "John Doe"
+        first, second = (call.kwargs["payload"]["request_id"] for call in client._execute_workflow.call_args_list)
+        assert first != second
+        # A late callback for the failed attempt is not mistaken for the retry's result
+        assert await registry.deliver(first, {}) is None
+
+    async def test_inline_mode_unchanged(self, stand_in):
+        from app.cassidy.client import CassidyClient
+
+        client = CassidyClient()
+        client.profile_workflow_url = "http://cassidy.test/workflows/profile?results=true"
+        client._get_http_client = AsyncMock(
+            return_value=httpx.AsyncClient(transport=httpx.ASGITransport(app=stand_in))
+        )
+
+        profile = await client.fetch_profile("https://www.linkedin.com/in/johndoe")
+
+        assert client.callbacks is None
+        assert profile.name == "John Doe"
+        assert stand_in.state.triggers[0]["results"] is True
+
+
+def test_stand_in_serves_mock_responses():
+    result = workflow_result("company")
+
+    assert result["workflowRun"]["actionResults"][0]["output"]["value"]["company_name"] == "TechCorp"
+
+
+class TestCallbackSettings:
+    def test_memory_backend_refused_with_several_workers(self):
+        with patch.object(settings, "CASSIDY_CALLBACK_MODE", True), \
+             patch.object(settings, "CASSIDY_CALLBACK_BACKEND", "memory"), \
+             patch.object(settings, "WEB_CONCURRENCY", 4):
+            with pytest.raises(ValueError, match="WEB_CONCURRENCY=4"):
+                callbacks_module.check_callback_settings()
+
+    def test_shared_backend_allowed_with_several_workers(self):
+        with patch.object(settings, "CASSIDY_CALLBACK_MODE", True), \
+             patch.object(settings, "CASSIDY_CALLBACK_BACKEND", "sqlite"), \
+             patch.object(settings, "WEB_CONCURRENCY", 4):
+            callbacks_module.check_callback_settings()
@@ -371,6 +371,61 @@ class TestErrorHandling(TestCassidyClient):
             client._extract_profile_data(invalid_json_response)
 
 
+class TestConnectionPool(TestCassidyClient):
+    """Test the shared per-event-loop connection pool"""
+    
+    @pytest.fixture
+    async def pooled_client(self, client):
+        """CassidyClient whose pool uses an in-memory transport"""
+        import httpx
+        
+        def handler(request):
+            return httpx.Response(200, json=MOCK_CASSIDY_COMPANY_RESPONSE)
+        
+        client.client_config["transport"] = httpx.MockTransport(handler)
+        yield client
+        await CassidyClient.close_pool()
+    
+    @pytest.mark.asyncio
+    async def test_pool_reused_across_requests(self, pooled_client):
+        """Test that consecutive workflows share one pooled HTTP client"""
+        pools_before = CassidyClient.pool_stats()["pools_opened"]
+        requests_before = CassidyClient.pool_stats()["requests"]
+        
+        await pooled_client.fetch_company(TEST_LINKEDIN_COMPANY_URL)
+        first = await pooled_client._get_http_client()
+        await CassidyClient().fetch_company(TEST_LINKEDIN_COMPANY_URL)
+        second = await pooled_client._get_http_client()
+        
+        stats = CassidyClient.pool_stats()
+        assert first is second
+        assert stats["pools_opened"] == pools_before + 1
+        assert stats["requests"] == requests_before + 2
+        assert stats["open_pools"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_close_pool_releases_shared_client(self, pooled_client):
+        """Test that closing the pool closes the client and a new one is opened on demand"""
+        first = await pooled_client._get_http_client()
+        
+        await CassidyClient.close_pool()
+        
+        assert first.is_closed
+        assert CassidyClient.pool_stats()["open_pools"] == 0
+        second = await pooled_client._get_http_client()
+        assert second is not first
+    
+    def test_pool_stats_report_limits(self):
+        """Test pool statistics include configured limits and counters"""
+        stats = CassidyClient.pool_stats()
+        
+        for key in ("max_connections", "max_keepalive_connections", "open_connections",
+                    "active_connections", "idle_connections", "connections_opened",
+                    "tls_handshakes", "requests"):
+            assert key in stats
+        assert stats["idle_connections"] == stats["open_connections"] - stats["active_connections"]
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
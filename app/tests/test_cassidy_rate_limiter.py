@@ -0,0 +1,113 @@
+"""
+Tests for the shared Cassidy token bucket and concurrent company fetching
+"""
+
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, AsyncMock, patch
+
+from app.cassidy.rate_limiter import TokenBucket, get_cassidy_rate_limiter
+from app.cassidy.models import CompanyProfile
+from app.services.linkedin_pipeline import LinkedInDataPipeline
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket"""
+
+    def test_burst_up_to_capacity_without_waiting(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=3)
+
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_waits_grow_once_bucket_is_empty(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=1)
+
+        assert bucket.reserve() == 0.0
+        first_wait = bucket.reserve()
+        second_wait = bucket.reserve()
+
+        assert first_wait == pytest.approx(1.0, abs=0.05)
+        assert second_wait == pytest.approx(2.0, abs=0.05)
+
+    def test_reservations_from_several_threads_all_counted(self):
+        bucket = TokenBucket(rate_per_minute=0.001, capacity=100)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: bucket.reserve(), range(400)))
+
+        assert bucket.available_tokens == pytest.approx(-300, abs=0.01)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate_per_minute=0)
+
+    async def test_acquire_sleeps_for_reserved_wait(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=1)
+
+        with patch('app.cassidy.rate_limiter.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            assert await bucket.acquire() == 0.0
+            waited = await bucket.acquire()
+
+        assert waited == pytest.approx(1.0, abs=0.05)
+        mock_sleep.assert_awaited_once()
+
+    def test_limiter_is_shared_process_wide(self):
+        assert get_cassidy_rate_limiter() is get_cassidy_rate_limiter()
+
+
+class TestConcurrentCompanyFetch:
+    """Tests for LinkedInDataPipeline._fetch_companies concurrency"""
+
+    @pytest.fixture
+    def pipeline(self):
+        with patch('app.services.linkedin_pipeline.CassidyClient'), \
+             patch('app.services.linkedin_pipeline.SupabaseClient'), \
+             patch('app.services.linkedin_pipeline.EmbeddingService'):
+            pipeline = LinkedInDataPipeline()
+        pipeline.rate_limiter = TokenBucket(rate_per_minute=600, capacity=100)
+        return pipeline
+
+    async def test_fetches_run_in_parallel_and_keep_order(self, pipeline):
+        in_flight = 0
+        peak_in_flight = 0
+
+        async def fake_fetch(url):
+            nonlocal in_flight, peak_in_flight
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            # Earlier URLs finish last to prove ordering does not depend on completion
+            await asyncio.sleep(0.01 * (5 - int(url[-1])))
+            in_flight -= 1
+            return CompanyProfile(company_name=f"Company {url[-1]}", company_id=url[-1])
+
+        pipeline.cassidy_client.fetch_company = Mock(side_effect=fake_fetch)
+        urls = [f"https://linkedin.com/company/company-{i}" for i in range(5)]
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.CASSIDY_MAX_CONCURRENT_FETCHES = 3
+            companies = await pipeline._fetch_companies(urls)
+
+        assert [c.company_id for c in companies] == ["0", "1", "2", "3", "4"]
+        assert peak_in_flight == 3
+
+    async def test_failures_are_isolated_and_timed(self, pipeline):
+        async def fake_fetch(url):
+            if "broken" in url:
+                raise Exception("Workflow failed")
+            return CompanyProfile(company_name="Good Corp", company_id="good")
+
+        pipeline.cassidy_client.fetch_company = Mock(side_effect=fake_fetch)
+        urls = [
+            "https://linkedin.com/company/broken",
+            "https://linkedin.com/company/good",
+        ]
+        timings = []
+
+        companies = await pipeline._fetch_companies(urls, timings)
+
+        assert [c.company_id for c in companies] == ["good"]
+        assert [t["company_url"] for t in timings] == urls
+        assert [t["success"] for t in timings] == [False, True]
+        assert all(t["in_flight_seconds"] >= 0 for t in timings)
+        assert all(t["token_wait_seconds"] == 0.0 for t in timings)
@@ -0,0 +1,247 @@
+"""
+Tests for deferred company enrichment: profile returned first, companies enriched in the background
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.cassidy.models import LinkedInProfile
+from app.services.company_enrichment_service import CompanyEnrichmentQueue
+
+
+class InMemoryEnrichmentService:
+    """CompanyEnrichmentService over a dict"""
+
+    def __init__(self):
+        self.enrichments = {}
+
+    async def create_enrichment(self, profile_id, pipeline_id=None):
+        self.enrichments[profile_id] = {"profile_id": profile_id, "pipeline_id": pipeline_id, "status": "pending"}
+        return dict(self.enrichments[profile_id])
+
+    async def get_enrichment(self, profile_id):
+        enrichment = self.enrichments.get(profile_id)
+        return dict(enrichment) if enrichment else None
+
+    async def mark_processing(self, profile_id):
+        self.enrichments[profile_id]["status"] = "processing"
+
+    async def record_result(self, profile_id, summary=None, error_message=None):
+        enrichment = self.enrichments[profile_id]
+        if enrichment["status"] in ("completed", "failed"):
+            return None
+        summary = summary or {}
+        enrichment.update(
+            status="failed" if error_message is not None else "completed",
+            companies=summary.get("companies", []),
+            companies_linked=summary.get("companies_linked", 0),
+            error_message=error_message
+        )
+        return dict(enrichment)
+
+
+@pytest.fixture
+def enrichment_service():
+    return InMemoryEnrichmentService()
+
+
+@pytest.fixture
+def queue(enrichment_service):
+    return CompanyEnrichmentQueue(enrichment_service, max_concurrent=1)
+
+
+class TestCompanyEnrichmentQueue:
+    async def test_submit_returns_before_enrichment_runs(self, queue, enrichment_service):
+        release = asyncio.Event()
+
+        async def enrich():
+            await release.wait()
+            return {"companies": [{"company_id": "c1"}], "companies_linked": 1, "errors": []}
+
+        enrichment = await queue.submit("profile-1", enrich, pipeline_id="pipeline-1")
+
+        assert enrichment["status"] == "pending"
+        await asyncio.sleep(0)
+        assert enrichment_service.enrichments["profile-1"]["status"] == "processing"
+        assert queue.pending_enrichments == 1
+
+        release.set()
+        await queue.wait("profile-1", timeout=1)
+
+        assert enrichment_service.enrichments["profile-1"]["status"] == "completed"
+        assert enrichment_service.enrichments["profile-1"]["companies_linked"] == 1
+        assert queue.pending_enrichments == 0
+
+    async def test_recorded_errors_fail_the_enrichment(self, queue, enrichment_service):
+        async def enrich():
+            return {"companies": [], "companies_linked": 0, "errors": [{"error": "Company processing failed: boom"}]}
+
+        await queue.submit("profile-1", enrich)
+        await queue.wait("profile-1", timeout=1)
+
+        enrichment = enrichment_service.enrichments["profile-1"]
+        assert enrichment["status"] == "failed"
+        assert enrichment["error_message"] == "Company processing failed: boom"
+
+    async def test_close_marks_unfinished_enrichments_failed(self, queue, enrichment_service):
+        async def enrich():
+            await asyncio.Event().wait()
+
+        await queue.submit("profile-1", enrich)
+        await asyncio.sleep(0)
+        await queue.close()
+
+        enrichment = enrichment_service.enrichments["profile-1"]
+        assert enrichment["status"] == "failed"
+        assert "shutdown" in enrichment["error_message"]
+
+    async def test_cancel_stops_enrichment_of_deleted_profile(self, queue, enrichment_service):
+        async def enrich():
+            await asyncio.Event().wait()
+
+        await queue.submit("profile-1", enrich)
+        await asyncio.sleep(0)
+        await queue.cancel("profile-1")
+
+        assert queue.pending_enrichments == 0
+        enrichment = enrichment_service.enrichments["profile-1"]
+        assert enrichment["status"] == "failed"
+        assert "deleted" in enrichment["error_message"]
+
+
+class TestDeferredIngestion:
+    @pytest.fixture
+    def pipeline(self, make_pipeline, queue):
+        pipeline = make_pipeline(enrichment_queue=queue)
+        pipeline.embedding_service = None
+        pipeline.db_client.store_profile = AsyncMock(return_value="profile-1")
+        pipeline.cassidy_client.fetch_profile = AsyncMock(return_value=LinkedInProfile(
+            full_name="Jane Exec", profile_id="jane", linkedin_url="https://www.linkedin.com/in/jane/"
+        ))
+        pipeline.company_service.link_profile_to_companies = AsyncMock(return_value=[{"id": "link-1"}])
+        return pipeline
+
+    async def test_profile_stored_before_companies(self, pipeline, queue, enrichment_service):
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            result = await pipeline.ingest_profile("https://www.linkedin.com/in/jane/", defer_companies=True)
+
+            # Only the profile fetch is on the request path
+            assert result["status"] == "completed"
+            assert result["storage_ids"]["profile"] == "profile-1"
+            assert result["companies"] == []
+            assert result["enrichment"]["status"] == "pending"
+            pipeline._fetch_companies.assert_not_awaited()
+
+            await queue.wait("profile-1", timeout=1)
+
+        pipeline._fetch_companies.assert_awaited_once()
+        pipeline.company_service.link_profile_to_companies.assert_awaited_once()
+        assert pipeline.company_service.link_profile_to_companies.call_args.args[0] == "profile-1"
+        enrichment = enrichment_service.enrichments["profile-1"]
+        assert enrichment["status"] == "completed"
+        assert enrichment["companies"] == [{"company_id": "company-uuid", "company_name": "Acme", "action": "created"}]
+        assert enrichment["companies_linked"] == 1
+
+    async def test_link_failure_reported_in_enrichment(self, pipeline, queue, enrichment_service):
+        pipeline.company_service.link_profile_to_companies = AsyncMock(side_effect=RuntimeError("profile was deleted"))
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            await pipeline.ingest_profile("https://www.linkedin.com/in/jane/", defer_companies=True)
+            await queue.wait("profile-1", timeout=1)
+
+        enrichment = enrichment_service.enrichments["profile-1"]
+        assert enrichment["status"] == "failed"
+        assert "profile was deleted" in enrichment["error_message"]
+        assert enrichment["companies_linked"] == 0
+
+    async def test_companies_processed_inline_by_default(self, pipeline, enrichment_service):
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            result = await pipeline.ingest_profile("https://www.linkedin.com/in/jane/")
+
+        assert "enrichment" not in result
+        assert [company["company_id"] for company in result["companies"]] == ["company-uuid"]
+        pipeline.company_service.link_profile_to_companies.assert_awaited_once()
+        assert enrichment_service.enrichments == {}
+
+
+class TestProfileControllerEnrichment:
+    @pytest.fixture
+    def controller(self, queue):
+        from main import ProfileController
+
+        db_client = MagicMock()
+        db_client.get_profile_by_url = AsyncMock(return_value=None)
+        db_client.get_profile_by_id = AsyncMock(return_value={
+            "id": "profile-1", "url": "https://www.linkedin.com/in/jane/", "name": "Jane Exec", "created_at": "2025-08-27T00:00:00Z"
+        })
+        pipeline = MagicMock(enrichment_queue=queue)
+        pipeline.ingest_profile = AsyncMock(return_value={
+            "pipeline_id": "pipeline-1",
+            "status": "completed",
+            "companies": [],
+            "storage_ids": {"profile": "profile-1"},
+            "enrichment": {"profile_id": "profile-1", "status": "pending"}
+        })
+        return ProfileController(db_client, MagicMock(), MagicMock(), linkedin_pipeline=pipeline, batch_runner=MagicMock())
+
+    async def test_deferred_profile_reports_enrichment_status(self, controller):
+        from main import ProfileCreateRequest
+
+        response = await controller.create_profile(ProfileCreateRequest(
+            linkedin_url="https://www.linkedin.com/in/jane", suggested_role="CTO", defer_companies=True
+        ))
+
+        assert controller.linkedin_pipeline.ingest_profile.call_args.kwargs["defer_companies"] is True
+        assert response.companies_processed == []
+        assert response.pipeline_metadata["enrichment_status"] == "pending"
+        assert response.pipeline_metadata["enrichment_url"] == "/api/v1/profiles/profile-1/enrichment"
+
+    async def test_get_enrichment_waits_for_running_enrichment(self, controller, queue):
+        release = asyncio.Event()
+
+        async def enrich():
+            await release.wait()
+            return {"companies": [{"company_id": "c1"}], "companies_linked": 1, "errors": []}
+
+        await queue.submit("profile-1", enrich)
+        asyncio.get_running_loop().call_later(0.01, release.set)
+
+        enrichment = await controller.get_enrichment("profile-1", wait=1)
+
+        assert enrichment.status == "completed"
+        assert enrichment.companies_linked == 1
+
+    async def test_get_enrichment_not_found(self, controller):
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.get_enrichment("never-deferred")
+
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.detail["error_code"] == "ENRICHMENT_NOT_FOUND"
+
+    async def test_replace_stops_pending_enrichment_before_deleting(self, controller, queue):
+        from main import ProfileCreateRequest
+
+        async def enrich():
+            await asyncio.Event().wait()
+
+        await queue.submit("profile-0", enrich)
+        await asyncio.sleep(0)
+        controller.db_client.get_profile_by_url = AsyncMock(return_value={"id": "profile-0", "url": "https://www.linkedin.com/in/jane/"})
+        pending_at_delete = []
+        controller.db_client.delete_profile = AsyncMock(
+            side_effect=lambda profile_id: pending_at_delete.append(queue.pending_enrichments) or True
+        )
+
+        await controller.create_profile(ProfileCreateRequest(
+            linkedin_url="https://www.linkedin.com/in/jane", suggested_role="CTO", force_refresh=True
+        ))
+
+        controller.db_client.delete_profile.assert_awaited_once_with("profile-0")
+        assert pending_at_delete == [0]
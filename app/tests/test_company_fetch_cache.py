@@ -0,0 +1,167 @@
+"""
+Tests for the cross-request company fetch cache
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.cassidy.company_cache import CompanyFetchCache, CACHE_HIT, CACHE_MISS, CACHE_COALESCED
+from app.cassidy.models import CompanyProfile
+from app.cassidy.rate_limiter import TokenBucket
+from app.services.linkedin_pipeline import LinkedInDataPipeline
+
+
+def make_company(company_id: str) -> CompanyProfile:
+    return CompanyProfile(company_name=f"Company {company_id}", company_id=company_id)
+
+
+class TestCompanyFetchCache:
+    """Tests for CompanyFetchCache"""
+
+    def test_url_variants_share_a_key(self):
+        assert CompanyFetchCache.cache_key("https://www.linkedin.com/company/Acme/") == "acme"
+        assert CompanyFetchCache.cache_key("linkedin.com/company/acme?trk=x") == "acme"
+
+    async def test_second_lookup_is_a_hit(self):
+        cache = CompanyFetchCache(ttl_seconds=60, max_entries=10)
+        fetcher = AsyncMock(return_value=make_company("acme"))
+
+        first, first_outcome = await cache.get_or_fetch("https://linkedin.com/company/acme", fetcher)
+        second, second_outcome = await cache.get_or_fetch("https://www.linkedin.com/company/acme/", fetcher)
+
+        assert first is second
+        assert (first_outcome, second_outcome) == (CACHE_MISS, CACHE_HIT)
+        assert fetcher.await_count == 1
+
+    async def test_expired_entries_are_refetched(self):
+        cache = CompanyFetchCache(ttl_seconds=60, max_entries=10)
+        fetcher = AsyncMock(return_value=make_company("acme"))
+
+        with patch('app.cassidy.company_cache.time.monotonic', return_value=1000.0):
+            await cache.get_or_fetch("https://linkedin.com/company/acme", fetcher)
+        with patch('app.cassidy.company_cache.time.monotonic', return_value=1061.0):
+            _, outcome = await cache.get_or_fetch("https://linkedin.com/company/acme", fetcher)
+
+        assert outcome == CACHE_MISS
+        assert fetcher.await_count == 2
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = CompanyFetchCache(ttl_seconds=60, max_entries=2)
+
+        cache.put("https://linkedin.com/company/a", make_company("a"))
+        cache.put("https://linkedin.com/company/b", make_company("b"))
+        cache.get("https://linkedin.com/company/a")
+        cache.put("https://linkedin.com/company/c", make_company("c"))
+
+        assert cache.get("https://linkedin.com/company/a") is not None
+        assert cache.get("https://linkedin.com/company/b") is None
+        assert cache.stats()["evictions"] == 1
+
+    async def test_concurrent_requests_make_one_upstream_call(self):
+        cache = CompanyFetchCache(ttl_seconds=60, max_entries=10)
+        calls = 0
+
+        async def slow_fetch(url):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return make_company("acme")
+
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("https://linkedin.com/company/acme", slow_fetch) for _ in range(5))
+        )
+
+        assert calls == 1
+        assert sorted(outcome for _, outcome in results) == [CACHE_COALESCED] * 4 + [CACHE_MISS]
+        assert len({id(company) for company, _ in results}) == 1
+
+    async def test_failures_are_shared_but_not_cached(self):
+        cache = CompanyFetchCache(ttl_seconds=60, max_entries=10)
+
+        async def failing_fetch(url):
+            await asyncio.sleep(0.01)
+            raise Exception("Workflow failed")
+
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("https://linkedin.com/company/acme", failing_fetch) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, Exception) for r in results)
+        assert cache.get("https://linkedin.com/company/acme") is None
+
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        cache = CompanyFetchCache(ttl_seconds=60, max_entries=10)
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch_after_release(url):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return make_company("acme")
+
+        leader = asyncio.create_task(cache.get_or_fetch("https://linkedin.com/company/acme", fetch_after_release))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_fetch("https://linkedin.com/company/acme", fetch_after_release))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        company, outcome = await follower
+        assert leader.cancelled()
+        assert (company.company_id, outcome) == ("acme", CACHE_COALESCED)
+        assert cache.get("https://linkedin.com/company/acme") is company
+        assert calls == 1
+
+    async def test_zero_ttl_disables_caching(self):
+        cache = CompanyFetchCache(ttl_seconds=0, max_entries=10)
+        fetcher = AsyncMock(return_value=make_company("acme"))
+
+        await cache.get_or_fetch("https://linkedin.com/company/acme", fetcher)
+        await cache.get_or_fetch("https://linkedin.com/company/acme", fetcher)
+
+        assert fetcher.await_count == 2
+
+
+class TestPipelineCompanyCache:
+    """Tests for company cache use in LinkedInDataPipeline._fetch_companies"""
+
+    @pytest.fixture
+    def pipeline(self):
+        with patch('app.services.linkedin_pipeline.CassidyClient'), \
+             patch('app.services.linkedin_pipeline.SupabaseClient'), \
+             patch('app.services.linkedin_pipeline.EmbeddingService'):
+            pipeline = LinkedInDataPipeline()
+        pipeline.rate_limiter = TokenBucket(rate_per_minute=600, capacity=100)
+        pipeline.company_cache = CompanyFetchCache(ttl_seconds=60, max_entries=10)
+        return pipeline
+
+    async def test_cached_companies_skip_cassidy(self, pipeline):
+        pipeline.cassidy_client.fetch_company = AsyncMock(return_value=make_company("acme"))
+        urls = ["https://linkedin.com/company/acme"]
+
+        await pipeline._fetch_companies(urls)
+        timings = []
+        companies = await pipeline._fetch_companies(urls, timings)
+
+        assert [c.company_id for c in companies] == ["acme"]
+        assert pipeline.cassidy_client.fetch_company.await_count == 1
+        assert timings[0]["cache"] == CACHE_HIT
+        assert timings[0]["in_flight_seconds"] == 0.0
+
+    async def test_concurrent_ingestions_share_one_fetch(self, pipeline):
+        async def slow_fetch(url):
+            await asyncio.sleep(0.01)
+            return make_company("acme")
+
+        pipeline.cassidy_client.fetch_company = Mock(side_effect=slow_fetch)
+        urls = ["https://linkedin.com/company/acme"]
+
+        results = await asyncio.gather(*(pipeline._fetch_companies(urls) for _ in range(4)))
+
+        assert all(len(companies) == 1 for companies in results)
+        assert pipeline.cassidy_client.fetch_company.call_count == 1
@@ -16,6 +16,9 @@ import uuid
 from app.repositories.company_repository import CompanyRepository
 from app.models.canonical.company import CanonicalCompany, CanonicalFundingInfo, CanonicalCompanyLocation
 
+# Fail any repository test whose call blocks the event loop (asyncio debug mode)
+pytestmark = pytest.mark.usefixtures("fail_on_loop_blocking")
+
 
 # --- Test Data Fixtures ---
 
@@ -192,6 +195,36 @@ async def test_get_by_linkedin_id_success(company_repository, sample_db_row):
     assert isinstance(result, CanonicalCompany)
     assert result.company_id == "123456"
 
+@pytest.mark.asyncio
+async def test_link_many_to_profile_single_upsert(company_repository):
+    """Test linking a profile to many companies in one upsert."""
+    mock_result = Mock()
+    mock_result.data = [{"id": "link-1"}, {"id": "link-2"}]
+    upsert_mock = company_repository.supabase_client.client.table.return_value.upsert
+    upsert_mock.return_value.execute = AsyncMock(return_value=mock_result)
+
+    result = await company_repository.link_many_to_profile("profile-1", [
+        ("company-1", {"position_title": "CTO", "is_current": True}),
+        ("company-2", {"position_title": "Engineer", "start_date": "2018"}),
+        ("company-1", {"position_title": "Intern"}),
+    ])
+
+    assert result == mock_result.data
+    company_repository.supabase_client.client.table.assert_called_with("profile_companies")
+    upsert_mock.assert_called_once()
+    rows = upsert_mock.call_args.args[0]
+    assert rows == [
+        {"profile_id": "profile-1", "company_id": "company-1", "job_title": "CTO", "is_current_role": True},
+        {"profile_id": "profile-1", "company_id": "company-2", "job_title": "Engineer", "start_date": "2018", "is_current_role": False},
+    ]
+    assert upsert_mock.call_args.kwargs["on_conflict"] == "profile_id,company_id"
+
+@pytest.mark.asyncio
+async def test_link_many_to_profile_empty(company_repository):
+    """Test that linking no companies makes no request."""
+    assert await company_repository.link_many_to_profile("profile-1", []) == []
+    company_repository.supabase_client.client.table.assert_not_called()
+
 @pytest.mark.asyncio
 async def test_update_company_success(company_repository, sample_company):
     """Test successful company update."""
@@ -213,16 +246,17 @@ async def test_update_company_success(company_repository, sample_company):
     # Verify database calls
     company_repository.client.table.return_value.update.assert_called_once()
 
-def test_upsert_by_linkedin_id_success(company_repository, sample_company):
+@pytest.mark.asyncio
+async def test_upsert_by_linkedin_id_success(company_repository, sample_company):
     """Test successful upsert by LinkedIn ID."""
     # Mock successful database response
     mock_result = Mock()
     mock_result.data = [{"id": str(uuid.uuid4()), "company_name": "Test Company Inc"}]
     
-    company_repository.client.table.return_value.upsert.return_value.execute.return_value = mock_result
+    company_repository.client.table.return_value.upsert.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test upsert
-    result = company_repository.upsert_by_linkedin_id(sample_company)
+    result = await company_repository.upsert_by_linkedin_id(sample_company)
     
     # Verify result
     assert result["company_name"] == "Test Company Inc"
@@ -232,17 +266,18 @@ def test_upsert_by_linkedin_id_success(company_repository, sample_company):
         ANY, on_conflict="linkedin_company_id"
     )
 
-def test_delete_company_success(company_repository):
+@pytest.mark.asyncio
+async def test_delete_company_success(company_repository):
     """Test successful company deletion."""
     # Mock successful database response
     mock_result = Mock()
     mock_result.data = [{"id": str(uuid.uuid4())}]
     
-    company_repository.client.table.return_value.delete.return_value.eq.return_value.execute.return_value = mock_result
+    company_repository.client.table.return_value.delete.return_value.eq.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test deletion
     company_id = str(uuid.uuid4())
-    result = company_repository.delete(company_id)
+    result = await company_repository.delete(company_id)
     
     # Verify result
     assert result is True
@@ -277,16 +312,17 @@ async def test_search_by_name_success(company_repository, sample_db_row):
         "company_name", "%Test Company%"
     )
 
-def test_search_by_domain_exact_match(company_repository, sample_db_row):
+@pytest.mark.asyncio
+async def test_search_by_domain_exact_match(company_repository, sample_db_row):
     """Test search by domain with exact match."""
     # Mock successful database response
     mock_result = Mock()
     mock_result.data = [sample_db_row]
     
-    company_repository.client.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value = mock_result
+    company_repository.client.table.return_value.select.return_value.eq.return_value.limit.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test exact domain search
-    results = company_repository.search_by_domain("testcompany.com", exact_match=True)
+    results = await company_repository.search_by_domain("testcompany.com", exact_match=True)
     
     # Verify results
     assert len(results) == 1
@@ -297,16 +333,17 @@ def test_search_by_domain_exact_match(company_repository, sample_db_row):
         "domain", "testcompany.com"
     )
 
-def test_search_by_domain_partial_match(company_repository, sample_db_row):
+@pytest.mark.asyncio
+async def test_search_by_domain_partial_match(company_repository, sample_db_row):
     """Test search by domain with partial match."""
     # Mock successful database response
     mock_result = Mock()
     mock_result.data = [sample_db_row]
     
-    company_repository.client.table.return_value.select.return_value.ilike.return_value.limit.return_value.execute.return_value = mock_result
+    company_repository.client.table.return_value.select.return_value.ilike.return_value.limit.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test partial domain search
-    results = company_repository.search_by_domain("testcompany", exact_match=False)
+    results = await company_repository.search_by_domain("testcompany", exact_match=False)
     
     # Verify results
     assert len(results) == 1
@@ -316,7 +353,8 @@ def test_search_by_domain_partial_match(company_repository, sample_db_row):
         "domain", "%testcompany%"
     )
 
-def test_get_companies_by_location(company_repository, sample_db_row):
+@pytest.mark.asyncio
+async def test_get_companies_by_location(company_repository, sample_db_row):
     """Test get companies by location."""
     # Mock successful database response
     mock_result = Mock()
@@ -327,26 +365,27 @@ def test_get_companies_by_location(company_repository, sample_db_row):
     mock_chain.select.return_value = mock_chain
     mock_chain.ilike.return_value = mock_chain  # Location search uses ilike
     mock_chain.limit.return_value = mock_chain
-    mock_chain.execute.return_value = mock_result
+    mock_chain.execute = AsyncMock(return_value=mock_result)
     company_repository.client.table.return_value = mock_chain
     
     # Test location search
-    results = company_repository.get_companies_by_location(city="San Francisco", country="United States")
+    results = await company_repository.get_companies_by_location(city="San Francisco", country="United States")
     
     # Verify results
     assert len(results) == 1
     assert isinstance(results[0], CanonicalCompany)
 
-def test_get_companies_by_industry(company_repository, sample_db_row):
+@pytest.mark.asyncio
+async def test_get_companies_by_industry(company_repository, sample_db_row):
     """Test get companies by industry."""
     # Mock successful database response
     mock_result = Mock()
     mock_result.data = [sample_db_row]
     
-    company_repository.client.table.return_value.select.return_value.contains.return_value.limit.return_value.execute.return_value = mock_result
+    company_repository.client.table.return_value.select.return_value.contains.return_value.limit.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test industry search
-    results = company_repository.get_companies_by_industry("Technology")
+    results = await company_repository.get_companies_by_industry("Technology")
     
     # Verify results
     assert len(results) == 1
@@ -359,7 +398,8 @@ def test_get_companies_by_industry(company_repository, sample_db_row):
 
 # --- Advanced Query Tests ---
 
-def test_get_companies_by_size_category_with_function(company_repository):
+@pytest.mark.asyncio
+async def test_get_companies_by_size_category_with_function(company_repository):
     """Test get companies by size category using database function."""
     # Mock successful database function response
     mock_result = Mock()
@@ -367,10 +407,10 @@ def test_get_companies_by_size_category_with_function(company_repository):
         {"id": str(uuid.uuid4()), "company_name": "Small Co", "employee_count": 25, "size_category": "Small"}
     ]
     
-    company_repository.client.rpc.return_value.execute.return_value = mock_result
+    company_repository.client.rpc.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test size category query
-    results = company_repository.get_companies_by_size_category("small", limit=10)
+    results = await company_repository.get_companies_by_size_category("small", limit=10)
     
     # Verify results
     assert len(results) == 1
@@ -382,7 +422,8 @@ def test_get_companies_by_size_category_with_function(company_repository):
         "limit_count": 10
     })
 
-def test_get_companies_by_size_category_fallback(company_repository):
+@pytest.mark.asyncio
+async def test_get_companies_by_size_category_fallback(company_repository):
     """Test get companies by size category using fallback when function fails."""
     # Mock failed database function call
     company_repository.client.rpc.side_effect = Exception("Function not found")
@@ -393,16 +434,17 @@ def test_get_companies_by_size_category_fallback(company_repository):
         {"id": str(uuid.uuid4()), "company_name": "Small Co", "employee_count": 25}
     ]
     
-    company_repository.client.table.return_value.select.return_value.gte.return_value.lt.return_value.limit.return_value.execute.return_value = mock_result
+    company_repository.client.table.return_value.select.return_value.gte.return_value.lt.return_value.limit.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test size category query with fallback
-    results = company_repository.get_companies_by_size_category("small", limit=10)
+    results = await company_repository.get_companies_by_size_category("small", limit=10)
     
     # Verify results
     assert len(results) == 1
     assert results[0]["size_category"] == "Small"
 
-def test_get_startup_companies_with_function(company_repository):
+@pytest.mark.asyncio
+async def test_get_startup_companies_with_function(company_repository):
     """Test get startup companies using database function."""
     # Mock successful database function response
     mock_result = Mock()
@@ -418,10 +460,10 @@ def test_get_startup_companies_with_function(company_repository):
         }
     ]
     
-    company_repository.client.rpc.return_value.execute.return_value = mock_result
+    company_repository.client.rpc.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test startup query
-    results = company_repository.get_startup_companies(limit=10)
+    results = await company_repository.get_startup_companies(limit=10)
     
     # Verify results
     assert len(results) == 1
@@ -433,7 +475,8 @@ def test_get_startup_companies_with_function(company_repository):
         "limit_count": 10
     })
 
-def test_vector_similarity_search_success(company_repository):
+@pytest.mark.asyncio
+async def test_vector_similarity_search_success(company_repository):
     """Test vector similarity search."""
     # Mock successful database function response
     mock_result = Mock()
@@ -445,11 +488,11 @@ def test_vector_similarity_search_success(company_repository):
         }
     ]
     
-    company_repository.client.rpc.return_value.execute.return_value = mock_result
+    company_repository.client.rpc.return_value.execute = AsyncMock(return_value=mock_result)
     
     # Test vector search
     query_embedding = [0.1] * 1536  # Mock embedding
-    results = company_repository.vector_similarity_search(query_embedding, threshold=0.8, limit=5)
+    results = await company_repository.vector_similarity_search(query_embedding, threshold=0.8, limit=5)
     
     # Verify results
     assert len(results) == 1
@@ -547,13 +590,14 @@ async def test_search_by_name_database_error(company_repository):
     results = await company_repository.search_by_name("Test")
     assert results == []
 
-def test_vector_similarity_search_database_error(company_repository):
+@pytest.mark.asyncio
+async def test_vector_similarity_search_database_error(company_repository):
     """Test handling of database errors during vector search."""
     # Mock database error
     company_repository.client.rpc.side_effect = Exception("Database error")
     
     # Test error handling (should return empty list)
-    results = company_repository.vector_similarity_search([0.1] * 1536)
+    results = await company_repository.vector_similarity_search([0.1] * 1536)
     assert results == []
 
 
@@ -599,3 +643,4 @@ def test_model_with_none_values(company_repository):
     assert company.company_name == "Test Co"
     assert company.company_id is None
     assert company.description is None
+
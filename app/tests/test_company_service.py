@@ -179,18 +179,22 @@ class TestCompanyService:
             for i in range(3)
         ]
         
-        mock_company_repo.get_by_linkedin_id.return_value = None
-        mock_company_repo.create.side_effect = [
-            {"id": str(uuid.uuid4()), "company_name": f"Company {i}"} for i in range(3)
+        mock_company_repo.get_by_linkedin_ids.return_value = {}
+        mock_company_repo.search_by_name.return_value = []
+        mock_company_repo.bulk_upsert.side_effect = lambda rows: [
+            {"id": str(uuid.uuid4()), "company_name": company.company_name} for _, company in rows
         ]
         
         # Execute
         results = await company_service.batch_process_companies(companies)
         
-        # Verify
+        # Verify - one lookup and one write for the whole batch
         assert len(results) == 3
         assert all(result["success"] for result in results)
-        assert mock_company_repo.create.call_count == 3
+        assert [result["action"] for result in results] == ["created"] * 3
+        mock_company_repo.get_by_linkedin_ids.assert_awaited_once_with(["123450", "123451", "123452"])
+        mock_company_repo.bulk_upsert.assert_awaited_once()
+        mock_company_repo.create.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_batch_process_companies_handles_errors(self, company_service, mock_company_repo, sample_company_data):
@@ -201,6 +205,9 @@ class TestCompanyService:
             for i in range(3)
         ]
         
+        mock_company_repo.get_by_linkedin_ids.return_value = {}
+        mock_company_repo.search_by_name.return_value = []
+        mock_company_repo.bulk_upsert.side_effect = Exception("Database error")
         mock_company_repo.get_by_linkedin_id.return_value = None
         mock_company_repo.create.side_effect = [
             {"id": str(uuid.uuid4()), "company_name": "Company 0"},
@@ -218,6 +225,54 @@ class TestCompanyService:
         assert results[1]["error"] == "Database error"
         assert results[2]["success"] is True
 
+    @pytest.mark.asyncio
+    async def test_batch_process_companies_bulk_matches_and_dedupes(self, company_service, mock_company_repo, sample_company_data):
+        """Test bulk processing resolves LinkedIn IDs, name matches leftovers and merges in-batch duplicates."""
+        # Setup
+        existing_id = str(uuid.uuid4())
+        similar_id = str(uuid.uuid4())
+        existing = CanonicalCompany(**{**sample_company_data, "id": existing_id})
+        similar = CanonicalCompany(**{**sample_company_data, "id": similar_id, "company_id": "999", "company_name": "Acme Widgets Inc"})
+        companies = [
+            CanonicalCompany(**{**sample_company_data, "description": "Updated description"}),
+            CanonicalCompany(**{**sample_company_data, "company_id": None, "company_name": "Acme Widgets"}),
+            CanonicalCompany(**{**sample_company_data, "company_id": "555", "company_name": "Brand New Co"}),
+            CanonicalCompany(**{**sample_company_data, "company_id": "555", "company_name": "Brand New Co", "employee_count": 42}),
+        ]
+        
+        mock_company_repo.get_by_linkedin_ids.return_value = {"123456": existing}
+        mock_company_repo.search_by_name.side_effect = lambda name: [similar] if "Acme" in name else []
+        mock_company_repo.bulk_upsert.side_effect = lambda rows: [
+            {"id": company_id or str(uuid.uuid4()), "company_name": company.company_name} for company_id, company in rows
+        ]
+        
+        # Execute
+        results = await company_service.batch_process_companies(companies)
+        
+        # Verify - name search only for the companies the LinkedIn ID lookup did not resolve
+        searched = sorted(call.args[0] for call in mock_company_repo.search_by_name.await_args_list)
+        assert searched == ["Acme Widgets", "Brand New Co"]
+        
+        rows = mock_company_repo.bulk_upsert.await_args.args[0]
+        assert len(rows) == 3
+        assert rows[0][0] == existing_id and rows[0][1].description == "Updated description"
+        assert rows[1][0] == similar_id
+        assert rows[2][0] is None and rows[2][1].employee_count == 42
+        
+        assert [result["action"] for result in results] == ["updated", "updated", "created", "updated"]
+        assert results[0]["company_id"] == existing_id
+        assert results[1]["company_id"] == similar_id
+        assert results[2]["company_id"] == results[3]["company_id"]
+        mock_company_repo.update.assert_not_called()
+        mock_company_repo.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_process_companies_empty(self, company_service, mock_company_repo):
+        """Test that an empty batch makes no database calls."""
+        assert await company_service.batch_process_companies([]) == []
+        mock_company_repo.get_by_linkedin_ids.assert_not_called()
+        mock_company_repo.bulk_upsert.assert_not_called()
+
     # Test 3.7 & 3.8: Profile-company relationship management
 
     def test_link_profile_to_company_success(self, company_service, mock_company_repo):
@@ -248,29 +303,53 @@ class TestCompanyService:
         assert result["company_id"] == company_id
         assert result["position_title"] == "Software Engineer"
 
-    def test_unlink_profile_from_company(self, company_service, mock_company_repo):
+    @pytest.mark.asyncio
+    async def test_link_profile_to_companies_bulk(self, company_service, mock_company_repo):
+        """Test linking a profile to many companies with one repository call."""
+        # Setup
+        profile_id = str(uuid.uuid4())
+        links = [(str(uuid.uuid4()), {"position_title": f"Role {i}"}) for i in range(3)]
+        mock_company_repo.link_many_to_profile.return_value = [{"id": str(uuid.uuid4())} for _ in links]
+        
+        # Execute
+        result = await company_service.link_profile_to_companies(profile_id, links)
+        
+        # Verify
+        mock_company_repo.link_many_to_profile.assert_awaited_once_with(profile_id, links)
+        assert len(result) == 3
+
+    @pytest.mark.asyncio
+    async def test_link_profile_to_companies_requires_position_title(self, company_service, mock_company_repo):
+        """Test that bulk linking validates every work experience before writing."""
+        links = [(str(uuid.uuid4()), {"position_title": "CTO"}), (str(uuid.uuid4()), {})]
+        
+        with pytest.raises(ValueError, match="position_title"):
+            await company_service.link_profile_to_companies(str(uuid.uuid4()), links)
+        mock_company_repo.link_many_to_profile.assert_not_called()
+
+    async def test_unlink_profile_from_company(self, company_service, mock_company_repo):
         """Test unlinking a profile from a company."""
         # Setup
         profile_id = str(uuid.uuid4())
         company_id = str(uuid.uuid4())
         
         # Execute
-        company_service.unlink_profile_from_company(profile_id, company_id)
+        await company_service.unlink_profile_from_company(profile_id, company_id)
         
         # Verify
-        mock_company_repo.unlink_from_profile.assert_called_once_with(profile_id, company_id)
+        mock_company_repo.unlink_from_profile.assert_awaited_once_with(profile_id, company_id)
 
-    def test_get_companies_for_profile(self, company_service, mock_company_repo, canonical_company):
+    async def test_get_companies_for_profile(self, company_service, mock_company_repo, canonical_company):
         """Test retrieving all companies associated with a profile."""
         # Setup
         profile_id = str(uuid.uuid4())
         mock_company_repo.get_companies_for_profile.return_value = [canonical_company]
         
         # Execute
-        result = company_service.get_companies_for_profile(profile_id)
+        result = await company_service.get_companies_for_profile(profile_id)
         
         # Verify
-        mock_company_repo.get_companies_for_profile.assert_called_once_with(profile_id)
+        mock_company_repo.get_companies_for_profile.assert_awaited_once_with(profile_id)
         assert result == [canonical_company]
 
     # Test 3.9: Error handling and transaction management
@@ -300,6 +379,7 @@ class TestCompanyService:
         """Test that batch processing handles transaction failures gracefully."""
         # Setup
         companies = [CanonicalCompany(**sample_company_data) for _ in range(2)]
+        mock_company_repo.get_by_linkedin_ids.side_effect = Exception("Transaction failed")
         mock_company_repo.get_by_linkedin_id.return_value = None
         mock_company_repo.create.side_effect = Exception("Transaction failed")
         
@@ -0,0 +1,109 @@
+"""
+Tests for the content-hash embedding cache
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.database.embedding_cache import EmbeddingCache, SQLiteEmbeddingStore, embedding_cache_key
+from app.database.embeddings import EmbeddingService
+
+
+def make_service(cache):
+    service = EmbeddingService(api_key="test-key", cache=cache)
+
+    def respond(model, input):
+        inputs = [input] if isinstance(input, str) else input
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[float(len(text.split())), 1.0]) for text in inputs]
+        response.usage = MagicMock(total_tokens=sum(len(text.split()) for text in inputs))
+        return response
+
+    service.client = MagicMock()
+    service.client.embeddings.create = AsyncMock(side_effect=respond)
+    return service
+
+
+class TestEmbeddingCacheKey:
+    def test_whitespace_normalized(self):
+        assert embedding_cache_key("model-a", "Name: Jane  |\n About") == embedding_cache_key("model-a", " Name: Jane | About ")
+
+    def test_model_and_text_sensitive(self):
+        assert embedding_cache_key("model-a", "text") != embedding_cache_key("model-b", "text")
+        assert embedding_cache_key("model-a", "text") != embedding_cache_key("model-a", "Text")
+
+
+class TestEmbeddingCache:
+    async def test_lru_eviction(self):
+        cache = EmbeddingCache(max_entries=2)
+        await cache.put_many("m", {"a": ([1.0], 1), "b": ([2.0], 1)})
+        await cache.get_many(["a"])
+        await cache.put_many("m", {"c": ([3.0], 1)})
+
+        found = await cache.get_many(["a", "b", "c"])
+
+        assert set(found) == {"a", "c"}
+        assert cache.stats()["entries"] == 2
+
+    async def test_persistent_tier_survives_new_cache(self, tmp_path):
+        path = str(tmp_path / "embeddings.db")
+        await EmbeddingCache(store=SQLiteEmbeddingStore(path)).put_many("m", {"a": ([0.5, 0.25], 7)})
+
+        # A fresh process: empty memory tier, same SQLite file
+        cache = EmbeddingCache(store=SQLiteEmbeddingStore(path))
+        found = await cache.get_many(["a", "missing"])
+
+        assert found == {"a": ([0.5, 0.25], 7)}
+        stats = cache.stats()
+        assert (stats["memory_hits"], stats["store_hits"], stats["misses"]) == (0, 1, 1)
+
+        # Promoted into the memory tier
+        await cache.get_many(["a"])
+        assert cache.stats()["memory_hits"] == 1
+
+    async def test_store_errors_are_misses(self):
+        store = MagicMock()
+        store.get_many = AsyncMock(side_effect=ConnectionError("database unavailable"))
+        store.put_many = AsyncMock(side_effect=ConnectionError("database unavailable"))
+        cache = EmbeddingCache(store=store)
+
+        assert await cache.get_many(["a"]) == {}
+        await cache.put_many("m", {"a": ([1.0], 1)})
+
+        assert await cache.get_many(["a"]) == {"a": ([1.0], 1)}
+        assert cache.stats()["store_errors"] == 2
+
+
+@pytest.mark.usefixtures("word_encoding")
+class TestEmbeddingServiceCaching:
+    async def test_cached_texts_skip_openai(self, tmp_path):
+        service = make_service(EmbeddingCache(store=SQLiteEmbeddingStore(str(tmp_path / "embeddings.db"))))
+        texts = ["one two", "one two three", "one two"]
+
+        first_vectors, first_saved = await service.generate_cached_embeddings(texts)
+        second_vectors, second_saved = await service.generate_cached_embeddings(texts)
+
+        # The duplicate text was only sent once, and the second call never reached OpenAI
+        service.client.embeddings.create.assert_awaited_once()
+        assert service.client.embeddings.create.call_args.kwargs["input"] == ["one two", "one two three"]
+        assert first_vectors == second_vectors
+        assert first_saved == [None, None, None]
+        assert second_saved == [2, 3, 2]
+
+    async def test_single_embedding_uses_cache(self):
+        service = make_service(EmbeddingCache())
+
+        first = await service.generate_embedding("Name: Jane Doe")
+        second = await service.generate_embedding("Name:  Jane Doe ")
+
+        assert first == second
+        service.client.embeddings.create.assert_awaited_once()
+
+    async def test_empty_texts_not_cached(self):
+        service = make_service(EmbeddingCache())
+
+        vectors, saved = await service.generate_cached_embeddings(["", "   "])
+
+        assert saved == [None, None]
+        assert all(not any(vector) for vector in vectors)
+        service.client.embeddings.create.assert_not_awaited()
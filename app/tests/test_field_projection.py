@@ -0,0 +1,124 @@
+"""
+Tests for column projection on profile and company list queries
+"""
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from postgrest import AsyncPostgrestClient
+
+from app.database.supabase_client import SupabaseClient, PROFILE_RESPONSE_COLUMNS
+from app.repositories.company_repository import CompanyRepository, COMPANY_RESPONSE_COLUMNS
+
+
+def stored_profile(index: int) -> dict:
+    """linkedin_profiles row as stored, including the 1536-float embedding"""
+    return {
+        "id": f"00000000-0000-0000-0000-{index:012d}",
+        "linkedin_id": f"person-{index}",
+        "name": f"Person {index}",
+        "url": f"https://www.linkedin.com/in/person-{index}/",
+        "position": "Engineer",
+        "about": "Builds things. " * 20,
+        "city": "Austin",
+        "country_code": "US",
+        "followers": 500,
+        "connections": 500,
+        "profile_image_url": None,
+        "current_company": {"name": "Acme"},
+        "experience": [{"title": "Engineer", "company": "Acme", "description": "Work. " * 30}] * 3,
+        "education": [{"school": "State University", "degree": "BS"}],
+        "certifications": [],
+        "suggested_role": None,
+        "created_at": "2025-08-25T00:00:00+00:00",
+        "timestamp": "2025-08-25T00:00:00+00:00",
+        "embedding": [0.0123456789] * 1536,
+    }
+
+
+@pytest.fixture
+async def postgrest_db():
+    """SupabaseClient talking PostgREST to an in-memory linkedin_profiles table"""
+    rows = [stored_profile(i) for i in range(50)]
+    transferred = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        select = request.url.params.get("select", "*")
+        projected = rows if select == "*" else [
+            {column: row[column] for column in select.split(",")} for row in rows
+        ]
+        response = httpx.Response(200, json=projected)
+        transferred.append(len(response.content))
+        return response
+
+    with patch("app.database.supabase_client.settings") as mock_settings:
+        mock_settings.SUPABASE_URL = "https://example.supabase.co"
+        mock_settings.SUPABASE_ANON_KEY = "anon-key"
+        db = SupabaseClient()
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    postgrest = AsyncPostgrestClient("https://example.supabase.co/rest/v1", http_client=http_client)
+    db.client = Mock(table=postgrest.from_)
+    db._client_initialized = True
+    yield db, transferred
+    await http_client.aclose()
+
+
+class TestProfileProjection:
+    async def test_search_requests_response_columns_only(self):
+        with patch("app.database.supabase_client.settings") as mock_settings:
+            mock_settings.SUPABASE_URL = "https://example.supabase.co"
+            mock_settings.SUPABASE_ANON_KEY = "anon-key"
+            db = SupabaseClient()
+        db._ensure_client = AsyncMock()
+        db.client = Mock()
+        db.client.rpc.return_value.execute = AsyncMock(return_value=Mock(data={"profiles": [], "total": 0}))
+
+        await db.search_profiles_with_total()
+        await db.search_profiles_with_total(columns=["id", "url", "created_at", "name"])
+
+        default_params = db.client.rpc.call_args_list[0].args[1]
+        assert default_params["p_columns"] == list(PROFILE_RESPONSE_COLUMNS)
+        assert "embedding" not in default_params["p_columns"]
+        assert db.client.rpc.call_args_list[1].args[1]["p_columns"] == ["id", "url", "created_at", "name"]
+
+    async def test_list_projection_payload_size(self, postgrest_db):
+        """Payload size of select=* versus the projected list columns"""
+        db, transferred = postgrest_db
+
+        async def fetch(columns):
+            profiles = await db.list_recent_profiles(limit=50, columns=columns)
+            return profiles, transferred[-1]
+
+        full_profiles, full_bytes = await fetch(("*",))
+        default_profiles, default_bytes = await fetch(PROFILE_RESPONSE_COLUMNS)
+        sparse_profiles, sparse_bytes = await fetch(("id", "url", "created_at", "name", "city"))
+
+        assert "embedding" in full_profiles[0]
+        assert "embedding" not in default_profiles[0]
+        assert set(sparse_profiles[0]) == {"id", "url", "created_at", "name", "city"}
+        # The embedding dominates the row: dropping it alone cuts the payload several-fold
+        assert default_bytes * 3 < full_bytes
+        assert sparse_bytes * 10 < full_bytes
+
+
+class TestCompanyProjection:
+    @pytest.fixture
+    def company_repository(self):
+        wrapper = Mock()
+        wrapper.client = Mock()
+        wrapper._ensure_client = AsyncMock(return_value=None)
+        return CompanyRepository(wrapper)
+
+    async def test_columns_passed_to_select(self, company_repository):
+        table = company_repository.client.table.return_value
+        table.select.return_value.order.return_value.order.return_value.range.return_value.execute = AsyncMock(return_value=Mock(data=[]))
+
+        await company_repository.get_all(limit=10)
+        await company_repository.get_all(limit=10, columns=COMPANY_RESPONSE_COLUMNS)
+
+        assert table.select.call_args_list[0].args == ("*",)
+        selected = table.select.call_args_list[1].args[0].split(",")
+        assert "embedding" not in selected
+        assert "raw_data" not in selected
+        assert {"id", "company_name", "employee_count"} <= set(selected)
@@ -0,0 +1,244 @@
+"""
+Tests for incremental re-ingestion: only changed columns, links and embeddings are written
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.cassidy.models import LinkedInProfile
+from app.database.embedding_cache import embedding_cache_key
+from app.database.supabase_client import SupabaseClient
+from app.services.company_service import CompanyService
+from app.services.profile_diff import diff_profile_columns, diff_profile_links
+
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+def profile_text(profile):
+    return f"{profile.full_name} | {profile.about}"
+
+
+def make_profile(**overrides):
+    fields = dict(
+        full_name="Jane Exec",
+        profile_id="jane",
+        linkedin_url="https://www.linkedin.com/in/jane/",
+        about="Technology leader",
+        city="Austin",
+        follower_count=500,
+        experiences=[{"title": "CTO", "company": "Acme", "company_id": "100"}]
+    )
+    fields.update(overrides)
+    return LinkedInProfile(**fields)
+
+
+def stored_row(profile, **overrides):
+    """linkedin_profiles row as stored for a profile"""
+    # profile_to_columns needs no connection
+    row = SupabaseClient.__new__(SupabaseClient).profile_to_columns(profile)
+    row.update(
+        id="profile-1",
+        suggested_role="CTO",
+        embedding_text_hash=embedding_cache_key(EMBEDDING_MODEL, profile_text(profile))
+    )
+    row.update(overrides)
+    return row
+
+
+class TestProfileDiff:
+    def test_unchanged_profile_has_no_changes(self):
+        profile = make_profile()
+        fresh = SupabaseClient.__new__(SupabaseClient).profile_to_columns(profile)
+
+        assert diff_profile_columns(stored_row(profile), fresh) == {}
+
+    def test_scalar_and_list_changes(self):
+        stored = stored_row(make_profile())
+        fresh = SupabaseClient.__new__(SupabaseClient).profile_to_columns(make_profile(
+            about="Technology and security leader",
+            experiences=[
+                {"title": "CTO", "company": "Acme", "company_id": "100"},
+                {"title": "VP Engineering", "company": "Globex", "company_id": "200"}
+            ]
+        ))
+
+        changes = diff_profile_columns(stored, fresh)
+
+        assert changes["about"] == {"old": "Technology leader", "new": "Technology and security leader"}
+        assert changes["experience"] == {"added": 1, "removed": 0}
+        assert set(changes) == {"about", "experience"}
+
+    def test_json_key_order_is_not_a_change(self):
+        stored = {"current_company": {"name": "Acme", "id": "100"}}
+        fresh = {"current_company": {"id": "100", "name": "Acme"}}
+
+        assert diff_profile_columns(stored, fresh) == {}
+
+    def test_link_diff(self):
+        stored_links = [
+            {"company_id": "c1", "job_title": "CTO", "is_current_role": True},
+            {"company_id": "c2", "job_title": "VP", "is_current_role": None},
+            {"company_id": "c3", "job_title": "Engineer", "is_current_role": False},
+        ]
+        desired = {
+            "c1": {"profile_id": "p", "company_id": "c1", "job_title": "CTO", "is_current_role": True},
+            "c2": {"profile_id": "p", "company_id": "c2", "job_title": "SVP", "is_current_role": False},
+            "c4": {"profile_id": "p", "company_id": "c4", "job_title": "Advisor", "is_current_role": False},
+        }
+
+        assert diff_profile_links(stored_links, desired) == (["c4"], ["c2"], ["c3"])
+
+
+class TestSyncProfileLinks:
+    @pytest.fixture
+    def company_repo(self):
+        repo = MagicMock()
+        repo.get_profile_links = AsyncMock(return_value=[
+            {"company_id": "c1", "job_title": "CTO", "is_current_role": True},
+            {"company_id": "c2", "job_title": "Engineer", "is_current_role": False},
+        ])
+        repo.link_many_to_profile = AsyncMock(return_value=[])
+        repo.unlink_many_from_profile = AsyncMock(return_value=1)
+        return repo
+
+    async def test_only_differences_are_written(self, company_repo):
+        service = CompanyService(company_repo)
+
+        changes = await service.sync_profile_links("profile-1", [
+            ("c1", {"position_title": "CTO", "is_current": True}),
+            ("c3", {"position_title": "Advisor"}),
+        ])
+
+        assert changes == {"added": ["c3"], "updated": [], "removed": ["c2"]}
+        company_repo.link_many_to_profile.assert_awaited_once_with("profile-1", [("c3", {"position_title": "Advisor"})])
+        company_repo.unlink_many_from_profile.assert_awaited_once_with("profile-1", ["c2"])
+
+    async def test_stale_links_kept_when_companies_incomplete(self, company_repo):
+        service = CompanyService(company_repo)
+
+        changes = await service.sync_profile_links(
+            "profile-1", [("c1", {"position_title": "CTO", "is_current": True})], remove_stale=False
+        )
+
+        assert changes == {"added": [], "updated": [], "removed": []}
+        company_repo.link_many_to_profile.assert_not_awaited()
+        company_repo.unlink_many_from_profile.assert_not_awaited()
+
+
+class TestPipelineUpdateProfile:
+    @pytest.fixture
+    def pipeline(self, make_pipeline):
+        pipeline = make_pipeline(action="updated", enrichment_queue=MagicMock())
+        pipeline.embedding_service = MagicMock(model=EMBEDDING_MODEL)
+        pipeline.embedding_service.profile_to_text = profile_text
+        pipeline.embedding_service.company_to_text = lambda company: company.company_name
+        pipeline.embedding_service.generate_cached_embeddings = AsyncMock(
+            side_effect=lambda texts: ([[0.1, 0.2] for _ in texts], [None] * len(texts))
+        )
+        pipeline.db_client.profile_to_columns = SupabaseClient.__new__(SupabaseClient).profile_to_columns
+        pipeline.db_client.update_profile = AsyncMock(return_value=True)
+        pipeline.db_client.store_profile = AsyncMock()
+        pipeline.company_service.sync_profile_links = AsyncMock(
+            return_value={"added": [], "updated": [], "removed": []}
+        )
+        pipeline.company_service.company_repo.update_embeddings = AsyncMock(return_value=1)
+        return pipeline
+
+    async def test_unchanged_profile_only_records_fetch_time(self, pipeline):
+        profile = make_profile()
+        pipeline.cassidy_client.fetch_profile = AsyncMock(return_value=profile)
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            result = await pipeline.update_profile(
+                "https://www.linkedin.com/in/jane/", stored_row(profile), suggested_role="CTO"
+            )
+
+        assert result["status"] == "completed"
+        assert result["storage_ids"]["profile"] == "profile-1"
+        assert result["changes"] == {
+            "mode": "incremental",
+            "fields": {},
+            "reembedded": False,
+            "links": {"added": [], "updated": [], "removed": []}
+        }
+        # Only the fetch time is written
+        profile_id, patch_columns = pipeline.db_client.update_profile.call_args.args
+        assert list(patch_columns) == ["last_fetched_at"]
+        pipeline.db_client.store_profile.assert_not_awaited()
+        # Only the company text is embedded
+        assert pipeline.embedding_service.generate_cached_embeddings.call_args.args[0] == ["Acme"]
+        assert pipeline.company_service.sync_profile_links.call_args.kwargs["remove_stale"] is True
+
+    async def test_only_changed_columns_are_patched(self, pipeline):
+        stored = stored_row(make_profile())
+        pipeline.cassidy_client.fetch_profile = AsyncMock(return_value=make_profile(city="Denver"))
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            result = await pipeline.update_profile("https://www.linkedin.com/in/jane/", stored, suggested_role="CIO")
+
+        assert result["changes"]["fields"] == {
+            "city": {"old": "Austin", "new": "Denver"},
+            "suggested_role": {"old": "CTO", "new": "CIO"}
+        }
+        assert result["changes"]["reembedded"] is False
+        profile_id, patch_columns = pipeline.db_client.update_profile.call_args.args
+        assert profile_id == "profile-1"
+        assert set(patch_columns) == {"city", "suggested_role", "timestamp", "last_fetched_at"}
+        assert patch_columns["city"] == "Denver"
+
+    async def test_profile_reembedded_when_embedding_text_changes(self, pipeline):
+        stored = stored_row(make_profile())
+        fresh = make_profile(about="Technology and security leader")
+        pipeline.cassidy_client.fetch_profile = AsyncMock(return_value=fresh)
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            result = await pipeline.update_profile("https://www.linkedin.com/in/jane/", stored)
+
+        assert result["changes"]["reembedded"] is True
+        patch_columns = pipeline.db_client.update_profile.call_args.args[1]
+        assert patch_columns["embedding"] == [0.1, 0.2]
+        assert patch_columns["embedding_text_hash"] == embedding_cache_key(EMBEDDING_MODEL, profile_text(fresh))
+        assert "about" in patch_columns
+
+    async def test_failed_company_fetch_keeps_existing_links(self, pipeline):
+        profile = make_profile()
+        pipeline.cassidy_client.fetch_profile = AsyncMock(return_value=profile)
+        pipeline._fetch_companies = AsyncMock(return_value=[])
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = True
+            await pipeline.update_profile("https://www.linkedin.com/in/jane/", stored_row(profile))
+
+        assert pipeline.company_service.sync_profile_links.call_args.kwargs["remove_stale"] is False
+
+
+class TestProfileControllerIncrementalUpdate:
+    async def test_incremental_mode_patches_existing_profile(self):
+        from main import ProfileController, ProfileCreateRequest
+
+        stored = {"id": "profile-1", "url": "https://www.linkedin.com/in/jane/", "name": "Jane Exec", "created_at": "2025-08-27T00:00:00Z"}
+        changes = {"mode": "incremental", "fields": {"city": {"old": "Austin", "new": "Denver"}}, "reembedded": False,
+                   "links": {"added": [], "updated": [], "removed": []}}
+        db_client = MagicMock()
+        db_client.get_profile_by_url = AsyncMock(return_value=stored)
+        db_client.get_profile_by_id = AsyncMock(return_value=stored)
+        db_client.delete_profile = AsyncMock()
+        pipeline = MagicMock()
+        pipeline.update_profile = AsyncMock(return_value={
+            "pipeline_id": "pipeline-1", "status": "completed", "companies": [],
+            "storage_ids": {"profile": "profile-1"}, "changes": changes
+        })
+        controller = ProfileController(db_client, MagicMock(), MagicMock(), linkedin_pipeline=pipeline, batch_runner=MagicMock())
+
+        response = await controller.create_profile(ProfileCreateRequest(
+            linkedin_url="https://www.linkedin.com/in/jane", suggested_role="CTO", update_mode="incremental"
+        ))
+
+        db_client.delete_profile.assert_not_awaited()
+        pipeline.ingest_profile.assert_not_called()
+        assert pipeline.update_profile.call_args.args == ("https://www.linkedin.com/in/jane/", stored)
+        assert response.changes == changes
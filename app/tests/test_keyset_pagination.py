@@ -0,0 +1,164 @@
+"""
+Tests for keyset (cursor) pagination of profiles, companies and scoring jobs
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from postgrest import AsyncPostgrestClient
+
+from app.core.pagination import apply_keyset, decode_cursor, encode_cursor, page_after
+from app.database.supabase_client import SupabaseClient
+from app.exceptions import InvalidCursorError
+from app.repositories.company_repository import CompanyRepository
+from app.services.scoring_job_service import ScoringJobService
+
+
+def rows(count: int) -> list:
+    """Rows with pairs sharing a created_at, so the id has to break ties"""
+    return [
+        {"id": f"00000000-0000-0000-0000-{index:012d}", "created_at": f"2025-08-25T10:00:{59 - index // 2:02d}+00:00"}
+        for index in range(count)
+    ]
+
+
+class TestCursor:
+    def test_round_trip(self):
+        cursor = encode_cursor("followers", "ASC", "500", "profile-1")
+
+        assert decode_cursor(cursor, "followers", "asc") == ("500", "profile-1")
+        assert "=" not in cursor
+
+    def test_null_sort_value_round_trip(self):
+        cursor = encode_cursor("city", "desc", None, "profile-1")
+
+        assert decode_cursor(cursor, "city", "desc") == (None, "profile-1")
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor("created_at", "desc", 5, "p")[:-2] + "!!"])
+    def test_malformed_cursor_rejected(self, cursor):
+        with pytest.raises(InvalidCursorError) as exc_info:
+            decode_cursor(cursor, "created_at", "desc")
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.error_code == "INVALID_CURSOR"
+
+    def test_cursor_for_other_sort_rejected(self):
+        cursor = encode_cursor("name", "asc", "Jane", "profile-1")
+
+        with pytest.raises(InvalidCursorError) as exc_info:
+            decode_cursor(cursor, "created_at", "desc")
+
+        assert exc_info.value.details["cursor_sort_by"] == "name"
+
+    def test_keyset_filter_and_tie_breaker(self):
+        query = AsyncPostgrestClient("https://example.supabase.co/rest/v1").from_("companies").select("*")
+        cursor = encode_cursor("created_at", "desc", "2025-08-25T10:00:00.5+00:00", "company-9")
+
+        params = apply_keyset(query, cursor).range(0, 10).params
+
+        assert params["order"] == "created_at.desc,id.desc"
+        assert params["or"] == (
+            '(created_at.lt."2025-08-25T10:00:00.5+00:00",'
+            'and(created_at.eq."2025-08-25T10:00:00.5+00:00",id.lt."company-9"))'
+        )
+
+    def test_page_after_walks_every_row_once(self):
+        table = sorted(rows(7), key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        seen, cursor = [], None
+        while True:
+            after = decode_cursor(cursor, "created_at", "desc") if cursor else None
+            remaining = [
+                row for row in table
+                if after is None or (row["created_at"], row["id"]) < (after[0], after[1])
+            ]
+            page, cursor = page_after(remaining[:3], 2)
+            seen.extend(row["id"] for row in page)
+            if cursor is None:
+                break
+
+        assert seen == [row["id"] for row in table]
+
+
+class TestProfileSearchCursor:
+    @pytest.fixture
+    def search_client(self):
+        with patch("app.database.supabase_client.settings") as mock_settings:
+            mock_settings.SUPABASE_URL = "https://test.supabase.co"
+            mock_settings.SUPABASE_ANON_KEY = "test-key"
+            db = SupabaseClient()
+        db._ensure_client = AsyncMock()
+        db.client = MagicMock()
+        rpc_response = MagicMock()
+        rpc_response.data = {
+            "total": 3,
+            "profiles": [{"id": "p1"}, {"id": "p2"}],
+            "next": {"value": "Austin", "id": "p2"}
+        }
+        db.client.rpc.return_value.execute = AsyncMock(return_value=rpc_response)
+        return db
+
+    async def test_next_cursor_continues_after_last_row(self, search_client):
+        _, _, next_cursor = await search_client.search_profiles_page(sort_by="city", sort_order="asc", limit=2)
+        await search_client.search_profiles_page(sort_by="city", sort_order="asc", limit=2, cursor=next_cursor)
+
+        first_params = search_client.client.rpc.call_args_list[0].args[1]
+        second_params = search_client.client.rpc.call_args_list[1].args[1]
+        assert first_params["p_after_value"] is None and first_params["p_after_id"] is None
+        assert second_params["p_after_value"] == "Austin"
+        assert second_params["p_after_id"] == "p2"
+        assert second_params["p_offset"] == 0
+
+    async def test_last_page_has_no_cursor(self, search_client):
+        search_client.client.rpc.return_value.execute.return_value.data = {"total": 2, "profiles": [{"id": "p1"}], "next": None}
+
+        profiles, total, next_cursor = await search_client.search_profiles_page(limit=2)
+
+        assert [p["id"] for p in profiles] == ["p1"]
+        assert next_cursor is None
+
+    async def test_cursor_from_other_sort_rejected_before_query(self, search_client):
+        cursor = encode_cursor("created_at", "desc", "2025-08-25 10:00:00+00", "p2")
+
+        with pytest.raises(InvalidCursorError):
+            await search_client.search_profiles_page(sort_by="name", cursor=cursor)
+
+        search_client.client.rpc.assert_not_called()
+
+
+class TestTableCursors:
+    async def test_company_page_trims_extra_row(self):
+        wrapper = Mock()
+        wrapper.client = MagicMock()
+        wrapper._ensure_client = AsyncMock(return_value=None)
+        repository = CompanyRepository(wrapper)
+        table = wrapper.client.table.return_value
+        execute = AsyncMock(return_value=Mock(data=[dict(row, company_name=f"Company {i}") for i, row in enumerate(rows(3))]))
+        table.select.return_value.order.return_value.order.return_value.range.return_value.execute = execute
+
+        companies, next_cursor = await repository.get_page(limit=2)
+
+        assert [company.company_name for company in companies] == ["Company 0", "Company 1"]
+        table.select.return_value.order.return_value.order.return_value.range.assert_called_once_with(0, 2)
+        assert decode_cursor(next_cursor, "created_at", "desc") == (rows(3)[1]["created_at"], rows(3)[1]["id"])
+
+    async def test_invalid_company_cursor_not_swallowed(self):
+        wrapper = Mock()
+        wrapper.client = MagicMock()
+        wrapper._ensure_client = AsyncMock(return_value=None)
+
+        with pytest.raises(InvalidCursorError):
+            await CompanyRepository(wrapper).get_page(cursor="garbage")
+
+    async def test_scoring_jobs_next_cursor(self):
+        service = ScoringJobService(supabase_client=Mock())
+        service._ensure_client = AsyncMock()
+        service.client = MagicMock()
+        table = service.client.table.return_value
+        job_rows = [dict(row, profile_id="p", status="completed", prompt="Score") for row in rows(2)]
+        table.select.return_value.order.return_value.order.return_value.range.return_value.execute = AsyncMock(return_value=Mock(data=job_rows))
+        service.client.rpc.return_value.execute = AsyncMock(return_value=Mock(data=[{"group_key": None, "status": "completed", "job_count": 2}]))
+
+        jobs, stats, next_cursor = await service.list_jobs(limit=2)
+
+        assert len(jobs) == 2
+        assert next_cursor is None
+        assert stats["total_jobs"] == 2
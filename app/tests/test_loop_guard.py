@@ -0,0 +1,60 @@
+"""
+Tests for the debug-mode event loop blocking guard
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from app.repositories.company_repository import CompanyRepository
+from app.testing.loop_guard import detect_loop_blocking
+
+
+@pytest.fixture
+def company_repository():
+    wrapper = Mock()
+    wrapper.client = Mock()
+    wrapper._ensure_client = AsyncMock(return_value=None)
+    return CompanyRepository(wrapper)
+
+
+async def test_blocking_repository_call_reported(company_repository):
+    async def execute():
+        time.sleep(0.2)  # Synchronous I/O stand-in
+        return Mock(data=[])
+
+    company_repository.client.table.return_value.select.return_value.ilike.return_value.limit.return_value.execute = execute
+
+    with detect_loop_blocking(threshold=0.1) as blocking_steps:
+        # Run in its own task so the blocking step is reported before we inspect it
+        await asyncio.create_task(company_repository.search_by_domain("testcompany"))
+
+    assert len(blocking_steps) == 1
+    assert "took" in blocking_steps[0]
+
+
+async def test_awaiting_repository_call_not_reported(company_repository):
+    async def execute():
+        await asyncio.sleep(0.2)
+        return Mock(data=[])
+
+    company_repository.client.table.return_value.select.return_value.ilike.return_value.limit.return_value.execute = execute
+
+    loop = asyncio.get_running_loop()
+    with detect_loop_blocking(threshold=0.1) as blocking_steps:
+        await asyncio.create_task(company_repository.search_by_domain("testcompany"))
+
+    assert blocking_steps == []
+    # Debug mode is switched back off afterwards
+    assert not loop.get_debug()
+
+
+async def test_non_string_log_messages_ignored():
+    with detect_loop_blocking(threshold=0.1) as blocking_steps:
+        logging.getLogger("asyncio").warning(RuntimeError("Executing is not a format string"))
+        logging.getLogger("asyncio").warning({"event": "structured"})
+
+    assert blocking_steps == []
@@ -0,0 +1,121 @@
+"""
+Tests for in-process metrics, request latency middleware and pipeline stage timings
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+
+from app.testing.compatibility import TestClient
+from app.core.metrics import (
+    MetricsRegistry,
+    PIPELINE_STAGE_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    OPENAI_TOKENS,
+    record_openai_usage,
+    record_request_metrics,
+)
+from app.cassidy.models import LinkedInProfile
+from app.services.linkedin_pipeline import LinkedInDataPipeline
+
+
+class TestMetricsRegistry:
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage duration", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, stage="fetch")
+
+        lines = registry.render().splitlines()
+
+        assert "# TYPE stage_seconds histogram" in lines
+        assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 1' in lines
+        assert 'stage_seconds_bucket{stage="fetch",le="1.0"} 3' in lines
+        assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 4' in lines
+        assert 'stage_seconds_sum{stage="fetch"} 4.05' in lines
+        assert 'stage_seconds_count{stage="fetch"} 4' in lines
+
+    def test_counter_labels_and_quoting(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("hits_total", "Hits", ["upstream"])
+        counter.inc(upstream="cassidy")
+        counter.inc(2, upstream='say "hi"')
+
+        lines = registry.render().splitlines()
+
+        assert 'hits_total{upstream="cassidy"} 1' in lines
+        assert 'hits_total{upstream="say \\"hi\\""} 2' in lines
+        with pytest.raises(ValueError):
+            counter.inc(-1, upstream="cassidy")
+        with pytest.raises(ValueError):
+            counter.inc(wrong="label")
+
+    def test_timer_observes_when_block_raises(self):
+        histogram = MetricsRegistry().histogram("work_seconds", "Work", ["stage"])
+
+        with pytest.raises(RuntimeError):
+            with histogram.time(stage="store"):
+                raise RuntimeError("database unavailable")
+
+        assert histogram.count(stage="store") == 1
+
+    def test_token_usage_skips_missing_fields(self):
+        before = OPENAI_TOKENS.value(model="test-model", kind="prompt")
+
+        record_openai_usage("test-model", MagicMock(prompt_tokens=12, completion_tokens=None))
+        record_openai_usage("test-model", None)
+
+        assert OPENAI_TOKENS.value(model="test-model", kind="prompt") == before + 12
+        assert OPENAI_TOKENS.value(model="test-model", kind="completion") == 0
+
+
+class TestRequestMetricsMiddleware:
+    def test_route_latency_labelled_by_template(self):
+        app = FastAPI()
+        app.middleware("http")(record_request_metrics)
+
+        @app.get("/widgets/{widget_id}")
+        async def get_widget(widget_id: str):
+            return {"id": widget_id}
+
+        test_client = TestClient(app)
+        route = "/widgets/{widget_id}"
+        before = HTTP_REQUEST_SECONDS.count(method="GET", route=route, status="200")
+
+        assert test_client.get("/widgets/1").status_code == 200
+        assert test_client.get("/widgets/2").status_code == 200
+        assert test_client.get("/missing").status_code == 404
+
+        assert HTTP_REQUEST_SECONDS.count(method="GET", route=route, status="200") == before + 2
+        assert HTTP_REQUEST_SECONDS.count(method="GET", route="unmatched", status="404") >= 1
+
+
+class TestPipelineStageTimings:
+    async def test_ingest_profile_records_stage_timings(self):
+        with patch('app.services.linkedin_pipeline.CassidyClient'), \
+             patch('app.services.linkedin_pipeline.SupabaseClient'), \
+             patch('app.services.linkedin_pipeline.EmbeddingService'):
+            pipeline = LinkedInDataPipeline()
+
+        url = "https://www.linkedin.com/in/jane-doe"
+        pipeline.cassidy_client.fetch_profile = AsyncMock(
+            return_value=LinkedInProfile(full_name="Jane Doe", profile_id="jane-doe", linkedin_url=url)
+        )
+        pipeline.embedding_service = MagicMock()
+        pipeline.embedding_service.profile_to_text = MagicMock(return_value="Name: Jane Doe")
+        pipeline.embedding_service.generate_cached_embeddings = AsyncMock(return_value=([[0.1, 0.2]], [None]))
+        pipeline.db_client = MagicMock()
+        pipeline.db_client.store_profile = AsyncMock(return_value="profile-uuid")
+        pipeline.company_service = None
+
+        stages = ("profile_fetch", "embedding", "profile_store")
+        before = {stage: PIPELINE_STAGE_SECONDS.count(stage=stage) for stage in stages}
+
+        with patch('app.services.linkedin_pipeline.settings') as mock_settings:
+            mock_settings.ENABLE_COMPANY_INGESTION = False
+            result = await pipeline.ingest_profile(url)
+
+        assert result["status"] == "completed"
+        for stage in stages:
+            assert PIPELINE_STAGE_SECONDS.count(stage=stage) == before[stage] + 1
@@ -15,6 +15,7 @@ from app.cassidy.models import ProfileIngestionRequest
 from app.cassidy.workflows import EnrichedProfile
 from app.cassidy.models import LinkedInProfile
 from app.models.canonical.profile import RoleType
+from app.database.supabase_client import PROFILE_DIFF_COLUMNS
 
 
 class TestProfileControllerWorkflowIntegration:
@@ -169,7 +170,7 @@ class TestProfileControllerWorkflowIntegration:
             await profile_controller.create_profile(request)
             
             # Verify normalized URL was used for lookup
-            mock_db_client.get_profile_by_url.assert_called_once_with(expected_normalized)
+            mock_db_client.get_profile_by_url.assert_called_once_with(expected_normalized, columns=PROFILE_DIFF_COLUMNS)
 
     @pytest.mark.asyncio
     async def test_create_profile_duplicate_detection_with_normalization(
@@ -208,7 +209,7 @@ class TestProfileControllerWorkflowIntegration:
         result = await profile_controller.create_profile(request)
         
         # Should detect duplicate with normalized URL
-        mock_db_client.get_profile_by_url.assert_called_once_with("https://www.linkedin.com/in/testuser/")
+        mock_db_client.get_profile_by_url.assert_called_once_with("https://www.linkedin.com/in/testuser/", columns=PROFILE_DIFF_COLUMNS)
         
         # Should delete existing profile and create new one (smart update)
         mock_db_client.delete_profile.assert_called_once_with("existing123")
@@ -2,11 +2,13 @@
 Tests for profile REST API endpoints
 """
 
+import json
+
 import pytest
 from app.testing.compatibility import TestClient
 from unittest.mock import patch, MagicMock, AsyncMock
 
-from main import app
+from main import app, get_profile_controller, PaginationMetadata, ProfileListResponse, ProfileResponse
 from app.exceptions import ProfileAlreadyExistsError
 
 
@@ -85,3 +87,32 @@ class TestProfileEndpoints:
         
         # Verify that delete_profile was called with the existing profile ID
         mock_db_instance.delete_profile.assert_called_once_with("existing-profile-id")
+    
+    def test_list_profiles_ndjson_streams_every_page(self):
+        """Accept: application/x-ndjson streams each profile as a line, following next_cursor"""
+        def page(ids, next_cursor):
+            return ProfileListResponse(
+                data=[ProfileResponse(id=i, url=f"https://www.linkedin.com/in/{i}/", name=i, created_at="2025-08-26T00:00:00Z") for i in ids],
+                pagination=PaginationMetadata(limit=2, offset=0, has_more=next_cursor is not None, next_cursor=next_cursor)
+            )
+        
+        controller = MagicMock()
+        controller.list_profiles = AsyncMock(side_effect=[page(["a", "b"], "cursor-1"), page(["c"], None)])
+        app.dependency_overrides[get_profile_controller] = lambda: controller
+        try:
+            response = self.client.get(
+                "/api/v1/profiles?limit=2&offset=5&fields=name",
+                headers={**self.headers, "Accept": "application/x-ndjson"}
+            )
+        finally:
+            app.dependency_overrides.clear()
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [{"id": "a", "name": "a"}, {"id": "b", "name": "b"}, {"id": "c", "name": "c"}]
+        
+        # The offset applies to the first page only; later pages continue from the cursor
+        first_call, second_call = controller.list_profiles.call_args_list
+        assert (first_call.kwargs["offset"], first_call.kwargs["cursor"]) == (5, None)
+        assert (second_call.kwargs["offset"], second_call.kwargs["cursor"]) == (0, "cursor-1")
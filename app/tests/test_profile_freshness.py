@@ -0,0 +1,132 @@
+"""
+Tests for the profile freshness policy: recently fetched profiles are served from storage
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.config import settings
+
+
+def stored_profile(fetched_ago: timedelta, **overrides):
+    fetched_at = (datetime.now(timezone.utc) - fetched_ago).isoformat()
+    profile = {
+        "id": "profile-1",
+        "url": "https://www.linkedin.com/in/jane/",
+        "name": "Jane Exec",
+        "suggested_role": "CTO",
+        "created_at": "2025-08-01T00:00:00+00:00",
+        "last_fetched_at": fetched_at
+    }
+    profile.update(overrides)
+    return profile
+
+
+@pytest.fixture
+def freshness_window():
+    with patch.object(settings, "PROFILE_FRESHNESS_SECONDS", 3600):
+        yield
+
+
+@pytest.fixture
+def controller(freshness_window):
+    from main import ProfileController
+
+    db_client = MagicMock()
+    db_client.get_profile_by_url = AsyncMock(return_value=None)
+    db_client.get_profile_by_id = AsyncMock(return_value=stored_profile(timedelta(0), id="profile-2"))
+    db_client.delete_profile = AsyncMock(return_value=True)
+    db_client.update_profile_suggested_role = AsyncMock(return_value=True)
+    pipeline = MagicMock(enrichment_queue=None)
+    pipeline.ingest_profile = AsyncMock(return_value={
+        "pipeline_id": "pipeline-1",
+        "status": "completed",
+        "companies": [],
+        "storage_ids": {"profile": "profile-2"}
+    })
+    return ProfileController(db_client, MagicMock(), MagicMock(), linkedin_pipeline=pipeline, batch_runner=MagicMock())
+
+
+def create_request(**overrides):
+    from main import ProfileCreateRequest
+
+    fields = dict(linkedin_url="https://www.linkedin.com/in/jane", suggested_role="CTO")
+    fields.update(overrides)
+    return ProfileCreateRequest(**fields)
+
+
+class TestProfileFreshness:
+    async def test_fresh_profile_served_from_storage(self, controller):
+        controller.db_client.get_profile_by_url.return_value = stored_profile(timedelta(minutes=10))
+
+        response = await controller.create_profile(create_request())
+
+        assert response.served_from == "storage"
+        assert response.id == "profile-1"
+        controller.linkedin_pipeline.ingest_profile.assert_not_called()
+        controller.db_client.delete_profile.assert_not_awaited()
+        controller.db_client.update_profile_suggested_role.assert_not_awaited()
+
+    async def test_stale_profile_fetched_again(self, controller):
+        controller.db_client.get_profile_by_url.return_value = stored_profile(timedelta(hours=2))
+
+        response = await controller.create_profile(create_request())
+
+        assert response.served_from == "fresh"
+        assert response.id == "profile-2"
+        controller.linkedin_pipeline.ingest_profile.assert_awaited_once()
+
+    async def test_force_refresh_bypasses_window(self, controller):
+        controller.db_client.get_profile_by_url.return_value = stored_profile(timedelta(minutes=10))
+
+        response = await controller.create_profile(create_request(force_refresh=True))
+
+        assert response.served_from == "fresh"
+        controller.linkedin_pipeline.ingest_profile.assert_awaited_once()
+
+    async def test_created_at_used_for_profiles_without_fetch_time(self, controller):
+        recent = (datetime.now(timezone.utc) - timedelta(minutes=5)).isoformat()
+        controller.db_client.get_profile_by_url.return_value = stored_profile(
+            timedelta(0), last_fetched_at=None, created_at=recent
+        )
+
+        response = await controller.create_profile(create_request())
+
+        assert response.served_from == "storage"
+
+    async def test_new_suggested_role_applied_to_stored_profile(self, controller):
+        controller.db_client.get_profile_by_url.return_value = stored_profile(timedelta(minutes=10))
+
+        response = await controller.create_profile(create_request(suggested_role="CISO"))
+
+        controller.db_client.update_profile_suggested_role.assert_awaited_once_with("profile-1", "CISO")
+        assert response.suggested_role == "CISO"
+        controller.linkedin_pipeline.ingest_profile.assert_not_called()
+
+    async def test_zero_window_disables_policy(self, controller):
+        controller.db_client.get_profile_by_url.return_value = stored_profile(timedelta(seconds=1))
+
+        with patch.object(settings, "PROFILE_FRESHNESS_SECONDS", 0):
+            response = await controller.create_profile(create_request())
+
+        assert response.served_from == "fresh"
+
+    async def test_batch_counts_profiles_served_from_storage(self, controller):
+        from main import BatchProfileCreateRequest
+
+        async def lookup(url, columns=None):
+            if url == "https://www.linkedin.com/in/jane/":
+                return stored_profile(timedelta(minutes=10))
+            return None
+        controller.db_client.get_profile_by_url.side_effect = lookup
+
+        response = await controller.batch_create_profiles(BatchProfileCreateRequest(profiles=[
+            create_request(),
+            create_request(linkedin_url="https://www.linkedin.com/in/john")
+        ]))
+
+        assert response.successful == 2
+        assert response.served_from_storage == 1
+        assert sorted(result.served_from for result in response.results) == ["fresh", "storage"]
@@ -0,0 +1,217 @@
+"""
+Tests for per-URL single-flight and leasing of concurrent profile ingestions
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.profile_ingestion_lock import (
+    InMemoryIngestionLockBackend,
+    ProfileIngestionInProgressError,
+    ProfileIngestionLock,
+    SQLiteIngestionLockBackend,
+)
+
+URL = "https://www.linkedin.com/in/jane/"
+
+
+@pytest.fixture
+def lock():
+    return ProfileIngestionLock(InMemoryIngestionLockBackend(), ttl_seconds=60, wait_seconds=1, poll_seconds=0.01)
+
+
+class TestSingleFlight:
+    async def test_identical_requests_share_one_ingestion(self, lock):
+        release = asyncio.Event()
+        calls = 0
+
+        async def ingest():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"id": "profile-1"}
+
+        leader = asyncio.create_task(lock.run(URL, "same", ingest))
+        follower = asyncio.create_task(lock.run(URL, "same", ingest))
+        await asyncio.sleep(0.01)
+        assert lock.in_flight == 1
+
+        release.set()
+        assert await leader == ({"id": "profile-1"}, False)
+        assert await follower == ({"id": "profile-1"}, True)
+        assert calls == 1
+        assert lock.in_flight == 0
+
+    async def test_followers_receive_leader_error(self, lock):
+        async def ingest():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("Cassidy unavailable")
+
+        results = await asyncio.gather(lock.run(URL, "same", ingest), lock.run(URL, "same", ingest), return_exceptions=True)
+
+        assert [str(result) for result in results] == ["Cassidy unavailable", "Cassidy unavailable"]
+
+    async def test_different_requests_for_a_url_are_serialized(self, lock):
+        running, order = 0, []
+
+        async def ingest(name):
+            nonlocal running
+            running += 1
+            assert running == 1
+            order.append(name)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return name
+
+        results = await asyncio.gather(
+            lock.run(URL, "replace", lambda: ingest("replace")),
+            lock.run(URL, "incremental", lambda: ingest("incremental"))
+        )
+
+        assert sorted(order) == ["incremental", "replace"]
+        assert [shared for _, shared in results] == [False, False]
+        assert len(lock.backend) == 0
+
+    async def test_caller_cancellation_does_not_cancel_shared_ingestion(self, lock):
+        release = asyncio.Event()
+
+        async def ingest():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(lock.run(URL, "same", ingest))
+        follower = asyncio.create_task(lock.run(URL, "same", ingest))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        release.set()
+
+        assert await follower == ("done", True)
+
+
+class TestLeases:
+    async def test_wait_for_held_lease_times_out(self, lock):
+        await lock.backend.acquire(URL, "other-worker", 60)
+        lock.wait_seconds = 0.05
+        ingest = AsyncMock()
+
+        with pytest.raises(ProfileIngestionInProgressError):
+            await lock.run(URL, "same", ingest)
+
+        ingest.assert_not_awaited()
+
+    async def test_expired_lease_is_taken_over(self, lock):
+        await lock.backend.acquire(URL, "crashed-worker", 0)
+
+        result, _ = await lock.run(URL, "same", AsyncMock(return_value="stored"))
+
+        assert result == "stored"
+
+    async def test_lease_renewed_while_ingestion_runs(self, lock):
+        lock.ttl_seconds = 0.06
+
+        async def slow_ingest():
+            await asyncio.sleep(0.2)
+            # Long past the original ttl, another worker still can't take the URL
+            assert not await lock.backend.acquire(URL, "other-worker", 60)
+            return "stored"
+
+        result, _ = await lock.run(URL, "same", slow_ingest)
+
+        assert result == "stored"
+        assert len(lock.backend) == 0
+
+    async def test_poll_interval_backs_off(self, lock, monkeypatch):
+        await lock.backend.acquire(URL, "other-worker", 60)
+        lock.wait_seconds, lock.poll_seconds, lock.max_poll_seconds = 1, 0.1, 0.4
+        sleeps = []
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 4:
+                await lock.backend.release(URL, "other-worker")
+            await real_sleep(0)
+
+        monkeypatch.setattr("app.services.profile_ingestion_lock.asyncio.sleep", fake_sleep)
+
+        await lock.run(URL, "same", AsyncMock(return_value="stored"))
+
+        assert sleeps[:4] == [0.1, 0.2, 0.4, 0.4]
+
+    async def test_backend_errors_fail_open(self):
+        backend = MagicMock()
+        backend.acquire = AsyncMock(side_effect=ConnectionError("database unreachable"))
+        backend.release = AsyncMock()
+        lock = ProfileIngestionLock(backend, ttl_seconds=60, wait_seconds=1)
+
+        result, _ = await lock.run(URL, "same", AsyncMock(return_value="stored"))
+
+        assert result == "stored"
+        backend.release.assert_not_awaited()
+
+    async def test_sqlite_leases_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "locks.sqlite3")
+        worker_a, worker_b = SQLiteIngestionLockBackend(path), SQLiteIngestionLockBackend(path)
+        try:
+            assert await worker_a.acquire(URL, "a", 60)
+            assert not await worker_b.acquire(URL, "b", 60)
+
+            await worker_a.release(URL, "a")
+            assert await worker_b.acquire(URL, "b", 60)
+
+            # Releasing someone else's lease does nothing
+            await worker_a.release(URL, "a")
+            assert not await worker_a.acquire(URL, "a", 60)
+        finally:
+            await worker_a.close()
+            await worker_b.close()
+
+
+class TestProfileControllerLocking:
+    @pytest.fixture
+    def controller(self, lock):
+        from main import ProfileController
+
+        db_client = MagicMock()
+        db_client.get_profile_by_url = AsyncMock(return_value=None)
+        db_client.get_profile_by_id = AsyncMock(return_value={
+            "id": "profile-1", "url": URL, "name": "Jane Exec", "created_at": "2025-08-27T00:00:00Z"
+        })
+
+        async def ingest_profile(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return {"pipeline_id": "pipeline-1", "status": "completed", "companies": [], "storage_ids": {"profile": "profile-1"}}
+
+        pipeline = MagicMock()
+        pipeline.ingest_profile = AsyncMock(side_effect=ingest_profile)
+        return ProfileController(
+            db_client, MagicMock(), MagicMock(), linkedin_pipeline=pipeline, batch_runner=MagicMock(), ingestion_lock=lock
+        )
+
+    async def test_concurrent_posts_run_one_ingestion(self, controller):
+        from main import ProfileCreateRequest
+
+        request = ProfileCreateRequest(linkedin_url="https://linkedin.com/in/jane", suggested_role="CTO")
+        same_request = ProfileCreateRequest(linkedin_url="https://www.linkedin.com/in/jane/", suggested_role="CTO")
+
+        first, second = await asyncio.gather(controller.create_profile(request), controller.create_profile(same_request))
+
+        controller.linkedin_pipeline.ingest_profile.assert_awaited_once()
+        assert first.id == second.id == "profile-1"
+        assert first is not second
+
+    async def test_lease_timeout_is_a_conflict(self, controller, lock):
+        from fastapi import HTTPException
+        from main import ProfileCreateRequest
+
+        await lock.backend.acquire(URL, "other-worker", 60)
+        lock.wait_seconds = 0.05
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.create_profile(ProfileCreateRequest(linkedin_url=URL, suggested_role="CTO"))
+
+        assert exc_info.value.status_code == 409
+        assert exc_info.value.detail["error_code"] == "PROFILE_INGESTION_IN_PROGRESS"
+        controller.linkedin_pipeline.ingest_profile.assert_not_awaited()
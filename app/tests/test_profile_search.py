@@ -0,0 +1,77 @@
+"""
+Tests for SupabaseClient profile search via the search_profiles database function
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.database.supabase_client import SupabaseClient
+
+
+@pytest.fixture
+def search_client():
+    """SupabaseClient with a mocked async Supabase connection"""
+    with patch('app.database.supabase_client.settings') as mock_settings:
+        mock_settings.SUPABASE_URL = "https://test.supabase.co"
+        mock_settings.SUPABASE_ANON_KEY = "test-key"
+        mock_settings.VECTOR_DIMENSION = 1536
+        db = SupabaseClient()
+
+    db._ensure_client = AsyncMock()
+    db.client = MagicMock()
+    rpc_response = MagicMock()
+    rpc_response.data = {"total": 42, "profiles": [{"id": "p1"}, {"id": "p2"}]}
+    db.client.rpc.return_value.execute = AsyncMock(return_value=rpc_response)
+    return db
+
+
+class TestSearchProfiles:
+    """Tests for search_profiles / search_profiles_with_total"""
+
+    async def test_single_round_trip_with_exact_total(self, search_client):
+        profiles, total = await search_client.search_profiles_with_total(
+            name="jane", company="acme", location="austin", limit=2, offset=10
+        )
+
+        assert [p["id"] for p in profiles] == ["p1", "p2"]
+        assert total == 42
+        search_client.client.rpc.assert_called_once()
+        search_client.client.table.assert_not_called()
+
+        function_name, params = search_client.client.rpc.call_args[0]
+        assert function_name == "search_profiles"
+        assert params["p_name"] == "jane"
+        assert params["p_company"] == "acme"
+        assert params["p_location"] == "austin"
+        assert params["p_limit"] == 2
+        assert params["p_offset"] == 10
+        assert params["p_sort_by"] == "created_at"
+        assert params["p_sort_order"] == "desc"
+
+    async def test_search_profiles_returns_page_only(self, search_client):
+        profiles = await search_client.search_profiles(limit=2)
+
+        assert [p["id"] for p in profiles] == ["p1", "p2"]
+
+    async def test_empty_result(self, search_client):
+        search_client.client.rpc.return_value.execute.return_value.data = None
+
+        profiles, total = await search_client.search_profiles_with_total()
+
+        assert profiles == []
+        assert total == 0
+
+    @pytest.mark.parametrize("score_range, expected", [
+        (None, {"p_unscored": False, "p_score_min": None, "p_score_max": None, "p_score_max_inclusive": True}),
+        ("unscored", {"p_unscored": True, "p_score_min": None, "p_score_max": None, "p_score_max_inclusive": True}),
+        ("high", {"p_unscored": False, "p_score_min": 8.0, "p_score_max": 10.0, "p_score_max_inclusive": True}),
+        ("medium", {"p_unscored": False, "p_score_min": 5.0, "p_score_max": 8.0, "p_score_max_inclusive": False}),
+        ("low", {"p_unscored": False, "p_score_min": 1.0, "p_score_max": 5.0, "p_score_max_inclusive": False}),
+        ("7-10", {"p_unscored": False, "p_score_min": 7.0, "p_score_max": 10.0, "p_score_max_inclusive": True}),
+        ("bogus-range", {"p_unscored": False, "p_score_min": None, "p_score_max": None, "p_score_max_inclusive": True}),
+    ])
+    async def test_score_range_parameters(self, search_client, score_range, expected):
+        await search_client.search_profiles_with_total(score_range=score_range)
+
+        _, params = search_client.client.rpc.call_args[0]
+        assert {key: params[key] for key in expected} == expected
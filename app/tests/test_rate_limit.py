@@ -0,0 +1,234 @@
+"""
+Tests for the sliding-window rate limiter and its middleware
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core import rate_limit
+from app.core.rate_limit import (
+    InMemoryRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+    enforce_rate_limits,
+    request_limits,
+    sliding_window_hit,
+)
+
+
+class TestSlidingWindow:
+    def test_limit_reached_within_window(self):
+        state = None
+        for _ in range(3):
+            state, result = sliding_window_hit(state, 1000.0, limit=3, window_seconds=60)
+            assert result.allowed
+
+        state, result = sliding_window_hit(state, 1010.0, limit=3, window_seconds=60)
+
+        assert not result.allowed
+        assert result.remaining == 0
+        # Window 16 runs 960-1020s: 10s left, then the 3 hits must decay to below 2
+        assert result.retry_after == pytest.approx(10 + 60 / 3)
+        assert state.current == 3
+
+    def test_previous_window_weighted_by_overlap(self):
+        state = None
+        for _ in range(10):
+            state, _ = sliding_window_hit(state, 959.0, limit=10, window_seconds=60)
+
+        # Halfway through the next window half of the previous count still applies
+        allowed = 0
+        while True:
+            state, result = sliding_window_hit(state, 990.0, limit=10, window_seconds=60)
+            if not result.allowed:
+                break
+            allowed += 1
+
+        assert allowed == 5
+        assert 0 < result.retry_after <= 30
+
+    def test_state_older_than_one_window_is_reset(self):
+        state, _ = sliding_window_hit(None, 10.0, limit=1, window_seconds=60)
+
+        state, result = sliding_window_hit(state, 200.0, limit=1, window_seconds=60)
+
+        assert result.allowed
+        assert (state.current, state.previous) == (1, 0)
+
+
+class TestBackends:
+    async def test_memory_evicts_expired_keys(self):
+        backend = InMemoryRateLimitBackend()
+        with patch("app.core.rate_limit.time.time", return_value=1000.0):
+            for profile in range(50):
+                await backend.hit(f"profile_scoring:{profile}", 10, 60)
+        assert len(backend) == 50
+
+        with patch("app.core.rate_limit.time.time", return_value=2000.0):
+            for _ in range(25):
+                await backend.hit("api_key:abc", 60, 60)
+
+        assert len(backend) == 1
+
+    async def test_sqlite_counters_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "limits.sqlite3")
+        first_worker, second_worker = SQLiteRateLimitBackend(path), SQLiteRateLimitBackend(path)
+        try:
+            results = [await backend.hit("upstream:cassidy", 3, 60) for backend in (first_worker, second_worker) * 2]
+        finally:
+            await first_worker.close()
+            await second_worker.close()
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert results[-1].retry_after > 0
+
+    async def test_postgres_single_hit_uses_hit_many_rpc(self):
+        db = MagicMock()
+        db._ensure_client = AsyncMock()
+        db.client.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"allowed": False, "remaining": 0, "retry_after": 12.5}])
+        )
+
+        result = await PostgresRateLimitBackend(db).hit("api_key:abc", 60, 60.0)
+
+        db.client.rpc.assert_called_once_with("rate_limit_hit_many", {
+            "p_keys": ["api_key:abc"], "p_limits": [60], "p_window_seconds": [60.0]
+        })
+        assert not result.allowed
+        assert result.retry_after == 12.5
+
+    async def test_rejected_request_not_counted_on_other_counters(self, tmp_path):
+        sqlite_backend = SQLiteRateLimitBackend(str(tmp_path / "limits.sqlite3"))
+        try:
+            for backend in (InMemoryRateLimitBackend(), sqlite_backend):
+                hits = [("api_key:abc", 2, 60), ("profile_scoring:p1", 1, 3600)]
+
+                first = await backend.hit_many(hits)
+                rejected = await backend.hit_many(hits)
+
+                assert [result.allowed for result in first] == [True, True]
+                assert [result.allowed for result in rejected] == [True, False]
+                # The rejected request left the API key's count at 1
+                assert (await backend.hit("api_key:abc", 2, 60)).allowed
+        finally:
+            await sqlite_backend.close()
+
+    async def test_postgres_backend_checks_all_counters_in_one_rpc(self):
+        db = MagicMock()
+        db._ensure_client = AsyncMock()
+        db.client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[
+            {"allowed": True, "remaining": 59, "retry_after": 0},
+            {"allowed": False, "remaining": 0, "retry_after": 30.0}
+        ]))
+
+        results = await PostgresRateLimitBackend(db).hit_many([("api_key:abc", 60, 60.0), ("upstream:openai", 10, 60.0)])
+
+        db.client.rpc.assert_called_once_with("rate_limit_hit_many", {
+            "p_keys": ["api_key:abc", "upstream:openai"],
+            "p_limits": [60, 10],
+            "p_window_seconds": [60.0, 60.0]
+        })
+        assert [result.allowed for result in results] == [True, False]
+        assert results[1].retry_after == 30.0
+
+    async def test_backend_errors_fail_open(self):
+        backend = MagicMock()
+        backend.hit_many = AsyncMock(side_effect=ConnectionError("database unavailable"))
+
+        result = await RateLimiter(backend).check("api_key", "abc", 60, 60)
+
+        assert result.allowed
+
+    async def test_expired_counters_purged_while_checking(self, tmp_path):
+        backend = SQLiteRateLimitBackend(str(tmp_path / "limits.sqlite3"))
+        limiter = RateLimiter(backend, purge_interval_seconds=0)
+        try:
+            with patch("app.core.rate_limit.time.time", return_value=1000.0):
+                for profile in range(20):
+                    await backend.hit(f"profile_scoring:{profile}", 10, 60)
+
+            with patch("app.core.rate_limit.time.time", return_value=2000.0):
+                await limiter.check("api_key", "abc", 60, 60)
+
+            keys = backend._connection.execute("SELECT key FROM rate_limit_counters").fetchall()
+        finally:
+            await backend.close()
+
+        assert keys == [("api_key:abc",)]
+
+    async def test_postgres_purge_uses_rpc(self):
+        db = MagicMock()
+        db._ensure_client = AsyncMock()
+        db.client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=7))
+
+        assert await PostgresRateLimitBackend(db).purge_expired() == 7
+        db.client.rpc.assert_called_once_with("purge_rate_limit_counters", {})
+
+
+class TestRequestLimits:
+    def test_scoring_route_limits_profile_and_openai(self):
+        limits = request_limits("POST", "/api/v1/profiles/profile-1/score", "key-hash")
+
+        assert [(scope, identity) for scope, identity, _, _ in limits] == [
+            ("api_key", "key-hash"),
+            ("profile_scoring", "profile-1"),
+            ("upstream", "openai"),
+        ]
+
+    def test_ingestion_routes_only_limited_per_key(self):
+        # Cassidy load is bounded per workflow run, not per HTTP request
+        for path in ("/api/v1/profiles", "/api/v1/profiles/batch", "/api/v1/profiles/batches"):
+            assert [limit[0] for limit in request_limits("POST", path, "key-hash")] == ["api_key"]
+
+    def test_reads_only_limited_per_key_and_probes_exempt(self):
+        assert [limit[0] for limit in request_limits("GET", "/api/v1/profiles/profile-1", "key-hash")] == ["api_key"]
+        assert request_limits("GET", "/api/v1/health", "key-hash") == []
+
+
+class TestMiddleware:
+    @pytest.fixture
+    def limited_app(self):
+        app = FastAPI()
+        app.middleware("http")(enforce_rate_limits)
+
+        @app.post("/api/v1/profiles/{profile_id}/score")
+        async def score(profile_id: str):
+            return {"profile_id": profile_id}
+
+        return app
+
+    async def test_rejects_with_retry_after(self, limited_app):
+        transport = httpx.ASGITransport(app=limited_app)
+        with patch.object(rate_limit.settings, "RATE_LIMIT_PROFILE_SCORING_PER_HOUR", 2):
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as session:
+                responses = [
+                    await session.post("/api/v1/profiles/profile-1/score", headers={"x-api-key": "key"})
+                    for _ in range(3)
+                ]
+                other_profile = await session.post("/api/v1/profiles/profile-2/score", headers={"x-api-key": "key"})
+
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert responses[0].headers["X-RateLimit-Limit"] == str(rate_limit.settings.RATE_LIMIT_PER_MINUTE)
+        rejected = responses[2]
+        assert rejected.json()["detail"]["error_code"] == "RATE_LIMIT_EXCEEDED"
+        assert rejected.json()["detail"]["details"]["scope"] == "profile_scoring"
+        assert 0 < int(rejected.headers["Retry-After"]) <= 2 * 3600
+        assert other_profile.status_code == 200
+
+    async def test_request_rejected_by_one_limit_does_not_use_up_the_others(self, limited_app):
+        transport = httpx.ASGITransport(app=limited_app)
+        with patch.object(rate_limit.settings, "RATE_LIMIT_PROFILE_SCORING_PER_HOUR", 1), \
+             patch.object(rate_limit.settings, "RATE_LIMIT_PER_MINUTE", 3):
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as session:
+                statuses = [
+                    (await session.post("/api/v1/profiles/profile-1/score", headers={"x-api-key": "key"})).status_code
+                    for _ in range(3)
+                ]
+                other_profile = await session.post("/api/v1/profiles/profile-2/score", headers={"x-api-key": "key"})
+
+        assert statuses == [200, 429, 429]
+        assert other_profile.status_code == 200
+        assert other_profile.headers["X-RateLimit-Remaining"] == "1"
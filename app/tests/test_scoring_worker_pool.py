@@ -0,0 +1,218 @@
+"""
+Tests for the scoring job worker pool against the SQLite job queue stand-in
+"""
+
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+from app.services.scoring_job_queue import SQLiteScoringJobQueue
+from app.services.scoring_worker import ScoringWorkerPool
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteScoringJobQueue(str(tmp_path / "scoring_jobs.db"))
+
+
+def make_pool(queue, process_job, **overrides):
+    options = {
+        "worker_count": 4,
+        "per_model_limit": 4,
+        "poll_interval": 0.02,
+        "heartbeat_interval": 0.05,
+        "stale_after_seconds": 60,
+        "max_retries": 3,
+    }
+    options.update(overrides)
+    return ScoringWorkerPool(queue, process_job, **options)
+
+
+async def wait_until(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Condition not met before timeout")
+        await asyncio.sleep(0.02)
+
+
+class TestScoringWorkerPool:
+    """Tests for ScoringWorkerPool"""
+
+    async def test_jobs_processed_exactly_once_across_pools(self, queue):
+        job_ids = [await queue.enqueue(f"profile-{i}", "Evaluate") for i in range(30)]
+        processed = []
+
+        async def process(job):
+            processed.append(job.id)
+            await asyncio.sleep(0.01)
+            await queue.complete(job.id)
+            return True
+
+        pools = [make_pool(queue, process, worker_id=f"worker-{i}") for i in range(2)]
+        for pool in pools:
+            await pool.start()
+
+        async def all_completed():
+            return (await queue.list_statuses()).count("completed") == len(job_ids)
+
+        try:
+            await wait_until(all_completed)
+        finally:
+            for pool in pools:
+                await pool.stop()
+
+        assert sorted(processed) == sorted(job_ids)
+        assert sum(pool.stats()["claimed"] for pool in pools) == len(job_ids)
+
+    async def test_per_model_concurrency_cap(self, queue):
+        for i in range(6):
+            await queue.enqueue(f"profile-{i}", "Evaluate", model_name="gpt-4o")
+            await queue.enqueue(f"profile-{i}", "Evaluate", model_name="gpt-3.5-turbo")
+        active = defaultdict(int)
+        peak = defaultdict(int)
+
+        async def process(job):
+            active[job.model_name] += 1
+            peak[job.model_name] = max(peak[job.model_name], active[job.model_name])
+            await asyncio.sleep(0.05)
+            active[job.model_name] -= 1
+            await queue.complete(job.id)
+            return True
+
+        pool = make_pool(queue, process, worker_count=6, per_model_limit=2)
+        await pool.start()
+
+        async def all_completed():
+            return (await queue.list_statuses()).count("completed") == 12
+
+        try:
+            await wait_until(all_completed)
+        finally:
+            await pool.stop()
+
+        assert peak["gpt-4o"] == 2
+        assert peak["gpt-3.5-turbo"] == 2
+
+    async def test_heartbeat_refreshes_in_flight_jobs(self, queue):
+        job_id = await queue.enqueue("profile-1", "Evaluate")
+        release = asyncio.Event()
+
+        async def process(job):
+            await release.wait()
+            await queue.complete(job.id)
+            return True
+
+        pool = make_pool(queue, process, worker_count=1)
+        await pool.start()
+        try:
+            async def claimed():
+                return (await queue.get(job_id))["status"] == "processing"
+
+            await wait_until(claimed)
+            first_heartbeat = (await queue.get(job_id))["heartbeat_at"]
+
+            async def heartbeat_advanced():
+                return (await queue.get(job_id))["heartbeat_at"] > first_heartbeat
+
+            await wait_until(heartbeat_advanced)
+            assert (await queue.get(job_id))["worker_id"] == pool.worker_id
+        finally:
+            release.set()
+            await pool.stop()
+
+    async def test_stale_jobs_reclaimed_then_failed(self, queue):
+        job_id = await queue.enqueue("profile-1", "Evaluate")
+
+        # A worker that claimed the job and died without heartbeating
+        for expected_retry_count in (1, 2):
+            assert (await queue.claim("dead-worker")).id == job_id
+            assert await queue.reclaim_stale(stale_after_seconds=-1, max_retries=2) == 1
+            job = await queue.get(job_id)
+            assert job["status"] == "pending"
+            assert job["worker_id"] is None
+            assert job["retry_count"] == expected_retry_count
+
+        assert (await queue.claim("dead-worker")).id == job_id
+        assert await queue.reclaim_stale(stale_after_seconds=-1, max_retries=2) == 1
+        job = await queue.get(job_id)
+        assert job["status"] == "failed"
+        assert job["error_message"] == "Worker stopped responding while processing job"
+
+    async def test_fresh_heartbeat_not_reclaimed(self, queue):
+        await queue.enqueue("profile-1", "Evaluate")
+        await queue.claim("live-worker")
+
+        assert await queue.reclaim_stale(stale_after_seconds=60, max_retries=3) == 0
+
+    async def test_fallback_jobs_without_worker_not_reclaimed(self, queue):
+        job_id = await queue.enqueue("profile-1", "Evaluate")
+        # The in-process fallback marks the job processing without claiming it
+        await queue._execute(lambda connection: connection.execute(
+            "UPDATE scoring_jobs SET status = 'processing', started_at = '2000-01-01T00:00:00' WHERE id = ?", (job_id,)
+        ))
+
+        assert await queue.reclaim_stale(stale_after_seconds=-1, max_retries=3) == 0
+        assert (await queue.get(job_id))["status"] == "processing"
+
+    async def test_stop_releases_unfinished_jobs(self, queue):
+        job_id = await queue.enqueue("profile-1", "Evaluate")
+        started = asyncio.Event()
+
+        async def process(job):
+            started.set()
+            await asyncio.sleep(60)
+            return True
+
+        pool = make_pool(queue, process, worker_count=1)
+        await pool.start()
+        await asyncio.wait_for(started.wait(), timeout=5.0)
+        await pool.stop(timeout=0.1)
+
+        job = await queue.get(job_id)
+        assert job["status"] == "pending"
+        assert job["worker_id"] is None
+        assert pool.stats()["released"] == 1
+        assert not pool.running
+
+    async def test_processor_exception_fails_job(self, queue):
+        job_id = await queue.enqueue("profile-1", "Evaluate", max_tokens=500, temperature=0.3)
+        seen = []
+
+        async def process(job):
+            seen.append((job.max_tokens, job.temperature))
+            raise RuntimeError("OpenAI unavailable")
+
+        pool = make_pool(queue, process, worker_count=1)
+        await pool.start()
+
+        async def failed():
+            return (await queue.get(job_id))["status"] == "failed"
+
+        try:
+            await wait_until(failed)
+        finally:
+            await pool.stop()
+
+        assert seen == [(500, 0.3)]
+        assert (await queue.get(job_id))["error_message"] == "RuntimeError: OpenAI unavailable"
+        assert pool.stats()["failed"] == 1
+
+    async def test_notify_wakes_idle_workers(self, queue):
+        processed = asyncio.Event()
+
+        async def process(job):
+            await queue.complete(job.id)
+            processed.set()
+            return True
+
+        pool = make_pool(queue, process, worker_count=1, poll_interval=30)
+        await pool.start()
+        try:
+            await asyncio.sleep(0.05)
+            await queue.enqueue("profile-1", "Evaluate")
+            pool.notify()
+            await asyncio.wait_for(processed.wait(), timeout=2.0)
+        finally:
+            await pool.stop()
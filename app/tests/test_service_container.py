@@ -0,0 +1,73 @@
+"""
+Tests for the process-lifetime ServiceContainer and the per-request overhead it removes
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.service_container import ServiceContainer
+
+
+@pytest.fixture
+def offline_settings(word_encoding):
+    """Configured OpenAI/Supabase settings without touching the network or tiktoken downloads"""
+    with patch("app.services.linkedin_pipeline.settings") as pipeline_settings, \
+         patch("app.services.llm_scoring_service.settings") as llm_settings, \
+         patch("app.database.embeddings.settings") as embedding_settings:
+        pipeline_settings.SUPABASE_URL = "https://example.supabase.co"
+        pipeline_settings.SUPABASE_ANON_KEY = "anon-key"
+        pipeline_settings.OPENAI_API_KEY = "test-key"
+        llm_settings.OPENAI_API_KEY = "test-key"
+        embedding_settings.OPENAI_API_KEY = "test-key"
+        yield
+
+
+@pytest.fixture
+def container(offline_settings):
+    return ServiceContainer(MagicMock(), MagicMock(), MagicMock())
+
+
+class TestServiceContainer:
+    def test_services_share_one_connection_set(self, container):
+        assert container.linkedin_pipeline.db_client is container.db_client
+        assert container.linkedin_pipeline.cassidy_client is container.cassidy_client
+        assert container.linkedin_pipeline.company_service is container.company_service
+        assert container.company_service.company_repo is container.company_repository
+        assert container.job_service.supabase_client is container.db_client
+        assert container.llm_service.job_service is container.job_service
+        assert container.template_service.client is container.db_client
+        assert container.template_versioning_service.client is container.db_client
+        assert container.batch_ingestion_runner.batch_service.supabase_client is container.db_client
+        assert container.linkedin_pipeline.enrichment_queue is container.company_enrichment_queue
+        assert container.company_enrichment_queue.enrichment_service.supabase_client is container.db_client
+
+    async def test_close_releases_every_connection(self, container):
+        container.llm_service.client = MagicMock(close=AsyncMock(side_effect=RuntimeError("already closed")))
+        container.linkedin_pipeline.embedding_service.client = MagicMock(close=AsyncMock())
+
+        await container.close()
+
+        # A failing close does not stop the remaining clients from closing
+        container.llm_service.client.close.assert_awaited_once()
+        container.linkedin_pipeline.embedding_service.client.close.assert_awaited_once()
+
+    async def test_scoring_jobs_use_shared_llm_service(self, container):
+        job = MagicMock()
+        with patch("app.services.service_container.process_claimed_scoring_job", AsyncMock(return_value=True)) as process:
+            assert await container.process_scoring_job(job) is True
+
+        process.assert_awaited_once_with(job, llm_service=container.llm_service)
+
+
+class TestPerRequestOverhead:
+    """Requests look services up in the container instead of constructing them (the old getters)"""
+
+    def test_lookups_do_not_construct_services(self, container):
+        with patch("app.services.service_container.LinkedInDataPipeline") as pipeline_class, \
+             patch("app.services.service_container.LLMScoringService") as llm_service_class:
+            pipelines = {id(container.linkedin_pipeline) for _ in range(10)}
+            llm_services = {id(container.llm_service) for _ in range(10)}
+
+        assert len(pipelines) == len(llm_services) == 1
+        pipeline_class.assert_not_called()
+        llm_service_class.assert_not_called()
@@ -0,0 +1,93 @@
+"""
+Tests for the shared Supabase connection pool
+"""
+
+import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.database.supabase_client import SupabaseClient, _PoolStatsTransport
+from app.repositories.company_repository import CompanyRepository
+from app.services.scoring_job_service import ScoringJobService
+from app.services.template_service import TemplateService
+
+
+@pytest.fixture
+async def shared_pool():
+    with patch("app.database.supabase_client.settings") as mock_settings, \
+         patch("app.database.supabase_client.acreate_client", new_callable=AsyncMock) as create:
+        mock_settings.SUPABASE_URL = "https://example.supabase.co"
+        mock_settings.SUPABASE_ANON_KEY = "anon-key"
+        mock_settings.SUPABASE_MAX_CONNECTIONS = 2
+        mock_settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS = 1
+        mock_settings.SUPABASE_POOL_TIMEOUT = 5.0
+        create.side_effect = lambda url, key, options: MagicMock(httpx_client=options.httpx_client)
+        yield create
+        await SupabaseClient.close_pool()
+
+
+class TestSharedSupabasePool:
+    async def test_instances_and_services_share_one_pool(self, shared_pool):
+        stats_before = SupabaseClient.pool_stats()
+
+        first, second = SupabaseClient(), SupabaseClient()
+        job_service = ScoringJobService(supabase_client=SupabaseClient())
+        await first._ensure_client()
+        await second._ensure_client()
+        await job_service._ensure_client()
+
+        assert first.client is second.client is job_service.client
+        shared_pool.assert_awaited_once()
+        # Counts are process-wide; pools left open on other event loops are not ours
+        assert SupabaseClient.pool_stats()["pools_opened"] == stats_before["pools_opened"] + 1
+        assert SupabaseClient.pool_stats()["open_pools"] == stats_before["open_pools"] + 1
+
+        # Repositories and template services wrap whichever SupabaseClient they are given
+        assert CompanyRepository(second).supabase_client is second
+        assert TemplateService(supabase_client=second).client is second
+
+    async def test_pool_sized_from_settings(self, shared_pool):
+        db = SupabaseClient()
+        await db._ensure_client()
+
+        http_client = db.client.httpx_client
+        connection_pool = http_client._transport._pool
+        assert connection_pool._max_connections == 2
+        assert connection_pool._max_keepalive_connections == 1
+        assert http_client.timeout.pool == 5.0
+
+    async def test_close_pool_reopens_on_demand(self, shared_pool):
+        open_before = SupabaseClient.pool_stats()["open_pools"]
+        db = SupabaseClient()
+        await db._ensure_client()
+        http_client = db.client.httpx_client
+
+        await SupabaseClient.close_pool()
+
+        assert http_client.is_closed
+        assert SupabaseClient.pool_stats()["open_pools"] == open_before
+        await SupabaseClient()._ensure_client()
+        assert shared_pool.await_count == 2
+
+
+class TestPoolStatsTransport:
+    async def test_requests_waiting_for_a_connection_are_counted(self):
+        transport = _PoolStatsTransport()
+        busy = MagicMock(is_idle=MagicMock(return_value=False))
+        transport._pool = MagicMock(connections=[busy] * 20, _requests=[])
+        before = dict(SupabaseClient._pool_counters)
+
+        with patch.object(httpx.AsyncHTTPTransport, "handle_async_request", AsyncMock(return_value=httpx.Response(200))):
+            await transport.handle_async_request(httpx.Request("GET", "https://example.supabase.co/rest/v1/profiles"))
+            transport._pool.connections = [busy]
+            await transport.handle_async_request(httpx.Request("GET", "https://example.supabase.co/rest/v1/profiles"))
+
+        assert SupabaseClient._pool_counters["requests"] == before["requests"] + 2
+        assert SupabaseClient._pool_counters["waits"] == before["waits"] + 1
+
+    def test_pool_stats_report_usage(self):
+        stats = SupabaseClient.pool_stats()
+
+        for key in ("max_connections", "open_connections", "in_use_connections", "idle_connections",
+                    "queued_requests", "requests", "waits", "pools_opened"):
+            assert key in stats
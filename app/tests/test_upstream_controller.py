@@ -0,0 +1,258 @@
+"""
+Tests for the adaptive concurrency limit and circuit breaker in front of Cassidy and OpenAI
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.upstream import UpstreamController, parse_duration, retry_after_seconds
+from app.exceptions import UpstreamUnavailableError
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.response = MagicMock(headers=headers or {})
+        super().__init__(f"HTTP {status_code}")
+
+
+def make_controller(**overrides):
+    options = dict(
+        max_concurrency=8,
+        latency_target_seconds=1.0,
+        failure_threshold=3,
+        open_seconds=60.0,
+        max_throttle_wait_seconds=0.5,
+        failure_exceptions=(httpx.TimeoutException, httpx.TransportError)
+    )
+    options.update(overrides)
+    return UpstreamController("cassidy", **options)
+
+
+async def call(controller, status_code=200, error=None, headers=None):
+    async with controller.request() as upstream_call:
+        if error is not None:
+            raise error
+        upstream_call.record(status_code, headers)
+
+
+class TestRateLimitHeaders:
+    def test_durations(self):
+        assert parse_duration("30") == 30.0
+        assert parse_duration("20ms") == pytest.approx(0.02)
+        assert parse_duration("6m0s") == 360.0
+        assert parse_duration("1h2m3.5s") == 3723.5
+        assert parse_duration("soon") is None
+
+    def test_retry_after_and_exhausted_openai_budget(self):
+        assert retry_after_seconds({"Retry-After": "12"}) == 12.0
+        assert retry_after_seconds({"retry-after-ms": "1500"}) == 1.5
+        assert retry_after_seconds({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "2s",
+            "x-ratelimit-remaining-tokens": "1200",
+            "x-ratelimit-reset-tokens": "6m0s"
+        }) == 2.0
+        assert retry_after_seconds({"x-ratelimit-remaining-requests": "5", "x-ratelimit-reset-requests": "2s"}) is None
+
+
+class TestAdaptiveConcurrency:
+    async def test_errors_halve_limit_and_fast_successes_grow_it(self):
+        controller = make_controller()
+
+        with pytest.raises(HTTPError):
+            await call(controller, error=HTTPError(503))
+        assert controller.concurrency_limit == 4
+
+        # +1/limit per success: about +1 after limit's worth of successes
+        for _ in range(5):
+            await call(controller)
+        assert controller.concurrency_limit == 5
+
+    async def test_slow_successes_shrink_limit(self):
+        controller = make_controller(latency_target_seconds=0.0)
+
+        await call(controller)
+
+        assert controller.limit == pytest.approx(7.2)
+        assert controller.snapshot()["slow"] == 1
+
+    async def test_client_errors_do_not_change_limit(self):
+        controller = make_controller()
+
+        await call(controller, status_code=404)
+        with pytest.raises(ValueError):
+            await call(controller, error=ValueError("bad payload"))
+
+        assert controller.limit == 8.0
+        assert controller.consecutive_failures == 0
+
+    async def test_calls_beyond_limit_queue_for_a_slot(self):
+        controller = make_controller(max_concurrency=2)
+        running, peak = 0, 0
+
+        async def work():
+            nonlocal running, peak
+            async with controller.request():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert controller.in_flight == 0
+
+
+class TestThrottling:
+    async def test_short_retry_after_is_waited_out(self):
+        controller = make_controller()
+        with pytest.raises(HTTPError):
+            await call(controller, error=HTTPError(429, {"Retry-After": "0.2"}))
+
+        with patch('app.core.upstream.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            await call(controller)
+
+        assert mock_sleep.await_args.args[0] == pytest.approx(0.2, abs=0.05)
+        # A 429 means the upstream is up: it never counts towards the circuit
+        assert controller.circuit == "closed"
+        assert controller.consecutive_failures == 0
+
+    async def test_long_retry_after_fails_fast(self):
+        controller = make_controller()
+        await call(controller, status_code=429, headers={"Retry-After": "120"})
+
+        with pytest.raises(UpstreamUnavailableError) as exc_info:
+            await call(controller)
+
+        assert exc_info.value.retry_after == pytest.approx(120, abs=1)
+        assert exc_info.value.details["reason"] == "rate limited by upstream"
+
+
+class TestCircuitBreaker:
+    async def trip(self, controller):
+        for _ in range(controller.failure_threshold):
+            with pytest.raises(httpx.ReadTimeout):
+                await call(controller, error=httpx.ReadTimeout("timed out"))
+
+    async def test_consecutive_failures_open_circuit(self):
+        controller = make_controller()
+        await self.trip(controller)
+        work = AsyncMock()
+
+        with pytest.raises(UpstreamUnavailableError) as exc_info:
+            async with controller.request():
+                await work()
+
+        work.assert_not_awaited()
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.error_code == "UPSTREAM_UNAVAILABLE"
+        assert exc_info.value.details["last_error"] == "ReadTimeout: timed out"
+        assert controller.snapshot()["circuit"] == "open"
+        assert controller.snapshot()["rejected"] == 1
+
+    async def test_success_resets_failure_count(self):
+        controller = make_controller()
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await call(controller, error=httpx.ConnectError("refused"))
+        await call(controller)
+
+        assert controller.consecutive_failures == 0
+        assert controller.circuit == "closed"
+
+    async def test_successful_probe_closes_circuit(self):
+        controller = make_controller(open_seconds=0.0)
+        await self.trip(controller)
+
+        await call(controller)
+
+        assert controller.circuit == "closed"
+        assert controller.snapshot()["last_error"] is None
+
+    async def test_failed_probe_reopens_circuit(self):
+        controller = make_controller(open_seconds=0.0)
+        await self.trip(controller)
+
+        with pytest.raises(HTTPError):
+            await call(controller, error=HTTPError(502))
+
+        assert controller.circuit == "open"
+
+    async def test_only_one_probe_while_half_open(self):
+        controller = make_controller(open_seconds=0.0)
+        await self.trip(controller)
+        release = asyncio.Event()
+
+        async def probe():
+            async with controller.request():
+                await release.wait()
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        with pytest.raises(UpstreamUnavailableError):
+            await call(controller)
+
+        release.set()
+        await probe_task
+        assert controller.circuit == "closed"
+
+    async def test_queued_calls_fail_when_circuit_opens(self):
+        controller = make_controller(max_concurrency=1, failure_threshold=1)
+        release = asyncio.Event()
+
+        async def failing():
+            async with controller.request():
+                await release.wait()
+                raise httpx.ReadTimeout("timed out")
+
+        first = asyncio.create_task(failing())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(call(controller))
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(httpx.ReadTimeout):
+            await first
+        with pytest.raises(UpstreamUnavailableError):
+            await queued
+        assert controller.in_flight == 0
+
+
+class TestCassidyClientIntegration:
+    async def test_open_circuit_is_not_retried(self):
+        from app.cassidy.client import CassidyClient
+
+        client = CassidyClient()
+        client.upstream = make_controller(failure_threshold=1)
+        client.upstream.counters["failures"] = 1
+        client.upstream._open_circuit()
+        http_client = MagicMock()
+        http_client.post = AsyncMock()
+
+        with patch.object(client, "_get_http_client", AsyncMock(return_value=http_client)):
+            with pytest.raises(UpstreamUnavailableError):
+                await client._execute_workflow_with_retry(url="https://cassidy.test", payload={}, workflow_type="profile")
+
+        http_client.post.assert_not_awaited()
+
+    async def test_responses_feed_the_controller(self):
+        from app.cassidy.client import CassidyClient
+
+        client = CassidyClient()
+        client.upstream = make_controller()
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=httpx.Response(
+            500, json={"error": "boom"}, request=httpx.Request("POST", "https://cassidy.test")
+        ))
+
+        with patch.object(client, "_get_http_client", AsyncMock(return_value=http_client)):
+            with pytest.raises(Exception):
+                await client._execute_workflow_with_retry(url="https://cassidy.test", payload={}, workflow_type="profile")
+
+        assert client.upstream.counters["failures"] == 1
+        assert client.upstream.snapshot()["last_error"] == "HTTP 500"
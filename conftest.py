@@ -198,6 +198,90 @@ def cleanup_registry():
             print(f"Would clean up {len(resources)} {resource_type}: {resources}")
 
 
+@pytest.fixture(autouse=True)
+def reset_company_fetch_cache():
+    """
+    Clear the process-wide company fetch cache before each test.
+    
+    Cached companies would otherwise let one test skip the mocked Cassidy calls of another.
+    """
+    from app.cassidy.company_cache import get_company_fetch_cache
+    get_company_fetch_cache().clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolate_embedding_cache(monkeypatch):
+    """
+    Give each test an empty, memory-only embedding cache.
+    
+    Keeps tests from reusing each other's vectors or touching the persistent cache tier.
+    """
+    from app.database import embedding_cache
+    monkeypatch.setattr(embedding_cache, "_embedding_cache", embedding_cache.EmbeddingCache(max_entries=1000))
+    yield
+
+
+ROUTE_DEPENDENCY_GETTERS = (
+    "get_profile_controller",
+    "get_company_controller",
+    "get_profile_scoring_controller",
+    "get_scoring_job_controller",
+    "get_template_service",
+    "get_template_versioning_service",
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limit_counters():
+    """Start every test with empty in-memory rate limit counters."""
+    import app.core.rate_limit as rate_limit
+    rate_limit._rate_limiter = None
+    yield
+    rate_limit._rate_limiter = None
+
+
+@pytest.fixture(autouse=True)
+def reset_upstream_controllers():
+    """
+    Start every test with fresh Cassidy/OpenAI controllers.
+    
+    The controllers are process-wide, so a mocked 429 or outage in one test
+    would otherwise throttle or trip the circuit for the tests after it.
+    """
+    from app.core.upstream import reset_upstream_controllers
+    
+    reset_upstream_controllers()
+    yield
+    reset_upstream_controllers()
+
+
+@pytest.fixture(autouse=True)
+def route_dependencies_follow_patches():
+    """
+    Resolve route dependencies through main's module attributes at call time.
+
+    Routes bind their controller/service getters via Depends when main is imported,
+    so tests patching main.get_* would otherwise not reach the routes.
+    """
+    import sys
+    main = sys.modules.get("main")
+    if main is None:
+        yield
+        return
+
+    overridden = []
+    for name in ROUTE_DEPENDENCY_GETTERS:
+        getter = getattr(main, name, None)
+        if getter is None or getter in main.app.dependency_overrides:
+            continue
+        main.app.dependency_overrides[getter] = lambda name=name: getattr(main, name)()
+        overridden.append(getter)
+    yield
+    for getter in overridden:
+        main.app.dependency_overrides.pop(getter, None)
+
+
 @pytest.fixture
 def production_config():
     """
@@ -8,15 +8,17 @@ Updated: Test Nixpacks build after removing Docker files - build verification
 """
 
 import asyncio
+import json
 import os
 import uuid
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Header, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, HttpUrl, Field, ValidationError, field_validator
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple, AsyncIterator, Awaitable, Callable
 from datetime import datetime, timezone
 import traceback
 import logging
@@ -27,23 +29,37 @@ logger = logging.getLogger(__name__)
 from app.cassidy.client import CassidyClient
 from app.cassidy.workflows import LinkedInWorkflow
 from app.cassidy.models import ProfileIngestionRequest
-from app.database.supabase_client import SupabaseClient
+from app.database.supabase_client import SupabaseClient, PROFILE_RESPONSE_COLUMNS, PROFILE_DIFF_COLUMNS
+from app.repositories.company_repository import COMPANY_RESPONSE_COLUMNS
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE_LATEST, record_request_metrics, registry as metrics_registry
+from app.core.rate_limit import close_rate_limiter, enforce_rate_limits
+from app.core.upstream import upstream_health
 from app.models.errors import ErrorResponse, ValidationErrorResponse
 from app.exceptions import (
     LinkedInIngestionError,
     InvalidLinkedInURLError,
-    ProfileAlreadyExistsError
+    ProfileAlreadyExistsError,
+    InvalidCursorError,
+    UpstreamUnavailableError
 )
 from app.cassidy.exceptions import CassidyWorkflowError
 from app.models.canonical import CanonicalProfile
 from app.models.canonical.profile import RoleType
 from app.models.scoring import ScoringRequest, ScoringResponse, JobRetryRequest
 from app.controllers.scoring_controllers import ProfileScoringController, ScoringJobController
+from app.services.scoring_worker import (
+    get_scoring_worker_pool, start_scoring_worker_pool, stop_scoring_worker_pool
+)
 from app.services.template_service import TemplateService
 from app.services.template_versioning_service import TemplateVersioningService
+from app.services.service_container import ServiceContainer
+from app.services.batch_ingestion_service import BatchIngestionRunner, BatchIngestionService
+from app.services.profile_ingestion_lock import ProfileIngestionInProgressError, ProfileIngestionLock
 from app.api.routes.profile_verification import router as profile_verification_router
 from app.api.routes.role_compatibility import router as role_compatibility_router
+from app.api.routes.cassidy_callbacks import router as cassidy_callbacks_router
+from app.cassidy.callbacks import check_callback_settings, close_cassidy_callback_registry, get_cassidy_callback_registry
 from app.models.template_models import (
     PromptTemplate,
     CreateTemplateRequest,
@@ -84,15 +100,70 @@ def normalize_linkedin_url(url: str) -> str:
     
     return url
 
+def build_services() -> ServiceContainer:
+    """Build the process-lifetime service container and the controllers that use it"""
+    container = ServiceContainer(get_db_client(), get_cassidy_client(), get_linkedin_workflow())
+    container.profile_controller = ProfileController(
+        container.db_client,
+        container.cassidy_client,
+        container.linkedin_workflow,
+        linkedin_pipeline=container.linkedin_pipeline,
+        batch_runner=container.batch_ingestion_runner,
+        ingestion_lock=container.profile_ingestion_lock
+    )
+    container.company_controller = CompanyController(container.db_client, company_service=container.company_service)
+    container.profile_scoring_controller = ProfileScoringController(
+        db_client=container.db_client,
+        job_service=container.job_service,
+        llm_service=container.llm_service,
+        template_service=container.template_service
+    )
+    container.scoring_job_controller = ScoringJobController(
+        job_service=container.job_service,
+        llm_service=container.llm_service
+    )
+    return container
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources at startup and release them at shutdown"""
+    global services
+    check_callback_settings()
+    await CassidyClient.open_pool()
+    if settings.SUPABASE_URL and settings.SUPABASE_ANON_KEY:
+        await SupabaseClient.open_pool()
+    services = build_services()
+    app.state.services = services
+    if settings.SCORING_WORKER_ENABLED:
+        await start_scoring_worker_pool(process_job=services.process_scoring_job)
+    try:
+        yield
+    finally:
+        # Stop claiming first so unfinished jobs are handed back before connections close
+        await stop_scoring_worker_pool()
+        container, services = services, None
+        await container.close()
+        await close_cassidy_callback_registry()
+        await close_rate_limiter()
+        await SupabaseClient.close_pool()
+        await CassidyClient.close_pool()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="LinkedIn Ingestion Service",
     description="Microservice for LinkedIn profile and company data ingestion",
     version=settings.VERSION,
+    lifespan=lifespan,
     docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
 )
 
+# Rate limits run inside CORS (so 429s carry CORS headers) and inside metrics
+if settings.RATE_LIMIT_ENABLED:
+    app.middleware("http")(enforce_rate_limits)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -102,12 +173,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.middleware("http")(record_request_metrics)
+
 # Include profile verification router
 app.include_router(profile_verification_router)
 
 # Include role compatibility router
 app.include_router(role_compatibility_router)
 
+# Include Cassidy workflow callback router
+app.include_router(cassidy_callbacks_router)
+
 # Global exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -218,6 +295,25 @@ async def profile_already_exists_handler(request: Request, exc: ProfileAlreadyEx
         content=error_response.model_dump()
     )
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """Handle InvalidCursorError with 400 status code and suggestions"""
+    error_response = ErrorResponse(
+        error_code=exc.error_code,
+        message=exc.message,
+        details={
+            "endpoint": str(request.url),
+            "method": request.method,
+            **exc.details
+        },
+        suggestions=exc.details.get("suggestions", [])
+    )
+    
+    return JSONResponse(
+        status_code=exc.status_code or 400,
+        content=error_response.model_dump()
+    )
+
 @app.exception_handler(CassidyWorkflowError)
 async def cassidy_workflow_error_handler(request: Request, exc: CassidyWorkflowError):
     """Handle CassidyWorkflowError with 400 status code for invalid URLs"""
@@ -278,6 +374,36 @@ async def cassidy_workflow_error_handler(request: Request, exc: CassidyWorkflowE
             content=error_response.model_dump()
         )
 
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    """Handle UpstreamUnavailableError with 503 status code and a Retry-After header"""
+    logger.warning(
+        f"Upstream unavailable: {exc.message}",
+        extra={
+            "upstream": exc.upstream,
+            "endpoint": str(request.url),
+            "method": request.method,
+            "error_code": exc.error_code
+        }
+    )
+    
+    error_response = ErrorResponse(
+        error_code=exc.error_code,
+        message=exc.message,
+        details={
+            "endpoint": str(request.url),
+            "method": request.method,
+            **exc.details
+        },
+        suggestions=exc.details.get("suggestions", [])
+    )
+    
+    return JSONResponse(
+        status_code=exc.status_code or 503,
+        content=error_response.model_dump(),
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
 @app.exception_handler(LinkedInIngestionError)
 async def linkedin_ingestion_error_handler(request: Request, exc: LinkedInIngestionError):
     """Handle base LinkedInIngestionError with dynamic status code and suggestions"""
@@ -347,6 +473,10 @@ cassidy_client = None
 db_client = None
 linkedin_workflow = None
 
+# Process-lifetime services, built in the lifespan; the get_* dependencies below
+# fall back to per-call construction when the app runs without its lifespan
+services: Optional[ServiceContainer] = None
+
 def get_cassidy_client():
     global cassidy_client
     if cassidy_client is None:
@@ -389,6 +519,9 @@ class ProfileCreateRequest(BaseModel):
     name: Optional[str] = None
     include_companies: bool = Field(default=True, description="Include company profiles for all experience entries")
     suggested_role: RoleType = Field(..., description="The suggested role for this profile: CIO, CTO, or CISO for role-specific scoring")
+    defer_companies: bool = Field(default=False, description="Return the profile after its own fetch and enrich its companies in the background; poll pipeline_metadata.enrichment_url for completion")
+    update_mode: str = Field(default="replace", pattern="^(replace|incremental)$", description="For an already stored profile: 'replace' deletes and re-creates it, 'incremental' patches only what changed and reports it in 'changes'")
+    force_refresh: bool = Field(default=False, description="Fetch from Cassidy even if the stored profile is within the freshness window")
 
 class BatchProfileCreateRequest(BaseModel):
     profiles: List[ProfileCreateRequest] = Field(..., min_items=1, max_items=10, description="List of profiles to ingest (max 10 per batch)")
@@ -399,6 +532,7 @@ class PaginationMetadata(BaseModel):
     offset: int
     total: Optional[int] = None
     has_more: bool = False
+    next_cursor: Optional[str] = None
 
 # ErrorResponse models now imported from app.models.errors
 
@@ -425,33 +559,152 @@ class ProfileResponse(BaseModel):
     # Company processing response fields (only present when using company ingestion)
     companies_processed: Optional[List[Dict[str, Any]]] = None
     pipeline_metadata: Optional[Dict[str, Any]] = None
+    # Field, embedding and company link changes (only present for incremental re-ingestion)
+    changes: Optional[Dict[str, Any]] = None
+    # "fresh" when fetched from Cassidy by this request, "storage" when the stored profile was still fresh
+    served_from: Optional[str] = None
 
 class ProfileListResponse(BaseModel):
     data: List[ProfileResponse]
     pagination: PaginationMetadata
 
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated sparse fieldset (e.g. fields=name,city)
+    
+    Returns:
+        Requested fields with id always first, or None when no fieldset was given
+    """
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if not requested or unknown:
+        error_response = ErrorResponse(
+            error_code="INVALID_FIELDS",
+            message=f"Unknown or empty fields: {', '.join(unknown) or fields!r}",
+            details={"unknown_fields": unknown, "allowed_fields": list(allowed)}
+        )
+        raise HTTPException(status_code=400, detail=error_response.model_dump())
+    return list(dict.fromkeys(["id", *requested]))
+
+def sparse_list_response(list_response: BaseModel, fields: List[str]) -> JSONResponse:
+    """Serialize a list response keeping only the requested fields of each item"""
+    return JSONResponse(
+        content=list_response.model_dump(
+            mode="json",
+            include={"data": {"__all__": set(fields)}, "pagination": True}
+        )
+    )
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client asked for newline-delimited JSON"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+async def ndjson_list_rows(
+    first_page: BaseModel,
+    fetch_page: Callable[[str], Awaitable[BaseModel]],
+    fields: Optional[List[str]] = None
+) -> AsyncIterator[str]:
+    """
+    Yield every row of a list response as NDJSON lines, following next_cursor
+    
+    Only one page of rows is held at a time, so memory stays flat however many
+    rows the export covers. Listings without keyset paging stop after one page.
+    
+    Args:
+        first_page: Already fetched first page (fetched up front so its errors return a normal error response)
+        fetch_page: Fetches the page continuing after a cursor
+        fields: Sparse fieldset to keep in each row
+    """
+    include = set(fields) if fields else None
+    page = first_page
+    while True:
+        for item in page.data:
+            yield item.model_dump_json(include=include) + "\n"
+        next_cursor = page.pagination.next_cursor
+        if not next_cursor:
+            return
+        page = await fetch_page(next_cursor)
+
+class ProfileEnrichmentResponse(BaseModel):
+    profile_id: str
+    status: str = Field(..., description="pending, processing, completed or failed")
+    pipeline_id: Optional[str] = None
+    companies: List[Dict[str, Any]] = Field(default_factory=list, description="Companies processed for the profile")
+    companies_linked: int = Field(0, description="Profile-company links written")
+    error_message: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+
 class BatchProfileResponse(BaseModel):
     batch_id: str = Field(..., description="Unique identifier for this batch operation")
     total_requested: int = Field(..., description="Total number of profiles requested")
     successful: int = Field(..., description="Number of profiles successfully processed")
     failed: int = Field(..., description="Number of profiles that failed processing")
+    served_from_storage: int = Field(default=0, description="Number of successful profiles returned from storage without a Cassidy fetch")
     results: List[ProfileResponse] = Field(..., description="Individual profile results")
     started_at: str = Field(..., description="Batch processing start time")
     completed_at: str = Field(..., description="Batch processing completion time")
     processing_time_seconds: float = Field(..., description="Total processing time in seconds")
 
+class BatchJobCreateRequest(BaseModel):
+    profiles: List[ProfileCreateRequest] = Field(..., min_items=1, max_items=100, description="List of profiles to ingest (max 100 per batch)")
+    max_concurrent: int = Field(default=3, ge=1, le=5, description="Maximum concurrent processing (1-5)")
+
+class BatchJobItemResult(BaseModel):
+    id: str
+    position: int = Field(..., description="Index of the profile in the submitted batch")
+    linkedin_url: str
+    status: str = Field(..., description="pending, processing, completed or failed")
+    profile_id: Optional[str] = None
+    result: Optional[Dict[str, Any]] = Field(None, description="Summary of the ingested profile")
+    error_message: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+
+class BatchJobResponse(BaseModel):
+    batch_id: str = Field(..., description="Unique identifier for this batch operation")
+    status: str = Field(..., description="queued, running, completed or failed")
+    total_requested: int = Field(..., description="Total number of profiles requested")
+    successful: int = Field(..., description="Number of profiles successfully processed so far")
+    failed: int = Field(..., description="Number of profiles that failed processing so far")
+    pending: int = Field(..., description="Number of profiles not yet processed")
+    created_at: str
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error_message: Optional[str] = None
+    status_url: str = Field(..., description="Poll this URL for progress and results")
+    events_url: str = Field(..., description="Server-Sent Events stream of progress and results")
+    results: Optional[List[BatchJobItemResult]] = Field(None, description="Per-profile results in submission order")
+
 # ProfileController class for REST endpoints
 class ProfileController:
     """Controller for profile-related REST operations"""
     
-    def __init__(self, db_client, cassidy_client, linkedin_workflow):
+    def __init__(self, db_client, cassidy_client, linkedin_workflow, linkedin_pipeline=None, batch_runner=None, ingestion_lock=None):
         self.db_client = db_client
         self.cassidy_client = cassidy_client
         self.linkedin_workflow = linkedin_workflow
         
         # Initialize LinkedIn pipeline for company processing
-        from app.services.linkedin_pipeline import LinkedInDataPipeline
-        self.linkedin_pipeline = LinkedInDataPipeline()
+        if linkedin_pipeline is None:
+            from app.services.linkedin_pipeline import LinkedInDataPipeline
+            linkedin_pipeline = LinkedInDataPipeline()
+        self.linkedin_pipeline = linkedin_pipeline
+        
+        # Background processor for asynchronous batch ingestion
+        if batch_runner is None:
+            batch_runner = BatchIngestionRunner(BatchIngestionService(supabase_client=db_client))
+        self.batch_runner = batch_runner
+        
+        # Coalesces and serializes concurrent ingestions of the same URL
+        if ingestion_lock is None:
+            ingestion_lock = ProfileIngestionLock()
+        self.ingestion_lock = ingestion_lock
     
     def _convert_db_profile_to_response(self, db_profile: Dict[str, Any]) -> ProfileResponse:
         """Convert database profile to ProfileResponse model"""
@@ -486,14 +739,21 @@ class ProfileController:
         sort_by: Optional[str] = None,
         sort_order: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> ProfileListResponse:
         """List profiles with optional filtering and pagination"""
+        # Only the columns the response needs; required response fields are always read
+        columns = (
+            list(dict.fromkeys(["id", "url", "created_at", *fields]))
+            if fields else PROFILE_RESPONSE_COLUMNS
+        )
         
         # If linkedin_url is provided, do exact search with normalized URL
         if linkedin_url:
             normalized_url = normalize_linkedin_url(linkedin_url)
-            profile = await self.db_client.get_profile_by_url(normalized_url)
+            profile = await self.db_client.get_profile_by_url(normalized_url, columns=columns)
             if profile:
                 return ProfileListResponse(
                     data=[self._convert_db_profile_to_response(profile)],
@@ -506,7 +766,7 @@ class ProfileController:
                 )
         
         # Otherwise do general search with filters
-        profiles = await self.db_client.search_profiles(
+        profiles, total, next_cursor = await self.db_client.search_profiles_page(
             name=name,
             company=company,
             location=location,
@@ -514,7 +774,9 @@ class ProfileController:
             sort_by=sort_by,
             sort_order=sort_order,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            columns=columns
         )
         
         profile_responses = [self._convert_db_profile_to_response(p) for p in profiles]
@@ -524,8 +786,9 @@ class ProfileController:
             pagination=PaginationMetadata(
                 limit=limit,
                 offset=offset,
-                total=len(profile_responses),
-                has_more=len(profile_responses) >= limit
+                total=total,
+                has_more=next_cursor is not None,
+                next_cursor=next_cursor
             )
         )
     
@@ -548,25 +811,70 @@ class ProfileController:
     async def create_profile(self, request: ProfileCreateRequest) -> ProfileResponse:
         """Create a new LinkedIn profile with complete company processing
         
-        Uses the consolidated LinkedInDataPipeline for all processing.
+        Uses the consolidated LinkedInDataPipeline for all processing. Identical
+        concurrent requests for a URL share one ingestion; other requests for the
+        same URL wait for it to finish.
         """
         
         # Normalize LinkedIn URL to consistent format
         linkedin_url = normalize_linkedin_url(str(request.linkedin_url))
+        flight_key = f"{linkedin_url} {request.model_dump_json(exclude={'linkedin_url'})}"
         
-        # Check for existing profile with normalized URL
-        existing_by_url = await self.db_client.get_profile_by_url(linkedin_url)
-        if existing_by_url:
-            # Smart update behavior: delete existing profile and create fresh one
-            await self.db_client.delete_profile(existing_by_url["id"])
+        try:
+            response, shared = await self.ingestion_lock.run(
+                linkedin_url, flight_key, lambda: self._create_profile(request, linkedin_url)
+            )
+        except ProfileIngestionInProgressError as e:
+            error_response = ErrorResponse(
+                error_code="PROFILE_INGESTION_IN_PROGRESS",
+                message=f"Profile {linkedin_url} is already being ingested; retry later",
+                details={
+                    "linkedin_url": linkedin_url,
+                    "waited_seconds": round(e.waited_seconds, 1),
+                    "operation": "create_profile"
+                }
+            )
+            raise HTTPException(status_code=409, detail=error_response.model_dump())
         
-        # Use LinkedInDataPipeline for unified processing (now includes storage and suggested role)
-        # Note: Company processing is controlled by ENABLE_COMPANY_INGESTION setting
-        pipeline_result = await self.linkedin_pipeline.ingest_profile(
-            linkedin_url, 
-            store_in_db=True,  # Pipeline now handles all storage
-            suggested_role=request.suggested_role.value if request.suggested_role else None
-        )
+        # Requests that joined another's ingestion get their own copy of its response
+        return response.model_copy(deep=True) if shared else response
+    
+    async def _create_profile(self, request: ProfileCreateRequest, linkedin_url: str) -> ProfileResponse:
+        """Ingest one profile; called with the URL's ingestion lease held"""
+        suggested_role = request.suggested_role.value if request.suggested_role else None
+        
+        # Check for existing profile with normalized URL
+        existing_by_url = await self.db_client.get_profile_by_url(linkedin_url, columns=PROFILE_DIFF_COLUMNS)
+        if existing_by_url and not request.force_refresh and self._is_profile_fresh(existing_by_url):
+            # Fetched recently enough: skip the Cassidy workflow entirely
+            if suggested_role and suggested_role != existing_by_url.get("suggested_role"):
+                await self.db_client.update_profile_suggested_role(existing_by_url["id"], suggested_role)
+                existing_by_url["suggested_role"] = suggested_role
+            response = self._convert_db_profile_to_response(existing_by_url)
+            response.served_from = "storage"
+            return response
+        
+        if existing_by_url and request.update_mode == "incremental":
+            # Patch only what changed since the profile was stored
+            pipeline_result = await self.linkedin_pipeline.update_profile(
+                linkedin_url,
+                existing_by_url,
+                suggested_role=suggested_role,
+                defer_companies=request.defer_companies
+            )
+        else:
+            if existing_by_url:
+                # Smart update behavior: delete existing profile and create fresh one
+                await self.delete_profile(existing_by_url["id"])
+            
+            # Use LinkedInDataPipeline for unified processing (now includes storage and suggested role)
+            # Note: Company processing is controlled by ENABLE_COMPANY_INGESTION setting
+            pipeline_result = await self.linkedin_pipeline.ingest_profile(
+                linkedin_url, 
+                store_in_db=True,  # Pipeline now handles all storage
+                suggested_role=suggested_role,
+                defer_companies=request.defer_companies
+            )
         
         # Get the stored profile ID from pipeline result
         profile_id = pipeline_result.get("storage_ids", {}).get("profile")
@@ -584,11 +892,96 @@ class ProfileController:
                 "companies_found": len(pipeline_result["companies"]),
                 "companies_fetched_from_cassidy": True,
                 "pipeline_status": pipeline_result.get("status"),
-                "pipeline_id": pipeline_result.get("pipeline_id")
+                "pipeline_id": pipeline_result.get("pipeline_id"),
+                "embedding_cache": pipeline_result.get("embedding_cache"),
+                "enrichment_status": "completed"
+            }
+        elif pipeline_result.get("enrichment"):
+            # Companies are still being fetched and linked in the background
+            response.companies_processed = []
+            response.pipeline_metadata = {
+                "companies_found": 0,
+                "companies_fetched_from_cassidy": False,
+                "pipeline_status": pipeline_result.get("status"),
+                "pipeline_id": pipeline_result.get("pipeline_id"),
+                "embedding_cache": pipeline_result.get("embedding_cache"),
+                "enrichment_status": pipeline_result["enrichment"]["status"],
+                "enrichment_url": f"/api/v1/profiles/{profile_id}/enrichment"
             }
         
+        response.changes = pipeline_result.get("changes")
+        response.served_from = "fresh"
         return response
     
+    @staticmethod
+    def _is_profile_fresh(stored_profile: Dict[str, Any]) -> bool:
+        """Whether a stored profile was fetched within the freshness window (PROFILE_FRESHNESS_SECONDS)"""
+        if settings.PROFILE_FRESHNESS_SECONDS <= 0:
+            return False
+        
+        # Profiles stored before last_fetched_at existed were fetched when created
+        fetched_at = stored_profile.get("last_fetched_at") or stored_profile.get("created_at")
+        if not fetched_at:
+            return False
+        try:
+            fetched_at = datetime.fromisoformat(str(fetched_at).replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        
+        age = (datetime.now(timezone.utc) - fetched_at).total_seconds()
+        return age < settings.PROFILE_FRESHNESS_SECONDS
+    
+    async def delete_profile(self, profile_id: str) -> bool:
+        """
+        Delete a profile, first stopping its deferred company enrichment in this
+        worker so the enrichment can't link companies to the deleted profile
+        
+        Returns:
+            True if the profile was deleted, False if it didn't exist
+        """
+        enrichment_queue = self.linkedin_pipeline.enrichment_queue
+        if enrichment_queue is not None:
+            await enrichment_queue.cancel(profile_id)
+        return await self.db_client.delete_profile(profile_id)
+    
+    async def get_enrichment(self, profile_id: str, wait: float = 0) -> ProfileEnrichmentResponse:
+        """
+        Get the status of a profile's deferred company enrichment
+        
+        Args:
+            profile_id: Profile record ID
+            wait: Seconds to wait for an enrichment running in this worker to finish first
+        """
+        enrichment_queue = self.linkedin_pipeline.enrichment_queue
+        enrichment = None
+        if enrichment_queue is not None:
+            await enrichment_queue.wait(profile_id, wait)
+            enrichment = await enrichment_queue.enrichment_service.get_enrichment(profile_id)
+        if not enrichment:
+            error_response = ErrorResponse(
+                error_code="ENRICHMENT_NOT_FOUND",
+                message=f"No deferred company enrichment for profile {profile_id}",
+                details={
+                    "profile_id": profile_id,
+                    "operation": "get_enrichment"
+                }
+            )
+            raise HTTPException(status_code=404, detail=error_response.model_dump())
+        
+        return ProfileEnrichmentResponse(
+            profile_id=enrichment["profile_id"],
+            status=enrichment["status"],
+            pipeline_id=enrichment.get("pipeline_id"),
+            companies=enrichment.get("companies") or [],
+            companies_linked=enrichment.get("companies_linked") or 0,
+            error_message=enrichment.get("error_message"),
+            created_at=enrichment.get("created_at"),
+            started_at=enrichment.get("started_at"),
+            completed_at=enrichment.get("completed_at")
+        )
+    
     
     async def batch_create_profiles(self, request: BatchProfileCreateRequest) -> BatchProfileResponse:
         """Batch create profiles using the unified ingestion flow with company processing"""
@@ -617,6 +1010,7 @@ class ProfileController:
         # Process results
         profile_responses = []
         successful_count = 0
+        storage_count = 0
         
         for i, result in enumerate(results):
             if isinstance(result, Exception):
@@ -643,6 +1037,8 @@ class ProfileController:
                 if profile_response:
                     profile_responses.append(profile_response)
                     successful_count += 1
+                    if profile_response.served_from == "storage":
+                        storage_count += 1
                 else:
                     # Handle errors from individual profile processing
                     error_response = ProfileResponse(
@@ -671,11 +1067,143 @@ class ProfileController:
             total_requested=len(request.profiles),
             successful=successful_count,
             failed=len(request.profiles) - successful_count,
+            served_from_storage=storage_count,
             results=profile_responses,
             started_at=started_at.isoformat(),
             completed_at=datetime.now(timezone.utc).isoformat(),
             processing_time_seconds=processing_time
         )
+    
+    async def stream_batch_create_profiles(self, request: BatchProfileCreateRequest) -> AsyncIterator[str]:
+        """
+        Batch create profiles, yielding one NDJSON line per profile as it finishes
+        
+        Each line is {"type": "result", "position", "linkedin_url", "status",
+        "profile" | "error"}, in completion order, followed by one
+        {"type": "summary", ...} line. Results are not retained once written.
+        """
+        import time
+        from uuid import uuid4
+        
+        batch_id = str(uuid4())
+        start_time = time.time()
+        started_at = datetime.now(timezone.utc)
+        semaphore = asyncio.Semaphore(request.max_concurrent)
+        
+        async def process_single_profile(position: int, profile_request: ProfileCreateRequest):
+            async with semaphore:
+                try:
+                    return position, await self.create_profile(profile_request), None
+                except Exception as e:
+                    return position, None, str(e)
+        
+        tasks = [
+            asyncio.create_task(process_single_profile(position, profile_request))
+            for position, profile_request in enumerate(request.profiles)
+        ]
+        successful_count = 0
+        storage_count = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                position, profile_response, error = await next_done
+                line = {
+                    "type": "result",
+                    "position": position,
+                    "linkedin_url": str(request.profiles[position].linkedin_url),
+                    "status": "completed" if profile_response else "failed",
+                }
+                if profile_response:
+                    successful_count += 1
+                    if profile_response.served_from == "storage":
+                        storage_count += 1
+                    line["profile"] = profile_response.model_dump(mode="json")
+                else:
+                    line["error"] = error
+                yield json.dumps(line) + "\n"
+        finally:
+            # A client that disconnects stops the remaining profiles
+            for task in tasks:
+                task.cancel()
+        
+        yield json.dumps({
+            "type": "summary",
+            "batch_id": batch_id,
+            "total_requested": len(request.profiles),
+            "successful": successful_count,
+            "failed": len(request.profiles) - successful_count,
+            "served_from_storage": storage_count,
+            "started_at": started_at.isoformat(),
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+            "processing_time_seconds": time.time() - start_time
+        }) + "\n"
+    
+    async def _ingest_batch_item(self, request_data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Ingest one stored batch request; returns (profile id, result summary)"""
+        profile = await self.create_profile(ProfileCreateRequest(**request_data))
+        return profile.id, {
+            "name": profile.name,
+            "url": profile.url,
+            "companies_processed": len(profile.companies_processed or []),
+            "pipeline_metadata": profile.pipeline_metadata,
+        }
+    
+    def _batch_job_response(self, batch: Dict[str, Any], items: Optional[List[Dict[str, Any]]] = None) -> BatchJobResponse:
+        """Convert a stored batch (and optionally its items) to BatchJobResponse"""
+        status_url = f"/api/v1/profiles/batches/{batch['id']}"
+        return BatchJobResponse(
+            batch_id=batch["id"],
+            status=batch["status"],
+            total_requested=batch["total_requested"],
+            successful=batch.get("successful") or 0,
+            failed=batch.get("failed") or 0,
+            pending=batch["total_requested"] - (batch.get("successful") or 0) - (batch.get("failed") or 0),
+            created_at=str(batch["created_at"]),
+            started_at=batch.get("started_at"),
+            completed_at=batch.get("completed_at"),
+            error_message=batch.get("error_message"),
+            status_url=status_url,
+            events_url=f"{status_url}/events",
+            results=[BatchJobItemResult(**item) for item in items] if items is not None else None
+        )
+    
+    async def submit_batch(self, request: BatchJobCreateRequest) -> BatchJobResponse:
+        """Record a batch and start ingesting it in the background"""
+        try:
+            batch, items = await self.batch_runner.batch_service.create_batch(
+                [profile.model_dump(mode="json") for profile in request.profiles],
+                max_concurrent=request.max_concurrent
+            )
+        except Exception as e:
+            error_response = ErrorResponse(
+                error_code="DATABASE_ERROR",
+                message=f"Failed to create ingestion batch: {str(e)}",
+                details={"operation": "submit_batch", "exception_type": type(e).__name__}
+            )
+            raise HTTPException(status_code=500, detail=error_response.model_dump())
+        
+        self.batch_runner.start(batch, items, self._ingest_batch_item)
+        return self._batch_job_response(batch)
+    
+    async def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Get a stored batch by ID or raise 404"""
+        batch = await self.batch_runner.batch_service.get_batch(batch_id)
+        if not batch:
+            error_response = ErrorResponse(
+                error_code="BATCH_NOT_FOUND",
+                message=f"Ingestion batch with ID {batch_id} not found",
+                details={
+                    "batch_id": batch_id,
+                    "operation": "get_batch"
+                }
+            )
+            raise HTTPException(status_code=404, detail=error_response.model_dump())
+        return batch
+    
+    async def get_batch_status(self, batch_id: str, include_results: bool = True) -> BatchJobResponse:
+        """Get a batch's progress and, optionally, its per-profile results"""
+        batch = await self.get_batch(batch_id)
+        items = await self.batch_runner.batch_service.get_items(batch_id) if include_results else None
+        return self._batch_job_response(batch, items)
 
 
 @app.get("/")
@@ -830,6 +1358,44 @@ async def detailed_health_check(
             overall_status = "degraded"
             errors.append(f"Scoring Service: {str(e)}")
         
+        # Cassidy connection pool statistics (no network call)
+        health_checks["cassidy_pool"] = {
+            "status": "healthy",
+            **CassidyClient.pool_stats()
+        }
+        
+        # Supabase connection pool statistics (no network call)
+        health_checks["supabase_pool"] = {
+            "status": "healthy",
+            **SupabaseClient.pool_stats()
+        }
+        
+        # Upstream concurrency limits and circuit breakers (no network call)
+        upstreams = upstream_health()
+        open_circuits = [name for name, state in upstreams.items() if state["circuit"] != "closed"]
+        health_checks["upstreams"] = {
+            "status": "degraded" if open_circuits else "healthy",
+            **upstreams
+        }
+        if open_circuits:
+            overall_status = "degraded"
+            errors.extend(f"Upstream {name}: circuit {upstreams[name]['circuit']}" for name in open_circuits)
+        
+        # Workflows waiting for Cassidy callbacks (no network call)
+        health_checks["cassidy_callbacks"] = (
+            {"status": "healthy", **get_cassidy_callback_registry().stats()}
+            if settings.CASSIDY_CALLBACK_MODE
+            else {"status": "disabled"}
+        )
+        
+        # Scoring worker pool statistics (no network call)
+        scoring_worker_pool = get_scoring_worker_pool()
+        health_checks["scoring_workers"] = (
+            {"status": "healthy", **scoring_worker_pool.stats()}
+            if scoring_worker_pool is not None
+            else {"status": "disabled"}
+        )
+        
         total_time = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
         
         return {
@@ -944,6 +1510,14 @@ async def liveness_probe():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: pipeline stage, request latency and upstream counters"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/version")
 async def get_version():
     """Get comprehensive version and deployment information"""
@@ -956,7 +1530,9 @@ async def get_version():
 
 
 # Initialize ProfileController
-def get_profile_controller():
+def get_profile_controller() -> ProfileController:
+    if services is not None:
+        return services.profile_controller
     return ProfileController(get_db_client(), get_cassidy_client(), get_linkedin_workflow())
 
 # New REST API endpoints
@@ -969,6 +1545,7 @@ def get_profile_controller():
     }
 )
 async def list_profiles(
+    request: Request,
     linkedin_url: Optional[str] = Query(None, description="Exact LinkedIn URL search"),
     name: Optional[str] = Query(None, description="Partial name search (case-insensitive)"),
     company: Optional[str] = Query(None, description="Partial company name search (case-insensitive)"),
@@ -978,21 +1555,38 @@ async def list_profiles(
     sort_order: Optional[str] = Query("desc", description="Sort order: 'asc' or 'desc' (default: desc)"),
     limit: int = Query(50, ge=1, le=100, description="Number of profiles to return"),
     offset: int = Query(0, ge=0, description="Number of profiles to skip"),
+    cursor: Optional[str] = Query(None, description="pagination.next_cursor of the previous page; continues after its last row with the same filters and sort"),
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields to return (id is always included), e.g. name,position,city"),
+    controller: ProfileController = Depends(get_profile_controller),
     api_key: str = Depends(verify_api_key)
 ):
-    """List profiles with optional filtering, sorting, and pagination"""
-    controller = get_profile_controller()
-    return await controller.list_profiles(
-        linkedin_url=linkedin_url,
-        name=name,
-        company=company,
-        location=location,
-        score_range=score_range,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        limit=limit,
-        offset=offset
-    )
+    """
+    List profiles with optional filtering, sorting, pagination and sparse fieldsets
+    
+    With Accept: application/x-ndjson every matching profile is streamed, one
+    per line, reading pages of `limit` rows until the last.
+    """
+    field_list = parse_fields(fields, PROFILE_RESPONSE_COLUMNS)
+    
+    async def fetch_page(page_cursor: Optional[str], page_offset: int = 0) -> ProfileListResponse:
+        return await controller.list_profiles(
+            linkedin_url=linkedin_url,
+            name=name,
+            company=company,
+            location=location,
+            score_range=score_range,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            offset=page_offset,
+            cursor=page_cursor,
+            fields=field_list
+        )
+    
+    result = await fetch_page(cursor, offset)
+    if wants_ndjson(request):
+        return StreamingResponse(ndjson_list_rows(result, fetch_page, field_list), media_type=NDJSON_MEDIA_TYPE)
+    return sparse_list_response(result, field_list) if field_list else result
 
 @app.get(
     "/api/v1/profiles/{profile_id}", 
@@ -1005,12 +1599,30 @@ async def list_profiles(
 )
 async def get_profile(
     profile_id: str,
+    controller: ProfileController = Depends(get_profile_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Get individual profile by ID"""
-    controller = get_profile_controller()
     return await controller.get_profile(profile_id)
 
+@app.get(
+    "/api/v1/profiles/{profile_id}/enrichment",
+    response_model=ProfileEnrichmentResponse,
+    responses={
+        403: {"model": ErrorResponse, "description": "Unauthorized - Invalid API key"},
+        404: {"model": ErrorResponse, "description": "No deferred enrichment for this profile"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def get_profile_enrichment(
+    profile_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for a running enrichment to finish before answering"),
+    controller: ProfileController = Depends(get_profile_controller),
+    api_key: str = Depends(verify_api_key)
+):
+    """Get the status of a profile's deferred company enrichment (created with defer_companies)"""
+    return await controller.get_enrichment(profile_id, wait=wait)
+
 @app.post(
     "/api/v1/profiles", 
     response_model=ProfileResponse, 
@@ -1024,10 +1636,10 @@ async def get_profile(
 )
 async def create_profile(
     request: ProfileCreateRequest,
+    controller: ProfileController = Depends(get_profile_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Create a new profile by ingesting from LinkedIn"""
-    controller = get_profile_controller()
     return await controller.create_profile(request)
 
 
@@ -1044,13 +1656,87 @@ async def create_profile(
 )
 async def batch_create_profiles(
     request: BatchProfileCreateRequest,
+    http_request: Request,
+    controller: ProfileController = Depends(get_profile_controller),
     api_key: str = Depends(verify_api_key)
 ):
-    """Batch create profiles using the unified ingestion flow with company processing (max 10 profiles per batch)"""
-    controller = get_profile_controller()
+    """
+    Batch create profiles using the unified ingestion flow with company processing (max 10 profiles per batch)
+    
+    With Accept: application/x-ndjson each profile's result is streamed as soon
+    as it completes, followed by a summary line.
+    """
+    if wants_ndjson(http_request):
+        return StreamingResponse(
+            controller.stream_batch_create_profiles(request),
+            status_code=201,
+            media_type=NDJSON_MEDIA_TYPE
+        )
     return await controller.batch_create_profiles(request)
 
 
+@app.post(
+    "/api/v1/profiles/batches",
+    response_model=BatchJobResponse,
+    status_code=202,
+    responses={
+        403: {"model": ErrorResponse, "description": "Unauthorized - Invalid API key"},
+        422: {"model": ValidationErrorResponse, "description": "Validation error"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def submit_profile_batch(
+    request: BatchJobCreateRequest,
+    controller: ProfileController = Depends(get_profile_controller),
+    api_key: str = Depends(verify_api_key)
+):
+    """Submit profiles for background ingestion (max 100 per batch); poll status_url or stream events_url for progress"""
+    return await controller.submit_batch(request)
+
+
+@app.get(
+    "/api/v1/profiles/batches/{batch_id}",
+    response_model=BatchJobResponse,
+    responses={
+        403: {"model": ErrorResponse, "description": "Unauthorized - Invalid API key"},
+        404: {"model": ErrorResponse, "description": "Batch not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def get_profile_batch(
+    batch_id: str,
+    include_results: bool = Query(True, description="Include per-profile results"),
+    controller: ProfileController = Depends(get_profile_controller),
+    api_key: str = Depends(verify_api_key)
+):
+    """Get the progress and per-profile results of an ingestion batch"""
+    return await controller.get_batch_status(batch_id, include_results=include_results)
+
+
+@app.get(
+    "/api/v1/profiles/batches/{batch_id}/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "item, progress and complete events"},
+        403: {"model": ErrorResponse, "description": "Unauthorized - Invalid API key"},
+        404: {"model": ErrorResponse, "description": "Batch not found"}
+    }
+)
+async def stream_profile_batch_events(
+    batch_id: str,
+    controller: ProfileController = Depends(get_profile_controller),
+    api_key: str = Depends(verify_api_key)
+):
+    """Stream an ingestion batch's progress as Server-Sent Events until it finishes"""
+    batch = await controller.get_batch(batch_id)
+    return StreamingResponse(
+        controller.batch_runner.events(batch),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.delete(
     "/api/v1/profiles/{profile_id}", 
     status_code=204,
@@ -1062,12 +1748,12 @@ async def batch_create_profiles(
 )
 async def delete_profile(
     profile_id: str,
+    controller: ProfileController = Depends(get_profile_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Delete an individual profile by ID"""
     try:
-        controller = get_profile_controller()
-        deleted = await controller.db_client.delete_profile(profile_id)
+        deleted = await controller.delete_profile(profile_id)
         
         if not deleted:
             error_response = ErrorResponse(
@@ -1172,6 +1858,17 @@ class CompanyListResponse(BaseModel):
     data: List[CompanyResponse]
     pagination: PaginationMetadata
 
+COMPANY_RESPONSE_FIELDS = tuple(CompanyResponse.model_fields)
+
+# Company response fields computed from other companies columns
+COMPANY_DERIVED_FIELD_COLUMNS = {
+    "company_id": ("linkedin_company_id",),
+    "company_age": ("year_founded",),
+    "size_category": ("employee_count",),
+    "is_startup": ("employee_count", "year_founded", "funding_info"),
+    "profile_count": (),
+}
+
 class CompanySummaryResponse(BaseModel):
     id: str
     company_name: str
@@ -1206,15 +1903,17 @@ class ProfileCompanyRelationship(BaseModel):
 class CompanyController:
     """Controller for company-related REST operations"""
     
-    def __init__(self, db_client):
+    def __init__(self, db_client, company_service=None):
         self.db_client = db_client
         
         # Initialize company service and repository
-        from app.repositories.company_repository import CompanyRepository
-        from app.services.company_service import CompanyService
+        if company_service is None:
+            from app.repositories.company_repository import CompanyRepository
+            from app.services.company_service import CompanyService
+            company_service = CompanyService(CompanyRepository(db_client))
         
-        self.company_repo = CompanyRepository(db_client)
-        self.company_service = CompanyService(self.company_repo)
+        self.company_repo = company_service.company_repo
+        self.company_service = company_service
     
     def _convert_canonical_to_response(self, company, profile_count=None) -> CompanyResponse:
         """Convert CanonicalCompany to CompanyResponse model"""
@@ -1285,6 +1984,16 @@ class CompanyController:
                 updated_at=None  # Not tracked in canonical model
             )
     
+    def _columns_for_fields(self, fields: Optional[List[str]]) -> Sequence[str]:
+        """companies columns needed to build the requested response fields (never the embedding)"""
+        if not fields:
+            return COMPANY_RESPONSE_COLUMNS
+        # Required to build a CanonicalCompany / CompanyResponse
+        columns = ["id", "company_name", "created_at", "timestamp"]
+        for field in fields:
+            columns.extend(COMPANY_DERIVED_FIELD_COLUMNS.get(field, (field,)))
+        return list(dict.fromkeys(columns))
+    
     def _get_size_category(self, employee_count: Optional[int]) -> str:
         """Calculate size category from employee count"""
         if employee_count is None:
@@ -1310,23 +2019,28 @@ class CompanyController:
         size_category: Optional[str] = None,
         is_startup: Optional[bool] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> CompanyListResponse:
         """List companies with filtering and pagination"""
         try:
             companies = []
+            keyset_paged = False
+            next_cursor = None
+            columns = self._columns_for_fields(fields)
             
             # Apply filters based on parameters
             if name:
-                companies = await self.company_repo.search_by_name(name, limit)
+                companies = await self.company_repo.search_by_name(name, limit, columns=columns)
             elif domain:
-                companies = self.company_repo.search_by_domain(domain, exact_match=False)
+                companies = await self.company_repo.search_by_domain(domain, exact_match=False, columns=columns)
             elif industry:
-                companies = self.company_repo.get_companies_by_industry(industry, limit)
+                companies = await self.company_repo.get_companies_by_industry(industry, limit, columns=columns)
             elif city or country:
-                companies = self.company_repo.get_companies_by_location(city, country, limit)
+                companies = await self.company_repo.get_companies_by_location(city, country, limit, columns=columns)
             elif is_startup:
-                startup_companies = self.company_repo.get_startup_companies(limit)
+                startup_companies = await self.company_repo.get_startup_companies(limit)
                 # Convert dict results to response format and get profile counts
                 if startup_companies:
                     company_ids = [c.get("id") for c in startup_companies if c.get("id")]
@@ -1358,7 +2072,7 @@ class CompanyController:
                         )
                     )
             elif size_category:
-                size_companies = self.company_repo.get_companies_by_size_category(size_category, limit)
+                size_companies = await self.company_repo.get_companies_by_size_category(size_category, limit)
                 # Convert dict results to response format and get profile counts
                 if size_companies:
                     company_ids = [c.get("id") for c in size_companies if c.get("id")]
@@ -1390,8 +2104,11 @@ class CompanyController:
                         )
                     )
             else:
-                # Get all companies using the proper get_all method
-                companies = await self.company_repo.get_all(limit=limit, offset=offset)
+                # Unfiltered listing pages by (created_at, id) keyset
+                keyset_paged = True
+                companies, next_cursor = await self.company_repo.get_page(
+                    limit=limit, offset=offset, cursor=cursor, columns=columns
+                )
             
             # For standard company results (CanonicalCompany objects), get profile counts
             if companies:
@@ -1426,10 +2143,13 @@ class CompanyController:
                     limit=limit,
                     offset=offset,
                     total=len(company_responses),
-                    has_more=len(company_responses) >= limit
+                    has_more=next_cursor is not None if keyset_paged else len(company_responses) >= limit,
+                    next_cursor=next_cursor
                 )
             )
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Failed to list companies: {str(e)}")
             return CompanyListResponse(
@@ -1457,7 +2177,7 @@ class CompanyController:
             raise HTTPException(status_code=404, detail=error_response.model_dump())
         
         # Get profile count for this company
-        profile_count = self.company_repo.get_profile_count_for_company(company_id)
+        profile_count = await self.company_repo.get_profile_count_for_company(company_id)
         
         return self._convert_canonical_to_response(company, profile_count)
     
@@ -1489,7 +2209,7 @@ class CompanyController:
             company = CanonicalCompany(**company_data)
             
             # Use service to create with deduplication
-            result = self.company_service.create_or_update_company(company)
+            result = await self.company_service.create_or_update_company(company)
             
             # Get the created company
             created_company = await self.company_repo.get_by_id(result["id"])
@@ -1536,7 +2256,7 @@ class CompanyController:
             updated_company = CanonicalCompany(**update_data)
             
             # Update in database
-            result = self.company_repo.update(company_id, updated_company)
+            result = await self.company_repo.update(company_id, updated_company)
             
             # Get the updated company
             updated_company = await self.company_repo.get_by_id(company_id)
@@ -1560,7 +2280,7 @@ class CompanyController:
     async def delete_company(self, company_id: str) -> None:
         """Delete a company"""
         try:
-            deleted = self.company_repo.delete(company_id)
+            deleted = await self.company_repo.delete(company_id)
             if not deleted:
                 error_response = ErrorResponse(
                     error_code="COMPANY_NOT_FOUND",
@@ -1598,7 +2318,7 @@ class CompanyController:
                 "description": request.description
             }
             
-            result = self.company_service.link_profile_to_company(profile_id, company_id, work_experience)
+            result = await self.company_service.link_profile_to_company(profile_id, company_id, work_experience)
             
             return ProfileCompanyRelationship(
                 id=result["id"],
@@ -1628,7 +2348,9 @@ class CompanyController:
 
 
 # Initialize CompanyController
-def get_company_controller():
+def get_company_controller() -> CompanyController:
+    if services is not None:
+        return services.company_controller
     return CompanyController(get_db_client())
 
 # ============================================================================
@@ -1644,6 +2366,7 @@ def get_company_controller():
     }
 )
 async def list_companies(
+    request: Request,
     name: Optional[str] = Query(None, description="Company name search"),
     domain: Optional[str] = Query(None, description="Domain search"),
     industry: Optional[str] = Query(None, description="Industry filter"),
@@ -1653,21 +2376,38 @@ async def list_companies(
     is_startup: Optional[bool] = Query(None, description="Filter for startup companies"),
     limit: int = Query(50, ge=1, le=100, description="Number of companies to return"),
     offset: int = Query(0, ge=0, description="Number of companies to skip"),
+    cursor: Optional[str] = Query(None, description="pagination.next_cursor of the previous page (unfiltered listing only); continues after its last row"),
+    fields: Optional[str] = Query(None, description="Comma-separated company fields to return (id is always included), e.g. company_name,domain,size_category"),
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
-    """List companies with optional filtering and pagination"""
-    controller = get_company_controller()
-    return await controller.list_companies(
-        name=name,
-        domain=domain,
-        industry=industry,
-        city=city,
-        country=country,
-        size_category=size_category,
-        is_startup=is_startup,
-        limit=limit,
-        offset=offset
-    )
+    """
+    List companies with optional filtering, pagination and sparse fieldsets
+    
+    With Accept: application/x-ndjson the companies are streamed one per line;
+    the unfiltered listing streams every company, page by page.
+    """
+    field_list = parse_fields(fields, COMPANY_RESPONSE_FIELDS)
+    
+    async def fetch_page(page_cursor: Optional[str], page_offset: int = 0) -> CompanyListResponse:
+        return await controller.list_companies(
+            name=name,
+            domain=domain,
+            industry=industry,
+            city=city,
+            country=country,
+            size_category=size_category,
+            is_startup=is_startup,
+            limit=limit,
+            offset=page_offset,
+            cursor=page_cursor,
+            fields=field_list
+        )
+    
+    result = await fetch_page(cursor, offset)
+    if wants_ndjson(request):
+        return StreamingResponse(ndjson_list_rows(result, fetch_page, field_list), media_type=NDJSON_MEDIA_TYPE)
+    return sparse_list_response(result, field_list) if field_list else result
 
 
 @app.get(
@@ -1681,10 +2421,10 @@ async def list_companies(
 )
 async def get_company(
     company_id: str,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Get individual company by ID"""
-    controller = get_company_controller()
     return await controller.get_company(company_id)
 
 
@@ -1700,10 +2440,10 @@ async def get_company(
 )
 async def create_company(
     request: CompanyCreateRequest,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Create a new company"""
-    controller = get_company_controller()
     return await controller.create_company(request)
 
 
@@ -1720,10 +2460,10 @@ async def create_company(
 async def update_company(
     company_id: str,
     request: CompanyUpdateRequest,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Update an existing company"""
-    controller = get_company_controller()
     return await controller.update_company(company_id, request)
 
 
@@ -1738,10 +2478,10 @@ async def update_company(
 )
 async def delete_company(
     company_id: str,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Delete a company"""
-    controller = get_company_controller()
     await controller.delete_company(company_id)
     return None
 
@@ -1765,10 +2505,10 @@ async def link_profile_to_company(
     profile_id: str,
     company_id: str,
     request: ProfileCompanyLinkRequest,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Link a profile to a company with work experience details"""
-    controller = get_company_controller()
     return await controller.link_profile_to_company(profile_id, company_id, request)
 
 
@@ -1784,12 +2524,12 @@ async def link_profile_to_company(
 async def unlink_profile_from_company(
     profile_id: str,
     company_id: str,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Unlink a profile from a company"""
     try:
-        controller = get_company_controller()
-        controller.company_service.unlink_profile_from_company(profile_id, company_id)
+        await controller.company_service.unlink_profile_from_company(profile_id, company_id)
         return None
     except Exception as e:
         logger.error(f"Failed to unlink profile {profile_id} from company {company_id}: {str(e)}")
@@ -1817,12 +2557,12 @@ async def unlink_profile_from_company(
 )
 async def get_companies_for_profile(
     profile_id: str,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Get all companies associated with a profile"""
     try:
-        controller = get_company_controller()
-        companies = controller.company_service.get_companies_for_profile(profile_id)
+        companies = await controller.company_service.get_companies_for_profile(profile_id)
         
         # Convert to response format
         company_responses = [controller._convert_canonical_to_response(company) for company in companies]
@@ -1861,11 +2601,11 @@ async def get_companies_for_profile(
 )
 async def get_profiles_for_company(
     company_id: str,
+    controller: CompanyController = Depends(get_company_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Get all profiles associated with a company"""
     try:
-        controller = get_company_controller()
         profiles_data = await controller.company_repo.get_profiles_for_company(company_id)
         
         # Transform data to flatten profile information with work experience
@@ -1932,18 +2672,26 @@ async def get_profiles_for_company(
 
 
 # Initialize Scoring Controllers
-def get_profile_scoring_controller():
+def get_profile_scoring_controller() -> ProfileScoringController:
+    if services is not None:
+        return services.profile_scoring_controller
     return ProfileScoringController()
 
-def get_scoring_job_controller():
+def get_scoring_job_controller() -> ScoringJobController:
+    if services is not None:
+        return services.scoring_job_controller
     return ScoringJobController()
 
 # Initialize Template Service
-def get_template_service():
+def get_template_service() -> TemplateService:
+    if services is not None:
+        return services.template_service
     return TemplateService(supabase_client=get_db_client())
 
 # Initialize Template Versioning Service
-def get_template_versioning_service():
+def get_template_versioning_service() -> TemplateVersioningService:
+    if services is not None:
+        return services.template_versioning_service
     return TemplateVersioningService(supabase_client=get_db_client())
 
 
@@ -1963,13 +2711,31 @@ def get_template_versioning_service():
 async def create_scoring_job(
     profile_id: str,
     request: ScoringRequest,
+    controller: ProfileScoringController = Depends(get_profile_scoring_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Initiate LLM-based scoring evaluation for a LinkedIn profile"""
-    controller = get_profile_scoring_controller()
     return await controller.create_scoring_job(profile_id, request)
 
 
+@app.get(
+    "/api/v1/scoring-jobs/stats",
+    responses={
+        403: {"model": ErrorResponse, "description": "Unauthorized - Invalid API key"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def get_scoring_job_stats(
+    since: Optional[datetime] = Query(None, description="Only count jobs created at or after this time (ISO 8601)"),
+    until: Optional[datetime] = Query(None, description="Only count jobs created before this time (ISO 8601)"),
+    group_by: Optional[str] = Query(None, pattern="^(template|model)$", description="Break counts down per 'template' or 'model'"),
+    controller: ScoringJobController = Depends(get_scoring_job_controller),
+    api_key: str = Depends(verify_api_key)
+):
+    """Scoring job counts per status, aggregated in the database"""
+    return await controller.get_job_stats(since=since, until=until, group_by=group_by)
+
+
 @app.get(
     "/api/v1/scoring-jobs/{job_id}",
     response_model=ScoringResponse,
@@ -1981,10 +2747,10 @@ async def create_scoring_job(
 )
 async def get_scoring_job_status(
     job_id: str,
+    controller: ScoringJobController = Depends(get_scoring_job_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Check the status and retrieve results of a scoring job"""
-    controller = get_scoring_job_controller()
     response = await controller.get_job_status(job_id)
     return JSONResponse(
         status_code=200,
@@ -2002,12 +2768,13 @@ async def get_scoring_job_status(
 async def list_scoring_jobs(
     limit: int = Query(50, ge=1, le=100, description="Number of jobs to return"),
     offset: int = Query(0, ge=0, description="Number of jobs to skip"),
+    cursor: Optional[str] = Query(None, description="pagination.next_cursor of the previous page; continues after its last row"),
     status: Optional[str] = Query(None, description="Filter by job status"),
+    controller: ScoringJobController = Depends(get_scoring_job_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """List scoring jobs for dashboard"""
-    controller = get_scoring_job_controller()
-    return await controller.list_jobs(limit=limit, offset=offset, status_filter=status)
+    return await controller.list_jobs(limit=limit, offset=offset, status_filter=status, cursor=cursor)
 
 
 @app.post(
@@ -2024,10 +2791,10 @@ async def list_scoring_jobs(
 async def retry_scoring_job(
     job_id: str,
     retry_request: Optional[JobRetryRequest] = None,
+    controller: ScoringJobController = Depends(get_scoring_job_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Retry a failed scoring job"""
-    controller = get_scoring_job_controller()
     return await controller.retry_job(job_id, retry_request)
 
 
@@ -2047,10 +2814,10 @@ async def retry_scoring_job(
 async def create_template_scoring_job(
     profile_id: str,
     request: EnhancedScoringRequest,
+    controller: ProfileScoringController = Depends(get_profile_scoring_controller),
     api_key: str = Depends(verify_api_key)
 ):
     """Create LLM scoring job with template-based OR prompt-based evaluation (V1.88)"""
-    controller = get_profile_scoring_controller()
     return await controller.create_template_scoring_job(profile_id, request)
 
 
@@ -2070,11 +2837,11 @@ async def list_templates(
     category: Optional[str] = Query(None, description="Filter by template category (CTO, CIO, CISO, etc.)"),
     include_inactive: bool = Query(False, description="Include inactive templates in results"),
     limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of templates to return"),
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """List prompt templates with optional filtering"""
     try:
-        service = get_template_service()
         templates = await service.list_templates(
             category=category,
             include_inactive=include_inactive,
@@ -2120,11 +2887,11 @@ async def list_template_summaries(
     category: Optional[str] = Query(None, description="Filter by template category"),
     include_inactive: bool = Query(False, description="Include inactive templates"),
     limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of summaries to return"),
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """List template summaries (without full prompt text) for performance"""
     try:
-        service = get_template_service()
         summaries = await service.list_template_summaries(
             category=category,
             include_inactive=include_inactive,
@@ -2169,11 +2936,11 @@ async def list_template_summaries(
 )
 async def get_template(
     template_id: str,
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Get a specific template by ID"""
     try:
-        service = get_template_service()
         template = await service.get_template_by_id(template_id)
         
         if not template:
@@ -2224,11 +2991,11 @@ async def get_template(
 )
 async def create_template(
     request: CreateTemplateRequest,
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Create a new prompt template"""
     try:
-        service = get_template_service()
         template = await service.create_template(request)
         
         logger.info(
@@ -2277,11 +3044,11 @@ async def create_template(
 async def update_template(
     template_id: str,
     request: UpdateTemplateRequest,
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Update an existing template"""
     try:
-        service = get_template_service()
         template = await service.update_template(template_id, request)
         
         if not template:
@@ -2339,11 +3106,11 @@ async def update_template(
 )
 async def delete_template(
     template_id: str,
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Soft delete a template (sets is_active to False)"""
     try:
-        service = get_template_service()
         deleted = await service.delete_template(template_id)
         
         if not deleted:
@@ -2405,6 +3172,7 @@ async def delete_template(
 )
 async def get_recommended_templates_for_profile(
     profile_id: str,
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Get template recommendations based on profile's suggested role"""
@@ -2428,7 +3196,6 @@ async def get_recommended_templates_for_profile(
         suggested_role = profile.get("suggested_role")
         if not suggested_role:
             # If no suggested role, return all templates
-            service = get_template_service()
             templates = await service.list_templates(include_inactive=False, limit=10)
             
             logger.info(
@@ -2440,7 +3207,6 @@ async def get_recommended_templates_for_profile(
             )
         else:
             # Get role-specific templates
-            service = get_template_service()
             templates = await service.get_templates_for_role(suggested_role)
             
             logger.info(
@@ -2491,6 +3257,7 @@ async def get_recommended_templates_for_profile(
 )
 async def get_default_template_for_profile(
     profile_id: str,
+    service: TemplateService = Depends(get_template_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Get the default template recommendation for a profile's role"""
@@ -2524,7 +3291,6 @@ async def get_default_template_for_profile(
             raise HTTPException(status_code=404, detail=error_response.model_dump())
         
         # Get the default template for the role
-        service = get_template_service()
         default_template = await service.get_default_template_for_role(suggested_role)
         
         if not default_template:
@@ -2589,11 +3355,11 @@ async def get_default_template_for_profile(
 )
 async def get_template_versions(
     template_id: str,
+    versioning_service: TemplateVersioningService = Depends(get_template_versioning_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Get version history for a template"""
     try:
-        versioning_service = get_template_versioning_service()
         versions = await versioning_service.get_version_history(template_id)
         
         if not versions:
@@ -2654,11 +3420,11 @@ async def get_template_versions(
 async def create_template_version(
     template_id: str,
     request: UpdateTemplateRequest,
+    versioning_service: TemplateVersioningService = Depends(get_template_versioning_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Create a new version of an existing template"""
     try:
-        versioning_service = get_template_versioning_service()
         new_version = await versioning_service.create_new_version(template_id, request)
         
         if not new_version:
@@ -2718,11 +3484,11 @@ async def compare_template_versions(
     template_id: str,
     version: int,
     compare_version: int,
+    versioning_service: TemplateVersioningService = Depends(get_template_versioning_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Compare two versions of a template"""
     try:
-        versioning_service = get_template_versioning_service()
         diff_result = await versioning_service.compare_versions(
             template_id, version, compare_version
         )
@@ -2791,11 +3557,11 @@ async def compare_template_versions(
 async def restore_template_version(
     template_id: str,
     version: int,
+    versioning_service: TemplateVersioningService = Depends(get_template_versioning_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Restore a previous version of a template as the current active version"""
     try:
-        versioning_service = get_template_versioning_service()
         restored_template = await versioning_service.restore_version(template_id, version)
         
         if not restored_template:
@@ -2859,11 +3625,11 @@ async def restore_template_version(
 async def set_active_template_version(
     template_id: str,
     version: int,
+    versioning_service: TemplateVersioningService = Depends(get_template_versioning_service),
     api_key: str = Depends(verify_api_key)
 ):
     """Set a specific version as the active version for a template"""
     try:
-        versioning_service = get_template_versioning_service()
         active_template = await versioning_service.set_active_version(template_id, version)
         
         if not active_template:
@@ -0,0 +1,103 @@
+-- Server-side profile search
+-- Runs the company join, score-range join and unscored anti-join, sorting and
+-- LIMIT/OFFSET inside the database so the API makes a single round-trip and
+-- gets an exact total count for pagination.
+
+CREATE OR REPLACE FUNCTION search_profiles(
+    p_name TEXT DEFAULT NULL,
+    p_company TEXT DEFAULT NULL,
+    p_location TEXT DEFAULT NULL,
+    p_unscored BOOLEAN DEFAULT FALSE,
+    p_score_min NUMERIC DEFAULT NULL,
+    p_score_max NUMERIC DEFAULT NULL,
+    p_score_max_inclusive BOOLEAN DEFAULT TRUE,
+    p_sort_by TEXT DEFAULT 'created_at',
+    p_sort_order TEXT DEFAULT 'desc',
+    p_limit INT DEFAULT 50,
+    p_offset INT DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    sort_expr TEXT;
+    sort_dir TEXT;
+    search_result JSONB;
+BEGIN
+    -- Whitelisted sort columns (mirrors SupabaseClient._apply_sorting)
+    sort_expr := CASE p_sort_by
+        WHEN 'name' THEN 'p.name'
+        WHEN 'city' THEN 'p.city'
+        WHEN 'location' THEN 'p.city'
+        WHEN 'position' THEN 'p."position"'
+        WHEN 'country_code' THEN 'p.country_code'
+        WHEN 'followers' THEN 'p.followers'
+        WHEN 'connections' THEN 'p.connections'
+        WHEN 'timestamp' THEN 'p."timestamp"'
+        WHEN 'url' THEN 'p.url'
+        WHEN 'about' THEN 'p.about'
+        WHEN 'profile_image_url' THEN 'p.profile_image_url'
+        WHEN 'suggested_role' THEN 'p.suggested_role'
+        WHEN 'linkedin_id' THEN 'p.linkedin_id'
+        WHEN 'current_company' THEN $q$(p.current_company->>'name')$q$
+        WHEN 'company' THEN $q$(p.current_company->>'name')$q$
+        ELSE 'p.created_at'
+    END;
+    sort_dir := CASE WHEN lower(coalesce(p_sort_order, 'desc')) = 'asc' THEN 'ASC' ELSE 'DESC' END;
+
+    EXECUTE format($sql$
+        WITH filtered AS (
+            SELECT p.*
+            FROM linkedin_profiles p
+            WHERE ($1 IS NULL OR p.name ILIKE '%%' || $1 || '%%')
+              AND ($2 IS NULL OR EXISTS (
+                    SELECT 1
+                    FROM profile_companies pc
+                    JOIN companies c ON c.id = pc.company_id
+                    WHERE pc.profile_id = p.id
+                      AND c.company_name ILIKE '%%' || $2 || '%%'
+              ))
+              AND ($3 IS NULL OR p.city ILIKE '%%' || $3 || '%%')
+              AND (NOT $4 OR NOT EXISTS (
+                    SELECT 1 FROM profile_scores s WHERE s.profile_id = p.linkedin_id
+              ))
+              AND ($5 IS NULL OR EXISTS (
+                    SELECT 1
+                    FROM profile_scores s
+                    WHERE s.profile_id = p.linkedin_id
+                      AND s.overall_score >= $5
+                      AND ($6 IS NULL OR s.overall_score < $6 OR ($7 AND s.overall_score = $6))
+              ))
+        ),
+        page AS (
+            SELECT p.*, row_number() OVER (ORDER BY %1$s %2$s NULLS LAST, p.id %2$s) AS _row_number
+            FROM filtered p
+            ORDER BY %1$s %2$s NULLS LAST, p.id %2$s
+            LIMIT $8 OFFSET $9
+        )
+        SELECT jsonb_build_object(
+            'total', (SELECT count(*) FROM filtered),
+            'profiles', coalesce(
+                (SELECT jsonb_agg(to_jsonb(page) - '_row_number' ORDER BY page._row_number) FROM page),
+                '[]'::jsonb
+            )
+        )
+    $sql$, sort_expr, sort_dir)
+    INTO search_result
+    USING p_name, p_company, p_location, coalesce(p_unscored, FALSE),
+          p_score_min, p_score_max, coalesce(p_score_max_inclusive, TRUE),
+          greatest(p_limit, 0), greatest(p_offset, 0);
+
+    RETURN search_result;
+END;
+$$;
+
+-- Support the score joins used by search_profiles
+DO $$
+BEGIN
+    IF to_regclass('public.profile_scores') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_profile_scores_profile_id_score
+            ON profile_scores(profile_id, overall_score);
+    END IF;
+END;
+$$;
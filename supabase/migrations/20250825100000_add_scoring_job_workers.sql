@@ -0,0 +1,114 @@
+-- Durable scoring job workers
+-- Persists per-job request parameters and worker ownership on scoring_jobs and
+-- adds the RPC functions the worker pool uses to claim, heartbeat, release and
+-- reclaim jobs atomically.
+
+ALTER TABLE scoring_jobs ADD COLUMN IF NOT EXISTS max_tokens INTEGER;
+ALTER TABLE scoring_jobs ADD COLUMN IF NOT EXISTS temperature REAL;
+ALTER TABLE scoring_jobs ADD COLUMN IF NOT EXISTS worker_id TEXT;
+ALTER TABLE scoring_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
+
+-- Claim polling: oldest pending job first
+CREATE INDEX IF NOT EXISTS idx_scoring_jobs_pending_created
+    ON scoring_jobs(created_at)
+    WHERE status = 'pending';
+
+-- Stale job detection
+CREATE INDEX IF NOT EXISTS idx_scoring_jobs_processing_heartbeat
+    ON scoring_jobs(heartbeat_at)
+    WHERE status = 'processing';
+
+-- Atomically claim the oldest pending job, skipping rows locked by other workers
+-- and models the caller is already running at capacity
+CREATE OR REPLACE FUNCTION claim_scoring_job(
+    p_worker_id TEXT,
+    p_exclude_models TEXT[] DEFAULT '{}'
+)
+RETURNS SETOF scoring_jobs
+LANGUAGE sql VOLATILE
+AS $$
+    UPDATE scoring_jobs j
+    SET status = 'processing',
+        worker_id = p_worker_id,
+        started_at = now(),
+        heartbeat_at = now(),
+        updated_at = now()
+    WHERE j.id = (
+        SELECT id
+        FROM scoring_jobs
+        WHERE status = 'pending'
+          AND NOT (model_name = ANY(coalesce(p_exclude_models, '{}')))
+        ORDER BY created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$;
+
+-- Record liveness for jobs a worker is still processing
+CREATE OR REPLACE FUNCTION heartbeat_scoring_jobs(
+    p_worker_id TEXT,
+    p_job_ids UUID[]
+)
+RETURNS INTEGER
+LANGUAGE sql VOLATILE
+AS $$
+    WITH touched AS (
+        UPDATE scoring_jobs
+        SET heartbeat_at = now()
+        WHERE id = ANY(p_job_ids)
+          AND worker_id = p_worker_id
+          AND status = 'processing'
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM touched;
+$$;
+
+-- Hand unfinished jobs back to the queue (graceful shutdown)
+CREATE OR REPLACE FUNCTION release_scoring_jobs(
+    p_worker_id TEXT,
+    p_job_ids UUID[]
+)
+RETURNS INTEGER
+LANGUAGE sql VOLATILE
+AS $$
+    WITH released AS (
+        UPDATE scoring_jobs
+        SET status = 'pending',
+            worker_id = NULL,
+            heartbeat_at = NULL,
+            started_at = NULL,
+            updated_at = now()
+        WHERE id = ANY(p_job_ids)
+          AND worker_id = p_worker_id
+          AND status = 'processing'
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM released;
+$$;
+
+-- Requeue (or fail, once out of retries) jobs whose worker stopped heartbeating
+CREATE OR REPLACE FUNCTION reclaim_stale_scoring_jobs(
+    p_stale_seconds INTEGER,
+    p_max_retries INTEGER DEFAULT 3
+)
+RETURNS INTEGER
+LANGUAGE sql VOLATILE
+AS $$
+    WITH reclaimed AS (
+        UPDATE scoring_jobs
+        SET status = CASE WHEN retry_count < p_max_retries THEN 'pending' ELSE 'failed' END,
+            retry_count = LEAST(retry_count + 1, 10),
+            error_message = CASE
+                WHEN retry_count < p_max_retries THEN NULL
+                ELSE 'Worker stopped responding while processing job'
+            END,
+            worker_id = NULL,
+            heartbeat_at = NULL,
+            updated_at = now()
+        WHERE status = 'processing'
+          AND coalesce(heartbeat_at, started_at, updated_at) < now() - make_interval(secs => p_stale_seconds)
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM reclaimed;
+$$;
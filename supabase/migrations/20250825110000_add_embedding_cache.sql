@@ -0,0 +1,14 @@
+-- Content-hash embedding cache
+-- Persistent tier of EmbeddingCache: vectors keyed by SHA-256 of the embedding
+-- model name plus the normalized input text, so unchanged profile and company
+-- text is never sent to OpenAI twice.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    cache_key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    embedding vector(1536) NOT NULL,
+    token_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON embedding_cache(created_at);
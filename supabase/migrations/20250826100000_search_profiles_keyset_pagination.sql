@@ -0,0 +1,162 @@
+-- Keyset (cursor) pagination for search_profiles
+-- p_after_value/p_after_id continue strictly after the last row of the previous
+-- page in (sort value NULLS LAST, id) order, so deep pages cost the same as the
+-- first and concurrent inserts don't shift them. The result gains 'next' with
+-- the sort value and id of the page's last row when another page follows.
+-- LIMIT/OFFSET still works for callers that don't pass a cursor.
+
+DROP FUNCTION IF EXISTS search_profiles(TEXT, TEXT, TEXT, BOOLEAN, NUMERIC, NUMERIC, BOOLEAN, TEXT, TEXT, INT, INT, TEXT[]);
+
+CREATE OR REPLACE FUNCTION search_profiles(
+    p_name TEXT DEFAULT NULL,
+    p_company TEXT DEFAULT NULL,
+    p_location TEXT DEFAULT NULL,
+    p_unscored BOOLEAN DEFAULT FALSE,
+    p_score_min NUMERIC DEFAULT NULL,
+    p_score_max NUMERIC DEFAULT NULL,
+    p_score_max_inclusive BOOLEAN DEFAULT TRUE,
+    p_sort_by TEXT DEFAULT 'created_at',
+    p_sort_order TEXT DEFAULT 'desc',
+    p_limit INT DEFAULT 50,
+    p_offset INT DEFAULT 0,
+    p_columns TEXT[] DEFAULT NULL,
+    p_after_value TEXT DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    sort_expr TEXT;
+    sort_type TEXT;
+    sort_dir TEXT;
+    seek_op TEXT;
+    keyset TEXT;
+    select_list TEXT;
+    search_result JSONB;
+BEGIN
+    -- Whitelisted sort columns (mirrors SupabaseClient._apply_sorting)
+    sort_expr := CASE p_sort_by
+        WHEN 'name' THEN 'p.name'
+        WHEN 'city' THEN 'p.city'
+        WHEN 'location' THEN 'p.city'
+        WHEN 'position' THEN 'p."position"'
+        WHEN 'country_code' THEN 'p.country_code'
+        WHEN 'followers' THEN 'p.followers'
+        WHEN 'connections' THEN 'p.connections'
+        WHEN 'timestamp' THEN 'p."timestamp"'
+        WHEN 'url' THEN 'p.url'
+        WHEN 'about' THEN 'p.about'
+        WHEN 'profile_image_url' THEN 'p.profile_image_url'
+        WHEN 'suggested_role' THEN 'p.suggested_role'
+        WHEN 'linkedin_id' THEN 'p.linkedin_id'
+        WHEN 'current_company' THEN $q$(p.current_company->>'name')$q$
+        WHEN 'company' THEN $q$(p.current_company->>'name')$q$
+        ELSE 'p.created_at'
+    END;
+    sort_type := CASE p_sort_by
+        WHEN 'followers' THEN 'integer'
+        WHEN 'connections' THEN 'integer'
+        WHEN 'timestamp' THEN 'timestamptz'
+        WHEN 'url' THEN 'text'
+        WHEN 'name' THEN 'text'
+        WHEN 'city' THEN 'text'
+        WHEN 'location' THEN 'text'
+        WHEN 'position' THEN 'text'
+        WHEN 'country_code' THEN 'text'
+        WHEN 'about' THEN 'text'
+        WHEN 'profile_image_url' THEN 'text'
+        WHEN 'suggested_role' THEN 'text'
+        WHEN 'linkedin_id' THEN 'text'
+        WHEN 'current_company' THEN 'text'
+        WHEN 'company' THEN 'text'
+        ELSE 'timestamptz'
+    END;
+    sort_dir := CASE WHEN lower(coalesce(p_sort_order, 'desc')) = 'asc' THEN 'ASC' ELSE 'DESC' END;
+    seek_op := CASE sort_dir WHEN 'ASC' THEN '>' ELSE '<' END;
+
+    -- Keyset: rows strictly after the cursor row in (sort value NULLS LAST, id) order
+    IF p_after_id IS NULL THEN
+        keyset := 'TRUE';
+    ELSIF p_after_value IS NULL THEN
+        keyset := format('(%1$s IS NULL AND p.id %2$s $11)', sort_expr, seek_op);
+    ELSE
+        keyset := format(
+            '(%1$s %2$s $10::%3$s OR (%1$s = $10::%3$s AND p.id %2$s $11) OR %1$s IS NULL)',
+            sort_expr, seek_op, sort_type
+        );
+    END IF;
+
+    -- Requested columns that exist on linkedin_profiles (quoted), never the embedding
+    SELECT string_agg(format('p.%I', cols.column_name), ', ' ORDER BY cols.ordinal_position)
+    INTO select_list
+    FROM information_schema.columns cols
+    WHERE cols.table_schema = 'public'
+      AND cols.table_name = 'linkedin_profiles'
+      AND cols.column_name <> 'embedding'
+      AND (p_columns IS NULL OR cols.column_name = ANY(p_columns || ARRAY['id']));
+
+    EXECUTE format($sql$
+        WITH filtered AS (
+            SELECT p.id
+            FROM linkedin_profiles p
+            WHERE ($1 IS NULL OR p.name ILIKE '%%' || $1 || '%%')
+              AND ($2 IS NULL OR EXISTS (
+                    SELECT 1
+                    FROM profile_companies pc
+                    JOIN companies c ON c.id = pc.company_id
+                    WHERE pc.profile_id = p.id
+                      AND c.company_name ILIKE '%%' || $2 || '%%'
+              ))
+              AND ($3 IS NULL OR p.city ILIKE '%%' || $3 || '%%')
+              AND (NOT $4 OR NOT EXISTS (
+                    SELECT 1 FROM profile_scores s WHERE s.profile_id = p.linkedin_id
+              ))
+              AND ($5 IS NULL OR EXISTS (
+                    SELECT 1
+                    FROM profile_scores s
+                    WHERE s.profile_id = p.linkedin_id
+                      AND s.overall_score >= $5
+                      AND ($6 IS NULL OR s.overall_score < $6 OR ($7 AND s.overall_score = $6))
+              ))
+        ),
+        page AS (
+            SELECT %3$s, %1$s AS _sort_key
+            FROM linkedin_profiles p
+            JOIN filtered f ON f.id = p.id
+            WHERE %4$s
+            ORDER BY %1$s %2$s NULLS LAST, p.id %2$s
+            LIMIT $8 + 1 OFFSET $9
+        ),
+        numbered AS (
+            SELECT page.*, row_number() OVER (ORDER BY page._sort_key %2$s NULLS LAST, page.id %2$s) AS _position
+            FROM page
+        )
+        SELECT jsonb_build_object(
+            'total', (SELECT count(*) FROM filtered),
+            'profiles', coalesce(
+                (SELECT jsonb_agg(to_jsonb(numbered) - '_sort_key' - '_position' ORDER BY numbered._position)
+                 FROM numbered WHERE numbered._position <= $8),
+                '[]'::jsonb
+            ),
+            'next', (
+                SELECT jsonb_build_object('value', last_row._sort_key::text, 'id', last_row.id)
+                FROM numbered last_row
+                WHERE last_row._position = $8
+                  AND (SELECT count(*) FROM numbered) > $8
+            )
+        )
+    $sql$, sort_expr, sort_dir, select_list, keyset)
+    INTO search_result
+    USING p_name, p_company, p_location, coalesce(p_unscored, FALSE),
+          p_score_min, p_score_max, coalesce(p_score_max_inclusive, TRUE),
+          greatest(p_limit, 0), greatest(p_offset, 0), p_after_value, p_after_id;
+
+    RETURN search_result;
+END;
+$$;
+
+-- Seek indexes for the default (created_at, id) ordering of the paged lists
+CREATE INDEX IF NOT EXISTS idx_linkedin_profiles_created_at_id ON linkedin_profiles(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_companies_created_at_id ON companies(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_scoring_jobs_created_at_id ON scoring_jobs(created_at DESC, id DESC);
@@ -0,0 +1,29 @@
+-- Server-side scoring job stats
+-- Counts jobs per status with GROUP BY inside the database, so the jobs page
+-- receives a handful of rows instead of the status of every job ever created.
+-- Optionally breaks the counts down per template or per model and restricts
+-- them to a created_at window [p_since, p_until).
+
+CREATE OR REPLACE FUNCTION scoring_job_stats(
+    p_since TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_until TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_group_by TEXT DEFAULT NULL
+)
+RETURNS TABLE(group_key TEXT, status TEXT, job_count BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        CASE p_group_by
+            WHEN 'template' THEN j.template_id::text
+            WHEN 'model' THEN j.model_name::text
+        END AS group_key,
+        j.status::text,
+        count(*) AS job_count
+    FROM scoring_jobs j
+    WHERE (p_since IS NULL OR j.created_at >= p_since)
+      AND (p_until IS NULL OR j.created_at < p_until)
+    GROUP BY 1, 2;
+$$;
+
+-- Status counts within a time window scan the window only
+CREATE INDEX IF NOT EXISTS idx_scoring_jobs_created_status ON scoring_jobs(created_at, status);
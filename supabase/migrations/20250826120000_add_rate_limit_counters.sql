@@ -0,0 +1,26 @@
+-- Shared sliding-window rate limit counters
+-- Backs RATE_LIMIT_BACKEND=postgres so every API worker enforces the same
+-- per-API-key, per-profile and per-upstream limits. Requests are counted by
+-- rate_limit_hit_many (20250827150000_add_rate_limit_hit_many.sql).
+
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    key TEXT PRIMARY KEY,
+    window_index BIGINT NOT NULL,
+    current_count INTEGER NOT NULL DEFAULT 0,
+    previous_count INTEGER NOT NULL DEFAULT 0,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires_at ON rate_limit_counters(expires_at);
+
+-- Expired counters carry no state; safe to delete at any time. The API calls
+-- this every RATE_LIMIT_PURGE_INTERVAL_SECONDS.
+CREATE OR REPLACE FUNCTION purge_rate_limit_counters()
+RETURNS INTEGER
+LANGUAGE sql VOLATILE
+AS $$
+    WITH purged AS (
+        DELETE FROM rate_limit_counters WHERE expires_at < clock_timestamp() RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM purged;
+$$;
@@ -0,0 +1,95 @@
+-- Asynchronous batch ingestion jobs
+-- POST /api/v1/profiles/batches records a batch and one item per requested
+-- profile, then processes them in the background. Each item's outcome is
+-- written as soon as it finishes, so progress can be polled (or streamed)
+-- and a batch's results never have to be held in memory at once.
+
+CREATE TABLE IF NOT EXISTS ingestion_batches (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    total_requested INTEGER NOT NULL CHECK (total_requested > 0),
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    max_concurrent INTEGER NOT NULL DEFAULT 3,
+    error_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS ingestion_batch_items (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    batch_id UUID NOT NULL REFERENCES ingestion_batches(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    linkedin_url TEXT NOT NULL,
+    request JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'processing', 'completed', 'failed')),
+    profile_id UUID,
+    result JSONB,
+    error_message TEXT,
+    started_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ,
+    UNIQUE (batch_id, position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_batches_created_at ON ingestion_batches(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_ingestion_batch_items_batch_status ON ingestion_batch_items(batch_id, status);
+
+-- Record one item's outcome and bump the batch counters in one statement, so
+-- concurrent items never lose an update and the batch completes exactly once.
+-- Returns the updated batch; an item that already finished is left unchanged.
+CREATE OR REPLACE FUNCTION complete_ingestion_batch_item(
+    p_item_id UUID,
+    p_status TEXT,
+    p_profile_id UUID DEFAULT NULL,
+    p_result JSONB DEFAULT NULL,
+    p_error_message TEXT DEFAULT NULL
+)
+RETURNS SETOF ingestion_batches
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    item_batch_id UUID;
+BEGIN
+    IF p_status NOT IN ('completed', 'failed') THEN
+        RAISE EXCEPTION 'Invalid item status: %', p_status;
+    END IF;
+
+    UPDATE ingestion_batch_items
+    SET status = p_status,
+        profile_id = p_profile_id,
+        result = p_result,
+        error_message = p_error_message,
+        completed_at = NOW()
+    WHERE id = p_item_id
+      AND status IN ('pending', 'processing')
+    RETURNING batch_id INTO item_batch_id;
+
+    IF item_batch_id IS NULL THEN
+        RETURN QUERY
+        SELECT b.* FROM ingestion_batches b
+        JOIN ingestion_batch_items i ON i.batch_id = b.id
+        WHERE i.id = p_item_id;
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    UPDATE ingestion_batches
+    SET successful = successful + (p_status = 'completed')::INT,
+        failed = failed + (p_status = 'failed')::INT,
+        status = CASE
+            WHEN successful + failed + 1 >= total_requested THEN 'completed'
+            ELSE 'running'
+        END,
+        completed_at = CASE
+            WHEN successful + failed + 1 >= total_requested THEN NOW()
+            ELSE completed_at
+        END,
+        updated_at = NOW()
+    WHERE id = item_batch_id
+    RETURNING *;
+END;
+$$;
@@ -0,0 +1,24 @@
+-- Deferred company enrichment
+-- POST /api/v1/profiles with defer_companies stores and returns the profile
+-- right after its own Cassidy fetch; its companies are fetched, upserted and
+-- linked in the background. One row per profile records that work, so clients
+-- can poll GET /api/v1/profiles/{profile_id}/enrichment from any worker.
+-- No foreign key on profile_id: SupabaseClient.delete_profile deletes the row
+-- together with the profile.
+
+CREATE TABLE IF NOT EXISTS profile_enrichments (
+    profile_id UUID PRIMARY KEY,
+    pipeline_id UUID,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'processing', 'completed', 'failed')),
+    companies JSONB NOT NULL DEFAULT '[]'::jsonb,
+    companies_linked INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_profile_enrichments_status ON profile_enrichments(status)
+    WHERE status IN ('pending', 'processing');
@@ -0,0 +1,7 @@
+-- Incremental profile re-ingestion
+-- Content hash (model + embedding text, as used by the embedding cache) of the
+-- text a profile's embedding was generated from. Re-ingesting with
+-- update_mode=incremental only re-embeds a profile when this hash changes.
+-- Profiles stored before this column existed are re-embedded once.
+
+ALTER TABLE linkedin_profiles ADD COLUMN IF NOT EXISTS embedding_text_hash TEXT;
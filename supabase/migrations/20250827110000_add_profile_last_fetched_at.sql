@@ -0,0 +1,8 @@
+-- Profile freshness policy
+-- When a profile was last fetched from Cassidy. POST /api/v1/profiles returns a
+-- stored profile fetched within PROFILE_FRESHNESS_SECONDS without fetching it
+-- again, unless the request sets force_refresh. Set on store and on every
+-- incremental re-ingestion; rows stored before this column existed fall back
+-- to created_at.
+
+ALTER TABLE linkedin_profiles ADD COLUMN IF NOT EXISTS last_fetched_at TIMESTAMPTZ;
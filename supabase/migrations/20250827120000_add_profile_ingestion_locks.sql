@@ -0,0 +1,51 @@
+-- Per-URL profile ingestion leases
+-- Backs PROFILE_LOCK_BACKEND=postgres so concurrent POST /api/v1/profiles for
+-- the same normalized URL are serialized across every API worker. PostgREST
+-- runs each call on any pooled connection, so a session-level advisory lock
+-- can't outlive one request: a transaction-level advisory lock decides who
+-- takes the lease, and the lease row (with an expiry, in case its worker dies)
+-- is held for the duration of the ingestion.
+
+CREATE TABLE IF NOT EXISTS profile_ingestion_locks (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION profile_ingestion_lock_acquire(
+    p_key TEXT,
+    p_owner TEXT,
+    p_ttl_seconds DOUBLE PRECISION
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    lease profile_ingestion_locks%ROWTYPE;
+BEGIN
+    -- Serializes acquirers of this key until the end of the call
+    PERFORM pg_advisory_xact_lock(hashtextextended(p_key, 0));
+
+    SELECT * INTO lease FROM profile_ingestion_locks WHERE key = p_key;
+
+    IF FOUND AND lease.owner <> p_owner AND lease.expires_at > clock_timestamp() THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO profile_ingestion_locks (key, owner, expires_at)
+    VALUES (p_key, p_owner, clock_timestamp() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at;
+
+    RETURN TRUE;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION profile_ingestion_lock_release(
+    p_key TEXT,
+    p_owner TEXT
+)
+RETURNS VOID
+LANGUAGE sql VOLATILE
+AS $$
+    DELETE FROM profile_ingestion_locks WHERE key = p_key AND owner = p_owner;
+$$;
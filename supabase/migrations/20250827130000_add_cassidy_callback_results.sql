@@ -0,0 +1,15 @@
+-- Cassidy workflow callback results
+-- Backs CASSIDY_CALLBACK_BACKEND=postgres. In callback mode Cassidy posts a
+-- workflow result to whichever API worker the load balancer picks; if that
+-- worker isn't the one waiting for the request, it stores the result here and
+-- the waiting worker's sweeper takes it (DELETE ... RETURNING). Rows nobody
+-- takes are purged after twice the callback timeout.
+
+CREATE TABLE IF NOT EXISTS cassidy_callback_results (
+    request_id TEXT PRIMARY KEY,
+    payload JSONB NOT NULL,
+    received_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_cassidy_callback_results_received_at
+    ON cassidy_callback_results (received_at);
@@ -0,0 +1,31 @@
+-- Reclaim only scoring jobs owned by a worker pool
+-- Jobs processed in-process by the fallback path (no worker pool running) are
+-- marked processing without a worker_id and never heartbeat, so the reclaim
+-- loop of another instance's pool would requeue them and score them twice.
+-- Those jobs are now left to the process running them.
+
+CREATE OR REPLACE FUNCTION reclaim_stale_scoring_jobs(
+    p_stale_seconds INTEGER,
+    p_max_retries INTEGER DEFAULT 3
+)
+RETURNS INTEGER
+LANGUAGE sql VOLATILE
+AS $$
+    WITH reclaimed AS (
+        UPDATE scoring_jobs
+        SET status = CASE WHEN retry_count < p_max_retries THEN 'pending' ELSE 'failed' END,
+            retry_count = LEAST(retry_count + 1, 10),
+            error_message = CASE
+                WHEN retry_count < p_max_retries THEN NULL
+                ELSE 'Worker stopped responding while processing job'
+            END,
+            worker_id = NULL,
+            heartbeat_at = NULL,
+            updated_at = now()
+        WHERE status = 'processing'
+          AND worker_id IS NOT NULL
+          AND coalesce(heartbeat_at, started_at, updated_at) < now() - make_interval(secs => p_stale_seconds)
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM reclaimed;
+$$;
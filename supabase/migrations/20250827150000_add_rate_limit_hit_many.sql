@@ -0,0 +1,95 @@
+-- Check every rate limit of a request together
+-- rate_limit_hit_many checks one request against several counters (API key,
+-- profile, upstream) in one call and counts it on all of them only if every
+-- counter allows it, so a request rejected by one limit does not use up the
+-- others. Mirrors app.core.rate_limit.sliding_window_hit: the current fixed
+-- window's count plus the previous window's count weighted by its remaining
+-- overlap.
+
+CREATE OR REPLACE FUNCTION rate_limit_hit_many(
+    p_keys TEXT[],
+    p_limits INT[],
+    p_window_seconds DOUBLE PRECISION[]
+)
+RETURNS JSONB
+LANGUAGE plpgsql VOLATILE
+AS $$
+DECLARE
+    now_epoch DOUBLE PRECISION := extract(epoch FROM clock_timestamp());
+    hit_count INT := coalesce(array_length(p_keys, 1), 0);
+    indexes BIGINT[] := '{}';
+    currents INT[] := '{}';
+    previouses INT[] := '{}';
+    results JSONB := '[]'::jsonb;
+    all_allowed BOOLEAN := TRUE;
+    i INT;
+    idx BIGINT;
+    elapsed DOUBLE PRECISION;
+    counter rate_limit_counters%ROWTYPE;
+    cur INT;
+    prev INT;
+    estimated DOUBLE PRECISION;
+    retry_after DOUBLE PRECISION;
+BEGIN
+    INSERT INTO rate_limit_counters (key, window_index, expires_at)
+    SELECT k, 0, clock_timestamp() FROM unnest(p_keys) AS k
+    ON CONFLICT (key) DO NOTHING;
+
+    -- Lock the counters in key order so concurrent requests can't deadlock
+    PERFORM 1 FROM rate_limit_counters WHERE key = ANY(p_keys) ORDER BY key FOR UPDATE;
+
+    FOR i IN 1..hit_count LOOP
+        idx := floor(now_epoch / p_window_seconds[i]);
+        elapsed := now_epoch - idx * p_window_seconds[i];
+        SELECT * INTO counter FROM rate_limit_counters WHERE key = p_keys[i];
+
+        cur := 0;
+        prev := 0;
+        IF counter.window_index = idx THEN
+            cur := counter.current_count;
+            prev := counter.previous_count;
+        ELSIF counter.window_index = idx - 1 THEN
+            prev := counter.current_count;
+        END IF;
+        indexes := indexes || idx;
+        currents := currents || cur;
+        previouses := previouses || prev;
+
+        estimated := prev * (1 - elapsed / p_window_seconds[i]) + cur;
+
+        IF estimated + 1 <= p_limits[i] THEN
+            results := results || jsonb_build_array(jsonb_build_object(
+                'allowed', TRUE,
+                'remaining', greatest(0, floor(p_limits[i] - estimated - 1)),
+                'retry_after', 0
+            ));
+        ELSE
+            all_allowed := FALSE;
+            IF cur + 1 > p_limits[i] THEN
+                retry_after := p_window_seconds[i] - elapsed;
+                IF cur > 0 THEN
+                    retry_after := retry_after + greatest(0, p_window_seconds[i] * (1 - (p_limits[i] - 1)::DOUBLE PRECISION / cur));
+                END IF;
+            ELSE
+                retry_after := p_window_seconds[i] * (1 - (p_limits[i] - 1 - cur)::DOUBLE PRECISION / prev) - elapsed;
+            END IF;
+            results := results || jsonb_build_array(jsonb_build_object(
+                'allowed', FALSE, 'remaining', 0, 'retry_after', greatest(retry_after, 0)
+            ));
+        END IF;
+    END LOOP;
+
+    IF all_allowed THEN
+        FOR i IN 1..hit_count LOOP
+            UPDATE rate_limit_counters
+            SET window_index = indexes[i],
+                current_count = currents[i] + 1,
+                previous_count = previouses[i],
+                expires_at = clock_timestamp() + make_interval(secs => 2 * p_window_seconds[i])
+            WHERE key = p_keys[i];
+        END LOOP;
+    END IF;
+
+    RETURN results;
+END;
+$$;
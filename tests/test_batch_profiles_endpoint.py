@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from app.testing.compatibility import TestClient
 from unittest.mock import AsyncMock, patch, MagicMock
@@ -264,3 +266,37 @@ def test_batch_create_profiles_unauthorized(client):
     
     # Should return unauthorized
     assert response.status_code == 403
+
+def test_batch_create_profiles_ndjson_streams_each_result(client):
+    """Accept: application/x-ndjson streams one line per profile and a summary line"""
+    from main import app, get_profile_controller, ProfileController, ProfileResponse
+    
+    controller = ProfileController(MagicMock(), MagicMock(), MagicMock(), linkedin_pipeline=MagicMock(), batch_runner=MagicMock())
+    
+    async def create_profile(profile_request):
+        if str(profile_request.linkedin_url) == MOCK_LINKEDIN_URL2:
+            raise ValueError("Cassidy workflow failed")
+        return ProfileResponse(**create_mock_profile(MOCK_PROFILE_ID1, MOCK_LINKEDIN_URL1, name="John Doe"))
+    
+    controller.create_profile = create_profile
+    app.dependency_overrides[get_profile_controller] = lambda: controller
+    try:
+        response = client.post(
+            "/api/v1/profiles/batch",
+            json=MOCK_BATCH_REQUEST,
+            headers={"X-API-Key": VALID_API_KEY, "Accept": "application/x-ndjson"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert response.status_code == 201
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = {line["position"]: line for line in lines[:-1]}
+    
+    assert results[0]["status"] == "completed"
+    assert results[0]["profile"]["id"] == MOCK_PROFILE_ID1
+    assert results[1]["status"] == "failed"
+    assert results[1]["error"] == "Cassidy workflow failed"
+    assert lines[-1]["type"] == "summary"
+    assert (lines[-1]["total_requested"], lines[-1]["successful"], lines[-1]["failed"]) == (2, 1, 1)
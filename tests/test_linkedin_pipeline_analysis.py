@@ -4,7 +4,7 @@ Created for Task 1 analysis to understand and validate existing behavior
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from app.services.linkedin_pipeline import LinkedInDataPipeline
 from app.cassidy.models import LinkedInProfile, CompanyProfile, ExperienceEntry
 
@@ -197,7 +197,7 @@ class TestLinkedInPipelineCompanyMethods:
 
     @pytest.mark.asyncio
     async def test_fetch_companies_rate_limiting(self, pipeline):
-        """Test _fetch_companies includes rate limiting delays"""
+        """Test _fetch_companies takes a rate limit token per URL and reports timings"""
         
         mock_company = CompanyProfile(company_name="Test Corp", company_id="1")
         
@@ -206,15 +206,21 @@ class TestLinkedInPipelineCompanyMethods:
             return mock_company
         
         pipeline.cassidy_client.fetch_company = Mock(side_effect=mock_fetch_company)
+        pipeline.rate_limiter = Mock()
+        pipeline.rate_limiter.acquire = AsyncMock(return_value=0.5)
         
         urls = ["https://linkedin.com/company/test-corp"]
+        timings = []
         
-        with patch('asyncio.sleep') as mock_sleep:
-            companies = await pipeline._fetch_companies(urls)
-            
-            # Should call sleep once per URL for rate limiting
-            assert mock_sleep.call_count == 1
-            mock_sleep.assert_called_with(1)  # 1 second delay
+        companies = await pipeline._fetch_companies(urls, timings)
+        
+        # Should take one token per URL
+        assert pipeline.rate_limiter.acquire.await_count == 1
+        assert companies == [mock_company]
+        assert len(timings) == 1
+        assert timings[0]["company_url"] == urls[0]
+        assert timings[0]["token_wait_seconds"] == 0.5
+        assert timings[0]["success"] is True
 
     @pytest.mark.asyncio
     async def test_fetch_companies_empty_list(self, pipeline):
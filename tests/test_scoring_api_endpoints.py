@@ -199,26 +199,28 @@ class TestScoringAPIEndpoints:
                 mock_job_service.create_job = AsyncMock(return_value=str(uuid.uuid4()))
                 
                 with patch('app.controllers.scoring_controllers.LLMScoringService') as MockLLMService:
-                    # Simulate rate limit exceeded by making multiple requests
                     controller = ProfileScoringController()
                     
-                    # Fill rate limit for this profile
-                    now = datetime.now(timezone.utc)
-                    controller._rate_limits[mock_profile_id] = [
-                        now - timedelta(minutes=30) for _ in range(10)
-                    ]
-                    
-                    with patch('main.get_profile_scoring_controller', return_value=controller):
+                    # One scoring request per profile per hour: the second is rejected
+                    with patch('main.get_profile_scoring_controller', return_value=controller), \
+                         patch.object(settings, 'RATE_LIMIT_PROFILE_SCORING_PER_HOUR', 1):
+                        first = client.post(
+                            f"/api/v1/profiles/{mock_profile_id}/score", 
+                            json=scoring_request_payload,
+                            headers={"x-api-key": valid_api_key}
+                        )
                         response = client.post(
                             f"/api/v1/profiles/{mock_profile_id}/score", 
                             json=scoring_request_payload,
                             headers={"x-api-key": valid_api_key}
                         )
         
+        assert first.status_code != 429
         assert response.status_code == 429
         data = response.json()
         assert data["detail"]["error_code"] == "RATE_LIMIT_EXCEEDED"
-        assert "Retry-After" in response.headers
+        assert data["detail"]["details"]["scope"] == "profile_scoring"
+        assert int(response.headers["Retry-After"]) > 0
 
     # GET /api/v1/scoring-jobs/{job_id} Tests
 
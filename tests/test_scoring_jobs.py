@@ -489,6 +489,67 @@ class TestScoringJobService:
         assert jobs[1].id == "job-2"
         assert all(job.profile_id == profile_id for job in jobs)
     
+    @pytest.mark.asyncio
+    async def test_job_stats_aggregated_in_database(self, scoring_service):
+        """Test per-status totals come from the scoring_job_stats aggregate"""
+        service, mock_table = scoring_service
+        
+        mock_result = MagicMock()
+        mock_result.data = [
+            {"group_key": None, "status": "completed", "job_count": 1200},
+            {"group_key": None, "status": "pending", "job_count": 30},
+            {"group_key": None, "status": "failed", "job_count": 4}
+        ]
+        service.client.rpc.return_value.execute = AsyncMock(return_value=mock_result)
+        since = datetime(2025, 8, 1, tzinfo=timezone.utc)
+        
+        stats = await service.get_job_stats(since=since)
+        
+        service.client.rpc.assert_called_once_with("scoring_job_stats", {
+            "p_since": since.isoformat(),
+            "p_until": None,
+            "p_group_by": None
+        })
+        mock_table.select.assert_not_called()
+        assert stats == {
+            "total_jobs": 1234,
+            "pending_jobs": 30,
+            "processing_jobs": 0,
+            "completed_jobs": 1200,
+            "failed_jobs": 4
+        }
+    
+    @pytest.mark.asyncio
+    async def test_job_stats_breakdown_per_template(self, scoring_service):
+        """Test per-template breakdown, with template-less jobs under 'none'"""
+        service, _ = scoring_service
+        
+        mock_result = MagicMock()
+        mock_result.data = [
+            {"group_key": "template-1", "status": "completed", "job_count": 5},
+            {"group_key": "template-1", "status": "failed", "job_count": 1},
+            {"group_key": None, "status": "completed", "job_count": 2}
+        ]
+        service.client.rpc.return_value.execute = AsyncMock(return_value=mock_result)
+        
+        stats = await service.get_job_stats(group_by="template")
+        
+        assert stats["total_jobs"] == 8
+        assert stats["completed_jobs"] == 7
+        assert stats["by_template"]["template-1"]["total_jobs"] == 6
+        assert stats["by_template"]["template-1"]["failed_jobs"] == 1
+        assert stats["by_template"]["none"]["completed_jobs"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_job_stats_rejects_unknown_breakdown(self, scoring_service):
+        """Test only template and model breakdowns are accepted"""
+        service, _ = scoring_service
+        
+        with pytest.raises(ValueError):
+            await service.get_job_stats(group_by="profile_id")
+        
+        service.client.rpc.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_database_constraint_violation(self, scoring_service):
         """Test handling of database constraint violations"""